@@ -1,45 +1,47 @@
-from nba_api.stats.endpoints import teamestimatedmetrics
 from nba_api.stats.static import teams
 import pandas as pd
 
+from data_loader import DEFAULT_SEASON, season_csv_path
+from ingest import (ADVANCED_METRICS_PREFIX, BASIC_STATS_PREFIX, COMPLETE_STATS_PREFIX,
+                    fetch_advanced_metrics, merge_team_stats)
+from nba_client import get_client
+
+ADVANCED_METRICS_CSV = season_csv_path(ADVANCED_METRICS_PREFIX, DEFAULT_SEASON)
+BASIC_STATS_CSV = season_csv_path(BASIC_STATS_PREFIX, DEFAULT_SEASON)
+COMPLETE_STATS_CSV = season_csv_path(COMPLETE_STATS_PREFIX, DEFAULT_SEASON)
+
 # Obtener la lista de todos los equipos de la NBA
 all_teams = teams.get_teams()
 print(f"Total de equipos en la NBA: {len(all_teams)}")
 
 # Obtener métricas avanzadas estimadas para todos los equipos en la temporada actual
-advanced_metrics = teamestimatedmetrics.TeamEstimatedMetrics(
-    season="2024-25",
-    season_type="Regular Season",
-    league_id="00"  # NBA
-)
-
-# Obtener los datos como un DataFrame de pandas
-metrics_df = advanced_metrics.get_data_frames()[0]
+# (para descargar y combinar todo en una sola pasada, usar ingest.py)
+metrics_df = fetch_advanced_metrics(get_client(), season=DEFAULT_SEASON)
 
 # Mostrar los nombres de las columnas disponibles
 print("\nColumnas de métricas avanzadas disponibles:")
 print(list(metrics_df.columns))
 
 # Mostrar las métricas avanzadas de todos los equipos
-print("\nMétricas avanzadas de equipos para la temporada 2024-25:")
+print(f"\nMétricas avanzadas de equipos para la temporada {DEFAULT_SEASON}:")
 pd.set_option('display.max_columns', None)  # Mostrar todas las columnas
 pd.set_option('display.width', 1000)  # Ampliar el ancho de visualización
 print(metrics_df)
 
 # Guardar las métricas avanzadas en un archivo CSV
-metrics_df.to_csv("nba_team_advanced_metrics_2024_25.csv", index=False)
-print("\nMétricas avanzadas guardadas en 'nba_team_advanced_metrics_2024_25.csv'")
+metrics_df.to_csv(ADVANCED_METRICS_CSV, index=False)
+print(f"\nMétricas avanzadas guardadas en '{ADVANCED_METRICS_CSV}'")
 
 # Combinar con estadísticas básicas
 try:
     # Cargar las estadísticas básicas guardadas previamente
-    basic_stats = pd.read_csv("nba_team_stats_2024_25.csv")
+    basic_stats = pd.read_csv(BASIC_STATS_CSV)
     
     # Unir ambos conjuntos de datos por TEAM_ID
-    combined_stats = pd.merge(basic_stats, metrics_df, on="TEAM_ID", how="inner")
+    combined_stats = merge_team_stats(basic_stats, metrics_df)
     
     # Guardar el conjunto de datos combinado
-    combined_stats.to_csv("nba_team_complete_stats_2024_25.csv", index=False)
-    print("\nEstadísticas completas guardadas en 'nba_team_complete_stats_2024_25.csv'")
+    combined_stats.to_csv(COMPLETE_STATS_CSV, index=False)
+    print(f"\nEstadísticas completas guardadas en '{COMPLETE_STATS_CSV}'")
 except Exception as e:
     print(f"\nNo se pudieron combinar las estadísticas: {e}") 
\ No newline at end of file
@@ -10,6 +10,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Importaciones locales
 from dashboard import create_dashboard
+from data_loader import DEFAULT_CSV_PATH
+from data_manager import get_data_manager
 
 # Verificar directorios necesarios
 os.makedirs('visualizations', exist_ok=True)
@@ -20,18 +22,18 @@ os.makedirs('cache', exist_ok=True)
 # Aplicación principal para Elastic Beanstalk
 def create_app():
     try:
-        # Intentar cargar los datos
-        csv_path = 'nba_team_complete_stats_2024_25.csv'
-        if os.path.exists(csv_path):
-            df = pd.read_csv(csv_path)
-            print(f"Datos cargados correctamente de {csv_path}")
+        # Obtener los datos del gestor compartido (ya cargados al importar dashboard);
+        # los callbacks leen del gestor, que recarga el CSV cuando cambia
+        manager = get_data_manager()
+        df = manager.snapshot().df
+        if not df.empty:
+            print(f"Datos cargados correctamente de {DEFAULT_CSV_PATH}")
             print(f"Dimensiones del DataFrame: {df.shape}")
         else:
-            print(f"No se encontró el archivo {csv_path}. Creando DataFrame vacío.")
-            df = pd.DataFrame()
+            print(f"No se encontró el archivo {DEFAULT_CSV_PATH}. Creando DataFrame vacío.")
         
         # Crear la aplicación Dash
-        app = create_dashboard(df)
+        app = create_dashboard(df, manager)
         return app
     
     except Exception as e:
@@ -39,10 +41,10 @@ def create_app():
         # Crear una aplicación con un DataFrame vacío como fallback
         return create_dashboard(pd.DataFrame())
 
-# Crear la aplicación - necesario para Elastic Beanstalk
-application = create_app()
-# Alias para WSGI
-app = application
+# Crear la aplicación Dash
+app = create_app()
+# Servidor WSGI (Flask) - necesario para Elastic Beanstalk y gunicorn
+application = app.server
 
 # Para ejecución local
 if __name__ == '__main__':
@@ -51,4 +53,4 @@ if __name__ == '__main__':
     debug = os.environ.get('DEBUG', 'False').lower() in ('true', '1', 't')
     
     print(f"Iniciando servidor en {host}:{port} (debug: {debug})")
-    application.run_server(host=host, port=port, debug=debug) 
\ No newline at end of file
+    app.run_server(host=host, port=port, debug=debug) 
\ No newline at end of file
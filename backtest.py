@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Backtesting del modelo de enfrentamientos.
+
+Cruza las predicciones del modelo configurado (prediction_models.py, el de
+analyze_matchup; otro con --model) con los resultados de los partidos terminados del calendario (status 'Final'
+y homeScore / awayScore, tal como los guarda get_schedule_data) y calcula,
+de forma vectorizada:
+
+- acierto (se predice al local si su probabilidad es mayor que la del visitante)
+- Brier score y log loss
+- tabla de calibración por tramos de probabilidad
+- referencias: acertar siempre con el local y Brier de la tasa de victorias local
+
+También puede evaluar un archivo de predicciones de batch_predict.py en lugar
+de recalcularlas.
+
+Nota: las estadísticas son las acumuladas de la temporada, no las que había
+antes de cada partido, así que sobre la temporada en curso el backtest es
+optimista (los resultados evaluados forman parte de los datos del modelo).
+Los ratings Elo, en cambio, no se toman de cache/elo_ratings.json (que ya
+incluye los partidos evaluados): si el modelo usa Elo, cada jornada se
+puntúa con ratings calculados sólo con los partidos de días anteriores.
+
+Uso:
+    python backtest.py
+    python backtest.py cache/nba_schedule.json --report backtest_report.json
+    python backtest.py --predictions predictions.csv
+    python backtest.py schedule_2023_24.json --season 2023-24
+"""
+
+import argparse
+import datetime
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DEFAULT_CSV_PATH, get_team_stats
+from elo import EloRatings
+from prediction_models import get_prediction_model, resolve_model
+from schedule_utils import DEFAULT_SCHEDULE_PATH, game_key, is_final, is_regular_season, iter_schedule
+from team_registry import get_registry
+
+DEFAULT_BUCKETS = 10
+LOG_LOSS_EPSILON = 1e-15
+
+
+def _score(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def completed_games(schedule, registry, regular_season_only=False):
+    """
+    Partidos terminados del calendario, como arrays.
+
+    Args:
+        schedule: Iterable de partidos (gameDate, homeTeam, awayTeam, status,
+            homeScore, awayScore)
+        registry: TeamRegistry para traducir nombres a filas
+        regular_season_only: Descartar playoffs, play-in y pretemporada
+
+    Returns:
+        Diccionario con arrays home_rows, away_rows, home_won (0/1) y listas
+        game_keys y game_dates, en el orden del calendario
+    """
+    home_rows, away_rows, home_won, keys, dates = [], [], [], [], []
+    for game in schedule:
+        if not is_final(game) or (regular_season_only and not is_regular_season(game)):
+            continue
+        home_score, away_score = _score(game.get('homeScore')), _score(game.get('awayScore'))
+        if home_score is None or away_score is None or home_score == away_score:
+            continue
+        home = registry.row(game.get('homeTeam'))
+        away = registry.row(game.get('awayTeam'))
+        if home is None or away is None:
+            continue
+        home_rows.append(home)
+        away_rows.append(away)
+        home_won.append(1.0 if home_score > away_score else 0.0)
+        keys.append(game_key(game))
+        dates.append(game.get('gameDate', ''))
+    return {
+        'home_rows': np.array(home_rows, dtype=np.intp),
+        'away_rows': np.array(away_rows, dtype=np.intp),
+        'home_won': np.array(home_won, dtype=np.float64),
+        'game_keys': keys,
+        'game_dates': dates,
+    }
+
+
+def evaluate(probabilities, outcomes, buckets=DEFAULT_BUCKETS):
+    """
+    Métricas de un conjunto de predicciones.
+
+    Args:
+        probabilities: Probabilidad de victoria del local (0-1) por partido
+        outcomes: 1 si ganó el local, 0 si no
+        buckets: Número de tramos de la tabla de calibración
+
+    Returns:
+        Diccionario con games, accuracy, brier, log_loss, las referencias y
+        la lista de tramos de calibración
+    """
+    p = np.asarray(probabilities, dtype=np.float64)
+    y = np.asarray(outcomes, dtype=np.float64)
+    games = len(p)
+    if games == 0:
+        return {'games': 0}
+
+    # Igual que analyze_matchup: con probabilidades iguales gana el visitante
+    predicted_home = p > 0.5
+    clipped = np.clip(p, LOG_LOSS_EPSILON, 1 - LOG_LOSS_EPSILON)
+    home_rate = y.mean()
+
+    edges = np.linspace(0, 1, buckets + 1)
+    bucket = np.clip(np.digitize(p, edges[1:-1]), 0, buckets - 1)
+    counts = np.bincount(bucket, minlength=buckets)
+    predicted_sum = np.bincount(bucket, weights=p, minlength=buckets)
+    observed_sum = np.bincount(bucket, weights=y, minlength=buckets)
+    calibration = [
+        {
+            'bucket': f"{edges[k]:.1f}-{edges[k + 1]:.1f}",
+            'games': int(counts[k]),
+            'mean_predicted': float(predicted_sum[k] / counts[k]),
+            'observed_home_win_rate': float(observed_sum[k] / counts[k]),
+        }
+        for k in range(buckets) if counts[k]
+    ]
+
+    return {
+        'games': games,
+        'accuracy': float((predicted_home == (y == 1)).mean()),
+        'brier': float(np.mean((p - y) ** 2)),
+        'log_loss': float(-np.mean(y * np.log(clipped) + (1 - y) * np.log(1 - clipped))),
+        'baseline_home_accuracy': float(home_rate),
+        'baseline_brier': float(np.mean((home_rate - y) ** 2)),
+        'calibration': calibration,
+    }
+
+
+def point_in_time_probabilities(model, ratings, schedule, registry, games):
+    """
+    Probabilidades de un modelo con Elo usando sólo los resultados anteriores
+    a cada fecha.
+
+    Los partidos de cada día se puntúan con los ratings de los días
+    anteriores y después se añaden a los ratings, como si el modelo se
+    hubiera consultado la mañana de cada jornada.
+
+    Args:
+        model: PredictionModel que usa Elo
+        ratings: EloRatings vacío donde se van acumulando los resultados
+        schedule: Lista de partidos del calendario
+        registry: TeamRegistry de los partidos
+        games: Partidos evaluados (resultado de completed_games)
+
+    Returns:
+        Array con la probabilidad de victoria del local (0-1) de cada partido
+    """
+    dates = np.array(games['game_dates'], dtype=str)
+    probabilities = np.empty(len(dates))
+    finished = sorted((game for game in schedule if is_final(game)), key=lambda game: game.get('gameDate', ''))
+    position = 0
+    for date in np.unique(dates):
+        start = position
+        while position < len(finished) and finished[position].get('gameDate', '') < date:
+            position += 1
+        if position > start:
+            ratings.update(finished[start:position], teams=registry.names, verbose=False)
+        # Un modelo nuevo por jornada: la caché no depende de la fecha del archivo de estado
+        home_prob = model.with_elo_ratings(ratings).filled_matrix(registry)
+        rows = np.flatnonzero(dates == date)
+        probabilities[rows] = home_prob[games['home_rows'][rows], games['away_rows'][rows]] / 100
+    return probabilities
+
+
+def model_probabilities(model, schedule, registry, games):
+    """
+    Probabilidad de victoria del local (0-1) de los partidos evaluados.
+
+    Los enfrentamientos sin opinión del modelo usan el modelo de pesos
+    (filled_matrix). Si el modelo usa Elo, los ratings se calculan en un
+    directorio temporal sólo con los partidos anteriores a cada fecha.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        ratings = EloRatings(os.path.join(directory, 'elo_ratings.json'),
+                             os.path.join(directory, 'elo_history.jsonl'))
+        if model.with_elo_ratings(ratings) is not model:
+            return point_in_time_probabilities(model, ratings, schedule, registry, games)
+    return model.filled_matrix(registry)[games['home_rows'], games['away_rows']] / 100
+
+
+def backtest(schedule, registry, regular_season_only=False, buckets=DEFAULT_BUCKETS, model=None):
+    """
+    Backtest de un modelo sobre los partidos terminados de un calendario.
+
+    Si el modelo usa Elo, cada partido se puntúa con los ratings anteriores
+    a su fecha (ver model_probabilities).
+
+    Args:
+        model: PredictionModel (por defecto, el configurado para el dashboard)
+
+    Returns:
+        Tupla (métricas, DataFrame con la predicción y el resultado de cada partido)
+    """
+    schedule = list(schedule)
+    games = completed_games(schedule, registry, regular_season_only)
+    probabilities = model_probabilities(model or get_prediction_model(), schedule, registry, games)
+
+    detail = pd.DataFrame({
+        'game_key': games['game_keys'],
+        'game_date': games['game_dates'],
+        'home_team': [registry.names[row] for row in games['home_rows']],
+        'away_team': [registry.names[row] for row in games['away_rows']],
+        'home_win_prob': probabilities,
+        'home_won': games['home_won'].astype(int),
+    })
+    return evaluate(probabilities, games['home_won'], buckets), detail
+
+
+def backtest_predictions(predictions_path, schedule, buckets=DEFAULT_BUCKETS):
+    """
+    Evalúa un archivo de predicciones de batch_predict.py (.csv o .jsonl)
+    cruzándolo por game_key con los resultados del calendario.
+    """
+    if predictions_path.endswith('.jsonl'):
+        predictions = pd.read_json(predictions_path, lines=True, dtype={'game_key': str})
+    elif predictions_path.endswith('.parquet'):
+        predictions = pd.read_parquet(predictions_path)
+    else:
+        predictions = pd.read_csv(predictions_path, dtype={'game_key': str})
+
+    results = []
+    for game in schedule:
+        home_score, away_score = _score(game.get('homeScore')), _score(game.get('awayScore'))
+        if is_final(game) and home_score is not None and away_score is not None and home_score != away_score:
+            results.append((game_key(game), 1 if home_score > away_score else 0))
+    results = pd.DataFrame(results, columns=['game_key', 'home_won'])
+
+    detail = predictions[['game_key', 'game_date', 'home_team', 'away_team', 'home_win_prob']].merge(
+        results, on='game_key', how='inner')
+    detail['home_win_prob'] = detail['home_win_prob'] / 100
+    return evaluate(detail['home_win_prob'].to_numpy(), detail['home_won'].to_numpy(), buckets), detail
+
+
+def print_report(metrics):
+    if not metrics.get('games'):
+        print("No hay partidos terminados con resultado en el calendario.")
+        return
+    print(f"Partidos evaluados: {metrics['games']}")
+    print(f"Acierto:           {metrics['accuracy'] * 100:.1f}% "
+          f"(siempre el local: {metrics['baseline_home_accuracy'] * 100:.1f}%)")
+    print(f"Brier score:       {metrics['brier']:.4f} (referencia: {metrics['baseline_brier']:.4f})")
+    print(f"Log loss:          {metrics['log_loss']:.4f}")
+    print("\nCalibración")
+    print(f"{'Tramo':>10} {'Partidos':>9} {'Predicho':>9} {'Real':>9}")
+    for row in metrics['calibration']:
+        print(f"{row['bucket']:>10} {row['games']:>9} {row['mean_predicted'] * 100:>8.1f}% "
+              f"{row['observed_home_win_rate'] * 100:>8.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest del modelo de predicción de partidos")
+    parser.add_argument('schedule', nargs='?', default=DEFAULT_SCHEDULE_PATH,
+                        help="Calendario con resultados (JSON o JSONL)")
+    parser.add_argument('--stats', default=DEFAULT_CSV_PATH, help="CSV de estadísticas completas")
+    parser.add_argument('--season', default=None,
+                        help="Usar las estadísticas de esta temporada del almacén (warehouse.py)")
+    parser.add_argument('--predictions', default=None,
+                        help="Evaluar un archivo de batch_predict.py en lugar de recalcular")
+    parser.add_argument('--regular-season', action='store_true', help="Sólo partidos de temporada regular")
+    parser.add_argument('--model', default=None,
+                        help="Modelo de predicción (por defecto, el configurado para el dashboard)")
+    parser.add_argument('--buckets', type=int, default=DEFAULT_BUCKETS, help="Tramos de calibración")
+    parser.add_argument('--report', default=None, help="Guardar el informe en JSON")
+    parser.add_argument('--details', default=None, help="Guardar el detalle por partido en CSV")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.schedule):
+        print(f"No se encontró el calendario {args.schedule}")
+        return
+
+    start = datetime.datetime.now()
+    if args.predictions:
+        metrics, detail = backtest_predictions(args.predictions, iter_schedule(args.schedule), args.buckets)
+    else:
+        if args.season:
+            from warehouse import get_warehouse
+            df = get_warehouse().load(args.season)
+        else:
+            df = get_team_stats(args.stats)
+        if df.empty:
+            return
+        metrics, detail = backtest(iter_schedule(args.schedule), get_registry(df),
+                                   args.regular_season, args.buckets, resolve_model(args.model))
+    elapsed = (datetime.datetime.now() - start).total_seconds()
+
+    print_report(metrics)
+    print(f"\nTiempo: {elapsed:.2f}s")
+
+    if args.report:
+        report = dict(metrics, schedule=args.schedule, generated_at=datetime.datetime.now().isoformat())
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Informe guardado en {args.report}")
+    if args.details:
+        detail.to_csv(args.details, index=False)
+        print(f"Detalle guardado en {args.details}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Predicción por lotes sobre el calendario.
+
+Lee un calendario (cache/nba_schedule.json o cualquier archivo JSON / JSONL
+con los mismos campos) de forma incremental, sin cargarlo entero en memoria,
+puntúa cada partido con el modelo de predicción de analyze_matchup
+(prediction_models.py; otro con --model) y escribe un archivo compacto de
+predicciones con la contribución de cada categoría y factor del modelo de
+pesos (matchup_engine.py).
+
+- Los partidos se puntúan por bloques en un pool de procesos.
+- La salida se escribe bloque a bloque; si la ejecución se interrumpe, al
+  relanzarla se omiten los partidos que ya están en el archivo de salida.
+
+Formatos: .csv, .jsonl, o .parquet (un directorio con un archivo por bloque;
+requiere pyarrow o fastparquet).
+
+Uso:
+    python batch_predict.py --output predictions.csv
+    python batch_predict.py cache/nba_schedule.json --output predictions.jsonl --workers 4
+"""
+
+import argparse
+import collections
+import csv
+import importlib.util
+import json
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from data_loader import DEFAULT_CSV_PATH, get_team_stats
+from data_versions import data_version
+from matchup_engine import FACTOR_NAMES, STAT_CATEGORIES, get_matchup_matrix
+from prediction_models import resolve_model
+from schedule_utils import DEFAULT_SCHEDULE_PATH, game_key, iter_schedule
+from team_registry import get_registry
+
+DEFAULT_BATCH_SIZE = 250
+
+
+def _slug(text):
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+
+# Columnas de contribución: una por categoría del modelo y una por factor
+CONTRIBUTION_COLUMNS = {name: f"contrib_{_slug(name)}" for name in list(STAT_CATEGORIES) + FACTOR_NAMES}
+
+OUTPUT_COLUMNS = [
+    'game_key', 'game_id', 'game_date', 'time', 'home_team', 'away_team', 'status',
+    'home_score', 'away_score', 'home_win_prob', 'away_win_prob', 'prediction',
+    'confidence', 'data_version',
+] + list(CONTRIBUTION_COLUMNS.values())
+
+
+# ----------------------------------------------------------------------
+# Puntuación (se ejecuta en los procesos del pool)
+
+_worker_state = {}
+
+
+def _init_worker(stats_path, model_name=None):
+    df = get_team_stats(stats_path)
+    registry = get_registry(df)
+    _worker_state['registry'] = registry
+    _worker_state['matchups'] = get_matchup_matrix(registry)
+    _worker_state['model'] = resolve_model(model_name)
+    _worker_state['data_version'] = data_version(stats_path)
+
+
+def score_games(games):
+    """
+    Puntúa una lista de partidos.
+
+    Returns:
+        Tupla (filas, partidos_omitidos). Los partidos con equipos que no están
+        en los datos se omiten.
+    """
+    registry = _worker_state['registry']
+    matchups = _worker_state['matchups']
+    rows = []
+    skipped = 0
+    for game in games:
+        home = registry.row(game.get('homeTeam'))
+        away = registry.row(game.get('awayTeam'))
+        if home is None or away is None:
+            skipped += 1
+            continue
+        # Mismo resultado que analyze_matchup(homeTeam, awayTeam, df)
+        analysis = _worker_state['model'].analyze(registry, home, away)
+        row = {
+            'game_key': game_key(game),
+            'game_id': game.get('game_id', ''),
+            'game_date': game.get('gameDate', ''),
+            'time': game.get('time', ''),
+            'home_team': registry.names[home],
+            'away_team': registry.names[away],
+            'status': game.get('status', ''),
+            'home_score': game.get('homeScore'),
+            'away_score': game.get('awayScore'),
+            'home_win_prob': analysis['win_probability']['team1'],
+            'away_win_prob': analysis['win_probability']['team2'],
+            'prediction': analysis['prediction'],
+            'confidence': round(analysis['confidence'], 2),
+            'data_version': _worker_state['data_version'],
+        }
+        for name, value in matchups.contributions(home, away).items():
+            row[CONTRIBUTION_COLUMNS[name]] = round(value, 4)
+        rows.append(row)
+    return rows, skipped
+
+
+# ----------------------------------------------------------------------
+# Escritura reanudable
+
+def output_format(path):
+    """Formato de salida a partir de la extensión: csv, jsonl o parquet."""
+    for extension in ('csv', 'jsonl', 'parquet'):
+        if path.endswith('.' + extension):
+            return extension
+    raise ValueError(f"Formato de salida no soportado: {path} (usa .csv, .jsonl o .parquet)")
+
+
+def _require_parquet_engine():
+    if not (importlib.util.find_spec('pyarrow') or importlib.util.find_spec('fastparquet')):
+        raise RuntimeError("La salida Parquet requiere pyarrow o fastparquet")
+
+
+def _truncate_partial_line(path):
+    # Una ejecución interrumpida puede dejar la última línea a medias
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            f.truncate(end)
+
+
+def completed_keys(path):
+    """game_key de los partidos que ya están en el archivo de salida."""
+    if not os.path.exists(path):
+        return set()
+    fmt = output_format(path)
+    if fmt == 'parquet':
+        _require_parquet_engine()
+        if not any(name.endswith('.parquet') for name in os.listdir(path)):
+            return set()
+        return set(pd.read_parquet(path, columns=['game_key'])['game_key'].astype(str))
+    _truncate_partial_line(path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            return {row['game_key'] for row in csv.DictReader(f)}
+        return {json.loads(line)['game_key'] for line in f if line.strip()}
+
+
+class PredictionWriter:
+    """Escribe las predicciones bloque a bloque en CSV, JSONL o Parquet."""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = output_format(path)
+        if self.format == 'parquet':
+            _require_parquet_engine()
+            os.makedirs(path, exist_ok=True)
+            self._part = len([name for name in os.listdir(path) if name.endswith('.parquet')])
+            self._file = None
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+            self._file = open(path, 'a', encoding='utf-8', newline='')
+            if self.format == 'csv':
+                self._csv = csv.DictWriter(self._file, fieldnames=OUTPUT_COLUMNS)
+                if new_file:
+                    self._csv.writeheader()
+
+    def write(self, rows):
+        if not rows:
+            return
+        if self.format == 'parquet':
+            part_path = os.path.join(self.path, f"part-{self._part:05d}.parquet")
+            tmp_path = f"{part_path}.tmp"
+            pd.DataFrame(rows, columns=OUTPUT_COLUMNS).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, part_path)
+            self._part += 1
+            return
+        if self.format == 'csv':
+            self._csv.writerows(rows)
+        else:
+            self._file.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+# ----------------------------------------------------------------------
+
+def _batches(games, done, batch_size):
+    batch = []
+    for game in games:
+        if game_key(game) in done:
+            continue
+        batch.append(game)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_batch(schedule_path, output_path, stats_path=DEFAULT_CSV_PATH, workers=None,
+              batch_size=DEFAULT_BATCH_SIZE, restart=False, model_name=None):
+    """
+    Puntúa todos los partidos de un calendario.
+
+    Args:
+        schedule_path: Archivo de calendario (JSON o JSONL)
+        output_path: Archivo de predicciones (.csv, .jsonl o .parquet)
+        stats_path: CSV de estadísticas completas
+        workers: Procesos del pool (None = uno por CPU, 1 = sin pool)
+        batch_size: Partidos por bloque
+        restart: Si es True, se descarta la salida existente en lugar de reanudar
+        model_name: Modelo de predicción (por defecto, el configurado para el
+            dashboard)
+
+    Returns:
+        Tupla (partidos_puntuados, partidos_omitidos)
+    """
+    if restart and os.path.exists(output_path):
+        if os.path.isdir(output_path):
+            for name in os.listdir(output_path):
+                os.remove(os.path.join(output_path, name))
+        else:
+            os.remove(output_path)
+
+    done = completed_keys(output_path)
+    if done:
+        print(f"Reanudando: {len(done)} partidos ya puntuados en {output_path}")
+
+    writer = PredictionWriter(output_path)
+    batches = _batches(iter_schedule(schedule_path), done, batch_size)
+    scored = skipped = 0
+    try:
+        if workers == 1:
+            _init_worker(stats_path, model_name)
+            results = (score_games(batch) for batch in batches)
+            for rows, batch_skipped in results:
+                writer.write(rows)
+                scored += len(rows)
+                skipped += batch_skipped
+        else:
+            workers = workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(stats_path, model_name)) as executor:
+                # Ventana acotada de bloques en vuelo: el calendario se sigue
+                # leyendo a medida que se escriben resultados, y en orden
+                pending = collections.deque()
+                for batch in batches:
+                    pending.append(executor.submit(score_games, batch))
+                    if len(pending) >= workers * 2:
+                        rows, batch_skipped = pending.popleft().result()
+                        writer.write(rows)
+                        scored += len(rows)
+                        skipped += batch_skipped
+                while pending:
+                    rows, batch_skipped = pending.popleft().result()
+                    writer.write(rows)
+                    scored += len(rows)
+                    skipped += batch_skipped
+    finally:
+        writer.close()
+    return scored, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predicciones por lotes sobre el calendario NBA")
+    parser.add_argument('schedule', nargs='?', default=DEFAULT_SCHEDULE_PATH,
+                        help="Calendario en JSON o JSONL (por defecto, la caché del dashboard)")
+    parser.add_argument('--output', default='predictions.csv', help="Archivo de salida (.csv, .jsonl o .parquet)")
+    parser.add_argument('--stats', default=DEFAULT_CSV_PATH, help="CSV de estadísticas completas")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos (por defecto, uno por CPU)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Partidos por bloque")
+    parser.add_argument('--restart', action='store_true', help="Descartar la salida existente en lugar de reanudar")
+    parser.add_argument('--model', default=None,
+                        help="Modelo de predicción (por defecto, el configurado para el dashboard)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.schedule):
+        print(f"No se encontró el calendario {args.schedule}. Abre el dashboard o descárgalo primero.")
+        return
+
+    try:
+        scored, skipped = run_batch(args.schedule, args.output, args.stats, args.workers,
+                                    args.batch_size, args.restart, args.model)
+    except (RuntimeError, ValueError) as e:
+        print(f"Error: {e}")
+        return
+    print(f"{scored} partidos puntuados en {args.output}")
+    if skipped:
+        print(f"{skipped} partidos omitidos (equipos no encontrados en los datos)")
+
+
+if __name__ == '__main__':
+    main()
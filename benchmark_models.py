@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Banco de pruebas de los modelos de predicción (prediction_models.py).
+
+Para cada modelo, sobre los mismos datos y los mismos partidos, mide:
+
+- construcción: tiempo de la primera matriz con las cachés vacías (lo que
+  paga la primera petición tras una recarga de datos)
+- latencia por llamada: análisis completo de un enfrentamiento (lo que hace
+  el calendario por cada partido) y probabilidad suelta, en microsegundos
+- latencia por lote: probabilidades de todos los partidos del calendario
+- memoria: pico de memoria asignada durante la construcción (tracemalloc)
+- acierto: métricas de backtest.py (acierto, Brier, log loss) sobre los
+  partidos terminados del calendario
+
+Para el acierto, los enfrentamientos sin opinión del modelo (NaN, p. ej. Elo
+sin partidos suficientes) usan la probabilidad del modelo de pesos
+(filled_matrix), como el dashboard, backtest.py y season_simulator.py. Las mismas advertencias que en backtest.py:
+las estadísticas incluyen los partidos evaluados; los ratings Elo no, porque
+cada jornada se puntúa con los ratings de los días anteriores.
+
+Uso:
+    python benchmark_models.py schedule_with_results.json
+    python benchmark_models.py schedule.json --models heuristic logistic --fit-logistic
+    python benchmark_models.py --report benchmark.json
+"""
+
+import argparse
+import datetime
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from backtest import completed_games, evaluate, model_probabilities
+from data_loader import DEFAULT_CSV_PATH, get_team_stats
+from prediction_models import LogisticModel, available_models, build_model
+from schedule_utils import DEFAULT_SCHEDULE_PATH, iter_schedule
+from team_registry import TeamRegistry
+
+DEFAULT_CALLS = 2000
+
+
+def _percentiles(samples):
+    samples = np.asarray(samples) * 1e6
+    return {'mean_us': float(samples.mean()), 'p50_us': float(np.percentile(samples, 50)),
+            'p95_us': float(np.percentile(samples, 95))}
+
+
+def benchmark_model(name, model, df, games, pairs, schedule):
+    """
+    Mide un modelo.
+
+    Args:
+        name: Nombre del modelo
+        model: PredictionModel
+        df: DataFrame de estadísticas (se crea un registro nuevo para que
+            las cachés por registro estén vacías)
+        games: Partidos terminados (completed_games)
+        pairs: Array (n, 2) de enfrentamientos para la latencia por llamada
+        schedule: Lista de partidos del calendario (resultados para los
+            ratings Elo anteriores a cada fecha)
+
+    Returns:
+        Diccionario de resultados
+    """
+    registry = TeamRegistry(df)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.matrix(registry)
+    build_seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    analyze_times = []
+    probability_times = []
+    for home, away in pairs:
+        start = time.perf_counter()
+        model.analyze(registry, home, away)
+        analyze_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        model.probabilities(registry, [home], [away])
+        probability_times.append(time.perf_counter() - start)
+
+    home_rows, away_rows = games['home_rows'], games['away_rows']
+    start = time.perf_counter()
+    probabilities = model.probabilities(registry, home_rows, away_rows)
+    batch_seconds = time.perf_counter() - start
+
+    probabilities = model_probabilities(model, schedule, registry, games)
+    metrics = evaluate(probabilities, games['home_won']) if len(probabilities) else {'games': 0}
+    metrics.pop('calibration', None)
+
+    return {
+        'model': name,
+        'build_ms': build_seconds * 1000,
+        'peak_memory_kb': peak / 1024,
+        'analyze': _percentiles(analyze_times),
+        'probability': _percentiles(probability_times),
+        'batch_ms': batch_seconds * 1000,
+        'batch_games': int(len(home_rows)),
+        'accuracy': metrics,
+    }
+
+
+def print_results(results):
+    print(f"{'Modelo':<10} {'Constr.':>9} {'Memoria':>9} {'Análisis p50/p95':>18} "
+          f"{'Prob. p50':>10} {'Lote':>9} {'Acierto':>8} {'Brier':>7} {'LogLoss':>8}")
+    for result in results:
+        metrics = result['accuracy']
+        quality = (f"{metrics['accuracy'] * 100:>7.1f}% {metrics['brier']:>7.4f} {metrics['log_loss']:>8.4f}"
+                   if metrics.get('games') else f"{'-':>8} {'-':>7} {'-':>8}")
+        print(f"{result['model']:<10} {result['build_ms']:>7.2f}ms {result['peak_memory_kb']:>7.0f}KB "
+              f"{result['analyze']['p50_us']:>8.0f}/{result['analyze']['p95_us']:<6.0f}us "
+              f"{result['probability']['p50_us']:>8.1f}us {result['batch_ms']:>7.2f}ms {quality}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparación de modelos de predicción")
+    parser.add_argument('schedule', nargs='?', default=DEFAULT_SCHEDULE_PATH,
+                        help="Calendario con resultados (JSON o JSONL)")
+    parser.add_argument('--stats', default=DEFAULT_CSV_PATH, help="CSV de estadísticas completas")
+    parser.add_argument('--models', nargs='+', default=None,
+                        help=f"Modelos a comparar (por defecto todos: {', '.join(available_models())})")
+    parser.add_argument('--calls', type=int, default=DEFAULT_CALLS, help="Llamadas para medir la latencia")
+    parser.add_argument('--fit-logistic', action='store_true',
+                        help="Ajustar el modelo logístico con el 80%% más antiguo de los partidos "
+                             "y evaluar todos los modelos con el 20%% restante")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla de los enfrentamientos de prueba")
+    parser.add_argument('--report', default=None, help="Guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    df = get_team_stats(args.stats)
+    if df.empty:
+        return
+    fit_registry = TeamRegistry(df)
+    schedule = list(iter_schedule(args.schedule))
+    games = completed_games(schedule, fit_registry)
+
+    models = {name: build_model(name) for name in (args.models or available_models())}
+    if args.fit_logistic and len(games['home_won']):
+        order = np.argsort(np.array(games['game_dates']), kind='stable')
+        split = int(len(order) * 0.8)
+        train, test = order[:split], order[split:]
+        models['logistic'] = LogisticModel.fit(fit_registry, games['home_rows'][train],
+                                               games['away_rows'][train], games['home_won'][train])
+        print(f"Logístico ajustado con {len(train)} partidos: intercept {models['logistic'].intercept:.4f}, "
+              f"{models['logistic'].coefficients}")
+        games = {key: (values[test] if isinstance(values, np.ndarray) else [values[i] for i in test])
+                 for key, values in games.items()}
+
+    rng = np.random.default_rng(args.seed)
+    teams = len(fit_registry)
+    pairs = rng.integers(0, teams, size=(args.calls, 2))
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+
+    print(f"Partidos evaluados: {len(games['home_won'])}; llamadas de latencia: {len(pairs)}\n")
+    results = [benchmark_model(name, model, df, games, pairs, schedule) for name, model in models.items()]
+    print_results(results)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'generated_at': datetime.datetime.now().isoformat(), 'schedule': args.schedule,
+                       'results': results}, f, indent=2)
+        print(f"\nResultados guardados en {args.report}")
+
+
+if __name__ == '__main__':
+    main()
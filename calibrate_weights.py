@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ajuste de los pesos del modelo de enfrentamientos con resultados reales.
+
+Los pesos de cada estadística (1.2 para E_OFF_RATING, 0.6 para PF...) y los
+ajustes fijos (momentum, ritmo, tiro, localía) se eligieron a mano. Esta
+herramienta los ajusta contra los partidos terminados de un calendario.
+
+Qué estadísticas favorecen a cada equipo y qué factores se aplican no depende
+de los pesos, así que se calculan una sola vez por partido (matrices de
+ventajas y de signos). Con ellas la probabilidad del local para K candidatos
+es un producto de matrices, y la función objetivo (log loss o Brier) se
+evalúa para miles de candidatos a la vez.
+
+Métodos de búsqueda, repartidos entre un pool de procesos:
+- random: búsqueda aleatoria alrededor del mejor candidato, en varias rondas
+  con perturbaciones cada vez menores
+- grid: rejilla sobre los ajustes contextuales con los pesos actuales
+
+Los pesos ajustados se guardan como una configuración versionada
+(config/matchup_weights.json, con el historial en
+config/matchup_weights_history/) que analyze_matchup carga automáticamente.
+
+Uso:
+    python calibrate_weights.py schedule_with_results.json
+    python calibrate_weights.py schedule.json --method grid --dry-run
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backtest import completed_games, evaluate
+from data_loader import DEFAULT_CSV_PATH, get_team_stats
+from data_versions import data_version
+from matchup_engine import DEFAULT_WEIGHTS_PATH, FACTOR_NAMES, MatchupMatrix, load_weights
+from schedule_utils import DEFAULT_SCHEDULE_PATH, iter_schedule
+from team_registry import get_registry
+
+DEFAULT_CANDIDATES = 20_000
+DEFAULT_ROUNDS = 3
+DEFAULT_CHUNK_SIZE = 1_000
+LOG_LOSS_EPSILON = 1e-15
+
+# Valores de la rejilla para cada ajuste contextual
+FACTOR_GRID = {
+    'momentum': [0, 2, 4, 6, 8],
+    'pace': [0, 1.5, 3, 4.5],
+    'shooting': [0, 2, 4, 6],
+    'home_court': [0, 2, 4, 6, 8, 10],
+    'neutralizing': [0, 1, 2, 3],
+}
+
+
+def build_design(registry, games):
+    """
+    Matrices de diseño de los partidos (independientes de los pesos).
+
+    Returns:
+        Tupla (stat_keys, ventajas (partidos x estadísticas, 0/1),
+        signos (partidos x factores, -1/0/+1))
+    """
+    engine = MatchupMatrix(registry)
+    home, away = games['home_rows'], games['away_rows']
+    advantages = engine.advantage[:, home, away].T.astype(np.float64)
+    signs = np.stack([engine.factor_signs[name][home, away] for name in FACTOR_NAMES], axis=1).astype(np.float64)
+    return engine.stat_keys, advantages, signs
+
+
+def predict_batch(advantages, signs, stat_weights, factor_values):
+    """
+    Probabilidad de victoria del local (0-1) para varios candidatos a la vez.
+
+    Args:
+        advantages: Matriz partidos x estadísticas
+        signs: Matriz partidos x factores
+        stat_weights: Matriz candidatos x estadísticas
+        factor_values: Matriz candidatos x factores
+
+    Returns:
+        Matriz partidos x candidatos
+    """
+    total = stat_weights.sum(axis=1)
+    home = advantages @ stat_weights.T / total * 100 + signs @ factor_values.T
+    # Las probabilidades de local y visitante suman 100 antes de recortar, así
+    # que recortar y normalizar equivale a recortar la del local
+    return np.clip(home, 0, 100) / 100
+
+
+def objective_values(probabilities, outcomes, objective='log_loss'):
+    """Valor del objetivo (menor es mejor) por candidato (columna)."""
+    y = outcomes[:, None]
+    if objective == 'brier':
+        return np.mean((probabilities - y) ** 2, axis=0)
+    p = np.clip(probabilities, LOG_LOSS_EPSILON, 1 - LOG_LOSS_EPSILON)
+    return -np.mean(y * np.log(p) + (1 - y) * np.log(1 - p), axis=0)
+
+
+def _evaluate_candidates(stat_weights, factor_values, advantages, signs, outcomes, objective):
+    """Devuelve (mejor_valor, pesos, factores) de un bloque de candidatos."""
+    scores = objective_values(predict_batch(advantages, signs, stat_weights, factor_values), outcomes, objective)
+    best = int(np.argmin(scores))
+    return float(scores[best]), stat_weights[best], factor_values[best]
+
+
+def _random_chunk(seed_sequence, size, center_weights, center_factors, scale, advantages, signs, outcomes, objective):
+    rng = np.random.default_rng(seed_sequence)
+    # Perturbaciones multiplicativas (log-normales) para los pesos y aditivas
+    # para los ajustes; ninguno puede ser negativo
+    stat_weights = center_weights * np.exp(rng.normal(0, scale, (size, len(center_weights))))
+    factor_values = np.maximum(
+        0, center_factors + rng.normal(0, scale, (size, len(center_factors))) * np.maximum(center_factors, 1.0))
+    return _evaluate_candidates(stat_weights, factor_values, advantages, signs, outcomes, objective)
+
+
+def _grid_chunk(factor_rows, center_weights, advantages, signs, outcomes, objective):
+    factor_values = np.array(factor_rows, dtype=np.float64)
+    stat_weights = np.repeat(center_weights[None, :], len(factor_values), axis=0)
+    return _evaluate_candidates(stat_weights, factor_values, advantages, signs, outcomes, objective)
+
+
+def _run(executor, function, tasks):
+    if executor is None:
+        return [function(*task) for task in tasks]
+    return list(executor.map(function, *zip(*tasks)))
+
+
+def search(advantages, signs, outcomes, initial_weights, initial_factors, method='random',
+           candidates=DEFAULT_CANDIDATES, rounds=DEFAULT_ROUNDS, objective='log_loss',
+           seed=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Busca los pesos que minimizan el objetivo.
+
+    Returns:
+        Tupla (mejor_valor, pesos, factores)
+    """
+    initial_weights = np.asarray(initial_weights, dtype=np.float64)
+    initial_factors = np.asarray(initial_factors, dtype=np.float64)
+    best = _evaluate_candidates(initial_weights[None, :], initial_factors[None, :],
+                                advantages, signs, outcomes, objective)
+
+    executor = None if workers == 1 else ProcessPoolExecutor(max_workers=workers)
+    try:
+        if method == 'grid':
+            grid = list(itertools.product(*(FACTOR_GRID[name] for name in FACTOR_NAMES)))
+            tasks = [(grid[start:start + chunk_size], best[1], advantages, signs, outcomes, objective)
+                     for start in range(0, len(grid), chunk_size)]
+            results = _run(executor, _grid_chunk, tasks)
+            best = min([best] + results, key=lambda result: result[0])
+            print(f"Rejilla: {len(grid)} combinaciones, objetivo {best[0]:.5f}")
+        else:
+            root = np.random.SeedSequence(seed)
+            per_round = max(1, candidates // rounds)
+            for round_number, scale in enumerate(np.geomspace(0.5, 0.1, rounds)):
+                sizes = [chunk_size] * (per_round // chunk_size)
+                if per_round % chunk_size:
+                    sizes.append(per_round % chunk_size)
+                seeds = root.spawn(len(sizes))
+                tasks = [(seed_sequence, size, best[1], best[2], scale, advantages, signs, outcomes, objective)
+                         for seed_sequence, size in zip(seeds, sizes)]
+                results = _run(executor, _random_chunk, tasks)
+                best = min([best] + results, key=lambda result: result[0])
+                print(f"Ronda {round_number + 1}/{rounds} (escala {scale:.2f}): objetivo {best[0]:.5f}")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return best
+
+
+def split_by_date(games, validation_fraction):
+    """Índices (entrenamiento, validación): la validación son los partidos más recientes."""
+    order = np.argsort(np.array(games['game_dates']), kind='stable')
+    n_validation = int(round(len(order) * validation_fraction))
+    if n_validation == 0:
+        return order, order[:0]
+    return order[:-n_validation], order[-n_validation:]
+
+
+def save_config(path, stat_weights, factors, metadata):
+    """
+    Guarda la configuración activa y una copia en el historial.
+
+    Returns:
+        Número de versión de la configuración guardada
+    """
+    version = 1
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                version = json.load(f).get('version', 0) + 1
+        except (OSError, ValueError):
+            pass
+
+    config = dict(metadata, version=version, stat_weights=stat_weights, factors=factors)
+    base, extension = os.path.splitext(path)
+    history_dir = f"{base}_history"
+    os.makedirs(history_dir, exist_ok=True)
+    with open(os.path.join(history_dir, f"v{version}{extension}"), 'w') as f:
+        json.dump(config, f, indent=2)
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(config, f, indent=2)
+    os.replace(tmp_path, path)
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajuste de los pesos del modelo de predicción")
+    parser.add_argument('schedule', nargs='?', default=DEFAULT_SCHEDULE_PATH,
+                        help="Calendario con resultados (JSON o JSONL)")
+    parser.add_argument('--stats', default=DEFAULT_CSV_PATH, help="CSV de estadísticas completas")
+    parser.add_argument('--season', default=None,
+                        help="Usar las estadísticas de esta temporada del almacén (warehouse.py)")
+    parser.add_argument('--method', choices=['random', 'grid'], default='random', help="Método de búsqueda")
+    parser.add_argument('--objective', choices=['log_loss', 'brier'], default='log_loss', help="Función objetivo")
+    parser.add_argument('--candidates', type=int, default=DEFAULT_CANDIDATES, help="Candidatos (búsqueda aleatoria)")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help="Rondas (búsqueda aleatoria)")
+    parser.add_argument('--validation', type=float, default=0.2,
+                        help="Fracción de partidos (los más recientes) reservados para validación")
+    parser.add_argument('--seed', type=int, default=None, help="Semilla para resultados reproducibles")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos (por defecto, uno por CPU)")
+    parser.add_argument('--output', default=DEFAULT_WEIGHTS_PATH, help="Archivo de configuración de pesos")
+    parser.add_argument('--dry-run', action='store_true', help="No guardar la configuración")
+    args = parser.parse_args()
+
+    if args.season:
+        from warehouse import get_warehouse
+        df = get_warehouse().load(args.season)
+    else:
+        df = get_team_stats(args.stats)
+    if df.empty:
+        return
+    registry = get_registry(df)
+
+    games = completed_games(iter_schedule(args.schedule), registry)
+    if len(games['home_won']) < 20:
+        print(f"Hay {len(games['home_won'])} partidos terminados con resultado; se necesitan al menos 20.")
+        return
+
+    stat_keys, advantages, signs = build_design(registry, games)
+    outcomes = games['home_won']
+    train, validation = split_by_date(games, args.validation)
+    print(f"Partidos: {len(train)} de entrenamiento, {len(validation)} de validación")
+
+    # Se parte de la configuración activa (o de los pesos por defecto)
+    stat_categories, factors, _ = load_weights(args.output)
+    current_weights = {key: weight for stats in stat_categories.values() for key, _, weight in stats}
+    initial_weights = np.array([current_weights[key] for key in stat_keys])
+    initial_factors = np.array([factors[name] for name in FACTOR_NAMES], dtype=np.float64)
+
+    start = datetime.datetime.now()
+    _, fitted_weights, fitted_factors = search(
+        advantages[train], signs[train], outcomes[train], initial_weights, initial_factors,
+        args.method, args.candidates, args.rounds, args.objective, args.seed, args.workers)
+    elapsed = (datetime.datetime.now() - start).total_seconds()
+    print(f"Búsqueda completada en {elapsed:.1f}s")
+
+    # Los pesos sólo importan en proporción: se reescalan a la suma inicial
+    fitted_weights = fitted_weights * initial_weights.sum() / fitted_weights.sum()
+
+    def metrics(weights, factor_values, rows):
+        if len(rows) == 0:
+            return None
+        probabilities = predict_batch(advantages[rows], signs[rows], weights[None, :], factor_values[None, :])[:, 0]
+        result = evaluate(probabilities, outcomes[rows])
+        result.pop('calibration')
+        return result
+
+    report = {
+        'initial': {'train': metrics(initial_weights, initial_factors, train),
+                    'validation': metrics(initial_weights, initial_factors, validation)},
+        'fitted': {'train': metrics(fitted_weights, fitted_factors, train),
+                   'validation': metrics(fitted_weights, fitted_factors, validation)},
+    }
+    for label, split in (('entrenamiento', 'train'), ('validación', 'validation')):
+        before, after = report['initial'][split], report['fitted'][split]
+        if before:
+            print(f"{label.capitalize()}: log loss {before['log_loss']:.4f} -> {after['log_loss']:.4f}, "
+                  f"Brier {before['brier']:.4f} -> {after['brier']:.4f}, "
+                  f"acierto {before['accuracy'] * 100:.1f}% -> {after['accuracy'] * 100:.1f}%")
+
+    print("\nPesos ajustados:")
+    for key, before, after in zip(stat_keys, initial_weights, fitted_weights):
+        print(f"  {key:<14} {before:6.2f} -> {after:6.2f}")
+    for name, before, after in zip(FACTOR_NAMES, initial_factors, fitted_factors):
+        print(f"  {name:<14} {before:6.2f} -> {after:6.2f}")
+
+    if args.dry_run:
+        return
+    validation_metrics = report['fitted']['validation']
+    if validation_metrics and validation_metrics['log_loss'] > report['initial']['validation']['log_loss']:
+        print("Aviso: los pesos ajustados empeoran el log loss de validación")
+
+    version = save_config(args.output, {key: round(float(weight), 4) for key, weight in zip(stat_keys, fitted_weights)},
+                          {name: round(float(value), 4) for name, value in zip(FACTOR_NAMES, fitted_factors)},
+                          {
+                              'created_at': datetime.datetime.now().isoformat(),
+                              'method': args.method,
+                              'objective': args.objective,
+                              'schedule': args.schedule,
+                              'stats': args.stats if not args.season else f"warehouse:{args.season}",
+                              'data_version': data_version(args.stats) if not args.season else None,
+                              'games': {'train': int(len(train)), 'validation': int(len(validation))},
+                              'metrics': report,
+                          })
+    print(f"\nConfiguración v{version} guardada en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,9 @@
 import pandas as pd
 
+from data_loader import DEFAULT_CSV_PATH
+
 # Cargar el archivo CSV
-combined_stats = pd.read_csv("nba_team_complete_stats_2024_25.csv")
+combined_stats = pd.read_csv(DEFAULT_CSV_PATH)
 
 # Imprimir las columnas disponibles
 print("Columnas disponibles en el archivo CSV:")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Matrices de correlación entre estadísticas.
+
+El mapa de calor de la Vista General recalculaba df[columnas].corr() en cada
+cambio de pestaña. Este módulo calcula una sola vez por versión de los datos
+la correlación de Pearson entre todas las columnas numéricas del registro de
+equipos; cualquier selección de columnas es sólo indexar esa matriz. La
+matriz se guarda como tabla compartida entre los workers (shared_tables.py).
+
+correlation_matrix y correlation_frame sirven también para tablas con muchas
+más filas y columnas (varias temporadas del almacén, registros por partido):
+sin valores ausentes el cálculo es un único producto de matrices, y con
+ausentes se usan, como DataFrame.corr, las filas completas de cada par.
+
+Uso:
+    python correlations.py --columns PTS AST E_NET_RATING W_PCT
+    python correlations.py --seasons 2022-23 2023-24 2024-25 --output corr.csv
+"""
+
+import argparse
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from shared_tables import register_table, shared_table
+
+
+def correlation_matrix(values):
+    """
+    Correlación de Pearson entre las columnas de una matriz (filas x columnas).
+
+    Los valores ausentes (NaN) se excluyen por pares, como en DataFrame.corr.
+    Las columnas constantes (o con menos de dos valores) dan NaN.
+
+    Returns:
+        Matriz (columnas x columnas)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if finite.all():
+            centered = values - values.mean(axis=0)
+            scale = np.sqrt((centered * centered).sum(axis=0))
+            standardized = centered / scale
+            corr = standardized.T @ standardized
+        else:
+            # Sumas por pares sobre las filas donde las dos columnas tienen valor
+            mask = finite.astype(np.float64)
+            means = np.nanmean(np.where(finite, values, np.nan), axis=0)
+            centered = np.where(finite, values - means, 0.0)
+            count = mask.T @ mask
+            sum_x = centered.T @ mask
+            sum_xx = (centered * centered).T @ mask
+            sum_xy = centered.T @ centered
+            cov = sum_xy - sum_x * sum_x.T / count
+            var_x = sum_xx - sum_x * sum_x / count
+            corr = cov / np.sqrt(var_x * var_x.T)
+            corr[count < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def correlation_frame(df, columns=None):
+    """
+    Matriz de correlación de un DataFrame como DataFrame etiquetado.
+
+    Args:
+        df: DataFrame (p. ej. varias temporadas del almacén o un registro
+            por partido)
+        columns: Columnas a correlacionar (por defecto todas las numéricas)
+    """
+    if columns is None:
+        columns = [column for column in df.columns if pd.api.types.is_numeric_dtype(df[column].dtype)]
+    columns = list(columns)
+    return pd.DataFrame(correlation_matrix(df[columns].to_numpy(dtype=np.float64, na_value=np.nan)),
+                        index=columns, columns=columns)
+
+
+class CorrelationService:
+    """
+    Correlaciones entre todas las columnas numéricas de un registro.
+
+    Attributes:
+        matrix: Matriz (columnas x columnas) en el orden de registry.columns
+
+    Args:
+        registry: TeamRegistry
+        matrix: Correlaciones ya calculadas; si no tienen la forma esperada,
+            se calculan de nuevo
+    """
+
+    def __init__(self, registry, matrix=None):
+        self.registry = registry
+        columns = len(registry.columns)
+        if matrix is None or matrix.shape != (columns, columns):
+            matrix = correlation_matrix(registry.matrix)
+        self.matrix = matrix
+
+    def values(self, columns):
+        """Submatriz de correlaciones de las columnas indicadas, en ese orden."""
+        indices = self.registry.column_indices(columns)
+        return self.matrix[np.ix_(indices, indices)]
+
+    def frame(self, columns):
+        """Submatriz de correlaciones como DataFrame etiquetado."""
+        columns = list(columns)
+        return pd.DataFrame(self.values(columns), index=columns, columns=columns)
+
+
+# Correlaciones calculadas, una por registro vivo (es decir, por versión de los datos)
+_services = weakref.WeakKeyDictionary()
+_services_lock = threading.Lock()
+
+
+def get_correlation_service(registry):
+    """Devuelve las correlaciones del registro, calculándolas la primera vez."""
+    with _services_lock:
+        service = _services.get(registry)
+        if service is None:
+            service = CorrelationService(registry, shared_table(registry, 'correlations'))
+            _services[registry] = service
+        return service
+
+
+def _correlation_table(registry):
+    return correlation_matrix(registry.matrix)
+
+
+register_table('correlations', _correlation_table)
+
+
+def main():
+    from data_loader import DEFAULT_CSV_PATH, get_team_stats
+    from warehouse import DEFAULT_WAREHOUSE_DIR, get_warehouse
+
+    parser = argparse.ArgumentParser(description="Correlaciones entre estadísticas de equipos")
+    parser.add_argument('--stats', default=DEFAULT_CSV_PATH, help="CSV de estadísticas completas")
+    parser.add_argument('--seasons', nargs='+', default=None,
+                        help="Correlacionar varias temporadas del almacén en lugar del CSV")
+    parser.add_argument('--root', default=DEFAULT_WAREHOUSE_DIR, help="Directorio del almacén")
+    parser.add_argument('--columns', nargs='+', default=None, help="Columnas (por defecto todas las numéricas)")
+    parser.add_argument('--output', default=None, help="Guardar la matriz en CSV")
+    args = parser.parse_args()
+
+    if args.seasons:
+        warehouse = get_warehouse(args.root)
+        df = pd.concat([warehouse.load(season) for season in args.seasons], ignore_index=True)
+    else:
+        df = get_team_stats(args.stats)
+    if df.empty:
+        return
+    result = correlation_frame(df, args.columns)
+
+    if args.output:
+        result.to_csv(args.output)
+        print(f"Matriz de {len(result)} columnas ({len(df)} filas) guardada en {args.output}")
+        return
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(result.round(2))
+
+
+if __name__ == '__main__':
+    main()
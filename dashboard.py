@@ -2,12 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import os
-import base64
 from urllib.request import urlopen, Request
 import io
 import time
@@ -19,12 +18,27 @@ import numpy as np
 import glob
 import json
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 import matplotlib.pyplot as plt
 import seaborn as sns
 import requests
 from io import BytesIO
 from bs4 import BeautifulSoup
 
+from correlations import get_correlation_service
+from data_loader import DEFAULT_CSV_PATH, DEFAULT_SEASON, season_date_range, season_display_name
+from data_manager import DataSnapshot, get_data_manager
+from elo import get_elo_ratings
+from figure_cache import FigureCache, figures_root
+from league_norms import get_league_norms
+from logo_assets import get_logo_assets
+from margin_model import get_margin_model
+from schema import is_lower_better
+from prediction_models import get_prediction_model
+from response_optimizer import get_response_optimizer
+from team_registry import get_registry
+
 # Verificar si existe la carpeta visualizaciones y crearla si no existe
 if not os.path.exists('visualizaciones'):
     os.makedirs('visualizaciones')
@@ -142,7 +156,98 @@ def get_team_id_from_abbr(abbr):
     }
     return team_id_map.get(abbr, "")
 
-# Función para obtener el logo de un equipo
+# Función para obtener el logo de un equipo: URL (con el hash del contenido)
+# del logo servido por el dashboard, descargándolo la primera vez
+def download_team_logo(abbr):
+    """
+    Descarga el logo SVG de un equipo del CDN de la NBA y lo guarda en logos/.
+    El archivo sólo se sustituye si la descarga funciona.
+    
+    Returns:
+        True si se guardó el logo
+    """
+    # Obtener el ID del equipo
+    team_id = get_team_id_from_abbr(abbr)
+    if team_id is None:
+        return False
+    
+    # Usar la URL oficial de la NBA
+    source_url = f'https://cdn.nba.com/logos/nba/{team_id}/primary/L/logo.svg'
+    
+    try:
+        print(f"Descargando logo desde: {source_url}")
+        
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        
+        req = Request(url=source_url, headers=headers)
+        response = urlopen(req, timeout=10)
+        logo_data = response.read()
+        if not logo_data:
+            return False
+        
+        # Guardar el SVG localmente (de forma atómica: nunca queda a medias)
+        path = get_logo_assets().path(abbr)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(logo_data)
+        os.replace(tmp_path, path)
+        return True
+        
+    except Exception as e:
+        print(f"Error al obtener logo para {abbr}: {e}")
+        return False
+
+# Descargas simultáneas y tiempo máximo (segundos) de una actualización de logos
+LOGO_DOWNLOAD_WORKERS = 6
+LOGO_REFRESH_DEADLINE = 30.0
+
+_logo_refresh_lock = threading.Lock()
+
+def refresh_team_logos(abbrs, on_done=None, workers=LOGO_DOWNLOAD_WORKERS, deadline=LOGO_REFRESH_DEADLINE):
+    """
+    Vuelve a descargar los logos en segundo plano, con un pool pequeño de
+    descargas y un tiempo máximo para el conjunto. Los logos que no terminan
+    a tiempo cuentan como fallidos (si terminan después, se guardan igual).
+    
+    Args:
+        abbrs: Abreviaturas de los equipos
+        on_done: Función que recibe, al terminar, la lista de logos que no se
+            pudieron descargar
+        workers: Descargas simultáneas
+        deadline: Segundos máximos para todas las descargas
+    
+    Returns:
+        El hilo de la actualización, o None si ya había una en curso
+    """
+    if not _logo_refresh_lock.acquire(blocking=False):
+        return None
+    
+    def run():
+        try:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='logo-download')
+            futures = {executor.submit(download_team_logo, abbr): abbr for abbr in abbrs}
+            done, pending = wait(futures, timeout=deadline)
+            executor.shutdown(wait=False, cancel_futures=True)
+            failed = sorted([futures[future] for future in pending] +
+                            [futures[future] for future in done if not future.result()])
+            if failed:
+                print(f"Logos actualizados; no se pudieron descargar: {', '.join(failed)}")
+            else:
+                print(f"{len(futures)} logos descargados de nuevo")
+            if on_done is not None:
+                on_done(failed)
+        except Exception as e:
+            print(f"Error actualizando los logos: {e}")
+        finally:
+            _logo_refresh_lock.release()
+    
+    thread = threading.Thread(target=run, name='logo-refresh', daemon=True)
+    thread.start()
+    return thread
+
 def get_team_logo(team_name):
     try:
         abbr = team_to_abbr.get(team_name)
@@ -150,48 +255,15 @@ def get_team_logo(team_name):
             print(f"No se encontró abreviatura para {team_name}")
             return None
         
-        # Obtener el ID del equipo
-        team_id = get_team_id_from_abbr(abbr)
-        
         # Verificar si ya hemos guardado el logo localmente
-        logo_path = f'logos/{abbr}.svg'
-        if os.path.exists(logo_path) and os.path.getsize(logo_path) > 0:
-            try:
-                with open(logo_path, 'rb') as f:
-                    logo_data = f.read()
-                # Codificar SVG para uso en plotly
-                encoded_image = base64.b64encode(logo_data).decode('ascii')
-                return f"data:image/svg+xml;base64,{encoded_image}"
-            except Exception as e:
-                print(f"Error con logo local {abbr}: {e}, intentando descargar de nuevo")
-                # Si hay un error, eliminar el archivo corrupto y continuar
-                os.remove(logo_path)
-        
-        # Usar la URL oficial de la NBA
-        logo_url = f'https://cdn.nba.com/logos/nba/{team_id}/primary/L/logo.svg'
+        logo_assets = get_logo_assets()
+        logo_url = logo_assets.url(abbr)
+        if logo_url:
+            return logo_url
         
-        try:
-            print(f"Descargando logo desde: {logo_url}")
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            req = Request(url=logo_url, headers=headers)
-            response = urlopen(req, timeout=10)
-            logo_data = response.read()
-            
-            # Guardar el SVG localmente
-            with open(logo_path, 'wb') as f:
-                f.write(logo_data)
-            
-            # Codificar SVG para uso en plotly
-            encoded_image = base64.b64encode(logo_data).decode('ascii')
-            return f"data:image/svg+xml;base64,{encoded_image}"
-            
-        except Exception as e:
-            print(f"Error al obtener logo para {team_name}: {e}")
-            return None
+        if download_team_logo(abbr):
+            return logo_assets.url(abbr)
+        return None
     
     except Exception as e:
         print(f"Error general al obtener el logo para {team_name}: {e}")
@@ -238,20 +310,149 @@ def get_team_id(team_name):
     }
     return team_ids.get(team_name)
 
-# Cargar los datos
-try:
-    df = pd.read_csv('nba_team_complete_stats_2024_25.csv')
-    # Limpiar nombres de columnas para evitar confusiones
+# Cargar los datos a través del gestor compartido (recarga el CSV si cambia)
+# (no se guarda el DataFrame en una variable global: quedaría con los datos
+# del arranque tras una recarga; todo lo lee de data_manager.snapshot())
+data_manager = get_data_manager()
+if not data_manager.snapshot().df.empty:
     # Mostrar los nombres de las columnas para debug
     print("Columnas en el CSV:")
-    print(df.columns.tolist())
-except FileNotFoundError:
-    print("Archivo CSV no encontrado. Ejecuta main.py y advanced_stats.py primero.")
-    df = pd.DataFrame()  # DataFrame vacío como fallback
+    print(data_manager.snapshot().df.columns.tolist())
+
+# Estadísticas que se pueden elegir como ejes del gráfico de dispersión
+SCATTER_AXIS_OPTIONS = [
+    {'label': 'Puntos por Partido', 'value': 'PTS'},
+    {'label': 'Asistencias por Partido', 'value': 'AST'},
+    {'label': 'Rebotes por Partido', 'value': 'REB'},
+    {'label': 'Robos por Partido', 'value': 'STL'},
+    {'label': 'Tapones por Partido', 'value': 'BLK'},
+    {'label': 'Porcentaje de Tiro', 'value': 'FG_PCT'},
+    {'label': 'Porcentaje de Triples', 'value': 'FG3_PCT'},
+    {'label': 'Rating Ofensivo', 'value': 'E_OFF_RATING'},
+    {'label': 'Rating Defensivo', 'value': 'E_DEF_RATING'},
+    {'label': 'Net Rating', 'value': 'E_NET_RATING'},
+    {'label': 'Victorias', 'value': 'W'},
+    {'label': 'Derrotas', 'value': 'L'},
+]
+
+SCATTER_TITLE = "Relación entre {x_axis} y {y_axis}"
+
+# Cambio de ejes del gráfico de dispersión en el navegador: reasigna x/y, los
+# títulos y la posición de los logos con las columnas de scatter-data. Si no
+# puede (sin datos, sin figura o con un eje que no está en los datos), pide la
+# figura al servidor a través de scatter-request.
+SCATTER_AXES_CLIENTSIDE = """
+function(xAxis, yAxis, data, figure) {
+    var noUpdate = window.dash_clientside.no_update;
+    if (!xAxis || !yAxis) {
+        return [noUpdate, noUpdate];
+    }
+    if (!data || !figure || !figure.data || !figure.data.length ||
+            !(xAxis in data.columns) || !(yAxis in data.columns)) {
+        return [noUpdate, {x_axis: xAxis, y_axis: yAxis}];
+    }
+    var fill = function (template) {
+        return template.split('{x_axis}').join(xAxis).split('{y_axis}').join(yAxis);
+    };
+    var x = data.columns[xAxis];
+    var y = data.columns[yAxis];
+    var axisTitle = function (axis, text) {
+        return Object.assign({}, axis, {title: Object.assign({}, (axis || {}).title, {text: text})});
+    };
+    var trace = Object.assign({}, figure.data[0], {x: x, y: y, hovertemplate: fill(data.hovertemplate)});
+    var layout = Object.assign({}, figure.layout, {
+        title: Object.assign({}, figure.layout.title, {text: fill(data.title)}),
+        xaxis: axisTitle(figure.layout.xaxis, xAxis),
+        yaxis: axisTitle(figure.layout.yaxis, yAxis),
+        images: (figure.layout.images || []).map(function (image, i) {
+            var row = data.image_rows[i];
+            return Object.assign({}, image, {x: x[row], y: y[row]});
+        })
+    });
+    return [Object.assign({}, figure, {data: [trace].concat(figure.data.slice(1)), layout: layout}), noUpdate];
+}
+"""
+
+# Columnas del mapa de calor de correlaciones por defecto
+CORRELATION_COLUMNS = ['PTS', 'AST', 'REB', 'STL', 'BLK', 'FG_PCT', 'FG3_PCT',
+                       'E_OFF_RATING', 'E_DEF_RATING', 'E_NET_RATING', 'E_PACE',
+                       'W', 'L', 'W_PCT']
 
-def create_dashboard(df):
+# Con más columnas, el mapa de calor se muestra sin el valor de cada celda
+CORRELATION_TEXT_MAX_COLUMNS = 30
+
+def correlation_values(df, columns):
+    # Correlaciones precalculadas por versión de los datos
+    registry = get_registry(df)
+    columns = [column for column in columns if column in registry.column_index]
+    return columns, get_correlation_service(registry).values(columns)
+
+def correlation_texttemplate(columns):
+    return '%{z:.2f}' if len(columns) <= CORRELATION_TEXT_MAX_COLUMNS else ''
+
+def build_correlation_chart(df, columns):
+    columns, corr_matrix = correlation_values(df, columns)
+    
+    # Crear mapa de calor, con los valores como capa de texto del propio mapa
+    fig = px.imshow(corr_matrix,
+                   labels=dict(x="Variable", y="Variable", color="Correlación"),
+                   x=columns,
+                   y=columns,
+                   color_continuous_scale='RdBu_r',
+                   title='Matriz de Correlación de Estadísticas')
+    fig.update_traces(texttemplate=correlation_texttemplate(columns), textfont_size=9)
+    
+    # Personalizar el diseño
+    fig.update_layout(
+        height=700,
+        margin=dict(l=40, r=40, t=60, b=40),
+        plot_bgcolor='rgba(240, 240, 240, 0.5)',
+        paper_bgcolor='white'
+    )
+    
+    return fig
+
+def create_dashboard(df, data_manager=None):
+    """
+    Crea la aplicación Dash.
+
+    Args:
+        df: DataFrame con el que se construye el layout
+        data_manager: DataManager del que leen los callbacks en cada petición
+            (recarga en caliente). Si es None, los callbacks usan siempre df.
+    """
     app = dash.Dash(__name__, suppress_callback_exceptions=True)
     
+    def current_df():
+        # Cada callback toma la instantánea una vez al empezar: una recarga
+        # durante la petición no afecta a los datos que ya está usando
+        return data_manager.snapshot().df if data_manager is not None else df
+    
+    static_snapshot = []
+    
+    def current_snapshot():
+        if data_manager is not None:
+            return data_manager.snapshot()
+        if not static_snapshot:
+            static_snapshot.append(DataSnapshot(df))
+        return static_snapshot[0]
+    
+    # Logos de los equipos como recursos cacheables, referenciados por URL
+    # desde las figuras y las imágenes
+    # (si falta un logo en disco, la ruta lo vuelve a descargar)
+    get_logo_assets().register(app.server, fetch=download_team_logo)
+    
+    # Respuestas de los callbacks redondeadas, sin estilos repetidos y comprimidas
+    get_response_optimizer().register(app.server)
+
+    # Las figuras de la Vista General sólo dependen de los datos: se cachean
+    # por versión (en disco, compartidas entre workers, si hay gestor de datos)
+    figure_cache = FigureCache(figures_root(data_manager.csv_path) if data_manager is not None else None,
+                               dependencies=(get_team_logo, get_team_color, build_correlation_chart, correlation_values))
+    
+    # Rango de fechas de la temporada activa para el calendario
+    season_start, season_end = season_date_range(DEFAULT_SEASON)
+    
     # Estilos CSS personalizados
     app.index_string = '''
     <!DOCTYPE html>
@@ -306,9 +507,177 @@ def create_dashboard(df):
     </html>
     '''
     
+    # Contenido de cada pestaña. Sólo se construye (y sólo se disparan los
+    # callbacks de sus componentes) cuando la pestaña está activa; el
+    # resultado se reutiliza mientras no cambien los datos (ver render_tab).
+    def general_tab(df):
+        # Tab de Vista General
+        return html.Div([
+            # Contenedor para todos los gráficos en una sola columna
+            html.Div([
+                # Gráfico 1: Gráfico de Dispersión de Equipos
+                html.H3("Gráfico de Dispersión de Equipos", style={'textAlign': 'center', 'marginTop': '20px'}),
+                html.Div([
+                    html.Div([
+                        html.Label("Eje X:"),
+                        dcc.Dropdown(
+                            id='x-axis',
+                            options=SCATTER_AXIS_OPTIONS,
+                            value='PTS',
+                            persistence=True,
+                            persistence_type='memory'
+                        ),
+                    ], style={'width': '48%', 'display': 'inline-block'}),
+                    
+                    html.Div([
+                        html.Label("Eje Y:"),
+                        dcc.Dropdown(
+                            id='y-axis',
+                            options=SCATTER_AXIS_OPTIONS,
+                            value='E_OFF_RATING',
+                            persistence=True,
+                            persistence_type='memory'
+                        ),
+                    ], style={'width': '48%', 'display': 'inline-block', 'float': 'right'}),
+                ]),
+                dcc.Graph(id='scatter-plot'),
+                # Columnas de los ejes (para cambiarlos en el navegador) y
+                # petición de la figura al servidor cuando no es posible
+                dcc.Store(id='scatter-data'),
+                dcc.Store(id='scatter-request'),
+                
+                # Gráfico 2: Asistencias vs Victorias
+                html.H3("Asistencias vs Victorias", style={'textAlign': 'center', 'marginTop': '30px'}),
+                dcc.Graph(id='ast-win-chart', figure=update_ast_win_chart()),
+                
+                # Gráfico 3: Top 10 Anotadores
+                html.H3("Top 10 Equipos por Puntos", style={'textAlign': 'center', 'marginTop': '30px'}),
+                dcc.Graph(id='top10-points-chart', figure=update_top10_points_chart()),
+                
+                # Gráfico 4: Ofensiva vs Defensiva
+                html.H3("Ofensiva vs Defensiva", style={'textAlign': 'center', 'marginTop': '30px'}),
+                dcc.Graph(id='off-def-chart', figure=update_off_def_chart()),
+                
+                # Gráfico 5: Ritmo vs Ofensiva
+                html.H3("Ritmo vs Ofensiva", style={'textAlign': 'center', 'marginTop': '30px'}),
+                dcc.Graph(id='pace-off-chart', figure=update_pace_off_chart()),
+                
+                # Gráfico 6: Correlación entre Estadísticas
+                html.H3("Correlación entre Estadísticas", style={'textAlign': 'center', 'marginTop': '30px'}),
+                html.Div([
+                    html.Label("Estadísticas:"),
+                    dcc.Dropdown(
+                        id='correlation-columns',
+                        options=[{'label': column, 'value': column} for column in df.columns
+                                 if column != 'TEAM_ID' and pd.api.types.is_numeric_dtype(df[column].dtype)],
+                        value=CORRELATION_COLUMNS,
+                        multi=True,
+                        persistence=True,
+                        persistence_type='memory'
+                    ),
+                ]),
+                dcc.Graph(id='correlation-chart'),
+                
+            ], className='full-width-charts')
+        ], className='container')
+    
+    def team_analysis_tab(df):
+        # Tab de Análisis de Equipo Individual
+        return html.Div([
+            html.Div([
+                html.H3("Selecciona un Equipo"),
+                dcc.Dropdown(
+                    id='team-selector',
+                    options=[{'label': team, 'value': team} for team in sorted(df['TEAM_NAME'].unique())],
+                    value=None,
+                    persistence=True,
+                    persistence_type='memory'
+                ),
+                html.Div(id='team-logo-container', style={'textAlign': 'center', 'margin': '20px 0'}),
+                html.H3(id='team-stats-title'),
+                html.Div(id='team-stats-table'),
+                dcc.Graph(id='team-radar-chart'),
+            ], className='card'),
+        ], className='container')
+    
+    def team_comparison_tab(df):
+        # Tab de Comparación de Equipos
+        return html.Div([
+            html.Div([
+                html.Div([
+                    html.H3("Equipo 1"),
+                    dcc.Dropdown(
+                        id='team1-selector',
+                        options=[{'label': team, 'value': team} for team in sorted(df['TEAM_NAME'].unique())],
+                        value=None,
+                        persistence=True,
+                        persistence_type='memory'
+                    ),
+                    html.Div(id='team1-logo-container', style={'textAlign': 'center', 'margin': '20px 0'}),
+                ], style={'width': '48%', 'display': 'inline-block'}),
+                
+                html.Div([
+                    html.H3("Equipo 2"),
+                    dcc.Dropdown(
+                        id='team2-selector',
+                        options=[{'label': team, 'value': team} for team in sorted(df['TEAM_NAME'].unique())],
+                        value=None,
+                        persistence=True,
+                        persistence_type='memory'
+                    ),
+                    html.Div(id='team2-logo-container', style={'textAlign': 'center', 'margin': '20px 0'}),
+                ], style={'width': '48%', 'display': 'inline-block', 'float': 'right'}),
+                
+                dcc.Graph(id='teams-comparison-chart'),
+            ], className='card'),
+        ], className='container')
+    
+    def schedule_tab(df):
+        # Tab de Calendario y Predicciones
+        return html.Div([
+            html.H3("Calendario de Partidos NBA", style={'textAlign': 'center', 'marginTop': '20px'}),
+            html.P("Vista de próximos partidos con análisis estadístico y predicciones", 
+                   style={'textAlign': 'center', 'marginBottom': '20px', 'color': '#666'}),
+            
+            # Botón para actualizar caché del calendario
+            html.Div([
+                html.Button('Actualizar datos del calendario', id='refresh-schedule-button', n_clicks=0,
+                         style={
+                             'marginBottom': '10px',
+                             'backgroundColor': '#1D428A',
+                             'color': 'white',
+                             'border': 'none',
+                             'padding': '10px 15px',
+                             'borderRadius': '5px',
+                             'cursor': 'pointer'
+                         }),
+                html.Div(id='refresh-schedule-output', style={'marginBottom': '10px', 'color': '#CE1141'})
+            ], style={'textAlign': 'center', 'marginBottom': '20px'}),
+            
+            # Selección de fecha
+            html.Div([
+                html.H4("Selecciona una fecha:"),
+                dcc.DatePickerSingle(
+                    id='date-picker',
+                    min_date_allowed=season_start,
+                    max_date_allowed=season_end,
+                    initial_visible_month=datetime.datetime.now().date(),
+                    date=datetime.datetime.now().date(),
+                    display_format='YYYY-MM-DD',
+                    style={'marginBottom': '15px'},
+                    persistence=True,
+                    persistence_type='memory'
+                ),
+            ], style={'textAlign': 'center', 'marginBottom': '20px'}),
+            
+            # Contenedor para la lista de partidos
+            html.Div(id='games-container', className='card')
+            
+        ], className='container')
+    
     # Definir el diseño del panel
     app.layout = html.Div([
-        html.H1("Dashboard de Estadísticas NBA 2024-2025", style={'textAlign': 'center'}),
+        html.H1(f"Dashboard de Estadísticas NBA {season_display_name(DEFAULT_SEASON)}", style={'textAlign': 'center'}),
         
         # Botón para limpiar caché de logos
         html.Div([
@@ -325,253 +694,80 @@ def create_dashboard(df):
             html.Div(id='clear-cache-output', style={'marginBottom': '10px', 'color': '#CE1141'})
         ], style={'textAlign': 'center', 'marginBottom': '20px'}),
         
-        dcc.Tabs(id='tabs', children=[
-            # Tab de Vista General
-            dcc.Tab(label='Vista General', value='tab-general', children=[
-                html.Div([
-                    # Contenedor para todos los gráficos en una sola columna
-                    html.Div([
-                        # Gráfico 1: Gráfico de Dispersión de Equipos
-                        html.H3("Gráfico de Dispersión de Equipos", style={'textAlign': 'center', 'marginTop': '20px'}),
-                        html.Div([
-                            html.Div([
-                                html.Label("Eje X:"),
-                                dcc.Dropdown(
-                                    id='x-axis',
-                                    options=[
-                                        {'label': 'Puntos por Partido', 'value': 'PTS'},
-                                        {'label': 'Asistencias por Partido', 'value': 'AST'},
-                                        {'label': 'Rebotes por Partido', 'value': 'REB'},
-                                        {'label': 'Robos por Partido', 'value': 'STL'},
-                                        {'label': 'Tapones por Partido', 'value': 'BLK'},
-                                        {'label': 'Porcentaje de Tiro', 'value': 'FG_PCT'},
-                                        {'label': 'Porcentaje de Triples', 'value': 'FG3_PCT'},
-                                        {'label': 'Rating Ofensivo', 'value': 'E_OFF_RATING'},
-                                        {'label': 'Rating Defensivo', 'value': 'E_DEF_RATING'},
-                                        {'label': 'Net Rating', 'value': 'E_NET_RATING'},
-                                        {'label': 'Victorias', 'value': 'W_x'},
-                                        {'label': 'Derrotas', 'value': 'L_x'},
-                                    ],
-                                    value='PTS'
-                                ),
-                            ], style={'width': '48%', 'display': 'inline-block'}),
-                            
-                            html.Div([
-                                html.Label("Eje Y:"),
-                                dcc.Dropdown(
-                                    id='y-axis',
-                                    options=[
-                                        {'label': 'Puntos por Partido', 'value': 'PTS'},
-                                        {'label': 'Asistencias por Partido', 'value': 'AST'},
-                                        {'label': 'Rebotes por Partido', 'value': 'REB'},
-                                        {'label': 'Robos por Partido', 'value': 'STL'},
-                                        {'label': 'Tapones por Partido', 'value': 'BLK'},
-                                        {'label': 'Porcentaje de Tiro', 'value': 'FG_PCT'},
-                                        {'label': 'Porcentaje de Triples', 'value': 'FG3_PCT'},
-                                        {'label': 'Rating Ofensivo', 'value': 'E_OFF_RATING'},
-                                        {'label': 'Rating Defensivo', 'value': 'E_DEF_RATING'},
-                                        {'label': 'Net Rating', 'value': 'E_NET_RATING'},
-                                        {'label': 'Victorias', 'value': 'W_x'},
-                                        {'label': 'Derrotas', 'value': 'L_x'},
-                                    ],
-                                    value='E_OFF_RATING'
-                                ),
-                            ], style={'width': '48%', 'display': 'inline-block', 'float': 'right'}),
-                        ]),
-                        dcc.Graph(id='scatter-plot'),
-                        
-                        # Gráfico 2: Asistencias vs Victorias
-                        html.H3("Asistencias vs Victorias", style={'textAlign': 'center', 'marginTop': '30px'}),
-                        dcc.Graph(id='ast-win-chart'),
-                        
-                        # Gráfico 3: Top 10 Anotadores
-                        html.H3("Top 10 Equipos por Puntos", style={'textAlign': 'center', 'marginTop': '30px'}),
-                        dcc.Graph(id='top10-points-chart'),
-                        
-                        # Gráfico 4: Ofensiva vs Defensiva
-                        html.H3("Ofensiva vs Defensiva", style={'textAlign': 'center', 'marginTop': '30px'}),
-                        dcc.Graph(id='off-def-chart'),
-                        
-                        # Gráfico 5: Ritmo vs Ofensiva
-                        html.H3("Ritmo vs Ofensiva", style={'textAlign': 'center', 'marginTop': '30px'}),
-                        dcc.Graph(id='pace-off-chart'),
-                        
-                        # Gráfico 6: Correlación entre Estadísticas
-                        html.H3("Correlación entre Estadísticas", style={'textAlign': 'center', 'marginTop': '30px'}),
-                        dcc.Graph(id='correlation-chart'),
-                        
-                    ], className='full-width-charts')
-                ], className='container'),
-            ]),
-            
-            # Tab de Análisis de Equipo Individual
-            dcc.Tab(label='Análisis de Equipo', value='tab-team-analysis', children=[
-                html.Div([
-                    html.Div([
-                        html.H3("Selecciona un Equipo"),
-                        dcc.Dropdown(
-                            id='team-selector',
-                            options=[{'label': team, 'value': team} for team in sorted(df['TEAM_NAME_x'].unique())],
-                            value=None
-                        ),
-                        html.Div(id='team-logo-container', style={'textAlign': 'center', 'margin': '20px 0'}),
-                        html.H3(id='team-stats-title'),
-                        html.Div(id='team-stats-table'),
-                        dcc.Graph(id='team-radar-chart'),
-                    ], className='card'),
-                ], className='container'),
-            ]),
-            
-            # Tab de Comparación de Equipos
-            dcc.Tab(label='Comparación de Equipos', value='tab-team-comparison', children=[
-                html.Div([
-                    html.Div([
-                        html.Div([
-                            html.H3("Equipo 1"),
-                            dcc.Dropdown(
-                                id='team1-selector',
-                                options=[{'label': team, 'value': team} for team in sorted(df['TEAM_NAME_x'].unique())],
-                                value=None
-                            ),
-                            html.Div(id='team1-logo-container', style={'textAlign': 'center', 'margin': '20px 0'}),
-                        ], style={'width': '48%', 'display': 'inline-block'}),
-                        
-                        html.Div([
-                            html.H3("Equipo 2"),
-                            dcc.Dropdown(
-                                id='team2-selector',
-                                options=[{'label': team, 'value': team} for team in sorted(df['TEAM_NAME_x'].unique())],
-                                value=None
-                            ),
-                            html.Div(id='team2-logo-container', style={'textAlign': 'center', 'margin': '20px 0'}),
-                        ], style={'width': '48%', 'display': 'inline-block', 'float': 'right'}),
-                        
-                        dcc.Graph(id='teams-comparison-chart'),
-                    ], className='card'),
-                ], className='container'),
-            ]),
-            
-            # Tab de Calendario y Predicciones
-            dcc.Tab(label='Calendario y Predicciones', value='tab-schedule', children=[
-                html.Div([
-                    html.H3("Calendario de Partidos NBA", style={'textAlign': 'center', 'marginTop': '20px'}),
-                    html.P("Vista de próximos partidos con análisis estadístico y predicciones", 
-                           style={'textAlign': 'center', 'marginBottom': '20px', 'color': '#666'}),
-                    
-                    # Botón para actualizar caché del calendario
-                    html.Div([
-                        html.Button('Actualizar datos del calendario', id='refresh-schedule-button', n_clicks=0,
-                                 style={
-                                     'marginBottom': '10px',
-                                     'backgroundColor': '#1D428A',
-                                     'color': 'white',
-                                     'border': 'none',
-                                     'padding': '10px 15px',
-                                     'borderRadius': '5px',
-                                     'cursor': 'pointer'
-                                 }),
-                        html.Div(id='refresh-schedule-output', style={'marginBottom': '10px', 'color': '#CE1141'})
-                    ], style={'textAlign': 'center', 'marginBottom': '20px'}),
-                    
-                    # Selección de fecha
-                    html.Div([
-                        html.H4("Selecciona una fecha:"),
-                        dcc.DatePickerSingle(
-                            id='date-picker',
-                            min_date_allowed=datetime.datetime(2024, 10, 1).date(),
-                            max_date_allowed=datetime.datetime(2025, 6, 30).date(),
-                            initial_visible_month=datetime.datetime.now().date(),
-                            date=datetime.datetime.now().date(),
-                            display_format='YYYY-MM-DD',
-                            style={'marginBottom': '15px'}
-                        ),
-                    ], style={'textAlign': 'center', 'marginBottom': '20px'}),
-                    
-                    # Contenedor para la lista de partidos
-                    html.Div(id='games-container', className='card')
-                    
-                ], className='container'),
-            ]),
+        dcc.Tabs(id='tabs', value='tab-general', children=[
+            dcc.Tab(label='Vista General', value='tab-general'),
+            dcc.Tab(label='Análisis de Equipo', value='tab-team-analysis'),
+            dcc.Tab(label='Comparación de Equipos', value='tab-team-comparison'),
+            dcc.Tab(label='Calendario y Predicciones', value='tab-schedule'),
         ]),
         
+        # Contenido de la pestaña activa, construido bajo demanda (ver render_tab)
+        html.Div(id='tab-content'),
+        
         html.Footer([
-            html.P("Dashboard de Estadísticas NBA 2024-2025 | Desarrollado con Dash y Python"),
+            html.P(f"Dashboard de Estadísticas NBA {season_display_name(DEFAULT_SEASON)} | Desarrollado con Dash y Python"),
         ], style={'textAlign': 'center', 'padding': '20px', 'marginTop': '50px'})
     ])
 
-    # Callback para actualizar el gráfico de dispersión
+    tab_builders = {
+        'tab-general': general_tab,
+        'tab-team-analysis': team_analysis_tab,
+        'tab-team-comparison': team_comparison_tab,
+        'tab-schedule': schedule_tab,
+    }
+    # Contenido ya construido por (versión de los datos, día, pestaña); el día
+    # forma parte de la clave porque el calendario abre en la fecha actual
+    tab_contents = {}
+    
     @app.callback(
-        Output('scatter-plot', 'figure'),
-        [Input('x-axis', 'value'),
-         Input('y-axis', 'value')]
+        Output('tab-content', 'children'),
+        [Input('tabs', 'value')]
     )
-    def update_scatter(x_axis, y_axis):
-        if not x_axis or not y_axis:
-            return go.Figure()
-        
-        # Crear figura base
-        fig = go.Figure()
-        
-        # Agregar puntos para cada equipo con imágenes de logo
-        for team_name in df['TEAM_NAME_x'].unique():
-            team_data = df[df['TEAM_NAME_x'] == team_name]
-            
-            # Obtener URL del logo y color del equipo
-            logo_url = get_team_logo(team_name)
-            team_color = get_team_color(team_name)
-            
-            if logo_url:
-                # Agregar equipo con logo
-                fig.add_trace(go.Scatter(
-                    x=team_data[x_axis],
-                    y=team_data[y_axis],
-                    mode='markers',
-                    name=team_name,
-                    marker=dict(
-                        size=40,
-                        opacity=0.8,
-                        color=team_color,
-                        line=dict(color='white', width=2)
-                    ),
-                    text=team_name,
-                    hovertemplate=f"<b>{team_name}</b><br>{x_axis}: %{{x:.2f}}<br>{y_axis}: %{{y:.2f}}<extra></extra>"
-                ))
-                
-                # Agregar logo como imagen
-                fig.add_layout_image(
-                    dict(
-                        source=logo_url,
-                        xref="x",
-                        yref="y",
-                        x=team_data[x_axis].values[0],
-                        y=team_data[y_axis].values[0],
-                        sizex=3,
-                        sizey=3,
-                        xanchor="center",
-                        yanchor="middle",
-                        sizing="contain",
-                        opacity=0.9,
-                        layer="above"
-                    )
-                )
-            else:
-                # Fallback sin logo
-                fig.add_trace(go.Scatter(
-                    x=team_data[x_axis],
-                    y=team_data[y_axis],
-                    mode='markers+text',
-                    name=team_name,
-                    text=team_name,
-                    textposition="top center",
-                    marker=dict(
-                        size=30,
-                        color=team_color
-                    )
-                ))
-        
-        # Ajustar layout
+    def render_tab(tab):
+        builder = tab_builders.get(tab)
+        if builder is None:
+            return None
+        snapshot = current_snapshot()
+        key = (snapshot.cache_key, datetime.date.today().isoformat(), tab)
+        content = tab_contents.get(key)
+        if content is None:
+            content = builder(snapshot.df)
+            # Sólo se conservan los contenidos de la versión y el día actuales
+            for old_key in [old_key for old_key in list(tab_contents) if old_key[:2] != key[:2]]:
+                tab_contents.pop(old_key, None)
+            tab_contents[key] = content
+        return content
+    
+    # Gráfico de dispersión: una sola traza con un punto por equipo y los logos
+    # referenciados por URL (el navegador descarga cada logo una sola vez)
+    def scatter_hovertemplate(x_axis, y_axis):
+        return f"<b>%{{customdata}}</b><br>{x_axis}: %{{x:.2f}}<br>{y_axis}: %{{y:.2f}}<extra></extra>"
+
+    def build_scatter(df, x_axis, y_axis):
+        teams = df['TEAM_NAME'].tolist()
+        logo_urls = [get_team_logo(team_name) for team_name in teams]
+        x_values = df[x_axis].to_numpy()
+        y_values = df[y_axis].to_numpy()
+
+        fig = go.Figure(go.Scatter(
+            x=x_values,
+            y=y_values,
+            mode='markers+text',
+            customdata=teams,
+            # Los equipos sin logo se identifican con su nombre
+            text=['' if logo_url else team_name for team_name, logo_url in zip(teams, logo_urls)],
+            textposition="top center",
+            marker=dict(
+                size=[40 if logo_url else 30 for logo_url in logo_urls],
+                opacity=0.8,
+                color=[get_team_color(team_name) for team_name in teams],
+                line=dict(color='white', width=2)
+            ),
+            hovertemplate=scatter_hovertemplate(x_axis, y_axis)
+        ))
+
         fig.update_layout(
-            title=f"Relación entre {x_axis} y {y_axis}",
+            title=SCATTER_TITLE.format(x_axis=x_axis, y_axis=y_axis),
             xaxis_title=x_axis,
             yaxis_title=y_axis,
             showlegend=False,
@@ -579,10 +775,70 @@ def create_dashboard(df):
             plot_bgcolor='rgba(240, 240, 240, 0.5)',
             paper_bgcolor='white',
             height=600,  # Altura fija para mejor visualización
-            margin=dict(l=40, r=40, t=60, b=40)
+            margin=dict(l=40, r=40, t=60, b=40),
+            images=[
+                dict(
+                    source=logo_url,
+                    xref="x",
+                    yref="y",
+                    x=x,
+                    y=y,
+                    sizex=3,
+                    sizey=3,
+                    xanchor="center",
+                    yanchor="middle",
+                    sizing="contain",
+                    opacity=0.9,
+                    layer="above"
+                )
+                for logo_url, x, y in zip(logo_urls, x_values, y_values) if logo_url
+            ]
         )
-        
         return fig
+
+    def scatter_data(df):
+        """
+        Datos para cambiar de ejes en el navegador: las columnas elegibles
+        (en el orden de los equipos de la figura), las filas de los equipos
+        con logo (en el orden de layout.images) y las plantillas de los textos.
+        """
+        teams = df['TEAM_NAME'].tolist()
+        return {
+            'columns': {option['value']: df[option['value']].to_numpy()
+                        for option in SCATTER_AXIS_OPTIONS if option['value'] in df.columns},
+            'image_rows': [row for row, team_name in enumerate(teams) if get_team_logo(team_name)],
+            'title': SCATTER_TITLE,
+            'hovertemplate': scatter_hovertemplate('{x_axis}', '{y_axis}'),
+        }
+
+    # Figura completa y datos de los ejes: al cargar la página y, como
+    # respaldo, cuando el navegador no puede cambiar los ejes por sí mismo
+    @app.callback(
+        [Output('scatter-plot', 'figure'),
+         Output('scatter-data', 'data')],
+        [Input('scatter-request', 'data')],
+        [State('x-axis', 'value'),
+         State('y-axis', 'value')]
+    )
+    def update_scatter(request, x_axis, y_axis):
+        df = current_df()
+        if request:
+            x_axis, y_axis = request['x_axis'], request['y_axis']
+        if not x_axis or not y_axis:
+            return go.Figure(), scatter_data(df)
+        return build_scatter(df, x_axis, y_axis), scatter_data(df)
+
+    # Cambio de ejes en el navegador, sin pasar por el servidor
+    app.clientside_callback(
+        SCATTER_AXES_CLIENTSIDE,
+        [Output('scatter-plot', 'figure', allow_duplicate=True),
+         Output('scatter-request', 'data')],
+        [Input('x-axis', 'value'),
+         Input('y-axis', 'value')],
+        [State('scatter-data', 'data'),
+         State('scatter-plot', 'figure')],
+        prevent_initial_call=True
+    )
     
     # Callback para actualizar el análisis de equipo
     @app.callback(
@@ -593,19 +849,22 @@ def create_dashboard(df):
         [Input('team-selector', 'value')]
     )
     def update_team_analysis(team):
+        df = current_df()
         if not team:
             return go.Figure(), "Estadísticas del Equipo", html.Div(), html.Div()
         
-        # Filtrar datos para el equipo seleccionado
-        team_data = df[df['TEAM_NAME_x'] == team].iloc[0]
+        # Fila del equipo seleccionado (lectura directa de la matriz del registro)
+        registry = get_registry(df)
+        team_data = registry.record(team)
+        if team_data is None:
+            return go.Figure(), "Estadísticas del Equipo", html.Div(), html.Div()
         
         # Crear gráfico de radar
         categories = ['PTS', 'AST', 'REB', 'STL', 'BLK', 'TOV']
-        values = [team_data[cat] for cat in categories]
+        values = team_data.values(categories)
         
-        # Normalizar valores para mejor visualización
-        max_vals = df[categories].max()
-        normalized_values = [(val / max_val) * 100 for val, max_val in zip(values, max_vals)]
+        # Normalizar valores para mejor visualización (porcentaje del máximo de la liga)
+        normalized_values = list(get_league_norms(registry).scale_to_max(categories, values))
         
         fig = go.Figure()
         
@@ -622,7 +881,7 @@ def create_dashboard(df):
         
         # Crear tabla de estadísticas
         stats_to_show = {
-            'Record': f"{int(team_data['W_x'])}-{int(team_data['L_x'])}",
+            'Record': f"{int(team_data['W'])}-{int(team_data['L'])}",
             'Puntos por Partido': f"{team_data['PTS']:.1f}",
             'Asistencias por Partido': f"{team_data['AST']:.1f}",
             'Rebotes por Partido': f"{team_data['REB']:.1f}",
@@ -689,16 +948,21 @@ def create_dashboard(df):
          Input('team2-selector', 'value')]
     )
     def update_comparison(team1, team2):
+        df = current_df()
         if not team1 or not team2:
             return go.Figure(), html.Div(), html.Div()
         
-        # Filtrar datos para los equipos seleccionados
-        team1_data = df[df['TEAM_NAME_x'] == team1].iloc[0]
-        team2_data = df[df['TEAM_NAME_x'] == team2].iloc[0]
+        # Filas de los equipos seleccionados
+        registry = get_registry(df)
+        team1_data = registry.record(team1)
+        team2_data = registry.record(team2)
+        if team1_data is None or team2_data is None:
+            return go.Figure(), html.Div(), html.Div()
         
         categories = ['PTS', 'AST', 'REB', 'STL', 'BLK', 'FG_PCT', 'FG3_PCT', 'E_OFF_RATING', 'E_DEF_RATING']
-        team1_values = [team1_data[cat] for cat in categories]
-        team2_values = [team2_data[cat] for cat in categories]
+        team1_values = team1_data.values(categories)
+        team2_values = team2_data.values(categories)
+        max_vals = get_league_norms(registry).maximum[registry.column_indices(categories)]
         
         # Normalizar FG_PCT y FG3_PCT multiplicándolos por 100
         categories_display = ['Puntos', 'Asistencias', 'Rebotes', 'Robos', 'Tapones', '% Tiro ×100', '% Triple ×100', 'Rating Of.', 'Rating Def.']
@@ -712,7 +976,7 @@ def create_dashboard(df):
                 normalized_values1.append(val1 * 100)
                 normalized_values2.append(val2 * 100)
             else:
-                max_val = max(df[categories[i]])
+                max_val = max_vals[i]
                 normalized_values1.append((val1 / max_val) * 100)
                 normalized_values2.append((val2 / max_val) * 100)
         
@@ -808,27 +1072,38 @@ def create_dashboard(df):
     def clear_logo_cache(n_clicks):
         if n_clicks > 0:
             try:
-                for filename in os.listdir('logos'):
-                    file_path = os.path.join('logos', filename)
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
-                return html.Div("✅ Caché de logos eliminado correctamente!", style={'color': 'green'})
+                # Los logos se vuelven a descargar en lugar de borrarse: las
+                # figuras cacheadas los referencian por URL, y un logo que no
+                # se puede descargar conserva la versión que ya había. La
+                # descarga sigue en segundo plano y la petición responde ya
+                abbrs = sorted(set(team_to_abbr.values()))
+                if refresh_team_logos(abbrs, on_done=logos_refreshed) is None:
+                    return html.Div("⏳ Ya se están descargando los logos", style={'color': 'orange'})
+                return html.Div(f"⏳ Descargando {len(abbrs)} logos en segundo plano; "
+                                "los gráficos se actualizarán al terminar", style={'color': 'green'})
             except Exception as e:
                 return html.Div(f"❌ Error al limpiar el caché: {str(e)}", style={'color': 'red'})
         return ""
     
-    # Callbacks para los nuevos gráficos dinámicos
-    @app.callback(
-        Output('ast-win-chart', 'figure'),
-        [Input('tabs', 'value')]
-    )
-    def update_ast_win_chart(_):
+    def logos_refreshed(failed):
+        # Las figuras y pestañas ya construidas se regeneran con las URLs
+        # (hashes) de los logos nuevos
+        snapshot = current_snapshot()
+        figure_cache.invalidate(snapshot)
+        figure_cache.warm_in_background(snapshot)
+        tab_contents.clear()
+    
+    # Gráficos de la Vista General que sólo dependen de los datos: general_tab
+    # los incluye ya construidos (desde la caché de figuras)
+    @figure_cache.chart('ast-win-chart', current_snapshot)
+    def update_ast_win_chart(df):
+        norms = get_league_norms(get_registry(df))
         # Gráfico de Asistencias vs Victorias
         fig = go.Figure()
         
         # Agregar puntos para cada equipo con imágenes de logo
-        for team_name in df['TEAM_NAME_x'].unique():
-            team_data = df[df['TEAM_NAME_x'] == team_name]
+        for team_name in df['TEAM_NAME'].unique():
+            team_data = df[df['TEAM_NAME'] == team_name]
             
             # Obtener URL del logo y color del equipo
             logo_url = get_team_logo(team_name)
@@ -837,7 +1112,7 @@ def create_dashboard(df):
             # Agregar punto para el equipo
             fig.add_trace(go.Scatter(
                 x=team_data['AST'],
-                y=team_data['W_x'],
+                y=team_data['W'],
                 mode='markers',
                 name=team_name,
                 marker=dict(
@@ -858,7 +1133,7 @@ def create_dashboard(df):
                         xref="x",
                         yref="y",
                         x=team_data['AST'].values[0],
-                        y=team_data['W_x'].values[0],
+                        y=team_data['W'].values[0],
                         sizex=2.2,
                         sizey=2.2,
                         xanchor="center",
@@ -870,8 +1145,8 @@ def create_dashboard(df):
                 )
         
         # Añadir línea de tendencia
-        x_range = np.linspace(df['AST'].min() - 0.5, df['AST'].max() + 0.5, 100)
-        y_trend = x_range * df['AST'].corr(df['W_x']) + (df['W_x'].mean() - df['AST'].corr(df['W_x']) * df['AST'].mean())
+        x_range = np.linspace(norms.min('AST') - 0.5, norms.max('AST') + 0.5, 100)
+        y_trend = x_range * df['AST'].corr(df['W']) + (norms.average('W') - df['AST'].corr(df['W']) * norms.average('AST'))
         
         fig.add_trace(go.Scatter(
             x=x_range,
@@ -895,19 +1170,16 @@ def create_dashboard(df):
         
         return fig
         
-    @app.callback(
-        Output('top10-points-chart', 'figure'),
-        [Input('tabs', 'value')]
-    )
-    def update_top10_points_chart(_):
+    @figure_cache.chart('top10-points-chart', current_snapshot)
+    def update_top10_points_chart(df):
         # Top 10 equipos por puntos
         top10_pts = df.sort_values('PTS', ascending=False).head(10)
         
         fig = go.Figure()
         
         # Para cada equipo, crear una barra con el valor de puntos
-        for i, team in enumerate(top10_pts['TEAM_NAME_x']):
-            team_data = top10_pts[top10_pts['TEAM_NAME_x'] == team]
+        for i, team in enumerate(top10_pts['TEAM_NAME']):
+            team_data = top10_pts[top10_pts['TEAM_NAME'] == team]
             team_color = get_team_color(team)
             points = team_data['PTS'].values[0]
             
@@ -963,24 +1235,22 @@ def create_dashboard(df):
         
         return fig
     
-    @app.callback(
-        Output('off-def-chart', 'figure'),
-        [Input('tabs', 'value')]
-    )
-    def update_off_def_chart(_):
+    @figure_cache.chart('off-def-chart', current_snapshot)
+    def update_off_def_chart(df):
+        norms = get_league_norms(get_registry(df))
         # Gráfico de Rating Ofensivo vs Rating Defensivo
         fig = go.Figure()
         
         # Agregar puntos para cada equipo con imágenes de logo
-        for team_name in df['TEAM_NAME_x'].unique():
-            team_data = df[df['TEAM_NAME_x'] == team_name]
+        for team_name in df['TEAM_NAME'].unique():
+            team_data = df[df['TEAM_NAME'] == team_name]
             
             # Obtener URL del logo y color del equipo
             logo_url = get_team_logo(team_name)
             team_color = get_team_color(team_name)
             
             # Calcular tamaño basado en porcentaje de victorias
-            size = 15 + (team_data['W_PCT_x'].values[0] * 20)
+            size = 15 + (team_data['W_PCT'].values[0] * 20)
             
             # Agregar punto para el equipo
             fig.add_trace(go.Scatter(
@@ -1030,20 +1300,20 @@ def create_dashboard(df):
         )
         
         # Añadir líneas de referencia para promedios
-        fig.add_hline(y=df['E_DEF_RATING'].mean(), line_dash="dash", line_color="gray", annotation_text="Media Liga")
-        fig.add_vline(x=df['E_OFF_RATING'].mean(), line_dash="dash", line_color="gray", annotation_text="Media Liga")
+        fig.add_hline(y=norms.average('E_DEF_RATING'), line_dash="dash", line_color="gray", annotation_text="Media Liga")
+        fig.add_vline(x=norms.average('E_OFF_RATING'), line_dash="dash", line_color="gray", annotation_text="Media Liga")
         
         # Añadir anotaciones para los cuadrantes
         fig.add_annotation(
-            x=df['E_OFF_RATING'].max() - 1,
-            y=df['E_DEF_RATING'].min() + 1,
+            x=norms.max('E_OFF_RATING') - 1,
+            y=norms.min('E_DEF_RATING') + 1,
             text="ELITE",
             showarrow=False,
             font=dict(size=14, color="green")
         )
         fig.add_annotation(
-            x=df['E_OFF_RATING'].min() + 1,
-            y=df['E_DEF_RATING'].max() - 1,
+            x=norms.min('E_OFF_RATING') + 1,
+            y=norms.max('E_DEF_RATING') - 1,
             text="DÉBIL",
             showarrow=False,
             font=dict(size=14, color="red")
@@ -1051,24 +1321,22 @@ def create_dashboard(df):
         
         return fig
     
-    @app.callback(
-        Output('pace-off-chart', 'figure'),
-        [Input('tabs', 'value')]
-    )
-    def update_pace_off_chart(_):
+    @figure_cache.chart('pace-off-chart', current_snapshot)
+    def update_pace_off_chart(df):
+        norms = get_league_norms(get_registry(df))
         # Gráfico de Ritmo vs Rating Ofensivo
         fig = go.Figure()
         
         # Agregar puntos para cada equipo con imágenes de logo
-        for team_name in df['TEAM_NAME_x'].unique():
-            team_data = df[df['TEAM_NAME_x'] == team_name]
+        for team_name in df['TEAM_NAME'].unique():
+            team_data = df[df['TEAM_NAME'] == team_name]
             
             # Obtener URL del logo y color del equipo
             logo_url = get_team_logo(team_name)
             team_color = get_team_color(team_name)
             
             # Calcular tamaño basado en puntos por partido
-            pts_norm = (team_data['PTS'].values[0] - df['PTS'].min()) / (df['PTS'].max() - df['PTS'].min())
+            pts_norm = (team_data['PTS'].values[0] - norms.min('PTS')) / (norms.max('PTS') - norms.min('PTS'))
             size = 15 + (pts_norm * 25)
             
             # Agregar punto para el equipo
@@ -1119,20 +1387,20 @@ def create_dashboard(df):
         )
         
         # Añadir líneas de referencia para promedios
-        fig.add_hline(y=df['E_OFF_RATING'].mean(), line_dash="dash", line_color="gray", annotation_text="Media Liga")
-        fig.add_vline(x=df['E_PACE'].mean(), line_dash="dash", line_color="gray", annotation_text="Media Liga")
+        fig.add_hline(y=norms.average('E_OFF_RATING'), line_dash="dash", line_color="gray", annotation_text="Media Liga")
+        fig.add_vline(x=norms.average('E_PACE'), line_dash="dash", line_color="gray", annotation_text="Media Liga")
         
         # Añadir anotaciones para los cuadrantes
         fig.add_annotation(
-            x=df['E_PACE'].max() - 0.5,
-            y=df['E_OFF_RATING'].max() - 0.5,
+            x=norms.max('E_PACE') - 0.5,
+            y=norms.max('E_OFF_RATING') - 0.5,
             text="RÁPIDO Y EFECTIVO",
             showarrow=False,
             font=dict(size=12, color="green")
         )
         fig.add_annotation(
-            x=df['E_PACE'].min() + 0.5,
-            y=df['E_OFF_RATING'].max() - 0.5,
+            x=norms.min('E_PACE') + 0.5,
+            y=norms.max('E_OFF_RATING') - 0.5,
             text="LENTO Y EFECTIVO",
             showarrow=False,
             font=dict(size=12, color="blue")
@@ -1140,47 +1408,26 @@ def create_dashboard(df):
         
         return fig
     
+    @figure_cache.chart('correlation-chart', current_snapshot)
+    def default_correlation_chart(df):
+        return build_correlation_chart(df, CORRELATION_COLUMNS)
+    
     @app.callback(
         Output('correlation-chart', 'figure'),
-        [Input('tabs', 'value')]
+        [Input('correlation-columns', 'value')]
     )
-    def update_correlation_chart(_):
-        # Seleccionar columnas numéricas relevantes para la correlación
-        numeric_cols = ['PTS', 'AST', 'REB', 'STL', 'BLK', 'FG_PCT', 'FG3_PCT', 
-                        'E_OFF_RATING', 'E_DEF_RATING', 'E_NET_RATING', 'E_PACE', 
-                        'W_x', 'L_x', 'W_PCT_x']
-        
-        # Calcular matriz de correlación
-        corr_matrix = df[numeric_cols].corr()
-        
-        # Crear mapa de calor
-        fig = px.imshow(corr_matrix,
-                       labels=dict(x="Variable", y="Variable", color="Correlación"),
-                       x=numeric_cols,
-                       y=numeric_cols,
-                       color_continuous_scale='RdBu_r',
-                       title='Matriz de Correlación de Estadísticas')
-        
-        # Añadir anotaciones con los valores de correlación
-        for i, row in enumerate(corr_matrix.values):
-            for j, val in enumerate(row):
-                fig.add_annotation(
-                    x=j, y=i,
-                    text=f"{val:.2f}",
-                    showarrow=False,
-                    font_size=9,
-                    font_color='black' if abs(val) < 0.7 else 'white'
-                )
-        
-        # Personalizar el diseño
-        fig.update_layout(
-            height=700,
-            margin=dict(l=40, r=40, t=60, b=40),
-            plot_bgcolor='rgba(240, 240, 240, 0.5)',
-            paper_bgcolor='white'
-        )
-        
-        return fig
+    def update_correlation_chart(columns):
+        # La selección por defecto se sirve desde la caché de figuras; el resto
+        # sólo cambia los datos del mapa de calor de esa misma figura
+        figure = default_correlation_chart()
+        if columns is None or list(columns) == CORRELATION_COLUMNS:
+            return figure
+        if not columns:
+            return go.Figure()
+        columns, corr_matrix = correlation_values(current_df(), columns)
+        heatmap = dict(figure['data'][0], x=columns, y=columns, z=corr_matrix,
+                       texttemplate=correlation_texttemplate(columns))
+        return dict(figure, data=[heatmap])
         
     # Callback para mostrar los partidos del día seleccionado y sus predicciones
     @app.callback(
@@ -1188,6 +1435,7 @@ def create_dashboard(df):
         [Input('date-picker', 'date')]
     )
     def update_schedule_view(selected_date):
+        df = current_df()
         if not selected_date:
             return html.Div("Selecciona una fecha para ver los partidos programados.")
         
@@ -1195,7 +1443,7 @@ def create_dashboard(df):
         selected_date = datetime.datetime.strptime(selected_date.split('T')[0], "%Y-%m-%d").strftime("%Y-%m-%d")
         
         # Obtener datos del calendario
-        schedule_data = get_schedule_data()
+        schedule_data = get_schedule_data(df)
         
         # Imprimir para depuración
         print(f"Fecha seleccionada: {selected_date}")
@@ -1209,6 +1457,14 @@ def create_dashboard(df):
             return html.Div("No hay partidos programados para esta fecha.", 
                            style={'textAlign': 'center', 'padding': '20px', 'color': '#666'})
         
+        # Marcador esperado de todos los partidos de la fecha de una vez
+        registry = get_registry(df)
+        norms = get_league_norms(registry)
+        projections = {
+            (row.home_team, row.away_team): row
+            for row in get_margin_model(registry).games(games_for_date).itertuples()
+        }
+        
         # Crear tarjetas para cada partido
         game_cards = []
         for game in games_for_date:
@@ -1217,6 +1473,7 @@ def create_dashboard(df):
             
             # Analizar el enfrentamiento
             matchup_analysis = analyze_matchup(home_team, away_team, df)
+            projection = projections.get((home_team, away_team))
             
             if matchup_analysis:
                 # Obtener logos y colores
@@ -1232,42 +1489,15 @@ def create_dashboard(df):
                 radar_categories = ['PTS', 'AST', 'REB', 'STL', 'BLK', 'E_OFF_RATING', 'E_DEF_RATING', 'E_NET_RATING']
                 radar_display_names = ['Puntos', 'Asistencias', 'Rebotes', 'Robos', 'Tapones', 'Rating Of.', 'Rating Def.', 'Net Rating']
                 
-                home_values = []
-                away_values = []
-                
-                for stat_key in radar_categories:
-                    if stat_key in matchup_analysis['comparison']:
-                        stat_data = matchup_analysis['comparison'][stat_key]
-                        home_value = stat_data['team1_value']
-                        away_value = stat_data['team2_value']
-                        
-                        # Normalizar para el radar chart si es necesario
-                        if stat_key in ['E_DEF_RATING']:
-                            # Para rating defensivo (menor es mejor), invertimos la normalización
-                            max_val_def = max(df[stat_key])
-                            min_val_def = min(df[stat_key])
-                            range_def = max_val_def - min_val_def
-                            
-                            # Normalizar e invertir para que menor rating defensivo = mayor valor en el gráfico
-                            home_normalized = (max_val_def - home_value) / range_def * 100
-                            away_normalized = (max_val_def - away_value) / range_def * 100
-                            
-                            home_values.append(home_normalized)
-                            away_values.append(away_normalized)
-                        else:
-                            # Para el resto de estadísticas (mayor es mejor)
-                            max_val = max(df[stat_key])
-                            min_val = min(df[stat_key])
-                            range_val = max_val - min_val
-                            
-                            if range_val > 0:  # Evitar división por cero
-                                home_normalized = (home_value - min_val) / range_val * 100
-                                away_normalized = (away_value - min_val) / range_val * 100
-                                home_values.append(home_normalized)
-                                away_values.append(away_normalized)
-                            else:
-                                home_values.append(50)
-                                away_values.append(50)
+                # Normalizar para el radar chart con el mínimo y máximo de la liga
+                # (invertido donde menor es mejor: de estas categorías, sólo el
+                # rating defensivo)
+                radar_stats = [stat_key for stat_key in radar_categories if stat_key in matchup_analysis['comparison']]
+                radar_values = np.array([
+                    [matchup_analysis['comparison'][stat_key]['team1_value'] for stat_key in radar_stats],
+                    [matchup_analysis['comparison'][stat_key]['team2_value'] for stat_key in radar_stats]
+                ])
+                home_values, away_values = norms.min_max(radar_stats, radar_values).tolist()
                 
                 # Crear radar chart para comparación visual
                 radar_fig = go.Figure()
@@ -1381,7 +1611,24 @@ def create_dashboard(df):
                                     'marginBottom': '15px',
                                     'background': f'linear-gradient(to right, {away_color} 0%, {away_color} {matchup_analysis["win_probability"]["team2"]}%, {home_color} {matchup_analysis["win_probability"]["team2"]}%, {home_color} 100%)',
                                     'borderRadius': '5px'
-                                })
+                                }),
+                                
+                                # Componente Elo de la probabilidad (si se ha mezclado)
+                                html.Div(
+                                    f"Elo: {away_team} {matchup_analysis['elo']['team2_rating']:.0f} · "
+                                    f"{home_team} {matchup_analysis['elo']['team1_rating']:.0f} "
+                                    f"(modelo {matchup_analysis['components']['heuristic']}% · "
+                                    f"Elo {matchup_analysis['elo']['team1_win_prob']}% local)",
+                                    style={'textAlign': 'center', 'fontSize': '12px', 'color': '#666', 'marginBottom': '10px'}
+                                ) if 'elo' in matchup_analysis and 'heuristic' in matchup_analysis.get('components', {}) else None,
+                                
+                                # Marcador esperado (margin_model.py)
+                                html.Div(
+                                    f"Marcador esperado: {away_team} {projection.away_points:.0f} - {home_team} {projection.home_points:.0f} · "
+                                    f"Diferencia: {home_team if projection.margin >= 0 else away_team} por {abs(projection.margin):.1f} · "
+                                    f"Total: {projection.total:.1f}",
+                                    style={'textAlign': 'center', 'fontSize': '12px', 'color': '#666', 'marginBottom': '10px'}
+                                ) if projection is not None else None
                             ]),
                             
                             # Estadísticas clave
@@ -1587,7 +1834,7 @@ def create_dashboard(df):
                 os.remove(cache_file)
             
             # Obtener datos actualizados
-            get_schedule_data()
+            get_schedule_data(current_df())
             
             return html.Div([
                 html.I(className="fas fa-check-circle", style={'color': 'green', 'marginRight': '5px'}),
@@ -1598,24 +1845,27 @@ def create_dashboard(df):
                 html.I(className="fas fa-exclamation-circle", style={'color': 'red', 'marginRight': '5px'}),
                 f"Error al actualizar calendario: {str(e)}"
             ])
+    
+    # Calentar la caché de figuras al arrancar (con gunicorn, en el master antes
+    # de crear los workers) y, en segundo plano, tras cada recarga de datos
+    if data_manager is not None and not data_manager.snapshot().df.empty:
+        figure_cache.warm(data_manager.snapshot())
+        data_manager.add_listener(lambda old, new: figure_cache.warm_in_background(new))
 
     return app
 
 # Función principal para iniciar el dashboard
 def main():
     try:
-        # Cargar datos
-        csv_path = 'nba_team_complete_stats_2024_25.csv'
-        if not os.path.exists(csv_path):
-            print(f"Error: No se encontró el archivo {csv_path}")
+        # Cargar datos (reutiliza la instancia ya cargada al importar el módulo)
+        if not os.path.exists(DEFAULT_CSV_PATH):
+            print(f"Error: No se encontró el archivo {DEFAULT_CSV_PATH}")
             return
         
-        df = pd.read_csv(csv_path)
-        print("Columnas en el CSV:")
-        print(list(df.columns))
+        manager = get_data_manager()
         
         # Crear y lanzar el dashboard
-        app = create_dashboard(df)
+        app = create_dashboard(manager.snapshot().df, manager)
         
         print("Iniciando el Dashboard NBA...")
         host = os.environ.get('HOST', '0.0.0.0')
@@ -1705,16 +1955,23 @@ def normalize_team_name(api_team_name, df_team_names):
     print(f"No se encontró coincidencia para el equipo: '{api_team_name}'")
     return api_team_name
 
-def get_schedule_data():
+def get_schedule_data(df=None):
     """
     Obtiene datos de partidos de la NBA utilizando el endpoint oficial de la NBA.
     Implementa caché para evitar llamadas excesivas al endpoint.
+    
+    Args:
+        df: DataFrame con los nombres de los equipos (por defecto, la
+            instantánea actual del gestor de datos)
     """
     cache_dir = "cache"
     cache_file = os.path.join(cache_dir, "nba_schedule.json")
     
-    # Obtener la lista de nombres de equipos del DataFrame
-    df_team_names = list(df['TEAM_NAME_x'].unique()) if 'df' in globals() and isinstance(df, pd.DataFrame) and 'TEAM_NAME_x' in df.columns else []
+    # Obtener la lista de nombres de equipos del DataFrame (de la instantánea
+    # actual: tras una recarga en caliente no se usan los datos del arranque)
+    if df is None:
+        df = get_data_manager().snapshot().df
+    df_team_names = list(df['TEAM_NAME'].unique()) if 'TEAM_NAME' in df.columns else []
     
     # Crear directorio de caché si no existe
     if not os.path.exists(cache_dir):
@@ -1728,7 +1985,9 @@ def get_schedule_data():
         if (current_timestamp - file_timestamp) < 10800:  # 3 horas en segundos
             try:
                 with open(cache_file, 'r') as f:
-                    return json.load(f)
+                    schedule = json.load(f)
+                update_elo_ratings(schedule, df_team_names)
+                return schedule
             except Exception as e:
                 print(f"Error leyendo caché de calendario: {e}")
     
@@ -1824,6 +2083,9 @@ def get_schedule_data():
         with open(cache_file, 'w') as f:
             json.dump(schedule, f)
         
+        # Los resultados nuevos actualizan los ratings Elo (sólo esos partidos)
+        update_elo_ratings(schedule, df_team_names)
+        
         return schedule
     
     except Exception as e:
@@ -1839,6 +2101,13 @@ def get_schedule_data():
         
         return schedule
 
+def update_elo_ratings(schedule, team_names=None):
+    """Procesa en los ratings Elo los partidos terminados que aún no se habían procesado."""
+    try:
+        get_elo_ratings().update(schedule, team_names)
+    except Exception as e:
+        print(f"Error actualizando ratings Elo: {e}")
+
 def generate_sample_schedule(team_names):
     """
     Genera un calendario de muestra con partidos aleatorios.
@@ -1866,8 +2135,9 @@ def generate_sample_schedule(team_names):
     
     # Generar calendario para toda la temporada
     # Desde octubre hasta junio (9 meses)
-    start_date = datetime.datetime(2024, 10, 1)
-    end_date = datetime.datetime(2025, 6, 30)
+    season_start, season_end = season_date_range(DEFAULT_SEASON)
+    start_date = datetime.datetime.combine(season_start, datetime.time())
+    end_date = datetime.datetime.combine(season_end, datetime.time())
     
     # Generar partidos para cada semana de la temporada
     current_date = start_date
@@ -1932,238 +2202,21 @@ def analyze_matchup(team1_name, team2_name, df):
     - Defensa (rating defensivo, bloqueos, robos)
     - Tendencias de juego (rebotes, asistencias, ritmo)
     - Factores contextuales (victorias recientes, rendimiento histórico)
-    """
-    if team1_name not in df['TEAM_NAME_x'].values or team2_name not in df['TEAM_NAME_x'].values:
-        return None
-    
-    team1_data = df[df['TEAM_NAME_x'] == team1_name].iloc[0]
-    team2_data = df[df['TEAM_NAME_x'] == team2_name].iloc[0]
-    
-    # Agrupar estadísticas por categorías con sus respectivos pesos
-    stat_categories = {
-        "Ofensiva": [
-            ('PTS', 'Puntos por partido', 1.0),
-            ('E_OFF_RATING', 'Rating Ofensivo', 1.2),
-            ('FG_PCT', 'Porcentaje tiros campo', 0.9),
-            ('FG3_PCT', 'Porcentaje triples', 0.8),
-            ('FT_PCT', 'Porcentaje tiros libres', 0.7),
-            ('AST', 'Asistencias', 0.8),
-            ('E_AST_RATIO', 'Ratio de asistencias', 0.7),
-            ('FGM', 'Canastas anotadas', 0.6),
-            ('FG3M', 'Triples anotados', 0.6)
-        ],
-        "Defensa": [
-            ('E_DEF_RATING', 'Rating Defensivo', 1.2),
-            ('STL', 'Robos', 0.8),
-            ('BLK', 'Tapones', 0.7),
-            ('BLKA', 'Tapones recibidos', 0.6),
-            ('PF', 'Faltas cometidas', 0.6)
-        ],
-        "Rebotes y Posesiones": [
-            ('REB', 'Rebotes totales', 0.9),
-            ('OREB', 'Rebotes ofensivos', 0.8),
-            ('DREB', 'Rebotes defensivos', 0.7),
-            ('E_OREB_PCT', 'Porcentaje rebotes ofensivos', 0.7),
-            ('E_DREB_PCT', 'Porcentaje rebotes defensivos', 0.7),
-            ('TOV', 'Pérdidas', 0.8),
-            ('E_TM_TOV_PCT', 'Porcentaje pérdidas', 0.7),
-            ('E_PACE', 'Ritmo de juego', 0.5)
-        ],
-        "Factores de victoria": [
-            ('W_PCT_x', 'Porcentaje victorias', 1.5),
-            ('E_NET_RATING', 'Rating Neto', 1.3),
-            ('PLUS_MINUS', 'Diferencial puntos', 1.0)
-        ]
-    }
-    
-    # Inicializar comparación y contadores de ventajas ponderadas
-    comparison = {}
-    advantage_points = {"team1": 0, "team2": 0}
-    total_weight = 0
-    
-    # Analizar cada categoría y estadística
-    for category, stats in stat_categories.items():
-        for key, name, weight in stats:
-            if key in team1_data and key in team2_data:
-                total_weight += weight
-                advantage = "team1"  # Por defecto
-                
-                # Estadísticas donde menor es mejor (invertir comparación)
-                if key in ['E_DEF_RATING', 'TOV', 'E_TM_TOV_PCT', 'BLKA', 'PF']:
-                    if team1_data[key] < team2_data[key]:
-                        advantage_points["team1"] += weight
-                        advantage = "team1"
-                    else:
-                        advantage_points["team2"] += weight
-                        advantage = "team2"
-                # Para todas las demás estadísticas, mayor es mejor
-                else:
-                    if team1_data[key] > team2_data[key]:
-                        advantage_points["team1"] += weight
-                        advantage = "team1"
-                    else:
-                        advantage_points["team2"] += weight
-                        advantage = "team2"
-                
-                # Guardar comparación para mostrar en la interfaz
-                comparison[key] = {
-                    "name": name,
-                    "category": category,
-                    "team1_value": team1_data[key],
-                    "team2_value": team2_data[key],
-                    "advantage": advantage,
-                    "weight": weight
-                }
-    
-    # Calcular probabilidades basadas en puntos ponderados
-    team1_win_prob = (advantage_points["team1"] / total_weight) * 100
-    team2_win_prob = (advantage_points["team2"] / total_weight) * 100
-    
-    # Factores de ajuste adicionales
     
-    # 1. Factor de momentum (ventaja al equipo con mejor racha reciente)
-    # Simulamos este factor con el porcentaje de victorias, ya que no tenemos datos de rachas
-    momentum_factor = 5  # Ajuste de hasta 5%
-    if team1_data['W_PCT_x'] > team2_data['W_PCT_x'] * 1.2:  # 20% mejor
-        team1_win_prob += momentum_factor
-        team2_win_prob -= momentum_factor
-    elif team2_data['W_PCT_x'] > team1_data['W_PCT_x'] * 1.2:
-        team1_win_prob -= momentum_factor
-        team2_win_prob += momentum_factor
+    Los pesos y ajustes están en matchup_engine.py, que calcula todos los
+    enfrentamientos de una vez por versión de los datos; aquí sólo se indexa
+    la matriz. team1 es siempre el equipo local.
     
-    # 2. Factor de estilo de juego (equipos de ritmo alto vs equipos de ritmo bajo)
-    pace_factor = 3  # Ajuste de hasta 3%
-    if team1_data['E_PACE'] > team2_data['E_PACE'] * 1.1:  # Equipo 1 juega a un ritmo 10% más alto
-        high_pace_team = "team1"
-        low_pace_team = "team2"
-    elif team2_data['E_PACE'] > team1_data['E_PACE'] * 1.1:
-        high_pace_team = "team2"
-        low_pace_team = "team1"
-    else:
-        high_pace_team = None
-        low_pace_team = None
-    
-    # Si hay diferencia significativa en ritmo, el equipo de ritmo alto tiene ventaja si es mejor ofensivamente
-    # El equipo de ritmo bajo tiene ventaja si es mejor defensivamente
-    if high_pace_team and low_pace_team:
-        if high_pace_team == "team1" and team1_data['E_OFF_RATING'] > team2_data['E_OFF_RATING']:
-            team1_win_prob += pace_factor
-            team2_win_prob -= pace_factor
-        elif high_pace_team == "team2" and team2_data['E_OFF_RATING'] > team1_data['E_OFF_RATING']:
-            team1_win_prob -= pace_factor
-            team2_win_prob += pace_factor
-        elif low_pace_team == "team1" and team1_data['E_DEF_RATING'] < team2_data['E_DEF_RATING']:
-            team1_win_prob += pace_factor
-            team2_win_prob -= pace_factor
-        elif low_pace_team == "team2" and team2_data['E_DEF_RATING'] < team1_data['E_DEF_RATING']:
-            team1_win_prob -= pace_factor
-            team2_win_prob += pace_factor
-    
-    # 3. Factor de eficiencia de tiro y defensa contra tiros
-    shooting_factor = 4  # Ajuste de hasta 4%
-    if team1_data['FG_PCT'] > team2_data['FG_PCT'] * 1.1 and team1_data['FG3_PCT'] > team2_data['FG3_PCT'] * 1.1:
-        team1_win_prob += shooting_factor
-        team2_win_prob -= shooting_factor
-    elif team2_data['FG_PCT'] > team1_data['FG_PCT'] * 1.1 and team2_data['FG3_PCT'] > team1_data['FG3_PCT'] * 1.1:
-        team1_win_prob -= shooting_factor
-        team2_win_prob += shooting_factor
-    
-    # 4. Factor de localía (Home-Court Advantage)
-    # En la NBA, históricamente, jugar en casa proporciona aproximadamente un 60% de probabilidad de victoria
-    # En nuestro modelo, team1 es siempre el equipo local
-    home_court_advantage = 6.0  # Ajuste de 6% por jugar en casa
-    team1_win_prob += home_court_advantage  # Beneficia al equipo local (team1)
-    team2_win_prob -= home_court_advantage  # Penaliza al equipo visitante (team2)
-    
-    # Si el equipo visitante tiene un porcentaje de victorias mucho mayor que el local,
-    # se reduce ligeramente el factor de localía
-    if team2_data['W_PCT_x'] > team1_data['W_PCT_x'] * 1.3:  # Visitante 30% mejor
-        neutralizing_factor = 2.0
-        team1_win_prob -= neutralizing_factor
-        team2_win_prob += neutralizing_factor
-    
-    # Asegurar que las probabilidades estén en el rango 0-100%
-    team1_win_prob = max(0, min(100, team1_win_prob))
-    team2_win_prob = max(0, min(100, team2_win_prob))
-    
-    # Asegurar que las probabilidades sumen exactamente 100%
-    total_prob = team1_win_prob + team2_win_prob
-    if total_prob > 0:  # Evitar división por cero
-        team1_win_prob = (team1_win_prob / total_prob) * 100
-        team2_win_prob = (team2_win_prob / total_prob) * 100
-    else:
-        # Si ambas probabilidades son 0, distribuir equitativamente
-        team1_win_prob = 50
-        team2_win_prob = 50
-    
-    # Calcular nivel de confianza basado en la diferencia de probabilidad
-    confidence_level = abs(team1_win_prob - team2_win_prob)
-    
-    # Definir estadísticas clave para mostrar en la interfaz
-    key_stats_for_display = ['PTS', 'AST', 'REB', 'E_OFF_RATING', 'E_DEF_RATING']
-    stat_display_names = ['Puntos', 'Asistencias', 'Rebotes', 'Rating Of.', 'Rating Def.']
-    
-    # Añadir los factores adicionales al diccionario de comparación
-    additional_factors = {
-        "Factores Adicionales": [
-            {
-                "key": "home_court",
-                "name": "Factor Localía",
-                "description": f"Ventaja del equipo local: +{home_court_advantage}%",
-                "impact": home_court_advantage,
-                "beneficiary": "team1"
-            },
-            {
-                "key": "momentum",
-                "name": "Momentum",
-                "description": "Ventaja por mejor racha reciente",
-                "impact": momentum_factor if team1_data['W_PCT_x'] > team2_data['W_PCT_x'] * 1.2 else 
-                         -momentum_factor if team2_data['W_PCT_x'] > team1_data['W_PCT_x'] * 1.2 else 0,
-                "beneficiary": "team1" if team1_data['W_PCT_x'] > team2_data['W_PCT_x'] * 1.2 else 
-                             "team2" if team2_data['W_PCT_x'] > team1_data['W_PCT_x'] * 1.2 else "neutral"
-            },
-            {
-                "key": "pace",
-                "name": "Estilo de Juego",
-                "description": "Ventaja por ritmo de juego",
-                "impact": pace_factor if high_pace_team and 
-                          ((high_pace_team == "team1" and team1_data['E_OFF_RATING'] > team2_data['E_OFF_RATING']) or
-                           (low_pace_team == "team1" and team1_data['E_DEF_RATING'] < team2_data['E_DEF_RATING'])) else
-                         -pace_factor if high_pace_team and 
-                          ((high_pace_team == "team2" and team2_data['E_OFF_RATING'] > team1_data['E_OFF_RATING']) or
-                           (low_pace_team == "team2" and team2_data['E_DEF_RATING'] < team1_data['E_DEF_RATING'])) else 0,
-                "beneficiary": "team1" if high_pace_team and 
-                               ((high_pace_team == "team1" and team1_data['E_OFF_RATING'] > team2_data['E_OFF_RATING']) or
-                                (low_pace_team == "team1" and team1_data['E_DEF_RATING'] < team2_data['E_DEF_RATING'])) else
-                              "team2" if high_pace_team and 
-                               ((high_pace_team == "team2" and team2_data['E_OFF_RATING'] > team1_data['E_OFF_RATING']) or
-                                (low_pace_team == "team2" and team2_data['E_DEF_RATING'] < team1_data['E_DEF_RATING'])) else "neutral"
-            },
-            {
-                "key": "shooting",
-                "name": "Eficiencia de Tiro",
-                "description": "Ventaja por mejor eficiencia en tiros",
-                "impact": shooting_factor if team1_data['FG_PCT'] > team2_data['FG_PCT'] * 1.1 and team1_data['FG3_PCT'] > team2_data['FG3_PCT'] * 1.1 else
-                         -shooting_factor if team2_data['FG_PCT'] > team1_data['FG_PCT'] * 1.1 and team2_data['FG3_PCT'] > team1_data['FG3_PCT'] * 1.1 else 0,
-                "beneficiary": "team1" if team1_data['FG_PCT'] > team2_data['FG_PCT'] * 1.1 and team1_data['FG3_PCT'] > team2_data['FG3_PCT'] * 1.1 else
-                              "team2" if team2_data['FG_PCT'] > team1_data['FG_PCT'] * 1.1 and team2_data['FG3_PCT'] > team1_data['FG3_PCT'] * 1.1 else "neutral"
-            }
-        ]
-    }
+    La probabilidad sale del modelo configurado en prediction_models.py (por
+    defecto, el de pesos mezclado con Elo cuando hay partidos suficientes).
+    """
+    registry = get_registry(df)
+    home = registry.row(team1_name)
+    away = registry.row(team2_name)
+    if home is None or away is None:
+        return None
     
-    return {
-        "comparison": comparison,
-        "win_probability": {
-            "team1": round(team1_win_prob, 1),
-            "team2": round(team2_win_prob, 1)
-        },
-        "prediction": team1_name if team1_win_prob > team2_win_prob else team2_name,
-        "confidence": confidence_level,  # Nivel de confianza basado en la diferencia
-        "key_stats_for_display": key_stats_for_display,
-        "stat_display_names": stat_display_names,
-        "stat_categories": stat_categories,  # Enviamos las categorías completas
-        "additional_factors": additional_factors  # Enviamos los factores adicionales
-    }
+    return get_prediction_model().analyze(registry, home, away)
 
 if __name__ == '__main__':
     main() 
\ No newline at end of file
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Carga del conjunto de datos combinado de estadísticas de equipos.
+
+El CSV se parsea una sola vez y se guarda junto a él una instantánea binaria
+columnar (un paquete de archivos .npy dentro de '<nombre>.snapshot/'). En los
+arranques siguientes el DataFrame se reconstruye desde la instantánea, mucho
+más rápido que parsear el CSV, y todos los consumidores del mismo proceso
+comparten un único DataFrame a través de get_team_stats().
+
+La instantánea acelera la carga, pero no ahorra memoria: pandas copia las
+columnas en sus propios bloques, así que cada proceso tiene su propia copia
+del DataFrame.
+"""
+
+import datetime
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from schema import canonicalize
+
+# Temporada activa (se puede cambiar con la variable de entorno NBA_SEASON)
+DEFAULT_SEASON = os.environ.get('NBA_SEASON', '2024-25')
+
+
+def season_file_suffix(season):
+    """Sufijo usado en los nombres de archivo: '2024-25' -> '2024_25'."""
+    return season.replace('-', '_')
+
+
+def season_display_name(season):
+    """Nombre largo de la temporada: '2024-25' -> '2024-2025'."""
+    start_year = int(season.split('-')[0])
+    return f"{start_year}-{start_year + 1}"
+
+
+def season_date_range(season):
+    """Fechas (inicio, fin) de una temporada: del 1 de octubre al 30 de junio."""
+    start_year = int(season.split('-')[0])
+    return datetime.date(start_year, 10, 1), datetime.date(start_year + 1, 6, 30)
+
+
+def season_csv_path(prefix, season=DEFAULT_SEASON):
+    """Ruta del CSV de una temporada: ('nba_team_stats', '2024-25') -> 'nba_team_stats_2024_25.csv'."""
+    return f"{prefix}_{season_file_suffix(season)}.csv"
+
+
+# Archivo de datos por defecto (generado por ingest.py, o por main.py y advanced_stats.py)
+DEFAULT_CSV_PATH = season_csv_path('nba_team_complete_stats')
+
+SNAPSHOT_SUFFIX = '.snapshot'
+SNAPSHOT_FORMAT_VERSION = 2
+
+# Bloques de la instantánea: cada tipo numérico se guarda como una matriz
+# (filas x columnas) en su propio .npy para poder mapearla en memoria
+_NUMERIC_BLOCKS = ('float64', 'float32', 'int64', 'int32', 'int16', 'int8', 'bool')
+
+# Instancias compartidas dentro del proceso, indexadas por ruta absoluta
+_shared_frames = {}
+_shared_lock = threading.Lock()
+
+
+def snapshot_path(csv_path):
+    """Devuelve la ruta del directorio de instantánea asociado a un CSV."""
+    base, _ = os.path.splitext(csv_path)
+    return base + SNAPSHOT_SUFFIX
+
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _block_for_dtype(dtype):
+    if isinstance(dtype, np.dtype) and dtype.name in _NUMERIC_BLOCKS:
+        return dtype.name
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'int64'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'float64'
+    return 'object'
+
+
+def _atomic_save(path, writer):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        writer(f)
+    os.replace(tmp_path, path)
+
+
+def write_snapshot(df, snapshot_dir, source_signature=None):
+    """
+    Guarda un DataFrame como instantánea columnar.
+
+    Args:
+        df: DataFrame a guardar
+        snapshot_dir: Directorio de destino
+        source_signature: Tamaño y mtime del CSV de origen (para invalidación)
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+
+    columns = []
+    blocks = {name: [] for name in _NUMERIC_BLOCKS + ('object',)}
+    for column in df.columns:
+        block = _block_for_dtype(df[column].dtype)
+        columns.append({
+            'name': column,
+            'block': block,
+            'index': len(blocks[block]),
+            'categorical': isinstance(df[column].dtype, pd.CategoricalDtype),
+        })
+        blocks[block].append(column)
+
+    for block in _NUMERIC_BLOCKS:
+        if not blocks[block]:
+            continue
+        matrix = np.ascontiguousarray(df[blocks[block]].to_numpy(dtype=block))
+        _atomic_save(os.path.join(snapshot_dir, f'{block}.npy'),
+                     lambda f, m=matrix: np.save(f, m, allow_pickle=False))
+
+    # Las columnas de texto (nombres de equipos) se guardan como JSON
+    object_values = {column: df[column].astype(object).where(df[column].notna(), None).tolist()
+                     for column in blocks['object']}
+    _atomic_save(os.path.join(snapshot_dir, 'object.json'),
+                 lambda f: f.write(json.dumps(object_values).encode('utf-8')))
+
+    # meta.json se escribe al final: marca la instantánea como completa
+    meta = {
+        'format': SNAPSHOT_FORMAT_VERSION,
+        'rows': len(df),
+        'columns': columns,
+        'source': source_signature,
+    }
+    _atomic_save(os.path.join(snapshot_dir, 'meta.json'),
+                 lambda f: f.write(json.dumps(meta).encode('utf-8')))
+
+
+def read_snapshot_meta(snapshot_dir):
+    """Lee los metadatos de una instantánea o devuelve None si no existe."""
+    meta_path = os.path.join(snapshot_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format') != SNAPSHOT_FORMAT_VERSION:
+        return None
+    return meta
+
+
+def load_snapshot_block(snapshot_dir, block):
+    """Abre con memory-map una de las matrices numéricas de la instantánea."""
+    return np.load(os.path.join(snapshot_dir, f'{block}.npy'), mmap_mode='r', allow_pickle=False)
+
+
+def read_snapshot(snapshot_dir, meta=None):
+    """
+    Reconstruye el DataFrame a partir de una instantánea.
+
+    Las matrices se abren con memory-map, pero pandas copia las columnas, así
+    que el DataFrame resultante ocupa memoria propia del proceso.
+
+    Args:
+        snapshot_dir: Directorio de la instantánea
+        meta: Metadatos ya leídos (opcional)
+
+    Returns:
+        DataFrame con las mismas columnas y tipos que el original
+    """
+    meta = meta or read_snapshot_meta(snapshot_dir)
+    if meta is None:
+        raise FileNotFoundError(f"Instantánea no válida: {snapshot_dir}")
+
+    needed = {column['block'] for column in meta['columns']}
+    matrices = {block: load_snapshot_block(snapshot_dir, block)
+                for block in _NUMERIC_BLOCKS if block in needed}
+    object_values = {}
+    if 'object' in needed:
+        with open(os.path.join(snapshot_dir, 'object.json'), 'r') as f:
+            object_values = json.load(f)
+
+    data = {}
+    for column in meta['columns']:
+        if column['block'] == 'object':
+            values = object_values[column['name']]
+            data[column['name']] = pd.Categorical(values) if column.get('categorical') else values
+        else:
+            data[column['name']] = matrices[column['block']][:, column['index']]
+    return pd.DataFrame(data, columns=[column['name'] for column in meta['columns']])
+
+
+def load_team_stats(csv_path=DEFAULT_CSV_PATH, use_snapshot=True):
+    """
+    Carga el conjunto de datos de equipos, usando la instantánea si está al día.
+
+    Si la instantánea no existe o es más antigua que el CSV, se parsea el CSV,
+    se convierte al esquema canónico (ver schema.py) y se regenera la
+    instantánea. Si el CSV no existe, devuelve un DataFrame vacío.
+
+    Args:
+        csv_path: Ruta del CSV de estadísticas completas
+        use_snapshot: Si es False, siempre se parsea el CSV
+
+    Returns:
+        DataFrame con las estadísticas de los equipos
+    """
+    if not os.path.exists(csv_path):
+        print(f"No se encontró el archivo {csv_path}. Ejecuta main.py y advanced_stats.py primero.")
+        return pd.DataFrame()
+
+    if not use_snapshot:
+        return canonicalize(pd.read_csv(csv_path))
+
+    signature = _source_signature(csv_path)
+    snapshot_dir = snapshot_path(csv_path)
+    meta = read_snapshot_meta(snapshot_dir)
+    if meta is not None and meta.get('source') == signature:
+        try:
+            return read_snapshot(snapshot_dir, meta)
+        except Exception as e:
+            print(f"Error leyendo instantánea {snapshot_dir}: {e}. Se usará el CSV.")
+
+    df = canonicalize(pd.read_csv(csv_path))
+    try:
+        write_snapshot(df, snapshot_dir, signature)
+    except OSError as e:
+        # El directorio puede ser de solo lectura en producción; no es fatal
+        print(f"No se pudo escribir la instantánea {snapshot_dir}: {e}")
+    return df
+
+
+def get_team_stats(csv_path=DEFAULT_CSV_PATH):
+    """
+    Devuelve el DataFrame compartido del proceso para el CSV indicado.
+
+    La primera llamada carga los datos (desde la instantánea si es posible);
+    las siguientes devuelven el mismo objeto. Los consumidores no deben
+    modificarlo en sitio.
+    """
+    key = os.path.abspath(csv_path)
+    with _shared_lock:
+        if key not in _shared_frames:
+            _shared_frames[key] = load_team_stats(csv_path)
+        return _shared_frames[key]
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Gestor de datos con recarga en caliente.
+
+El dashboard capturaba el DataFrame al importarse, así que para ver un CSV
+nuevo había que reiniciar la aplicación. DataManager vigila el archivo de
+datos y, cuando cambia, carga una instantánea nueva (DataFrame + registro de
+equipos + versión) y la intercambia de forma atómica.
+
+Cada callback lee manager.snapshot() una sola vez al empezar y trabaja con
+ese objeto: las peticiones en curso terminan con la instantánea antigua y las
+siguientes ven la nueva. Las instantáneas no se modifican nunca.
+
+La comprobación del archivo se hace al acceder (como mucho una vez cada
+poll_interval segundos) en lugar de con un hilo en segundo plano, de modo que
+funciona igual tras el fork de los workers de gunicorn. La matriz de equipos
+y las tablas derivadas se mapean desde shared_tables.py, así que todos los
+workers comparten una sola copia física.
+"""
+
+import os
+import threading
+import time
+
+from data_loader import DEFAULT_CSV_PATH, load_team_stats
+from data_versions import data_version
+from shared_tables import open_shared_tables
+from team_registry import get_registry
+
+DEFAULT_POLL_INTERVAL = 5.0  # segundos
+
+
+def snapshot_key(version, signature):
+    """Clave estable entre procesos para una versión de los datos."""
+    size, mtime_ns = signature or (0, 0)
+    return f"v{version}-{size}-{mtime_ns}"
+
+
+def _file_signature(path):
+    """(tamaño, mtime_ns) del archivo, o None si no existe."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class DataSnapshot:
+    """
+    Estado inmutable de los datos en un momento dado.
+
+    Attributes:
+        df: DataFrame canónico (no debe modificarse en sitio)
+        registry: TeamRegistry de df (sobre la matriz compartida si la hay)
+        tables: SharedTables de esta versión, o None
+        version: data_version del manifiesto del CSV (ver data_versions.py)
+        signature: (tamaño, mtime_ns) del CSV cargado
+        loaded_at: Marca de tiempo de la carga
+    """
+
+    __slots__ = ('df', 'registry', 'tables', 'version', 'signature', 'loaded_at')
+
+    def __init__(self, df, version=0, signature=None, tables=None):
+        registry = None
+        if not df.empty:
+            registry = get_registry(df, tables.registry if tables is not None else None)
+        object.__setattr__(self, 'df', df)
+        object.__setattr__(self, 'registry', registry)
+        object.__setattr__(self, 'tables', tables)
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'signature', signature)
+        object.__setattr__(self, 'loaded_at', time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DataSnapshot es inmutable")
+
+    @property
+    def cache_key(self):
+        """Clave estable entre procesos para cachés derivadas de estos datos."""
+        return snapshot_key(self.version, self.signature)
+
+
+class DataManager:
+    """
+    Fuente de datos de la aplicación con recarga automática del CSV.
+
+    Args:
+        csv_path: CSV de estadísticas completas
+        poll_interval: Segundos mínimos entre comprobaciones del archivo
+            (None desactiva la recarga automática; refresh() sigue funcionando)
+        share_tables: Si es True, la matriz de equipos y las tablas derivadas se
+            mapean desde archivos compartidos entre procesos
+    """
+
+    def __init__(self, csv_path=DEFAULT_CSV_PATH, poll_interval=DEFAULT_POLL_INTERVAL, share_tables=True):
+        self.csv_path = csv_path
+        self.poll_interval = poll_interval
+        self.share_tables = share_tables
+        self._reload_lock = threading.Lock()
+        self._listeners = []
+        self._next_check = 0.0
+        self._snapshot = self._load()
+
+    def _load(self):
+        signature = _file_signature(self.csv_path)
+        df = load_team_stats(self.csv_path)
+        version = data_version(self.csv_path)
+        tables = None
+        if self.share_tables and not df.empty:
+            tables = open_shared_tables(self.csv_path, df, snapshot_key(version, signature), version)
+        return DataSnapshot(df, version, signature, tables)
+
+    def snapshot(self):
+        """
+        Devuelve la instantánea actual, recargando antes si el CSV cambió.
+
+        Los llamadores deben guardar la instantánea devuelta y usarla durante
+        toda la petición.
+        """
+        if self.poll_interval is not None and time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._snapshot
+
+    def refresh(self, force=False):
+        """
+        Recarga los datos si el CSV cambió (o siempre, con force=True).
+
+        Si otro hilo ya está recargando, no espera: devuelve False y las
+        peticiones siguen usando la instantánea actual.
+
+        Returns:
+            True si se publicó una instantánea nueva
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self._next_check = time.monotonic() + (self.poll_interval or 0)
+            signature = _file_signature(self.csv_path)
+            current = self._snapshot
+            if signature is None or (signature == current.signature and not force):
+                return False
+
+            try:
+                new_snapshot = self._load()
+            except Exception as e:
+                print(f"Error recargando {self.csv_path}: {e}. Se mantienen los datos anteriores.")
+                return False
+            if new_snapshot.df.empty:
+                return False
+
+            # Publicación atómica: una sola asignación de referencia
+            self._snapshot = new_snapshot
+            print(f"Datos recargados de {self.csv_path} (versión {new_snapshot.version})")
+        finally:
+            self._reload_lock.release()
+
+        for listener in list(self._listeners):
+            try:
+                listener(current, new_snapshot)
+            except Exception as e:
+                print(f"Error notificando la recarga de datos: {e}")
+        return True
+
+    def add_listener(self, listener):
+        """Registra una función listener(anterior, nueva) que se llama tras cada recarga."""
+        self._listeners.append(listener)
+
+
+# Gestores compartidos dentro del proceso, indexados por ruta absoluta
+_shared_managers = {}
+_shared_lock = threading.Lock()
+
+
+def get_data_manager(csv_path=DEFAULT_CSV_PATH, poll_interval=DEFAULT_POLL_INTERVAL):
+    """Devuelve el gestor compartido del proceso para el CSV indicado."""
+    key = os.path.abspath(csv_path)
+    with _shared_lock:
+        if key not in _shared_managers:
+            _shared_managers[key] = DataManager(csv_path, poll_interval)
+        return _shared_managers[key]
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Versionado de los CSV de estadísticas por equipo.
+
+Cada CSV tiene junto a él un manifiesto ('<nombre>.versions.json') con:
+- data_version: contador monotónico que sube cada vez que cambia algún equipo
+- row_hashes: hash de la fila de cada TEAM_ID tal como se escribe en el CSV
+- team_versions: data_version en la que cambió por última vez cada equipo
+
+Con esto un refresco sólo reescribe los archivos cuyo contenido cambió, y las
+cachés derivadas (figuras, enfrentamientos, gráficos) pueden invalidar
+únicamente los equipos cuyos números se movieron.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+MANIFEST_SUFFIX = '.versions.json'
+
+
+def manifest_path(csv_path):
+    """Ruta del manifiesto de versiones de un CSV."""
+    base, _ = os.path.splitext(csv_path)
+    return base + MANIFEST_SUFFIX
+
+
+def row_hashes(df, key='TEAM_ID'):
+    """
+    Calcula un hash por fila usando la misma serialización que el CSV.
+
+    Returns:
+        Diccionario {TEAM_ID (str): hash}
+    """
+    lines = df.to_csv(index=False, header=False, lineterminator='\n').splitlines()
+    # La cabecera forma parte del hash: si cambian las columnas, cambian todos los equipos
+    header = ','.join(str(column) for column in df.columns)
+    return {
+        str(team_id): hashlib.sha1(f"{header}\n{line}".encode('utf-8')).hexdigest()
+        for team_id, line in zip(df[key], lines)
+    }
+
+
+def _empty_manifest():
+    return {'data_version': 0, 'row_hashes': {}, 'team_versions': {}}
+
+
+def read_manifest(csv_path, key='TEAM_ID'):
+    """
+    Lee el manifiesto de un CSV.
+
+    Si no existe pero el CSV sí, se construye uno en memoria a partir del CSV
+    actual (versión 0), para que el primer refresco sólo marque como cambiados
+    los equipos que realmente cambiaron.
+    """
+    path = manifest_path(csv_path)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Manifiesto de versiones ilegible {path}: {e}")
+
+    manifest = _empty_manifest()
+    if os.path.exists(csv_path):
+        hashes = row_hashes(pd.read_csv(csv_path), key)
+        manifest['row_hashes'] = hashes
+        manifest['team_versions'] = {team_id: 0 for team_id in hashes}
+    return manifest
+
+
+def write_manifest(csv_path, manifest):
+    """Guarda el manifiesto de forma atómica."""
+    path = manifest_path(csv_path)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def plan_refresh(df, csv_path, key='TEAM_ID', force=False):
+    """
+    Compara los datos nuevos con el manifiesto actual.
+
+    Args:
+        df: DataFrame recién descargado
+        csv_path: CSV que se actualizaría
+        key: Columna que identifica a cada equipo
+        force: Subir la versión aunque no haya cambiado ningún equipo (el CSV
+            se reescribe de todos modos, p. ej. en un refresco completo)
+
+    Returns:
+        Tupla (equipos_cambiados, manifiesto_nuevo). Si no cambió ningún equipo
+        (y no se fuerza) la lista está vacía y el manifiesto es el actual.
+    """
+    manifest = read_manifest(csv_path, key)
+    new_hashes = row_hashes(df, key)
+    old_hashes = manifest['row_hashes']
+
+    changed = sorted(
+        team_id for team_id in set(new_hashes) | set(old_hashes)
+        if new_hashes.get(team_id) != old_hashes.get(team_id)
+    )
+    if not changed and not force and os.path.exists(csv_path):
+        return [], manifest
+
+    version = manifest['data_version'] + 1
+    team_versions = {team_id: manifest['team_versions'].get(team_id, version) for team_id in new_hashes}
+    for team_id in changed:
+        if team_id in team_versions:
+            team_versions[team_id] = version
+
+    return changed, {
+        'data_version': version,
+        'row_hashes': new_hashes,
+        'team_versions': team_versions,
+    }
+
+
+def data_version(csv_path):
+    """Versión actual de los datos de un CSV (0 si nunca se versionó)."""
+    path = manifest_path(csv_path)
+    if not os.path.exists(path):
+        return 0
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get('data_version', 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def team_versions(csv_path):
+    """Versión en la que cambió por última vez cada equipo: {TEAM_ID (int): versión}."""
+    manifest = read_manifest(csv_path)
+    return {int(team_id): version for team_id, version in manifest['team_versions'].items()}
+
+
+def teams_changed_since(csv_path, version):
+    """TEAM_ID de los equipos que cambiaron después de la versión indicada."""
+    return sorted(team_id for team_id, team_version in team_versions(csv_path).items()
+                  if team_version > version)
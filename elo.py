@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ratings Elo de los equipos, actualizados con los resultados del calendario.
+
+Cada partido terminado del calendario (status 'Final' y marcador, tal como lo
+guarda get_schedule_data) actualiza sólo los ratings de sus dos equipos, en
+O(1). Sólo cuentan los partidos de temporada regular (también los de playoffs
+con ELO_INCLUDE_PLAYOFFS=1 o --playoffs) entre equipos conocidos: la
+pretemporada, el All-Star o los rivales de fuera de la NBA no se valoran. El estado (ratings, partidos jugados y partidos ya procesados) se
+guarda en cache/elo_ratings.json y cada actualización se añade al historial
+cache/elo_history.jsonl, así que actualizar después de cada jornada sólo
+procesa los partidos nuevos, sin repetir la temporada.
+
+La actualización sigue el Elo de FiveThirtyEight para la NBA: K=20, ventaja
+de localía de 100 puntos y un multiplicador por margen de victoria que
+atenúa las victorias esperadas por mucho.
+
+Con el modelo de predicción blend (ver prediction_models.py), la probabilidad
+por diferencia de ratings se mezcla en analyze_matchup con la del modelo de
+estadísticas (peso ELO_BLEND_WEIGHT) cuando ambos equipos tienen suficientes
+partidos valorados.
+
+Los resultados que lleguen tarde (de una fecha anterior a la última
+procesada) se aplican al recibirse; `python elo.py rebuild` vuelve a calcular
+todo en orden cronológico.
+
+Uso:
+    python elo.py update
+    python elo.py --playoffs update
+    python elo.py ratings
+    python elo.py history "Boston Celtics"
+    python elo.py predict "Boston Celtics" "Utah Jazz"
+    python elo.py rebuild cache/nba_schedule.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import threading
+
+from data_loader import DEFAULT_CSV_PATH, get_team_stats
+from schedule_utils import DEFAULT_SCHEDULE_PATH, game_key, is_final, is_playoff, is_regular_season, iter_schedule
+from team_registry import get_registry
+
+try:
+    import fcntl
+except ImportError:  # Windows: sólo se protege dentro del proceso
+    fcntl = None
+
+DEFAULT_STATE_PATH = os.path.join('cache', 'elo_ratings.json')
+DEFAULT_HISTORY_PATH = os.path.join('cache', 'elo_history.jsonl')
+INITIAL_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 100.0
+
+# Peso de la probabilidad Elo en el modelo blend por defecto (0 la desactiva)
+# y partidos mínimos de cada equipo para aplicarla
+ELO_BLEND_WEIGHT = float(os.environ.get('ELO_BLEND_WEIGHT', 0.3))
+MIN_GAMES_FOR_BLEND = 10
+
+# Valorar también los partidos de playoffs (además de la temporada regular)
+INCLUDE_PLAYOFFS = os.environ.get('ELO_INCLUDE_PLAYOFFS', '0') == '1'
+
+
+def expected_score(rating_difference):
+    """Probabilidad (0-1) de ganar con la diferencia de rating indicada."""
+    return 1.0 / (1.0 + 10 ** (-rating_difference / 400.0))
+
+
+def margin_multiplier(margin, winner_rating_difference):
+    """
+    Multiplicador por margen de victoria. Crece con el margen y se reduce
+    cuando el ganador ya era favorito, para no inflar a los favoritos.
+    """
+    return (abs(margin) + 3) ** 0.8 / (7.5 + 0.006 * winner_rating_difference)
+
+
+def _score(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class EloRatings:
+    """
+    Ratings Elo persistentes con actualización incremental.
+
+    Args:
+        state_path: JSON con ratings, partidos jugados y partidos procesados
+        history_path: JSONL con una línea por partido procesado
+        k_factor: Factor K de la actualización
+        home_advantage: Puntos Elo de ventaja del local
+        include_playoffs: Valorar también los partidos de playoffs
+    """
+
+    def __init__(self, state_path=DEFAULT_STATE_PATH, history_path=DEFAULT_HISTORY_PATH,
+                 k_factor=K_FACTOR, home_advantage=HOME_ADVANTAGE, include_playoffs=INCLUDE_PLAYOFFS):
+        self.state_path = state_path
+        self.history_path = history_path
+        self.k_factor = k_factor
+        self.home_advantage = home_advantage
+        self.include_playoffs = include_playoffs
+        self._lock = threading.Lock()
+        self._reset()
+        self._state_mtime = None
+        self._reload_if_changed()
+
+    def _reset(self):
+        self.ratings = {}
+        self.games_played = {}
+        self.processed = set()
+        self.last_date = ''
+
+    # ------------------------------------------------------------------
+    # Persistencia
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        """Excluye a otros procesos (p. ej. otros workers de gunicorn) durante una actualización."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        with open(f"{self.state_path}.lock", 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _reload_if_changed(self):
+        """Relee el estado si otro proceso lo ha modificado."""
+        try:
+            mtime_ns = os.stat(self.state_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns == self._state_mtime:
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error leyendo ratings Elo {self.state_path}: {e}")
+            return
+        self.ratings = state.get('ratings', {})
+        self.games_played = state.get('games_played', {})
+        self.processed = set(state.get('processed', []))
+        self.last_date = state.get('last_date', '')
+        self._state_mtime = mtime_ns
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        state = {
+            'k_factor': self.k_factor,
+            'home_advantage': self.home_advantage,
+            'last_date': self.last_date,
+            'ratings': self.ratings,
+            'games_played': self.games_played,
+            'processed': sorted(self.processed),
+        }
+        tmp_path = f"{self.state_path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+        self._state_mtime = os.stat(self.state_path).st_mtime_ns
+
+    def _append_history(self, records):
+        os.makedirs(os.path.dirname(self.history_path) or '.', exist_ok=True)
+        with open(self.history_path, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+
+    # ------------------------------------------------------------------
+    # Actualización
+
+    def _apply(self, game, key, home_score, away_score):
+        """Actualiza los ratings de los dos equipos de un partido (O(1))."""
+        home, away = game['homeTeam'], game['awayTeam']
+        home_before = self.rating(home)
+        away_before = self.rating(away)
+
+        difference = home_before + self.home_advantage - away_before
+        home_expected = expected_score(difference)
+        home_won = home_score > away_score
+        winner_difference = difference if home_won else -difference
+        change = (self.k_factor * margin_multiplier(home_score - away_score, winner_difference)
+                  * ((1.0 if home_won else 0.0) - home_expected))
+
+        self.ratings[home] = home_before + change
+        self.ratings[away] = away_before - change
+        self.games_played[home] = self.games_played.get(home, 0) + 1
+        self.games_played[away] = self.games_played.get(away, 0) + 1
+        self.processed.add(key)
+        self.last_date = max(self.last_date, game.get('gameDate', ''))
+
+        return {
+            'game_key': key,
+            'game_date': game.get('gameDate', ''),
+            'home_team': home,
+            'away_team': away,
+            'home_score': home_score,
+            'away_score': away_score,
+            'home_win_prob': round(home_expected * 100, 2),
+            'home_rating_before': round(home_before, 2),
+            'away_rating_before': round(away_before, 2),
+            'home_rating_after': round(self.ratings[home], 2),
+            'away_rating_after': round(self.ratings[away], 2),
+        }
+
+    def update(self, schedule, teams=None, verbose=True):
+        """
+        Procesa los partidos terminados del calendario que aún no se habían
+        procesado, en orden cronológico.
+
+        Args:
+            schedule: Iterable de partidos (game_id, gameDate, homeTeam,
+                awayTeam, status, homeScore, awayScore)
+            teams: Nombres de los equipos conocidos (p. ej. registry.names);
+                los partidos con otros equipos se ignoran. None no filtra.
+            verbose: Mostrar el resumen de la actualización
+
+        Returns:
+            Lista con el registro de historial de cada partido nuevo
+        """
+        with self._lock:
+            self._reload_if_changed()
+            pending = [entry[2] for entry in self._new_games(schedule, teams)]
+            if not pending:
+                return []
+            with self._file_lock():
+                # Otro proceso puede haberlos procesado mientras tanto
+                self._reload_if_changed()
+                records = self._process(pending)
+        if records and verbose:
+            print(f"Ratings Elo actualizados con {len(records)} partidos (hasta {self.last_date})")
+        return records
+
+    def _counts(self, game):
+        """True si el partido entra en los ratings (temporada regular u, opcionalmente, playoffs)."""
+        return is_regular_season(game) or (self.include_playoffs and is_playoff(game))
+
+    def _new_games(self, schedule, teams=None):
+        """Partidos terminados sin procesar: (fecha, clave, partido, puntos local, puntos visitante)."""
+        teams = set(teams) if teams is not None else None
+        new_games = []
+        for game in schedule:
+            if not is_final(game) or not self._counts(game):
+                continue
+            home, away = game.get('homeTeam'), game.get('awayTeam')
+            if not home or not away or (teams is not None and (home not in teams or away not in teams)):
+                continue
+            key = game_key(game)
+            if key in self.processed:
+                continue
+            home_score, away_score = _score(game.get('homeScore')), _score(game.get('awayScore'))
+            if home_score is None or away_score is None or home_score == away_score:
+                continue
+            new_games.append((game.get('gameDate', ''), key, game, home_score, away_score))
+        return new_games
+
+    def _process(self, schedule, teams=None):
+        """Aplica los partidos nuevos y guarda el estado (con los locks tomados)."""
+        new_games = self._new_games(schedule, teams)
+        if not new_games:
+            return []
+        new_games.sort(key=lambda entry: (entry[0], entry[1]))
+        records = []
+        for _, key, game, home_score, away_score in new_games:
+            # Un partido repetido en el calendario sólo cuenta una vez
+            if key not in self.processed:
+                records.append(self._apply(game, key, home_score, away_score))
+        self._append_history(records)
+        self._save()
+        return records
+
+    def rebuild(self, schedule, teams=None):
+        """Borra el estado y el historial y procesa de nuevo todo el calendario (ver update)."""
+        with self._lock, self._file_lock():
+            self._reset()
+            for path in (self.state_path, self.history_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._state_mtime = None
+            records = self._process(schedule, teams)
+        print(f"Ratings Elo recalculados con {len(records)} partidos")
+        return records
+
+    # ------------------------------------------------------------------
+    # Consultas
+
+    def refresh(self):
+        """Relee el estado si otro proceso lo ha actualizado."""
+        with self._lock:
+            self._reload_if_changed()
+
+    @property
+    def state_version(self):
+        """Identificador del estado cargado (cambia con cada actualización)."""
+        return self._state_mtime
+
+    def rating(self, team):
+        return self.ratings.get(team, INITIAL_RATING)
+
+    def home_win_probability(self, home, away):
+        """Probabilidad de victoria del local (0-100) por diferencia de ratings."""
+        return expected_score(self.rating(home) + self.home_advantage - self.rating(away)) * 100
+
+    def table(self):
+        """Lista de (equipo, rating, partidos) ordenada de mayor a menor rating."""
+        return sorted(((team, rating, self.games_played.get(team, 0)) for team, rating in self.ratings.items()),
+                      key=lambda entry: entry[1], reverse=True)
+
+    def history(self, team=None):
+        """Registros del historial, opcionalmente sólo los de un equipo."""
+        if not os.path.exists(self.history_path):
+            return []
+        records = []
+        with open(self.history_path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if team is None or team in (record['home_team'], record['away_team']):
+                    records.append(record)
+        return records
+
+
+# Instancias compartidas dentro del proceso, indexadas por archivo de estado
+_shared_ratings = {}
+_shared_lock = threading.Lock()
+
+
+def get_elo_ratings(state_path=DEFAULT_STATE_PATH, history_path=DEFAULT_HISTORY_PATH):
+    """Devuelve los ratings compartidos del proceso para el archivo indicado."""
+    key = os.path.abspath(state_path)
+    with _shared_lock:
+        if key not in _shared_ratings:
+            _shared_ratings[key] = EloRatings(state_path, history_path)
+        return _shared_ratings[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ratings Elo de los equipos NBA")
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help="Archivo de estado de los ratings")
+    parser.add_argument('--history', default=DEFAULT_HISTORY_PATH, help="Archivo de historial")
+    parser.add_argument('--stats', default=DEFAULT_CSV_PATH, help="CSV con los equipos conocidos")
+    parser.add_argument('--playoffs', action='store_true', default=INCLUDE_PLAYOFFS,
+                        help="Valorar también los partidos de playoffs")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    update_parser = subparsers.add_parser('update', help="Procesar los partidos terminados nuevos")
+    update_parser.add_argument('schedule', nargs='?', default=DEFAULT_SCHEDULE_PATH)
+
+    rebuild_parser = subparsers.add_parser('rebuild', help="Recalcular los ratings desde cero")
+    rebuild_parser.add_argument('schedule', nargs='?', default=DEFAULT_SCHEDULE_PATH)
+
+    subparsers.add_parser('ratings', help="Mostrar la clasificación Elo")
+
+    history_parser = subparsers.add_parser('history', help="Historial de un equipo")
+    history_parser.add_argument('team')
+
+    predict_parser = subparsers.add_parser('predict', help="Probabilidad Elo de un partido")
+    predict_parser.add_argument('home')
+    predict_parser.add_argument('away')
+
+    args = parser.parse_args()
+    ratings = EloRatings(args.state, args.history, include_playoffs=args.playoffs)
+
+    if args.command in ('update', 'rebuild'):
+        if not os.path.exists(args.schedule):
+            print(f"No se encontró el calendario {args.schedule}")
+            return
+        df = get_team_stats(args.stats)
+        teams = get_registry(df).names if not df.empty else None
+        schedule = iter_schedule(args.schedule)
+        records = (ratings.update(schedule, teams) if args.command == 'update'
+                   else ratings.rebuild(schedule, teams))
+        if not records:
+            print("No hay partidos terminados nuevos")
+    elif args.command == 'ratings':
+        for position, (team, rating, games) in enumerate(ratings.table(), 1):
+            print(f"{position:>2}. {team:<26} {rating:7.1f} ({games} partidos)")
+    elif args.command == 'history':
+        for record in ratings.history(args.team):
+            home = record['home_team'] == args.team
+            before = record['home_rating_before'] if home else record['away_rating_before']
+            after = record['home_rating_after'] if home else record['away_rating_after']
+            rival = record['away_team'] if home else record['home_team']
+            print(f"{record['game_date']} {'vs' if home else '@ '} {rival:<26} "
+                  f"{record['home_score']}-{record['away_score']}  {before:7.1f} -> {after:7.1f}")
+    elif args.command == 'predict':
+        probability = ratings.home_win_probability(args.home, args.away)
+        print(f"{args.home} ({ratings.rating(args.home):.1f}) vs {args.away} ({ratings.rating(args.away):.1f}): "
+              f"{probability:.1f}% local")
+
+
+if __name__ == '__main__':
+    main()
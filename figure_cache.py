@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Caché de figuras que sólo dependen de los datos.
+
+Los gráficos de la pestaña Vista General se reconstruían desde cero en cada
+cambio de pestaña de cada usuario (con 30 búsquedas de logos por gráfico),
+aunque su resultado sólo cambia cuando cambian los datos. Esta caché guarda
+cada figura serializada por (gráfico, versión de los datos):
+
+    <csv>.figures/<clave de versión>/<gráfico>-<huella>.json
+
+- En memoria dentro de cada proceso, y en disco para compartirla entre los
+  workers de gunicorn: el primero que construye una figura la publica con un
+  renombrado atómico y el resto la leen.
+- La huella incluye el código del gráfico, el de las funciones auxiliares
+  que se declaren como dependencias (p. ej. las que dan los logos) y la
+  versión de Plotly, así que un despliegue con gráficos modificados no sirve
+  figuras antiguas.
+- Se calienta al arrancar (con preload_app, en el master de gunicorn) y tras
+  cada recarga de datos, en segundo plano.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import threading
+
+import plotly
+import plotly.io as pio
+
+from shared_tables import KEEP_VERSIONS
+
+FIGURES_SUFFIX = '.figures'
+
+# Versiones de datos que se conservan en memoria dentro de cada proceso
+MEMORY_VERSIONS = 2
+
+
+def figures_root(csv_path):
+    """Directorio raíz de la caché de figuras de un CSV."""
+    base, _ = os.path.splitext(csv_path)
+    return base + FIGURES_SUFFIX
+
+
+def _source(function):
+    try:
+        return inspect.getsource(function)
+    except (OSError, TypeError):
+        return function.__code__.co_code.hex()
+
+
+def _fingerprint(builder, dependencies=()):
+    sources = [_source(function) for function in (builder, *dependencies)]
+    return hashlib.sha1("\n".join([plotly.__version__, *sources]).encode('utf-8')).hexdigest()[:12]
+
+
+class FigureCache:
+    """
+    Figuras serializadas por (gráfico, versión de los datos).
+
+    Args:
+        directory: Raíz de la caché en disco (None: sólo en memoria)
+        dependencies: Funciones auxiliares de los gráficos cuyo código forma
+            parte de la huella de todas las figuras
+    """
+
+    def __init__(self, directory=None, dependencies=()):
+        self.directory = directory
+        self.dependencies = tuple(dependencies)
+        self._builders = {}
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._build_locks = {}
+
+    def register(self, chart_id, builder):
+        """Registra la función builder(df) -> figura de un gráfico."""
+        self._builders[chart_id] = (builder, _fingerprint(builder, self.dependencies))
+        self._build_locks[chart_id] = threading.Lock()
+
+    def chart(self, chart_id, snapshot_fn):
+        """
+        Decorador: registra la función decorada (que recibe el DataFrame) y
+        la sustituye por una que devuelve la figura cacheada de la instantánea
+        actual, ignorando sus argumentos (sirve como callback de Dash o para
+        incluir la figura ya construida en un layout).
+
+        Args:
+            chart_id: Identificador del gráfico
+            snapshot_fn: Función sin argumentos que devuelve la DataSnapshot actual
+        """
+        def decorator(builder):
+            self.register(chart_id, builder)
+
+            def callback(*_):
+                return self.get(chart_id, snapshot_fn())
+            callback.__name__ = builder.__name__
+            return callback
+        return decorator
+
+    def _path(self, chart_id, key):
+        _, fingerprint = self._builders[chart_id]
+        return os.path.join(self.directory, key, f"{chart_id}-{fingerprint}.json")
+
+    def _remember(self, key, chart_id, figure):
+        with self._lock:
+            self._memory.setdefault(key, {})[chart_id] = figure
+            # Sólo se conservan las versiones más recientes
+            while len(self._memory) > MEMORY_VERSIONS:
+                del self._memory[next(iter(self._memory))]
+
+    def _read(self, chart_id, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(chart_id, key), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, chart_id, key, figure_json):
+        if self.directory is None:
+            return
+        path = self._path(chart_id, key)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        try:
+            new_version = not os.path.isdir(os.path.dirname(path))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                f.write(figure_json)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"No se pudo guardar la figura {chart_id} en caché: {e}")
+            return
+        if new_version:
+            self._prune(key)
+
+    def _prune(self, current):
+        try:
+            entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory)]
+        except OSError:
+            return
+        versions = sorted((path for path in entries if os.path.isdir(path)), key=os.path.getmtime, reverse=True)
+        for path in versions[KEEP_VERSIONS:]:
+            if os.path.basename(path) != current:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def get(self, chart_id, snapshot):
+        """
+        Figura (dict JSON de Plotly) de un gráfico para una instantánea de los
+        datos: de memoria, de disco o construyéndola.
+        """
+        key = snapshot.cache_key
+        figure = self._memory.get(key, {}).get(chart_id)
+        if figure is not None:
+            return figure
+
+        # Un solo hilo construye cada gráfico; el resto espera y lo reutiliza
+        with self._build_locks[chart_id]:
+            figure = self._memory.get(key, {}).get(chart_id)
+            if figure is not None:
+                return figure
+            figure = self._read(chart_id, key)
+            if figure is None:
+                builder, _ = self._builders[chart_id]
+                figure_json = pio.to_json(builder(snapshot.df), validate=False)
+                self._write(chart_id, key, figure_json)
+                figure = json.loads(figure_json)
+            self._remember(key, chart_id, figure)
+        return figure
+
+    def invalidate(self, snapshot):
+        """
+        Descarta las figuras de una instantánea (en memoria y en disco) para
+        que se vuelvan a construir, p. ej. cuando cambian los logos.
+        """
+        key = snapshot.cache_key
+        with self._lock:
+            self._memory.pop(key, None)
+        if self.directory is None:
+            return
+        for chart_id in list(self._builders):
+            try:
+                os.remove(self._path(chart_id, key))
+            except OSError:
+                pass
+
+    def warm(self, snapshot):
+        """Construye (o carga) todas las figuras registradas de una instantánea."""
+        for chart_id in list(self._builders):
+            try:
+                self.get(chart_id, snapshot)
+            except Exception as e:
+                print(f"Error calentando la figura {chart_id}: {e}")
+
+    def warm_in_background(self, snapshot):
+        thread = threading.Thread(target=self.warm, args=(snapshot,), name='figure-cache-warm', daemon=True)
+        thread.start()
+        return thread
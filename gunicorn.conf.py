@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+
+"""
+Configuración de gunicorn para el despliegue (ver Procfile).
+
+Con preload_app el master importa application.py una sola vez antes de crear
+los workers: los datos se cargan y las tablas compartidas (shared_tables.py)
+se construyen en el master, y los workers heredan los mapeos de memoria en
+lugar de cargar cada uno su propia copia.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '3'))
+preload_app = True
+
+
+def when_ready(server):
+    from data_manager import get_data_manager
+    snapshot = get_data_manager().snapshot()
+    shared = snapshot.tables.directory if snapshot.tables is not None else "sin tablas compartidas"
+    server.log.info(f"Datos precargados (versión {snapshot.cache_key}): {shared}")
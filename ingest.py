@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ingesta de estadísticas de equipos en una sola pasada.
+
+Descarga en paralelo las estadísticas básicas (LeagueDashTeamStats) y las
+métricas avanzadas (TeamEstimatedMetrics), las combina en memoria por TEAM_ID
+y escribe los tres CSV de forma atómica.
+
+El acceso HTTP se hace a través de un "transporte" intercambiable: por defecto
+se usa el cliente de nba_client.py contra stats.nba.com (con caché, límite de
+peticiones y reintentos), pero se puede apuntar a un servidor local que sirva
+respuestas grabadas (por ejemplo `python -m http.server` sobre un directorio
+generado con --record-dir).
+
+Uso:
+    python ingest.py
+    python ingest.py --record-dir respuestas/
+    python ingest.py --base-url http://127.0.0.1:8000
+    python ingest.py --incremental
+"""
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from nba_api.stats.endpoints import leaguedashteamstats, teamestimatedmetrics
+from nba_api.stats.library.http import NBAStatsHTTP, NBAStatsResponse
+
+from data_loader import DEFAULT_SEASON, season_csv_path
+from data_versions import data_version, plan_refresh, write_manifest
+from nba_client import DEFAULT_CACHE_DIR, DEFAULT_CACHE_TTL, NBAStatsClient, get_client
+from schema import canonicalize
+
+SEASON_TYPE = "Regular Season"
+
+# Prefijos de los CSV generados (se completan con la temporada)
+BASIC_STATS_PREFIX = 'nba_team_stats'
+ADVANCED_METRICS_PREFIX = 'nba_team_advanced_metrics'
+COMPLETE_STATS_PREFIX = 'nba_team_complete_stats'
+
+
+class NBAApiTransport:
+    """Transporte directo con el cliente HTTP de nba_api, sin caché ni reintentos."""
+
+    def send(self, endpoint, parameters, timeout=30):
+        response = NBAStatsHTTP().send_api_request(
+            endpoint=endpoint,
+            parameters=parameters,
+            timeout=timeout,
+        )
+        return response.get_response()
+
+
+class HTTPTransport:
+    """
+    Transporte contra una URL base arbitraria.
+
+    Cada endpoint se pide como GET {base_url}/{endpoint}?{parámetros}, lo que
+    permite usar un servidor local con respuestas grabadas en lugar de la API.
+    """
+
+    def __init__(self, base_url, session=None):
+        self.base_url = base_url.rstrip('/')
+        self.session = session or requests.Session()
+
+    def send(self, endpoint, parameters, timeout=30):
+        response = self.session.get(f"{self.base_url}/{endpoint}", params=parameters, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+
+class RecordingTransport:
+    """Envuelve otro transporte y guarda cada respuesta en '<directorio>/<endpoint>'."""
+
+    def __init__(self, inner, directory):
+        self.inner = inner
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def send(self, endpoint, parameters, timeout=30):
+        text = self.inner.send(endpoint, parameters, timeout)
+        with open(os.path.join(self.directory, endpoint), 'w', encoding='utf-8') as f:
+            f.write(text)
+        return text
+
+
+def fetch_endpoint(endpoint_cls, transport, **kwargs):
+    """
+    Ejecuta un endpoint de nba_api a través del transporte indicado.
+
+    Args:
+        endpoint_cls: Clase de endpoint de nba_api
+        transport: Objeto con método send(endpoint, parameters, timeout)
+        **kwargs: Parámetros del endpoint
+
+    Returns:
+        Primer DataFrame devuelto por el endpoint
+    """
+    endpoint = endpoint_cls(get_request=False, **kwargs)
+    text = transport.send(endpoint.endpoint, endpoint.parameters, endpoint.timeout)
+    endpoint.nba_response = NBAStatsResponse(response=text, status_code=200, url=None)
+    endpoint.load_response()
+    return endpoint.get_data_frames()[0]
+
+
+def fetch_basic_stats(transport, season=DEFAULT_SEASON, season_type=SEASON_TYPE):
+    """Estadísticas básicas por partido de todos los equipos."""
+    return fetch_endpoint(
+        leaguedashteamstats.LeagueDashTeamStats,
+        transport,
+        season=season,
+        season_type_all_star=season_type,
+        per_mode_detailed="PerGame",
+        measure_type_detailed_defense="Base",
+        plus_minus="N",
+        pace_adjust="N",
+        rank="N",
+        shot_clock_range_nullable="",
+        period=0,
+        last_n_games=0,
+        month=0
+    )
+
+
+def fetch_advanced_metrics(transport, season=DEFAULT_SEASON, season_type=SEASON_TYPE):
+    """Métricas avanzadas estimadas de todos los equipos."""
+    return fetch_endpoint(
+        teamestimatedmetrics.TeamEstimatedMetrics,
+        transport,
+        season=season,
+        season_type=season_type,
+        league_id="00"  # NBA
+    )
+
+
+def merge_team_stats(basic_stats, metrics):
+    """Une estadísticas básicas y avanzadas por TEAM_ID, en el esquema canónico (schema.py)."""
+    return canonicalize(pd.merge(basic_stats, metrics, on="TEAM_ID", how="inner"))
+
+
+def write_csvs_atomically(frames):
+    """
+    Escribe varios DataFrames como CSV sin dejar archivos a medio escribir.
+
+    Primero se escriben todos los temporales; sólo si todos se escriben bien
+    se renombran sobre los archivos definitivos.
+
+    Args:
+        frames: Diccionario {ruta: DataFrame}
+    """
+    temp_paths = {}
+    try:
+        for path, frame in frames.items():
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            frame.to_csv(tmp_path, index=False)
+            temp_paths[path] = tmp_path
+    except Exception:
+        for tmp_path in temp_paths.values():
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+
+    for path, tmp_path in temp_paths.items():
+        os.replace(tmp_path, path)
+
+
+def fetch_season(transport, season=DEFAULT_SEASON, season_type=SEASON_TYPE):
+    """
+    Descarga en paralelo las estadísticas básicas y avanzadas de una temporada.
+
+    Returns:
+        Diccionario con los DataFrames 'basic', 'advanced' y 'complete'
+    """
+    # Las dos peticiones son independientes: se lanzan en paralelo
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        basic_future = executor.submit(fetch_basic_stats, transport, season, season_type)
+        metrics_future = executor.submit(fetch_advanced_metrics, transport, season, season_type)
+        basic_stats = basic_future.result()
+        metrics = metrics_future.result()
+
+    return {
+        'basic': basic_stats,
+        'advanced': metrics,
+        'complete': merge_team_stats(basic_stats, metrics),
+    }
+
+
+def run_ingestion(transport=None, season=DEFAULT_SEASON, output_dir='.', warehouse=None, incremental=False):
+    """
+    Descarga, combina y guarda las estadísticas de todos los equipos.
+
+    Args:
+        transport: Transporte HTTP (por defecto el cliente compartido de nba_client)
+        season: Temporada en formato "2024-25"
+        output_dir: Directorio donde se escriben los CSV
+        warehouse: StatsWarehouse donde añadir también la temporada (opcional)
+        incremental: Si es True, sólo se reescriben los CSV en los que cambió
+            algún equipo (y sólo entonces se sube su versión de datos). Si es
+            False se reescriben todos, también con un manifiesto nuevo
+
+    Returns:
+        Diccionario con los DataFrames 'basic', 'advanced' y 'complete', y en
+        'changed' los TEAM_ID cambiados por archivo (sólo en modo incremental)
+    """
+    transport = transport or get_client()
+    frames = fetch_season(transport, season)
+
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = {
+        os.path.join(output_dir, season_csv_path(BASIC_STATS_PREFIX, season)): frames['basic'],
+        os.path.join(output_dir, season_csv_path(ADVANCED_METRICS_PREFIX, season)): frames['advanced'],
+        os.path.join(output_dir, season_csv_path(COMPLETE_STATS_PREFIX, season)): frames['complete'],
+    }
+
+    # Comparar fila a fila (por TEAM_ID) con lo que ya hay en disco. Un
+    # refresco completo reescribe todos los CSV y sube siempre su versión,
+    # para que el manifiesto nunca quede desfasado respecto al CSV.
+    plans = {path: plan_refresh(frame, path, force=not incremental) for path, frame in outputs.items()}
+    rewritten = [path for path, (changed, _) in plans.items() if not incremental or changed]
+    write_csvs_atomically({path: outputs[path] for path in rewritten})
+    # Los manifiestos se escriben después de los CSV: si algo falla antes,
+    # el siguiente refresco vuelve a detectar los mismos cambios
+    for path in rewritten:
+        write_manifest(path, plans[path][1])
+    if incremental:
+        frames['changed'] = {path: changed for path, (changed, _) in plans.items()}
+
+    # En modo incremental el almacén sólo se reescribe si cambió algún CSV
+    # (o si todavía no tiene la temporada)
+    if warehouse is not None and (rewritten or not warehouse.has_season(season, SEASON_TYPE)):
+        warehouse.append(frames['complete'], season, SEASON_TYPE, replace=True)
+
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Descarga y combina las estadísticas de equipos NBA")
+    parser.add_argument('--season', default=DEFAULT_SEASON, help="Temporada (por ejemplo 2024-25)")
+    parser.add_argument('--output-dir', default='.', help="Directorio de salida de los CSV")
+    parser.add_argument('--base-url', help="URL base alternativa (servidor local con respuestas grabadas)")
+    parser.add_argument('--record-dir', help="Guardar las respuestas crudas en este directorio")
+    parser.add_argument('--warehouse', help="Añadir también la temporada al almacén multi-temporada de este directorio")
+    parser.add_argument('--no-cache', action='store_true', help="No usar la caché de respuestas de la API")
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_CACHE_TTL,
+                        help="Segundos de validez de las respuestas cacheadas")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Reescribir sólo los archivos con equipos cambiados y actualizar la versión de datos")
+    args = parser.parse_args()
+
+    if args.base_url:
+        transport = HTTPTransport(args.base_url)
+    else:
+        transport = NBAStatsClient(cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR, cache_ttl=args.cache_ttl)
+    if args.record_dir:
+        transport = RecordingTransport(transport, args.record_dir)
+
+    warehouse = None
+    if args.warehouse:
+        from warehouse import StatsWarehouse
+        warehouse = StatsWarehouse(args.warehouse)
+
+    frames = run_ingestion(transport, season=args.season, output_dir=args.output_dir,
+                           warehouse=warehouse, incremental=args.incremental)
+
+    print(f"Equipos con estadísticas básicas: {len(frames['basic'])}")
+    print(f"Equipos con métricas avanzadas: {len(frames['advanced'])}")
+    print(f"Estadísticas completas guardadas en '{season_csv_path(COMPLETE_STATS_PREFIX, args.season)}' "
+          f"({frames['complete'].shape[1]} columnas)")
+
+    if args.incremental:
+        for path, changed in frames['changed'].items():
+            if changed:
+                print(f"{path}: {len(changed)} equipos cambiados (versión de datos {data_version(path)})")
+            else:
+                print(f"{path}: sin cambios, no se reescribe")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Estadísticas de referencia de la liga para normalizar gráficos.
+
+Los radares y las barras del dashboard normalizaban cada valor con el máximo
+y el mínimo de la liga, recorriendo la columna del DataFrame en cada
+callback (y, en el calendario, para cada estadística de cada partido). Este
+módulo calcula una sola vez por versión de los datos el mínimo, máximo,
+media, desviación típica y percentiles de todas las columnas numéricas del
+registro de equipos, y ofrece las normalizaciones que usan los gráficos.
+
+Las referencias se guardan como tabla compartida (shared_tables.py), así
+que los workers de gunicorn las mapean en lugar de calcularlas cada uno.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+
+from schema import is_lower_better
+from shared_tables import register_table, shared_table
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+
+def norms_table(registry):
+    """
+    Referencias de la liga apiladas en una tabla: mínimo, máximo, media,
+    desviación, una fila por percentil y los valores ordenados de cada columna.
+    """
+    matrix = registry.matrix
+    return np.vstack([matrix.min(axis=0), matrix.max(axis=0), matrix.mean(axis=0), matrix.std(axis=0),
+                      np.percentile(matrix, PERCENTILES, axis=0), np.sort(matrix, axis=0)])
+
+
+class LeagueNorms:
+    """
+    Referencias de la liga por columna numérica de un registro.
+
+    Attributes:
+        minimum, maximum, mean, std: Arrays con un valor por columna (en el
+            orden de registry.columns)
+        percentiles: Matriz (len(PERCENTILES) x columnas)
+        sorted_values: Matriz (equipos x columnas) con cada columna ordenada
+
+    Args:
+        registry: TeamRegistry
+        table: Referencias ya calculadas (ver norms_table); si no tiene la
+            forma esperada, se calculan de nuevo
+    """
+
+    def __init__(self, registry, table=None):
+        self.registry = registry
+        rows = 4 + len(PERCENTILES)
+        if table is None or table.shape != (rows + len(registry), len(registry.columns)):
+            table = norms_table(registry)
+        # Vistas de una única tabla (mapeada en memoria si es compartida)
+        self.minimum, self.maximum, self.mean, self.std = table[0], table[1], table[2], table[3]
+        self.percentiles = table[4:rows]
+        self.sorted_values = table[rows:]
+
+    def _indices(self, columns):
+        return self.registry.column_indices(columns)
+
+    def min(self, column):
+        return float(self.minimum[self.registry.column_index[column]])
+
+    def max(self, column):
+        return float(self.maximum[self.registry.column_index[column]])
+
+    def average(self, column):
+        return float(self.mean[self.registry.column_index[column]])
+
+    def percentile(self, column, q):
+        """Percentil q (uno de PERCENTILES) de una columna."""
+        return float(self.percentiles[PERCENTILES.index(q), self.registry.column_index[column]])
+
+    def percentile_rank(self, column, value):
+        """Porcentaje de equipos con un valor menor o igual que `value`."""
+        values = self.sorted_values[:, self.registry.column_index[column]]
+        return float(np.searchsorted(values, value, side='right') / len(values) * 100)
+
+    def scale_to_max(self, columns, values):
+        """Valores como porcentaje del máximo de la liga en cada columna."""
+        return np.asarray(values, dtype=np.float64) / self.maximum[self._indices(columns)] * 100
+
+    def min_max(self, columns, values, invert_lower_better=True):
+        """
+        Valores en la escala 0-100 entre el mínimo y el máximo de la liga.
+
+        Args:
+            columns: Lista de columnas
+            values: Valores (array del mismo largo que columns, o matriz
+                filas x columnas)
+            invert_lower_better: Invertir las estadísticas donde menor es
+                mejor, para que un valor mayor siempre sea mejor en el gráfico
+
+        Returns:
+            Array con la forma de values; 50 si la columna no tiene rango
+        """
+        indices = self._indices(columns)
+        minimum = self.minimum[indices]
+        maximum = self.maximum[indices]
+        spread = maximum - minimum
+        values = np.asarray(values, dtype=np.float64)
+        invert = np.array([invert_lower_better and is_lower_better(column) for column in columns])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scaled = np.where(invert, maximum - values, values - minimum) / spread * 100
+        return np.where(spread > 0, scaled, 50.0)
+
+
+# Referencias calculadas, una por registro vivo (es decir, por versión de los datos)
+_norms = weakref.WeakKeyDictionary()
+_norms_lock = threading.Lock()
+
+
+def get_league_norms(registry):
+    """Devuelve las referencias de la liga del registro, calculándolas la primera vez."""
+    with _norms_lock:
+        norms = _norms.get(registry)
+        if norms is None:
+            norms = LeagueNorms(registry, shared_table(registry, 'league_norms'))
+            _norms[registry] = norms
+        return norms
+
+
+register_table('league_norms', norms_table)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Logos de los equipos como recursos estáticos cacheables.
+
+Los logos se incrustaban como URIs data:image/svg+xml en base64 en cada
+figura y cada html.Img, así que cada respuesta de un callback volvía a
+enviarlos. Este módulo los sirve desde el servidor Flask de Dash con URLs que
+incluyen un hash del contenido:
+
+    /logos/<ABBR>.<hash>.svg
+
+- Una URL con el hash actual no cambia nunca de contenido: se sirve con
+  caché de larga duración (immutable) y el navegador la pide una sola vez.
+- Si el logo cambia en disco cambia su hash, y por tanto su URL. Las URLs
+  antiguas (p. ej. en figuras cacheadas) y /logos/<ABBR>.svg siguen
+  funcionando con el contenido actual, pero se revalidan con ETag.
+- Si falta el archivo, la ruta intenta volver a descargarlo (función fetch de
+  register) antes de responder 404.
+"""
+
+import hashlib
+import os
+import re
+import threading
+
+import flask
+
+LOGOS_DIR = 'logos'
+LOGO_ROUTE = '/logos'
+
+# Un año: el máximo habitual para recursos con hash en la URL
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_ABBR_PATTERN = re.compile(r'^[A-Z]{2,4}$')
+
+
+class LogoAssets:
+    """
+    Logos SVG de un directorio, con URLs por contenido.
+
+    Args:
+        directory: Directorio con los ficheros <ABBR>.svg
+        route: Prefijo de las URLs
+    """
+
+    def __init__(self, directory=LOGOS_DIR, route=LOGO_ROUTE):
+        self.directory = directory
+        self.route = route
+        self.fetch = None
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def path(self, abbr):
+        return os.path.abspath(os.path.join(self.directory, f"{abbr}.svg"))
+
+    def digest(self, abbr):
+        """
+        Hash del contenido actual del logo (None si no existe o está vacío).
+        Se recalcula sólo cuando cambian la fecha o el tamaño del fichero.
+        """
+        path = self.path(abbr)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size == 0:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._digests.get(abbr)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        try:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()[:12]
+        except OSError:
+            return None
+        with self._lock:
+            self._digests[abbr] = (signature, digest)
+        return digest
+
+    def url(self, abbr):
+        """URL del logo con el hash de su contenido (None si no hay logo)."""
+        digest = self.digest(abbr)
+        if digest is None:
+            return None
+        return f"{self.route}/{abbr}.{digest}.svg"
+
+    def serve(self, abbr, digest=None):
+        """
+        Respuesta Flask con el logo. Responde 304 si el navegador ya tiene la
+        versión actual (If-None-Match).
+        """
+        if not _ABBR_PATTERN.match(abbr):
+            flask.abort(404)
+        current = self.digest(abbr)
+        if current is None and self.fetch is not None and self.fetch(abbr):
+            current = self.digest(abbr)
+        if current is None:
+            flask.abort(404)
+        if digest == current:
+            response = flask.send_file(self.path(abbr), mimetype='image/svg+xml', etag=current,
+                                       conditional=True, max_age=IMMUTABLE_MAX_AGE)
+            response.cache_control.immutable = True
+        else:
+            response = flask.send_file(self.path(abbr), mimetype='image/svg+xml', etag=current,
+                                       conditional=True, max_age=0)
+            response.cache_control.no_cache = True
+        return response
+
+    def register(self, server, fetch=None):
+        """
+        Añade las rutas de los logos al servidor Flask.
+
+        Args:
+            server: Servidor Flask
+            fetch: Función fetch(abbr) -> bool que descarga un logo que falta
+                en disco (opcional)
+        """
+        self.fetch = fetch
+        server.add_url_rule(f"{self.route}/<abbr>.<digest>.svg", 'team_logo_hashed', self.serve)
+        server.add_url_rule(f"{self.route}/<abbr>.svg", 'team_logo', self.serve)
+
+
+# Instancia compartida por el dashboard
+_logo_assets = None
+_logo_assets_lock = threading.Lock()
+
+
+def get_logo_assets():
+    """Devuelve la instancia compartida de LogoAssets, creándola la primera vez."""
+    global _logo_assets
+    with _logo_assets_lock:
+        if _logo_assets is None:
+            _logo_assets = LogoAssets()
+        return _logo_assets
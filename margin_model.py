@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Modelo de diferencia de puntos y total esperado de cada partido.
+
+Complementa a la probabilidad de victoria de analyze_matchup con el marcador
+esperado:
+
+- posesiones: ritmo de los dos equipos (E_PACE) relativo al de la liga
+  (pace_local * pace_visitante / pace_liga)
+- puntos por posesión: rating ofensivo del equipo frente al defensivo del
+  rival, relativo al rating medio de la liga
+- localía: HOME_COURT_POINTS puntos de diferencia a favor del local
+
+La diferencia real se modela como una normal centrada en la esperada con
+desviación MARGIN_STD, de donde salen la probabilidad de victoria y la
+distribución de la diferencia por tramos.
+
+Todo se calcula de una vez para los 30x30 enfrentamientos (local x
+visitante) de cada versión de los datos; predecir una jornada o la
+temporada completa es sólo indexar esas matrices.
+
+Uso:
+    python margin_model.py --date 2025-01-15
+    python margin_model.py --output season_margins.csv
+"""
+
+import argparse
+import math
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.special import ndtr
+except ImportError:  # scipy es opcional: sin él se usa la aproximación de NumPy
+    ndtr = None
+
+from schedule_utils import DEFAULT_SCHEDULE_PATH, iter_schedule
+
+HOME_COURT_POINTS = 2.5
+MARGIN_STD = 12.0
+
+# Límites de los tramos de la distribución de la diferencia (local - visitante)
+MARGIN_EDGES = [-15, -10, -5, 0, 5, 10, 15]
+
+
+def _edge_labels(edges):
+    labels = [f"<{edges[0]}"]
+    labels += [f"{low}..{high}" for low, high in zip(edges[:-1], edges[1:])]
+    labels.append(f">{edges[-1]}")
+    return labels
+
+
+MARGIN_BUCKETS = _edge_labels(MARGIN_EDGES)
+
+# Coeficientes de Chebyshev de erfc (Numerical Recipes, 3.ª ed., 6.2.2): la
+# distribución normal difiere de la calculada con math.erf en menos de 1e-15
+_ERFC_COEFFICIENTS = [
+    -1.3026537197817094, 6.4196979235649026e-1, 1.9476473204185836e-2, -9.561514786808631e-3,
+    -9.46595344482036e-4, 3.66839497852761e-4, 4.2523324806907e-5, -2.0278578112534e-5,
+    -1.624290004647e-6, 1.303655835580e-6, 1.5626441722e-8, -8.5238095915e-8,
+    6.529054439e-9, 5.059343495e-9, -9.91364156e-10, -2.27365122e-10,
+    9.6467911e-11, 2.394038e-12, -6.886027e-12, 8.94487e-13,
+    3.13092e-13, -1.12708e-13, 3.81e-16, 7.106e-15,
+    -1.523e-15, -9.4e-17, 1.21e-16, -2.8e-17,
+]
+
+
+def _erfc_positive(z):
+    """erfc(z) para z >= 0, elemento a elemento (recurrencia de Clenshaw)."""
+    t = 2.0 / (2.0 + z)
+    ty = 4.0 * t - 2.0
+    d = np.zeros_like(z)
+    dd = np.zeros_like(z)
+    for coefficient in _ERFC_COEFFICIENTS[:0:-1]:
+        d, dd = ty * d - dd + coefficient, d
+    return t * np.exp(-z * z + 0.5 * (_ERFC_COEFFICIENTS[0] + ty * d) - dd)
+
+
+def normal_cdf(x):
+    """Función de distribución de la normal estándar, elemento a elemento."""
+    x = np.asarray(x, dtype=np.float64)
+    if ndtr is not None:
+        return ndtr(x)
+    # Phi(x) = erfc(-x / sqrt(2)) / 2, con erfc(-z) = 2 - erfc(z)
+    tail = 0.5 * _erfc_positive(np.abs(x) / math.sqrt(2))
+    return np.where(x >= 0, 1.0 - tail, tail)
+
+
+class MarginModel:
+    """
+    Marcador esperado de todos los enfrentamientos de un registro. Los
+    índices [i, j] son (local, visitante) en el orden de registry.names.
+
+    Attributes:
+        possessions: Posesiones esperadas por equipo
+        home_points, away_points: Puntos esperados de cada equipo
+        margin: Diferencia esperada (local - visitante)
+        total: Puntos totales esperados
+        home_win_prob: Probabilidad de victoria del local (0-100)
+        bucket_probabilities: Probabilidad de cada tramo de MARGIN_BUCKETS
+            (local, visitante, tramo)
+
+    Args:
+        registry: TeamRegistry
+        home_court: Puntos de ventaja del local
+        margin_std: Desviación típica de la diferencia real
+    """
+
+    def __init__(self, registry, home_court=HOME_COURT_POINTS, margin_std=MARGIN_STD):
+        self.registry = registry
+        self.home_court = home_court
+        self.margin_std = margin_std
+
+        pace = registry.column('E_PACE')
+        offense = registry.column('E_OFF_RATING')
+        defense = registry.column('E_DEF_RATING')
+        league_pace = pace.mean()
+        # En la liga, los puntos anotados y recibidos por 100 posesiones coinciden
+        league_rating = (offense.mean() + defense.mean()) / 2
+
+        self.possessions = pace[:, None] * pace[None, :] / league_pace
+        home_per_possession = offense[:, None] * defense[None, :] / league_rating / 100
+        away_per_possession = offense[None, :] * defense[:, None] / league_rating / 100
+        self.home_points = self.possessions * home_per_possession + home_court / 2
+        self.away_points = self.possessions * away_per_possession - home_court / 2
+        self.margin = self.home_points - self.away_points
+        self.total = self.home_points + self.away_points
+        self.home_win_prob = normal_cdf(self.margin / margin_std) * 100
+
+        cdf = normal_cdf((np.array(MARGIN_EDGES, dtype=np.float64)[None, None, :] - self.margin[:, :, None])
+                         / margin_std)
+        n = len(registry)
+        self.bucket_probabilities = np.diff(
+            np.concatenate([np.zeros((n, n, 1)), cdf, np.ones((n, n, 1))], axis=2), axis=2)
+
+    def predict(self, home_rows, away_rows):
+        """
+        Predicción de un lote de partidos (arrays de filas del registro).
+
+        Returns:
+            Diccionario de arrays home_points, away_points, margin, total y
+            home_win_prob
+        """
+        home_rows = np.asarray(home_rows, dtype=np.intp)
+        away_rows = np.asarray(away_rows, dtype=np.intp)
+        return {
+            'home_points': self.home_points[home_rows, away_rows],
+            'away_points': self.away_points[home_rows, away_rows],
+            'margin': self.margin[home_rows, away_rows],
+            'total': self.total[home_rows, away_rows],
+            'home_win_prob': self.home_win_prob[home_rows, away_rows],
+        }
+
+    def distribution(self, home_rows, away_rows):
+        """Probabilidad de cada tramo de MARGIN_BUCKETS (partidos x tramos)."""
+        return self.bucket_probabilities[np.asarray(home_rows, dtype=np.intp), np.asarray(away_rows, dtype=np.intp)]
+
+    def cover_probability(self, home, away, spread):
+        """
+        Probabilidad (0-100) de que el local cubra el hándicap indicado
+        (p. ej. -5.5: gana por 6 o más).
+        """
+        i, j = self.registry.index[home], self.registry.index[away]
+        return float(1 - normal_cdf((-spread - self.margin[i, j]) / self.margin_std)) * 100
+
+    def games(self, schedule):
+        """
+        Predicción de una lista de partidos del calendario (una jornada o la
+        temporada completa). Los partidos con equipos desconocidos se omiten.
+
+        Returns:
+            DataFrame con una fila por partido
+        """
+        registry = self.registry
+        rows = [(game, registry.row(game.get('homeTeam')), registry.row(game.get('awayTeam')))
+                for game in schedule]
+        rows = [(game, home, away) for game, home, away in rows if home is not None and away is not None]
+        home_rows = np.array([home for _, home, _ in rows], dtype=np.intp)
+        away_rows = np.array([away for _, _, away in rows], dtype=np.intp)
+
+        result = pd.DataFrame({
+            'game_id': [game.get('game_id', '') for game, _, _ in rows],
+            'game_date': [game.get('gameDate', '') for game, _, _ in rows],
+            'home_team': [registry.names[home] for home in home_rows],
+            'away_team': [registry.names[away] for away in away_rows],
+        })
+        for column, values in self.predict(home_rows, away_rows).items():
+            result[column] = np.round(values, 1)
+        distribution = self.distribution(home_rows, away_rows)
+        for b, label in enumerate(MARGIN_BUCKETS):
+            result[f"margin_{label}"] = np.round(distribution[:, b] * 100, 1)
+        return result
+
+
+# Modelos calculados, uno por registro vivo (es decir, por versión de los datos)
+_models = weakref.WeakKeyDictionary()
+_models_lock = threading.Lock()
+
+
+def get_margin_model(registry):
+    """Devuelve el modelo de diferencias del registro, calculándolo la primera vez."""
+    with _models_lock:
+        model = _models.get(registry)
+        if model is None:
+            model = MarginModel(registry)
+            _models[registry] = model
+        return model
+
+
+def main():
+    from data_loader import DEFAULT_CSV_PATH, get_team_stats
+    from team_registry import get_registry
+
+    parser = argparse.ArgumentParser(description="Diferencia y total esperados de los partidos")
+    parser.add_argument('schedule', nargs='?', default=DEFAULT_SCHEDULE_PATH, help="Calendario (JSON o JSONL)")
+    parser.add_argument('--stats', default=DEFAULT_CSV_PATH, help="CSV de estadísticas completas")
+    parser.add_argument('--date', default=None, help="Sólo los partidos de esta fecha (YYYY-MM-DD)")
+    parser.add_argument('--output', default=None, help="Guardar las predicciones en CSV")
+    args = parser.parse_args()
+
+    df = get_team_stats(args.stats)
+    if df.empty:
+        return
+    model = get_margin_model(get_registry(df))
+    schedule = iter_schedule(args.schedule)
+    if args.date:
+        schedule = (game for game in schedule if game.get('gameDate') == args.date)
+    result = model.games(schedule)
+
+    if args.output:
+        result.to_csv(args.output, index=False)
+        print(f"{len(result)} partidos guardados en {args.output}")
+        return
+    for game in result.itertuples():
+        favorite = game.home_team if game.margin >= 0 else game.away_team
+        print(f"{game.game_date} {game.away_team} @ {game.home_team}: "
+              f"{game.away_points:.1f}-{game.home_points:.1f}, {favorite} por {abs(game.margin):.1f}, "
+              f"total {game.total:.1f}, local {game.home_win_prob:.1f}%")
+
+
+if __name__ == '__main__':
+    main()
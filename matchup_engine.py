@@ -0,0 +1,459 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Motor vectorizado de enfrentamientos.
+
+analyze_matchup comparaba dos equipos estadística a estadística en bucles de
+Python y aplicaba los ajustes (momentum, ritmo, tiro, localía) con ifs
+escalares. Este módulo calcula de una sola pasada con NumPy la matriz 30x30
+(local x visitante) de probabilidades de victoria y la contribución de cada
+factor, una vez por versión de los datos.
+
+Las operaciones se hacen en el mismo orden y con los mismos tipos que el
+cálculo escalar (float64), así que los resultados son idénticos a los de la
+versión anterior de analyze_matchup.
+
+Los pesos de cada estadística y el tamaño de los ajustes se pueden sustituir
+por los ajustados con calibrate_weights.py, que se guardan en
+config/matchup_weights.json (o en la ruta de la variable MATCHUP_WEIGHTS).
+Si el archivo no existe se usan los valores por defecto de este módulo.
+
+Todas las matrices de MatchupMatrix se registran como una tabla compartida
+(shared_tables.py, con la configuración de pesos como clave): los workers
+de gunicorn mapean la que construyó el master en lugar de recalcularla.
+"""
+
+import json
+import os
+import threading
+import weakref
+
+import numpy as np
+
+from schema import is_lower_better
+from shared_tables import register_table, shared_table
+
+# Estadísticas agrupadas por categoría: (columna, nombre, peso)
+STAT_CATEGORIES = {
+    "Ofensiva": [
+        ('PTS', 'Puntos por partido', 1.0),
+        ('E_OFF_RATING', 'Rating Ofensivo', 1.2),
+        ('FG_PCT', 'Porcentaje tiros campo', 0.9),
+        ('FG3_PCT', 'Porcentaje triples', 0.8),
+        ('FT_PCT', 'Porcentaje tiros libres', 0.7),
+        ('AST', 'Asistencias', 0.8),
+        ('E_AST_RATIO', 'Ratio de asistencias', 0.7),
+        ('FGM', 'Canastas anotadas', 0.6),
+        ('FG3M', 'Triples anotados', 0.6)
+    ],
+    "Defensa": [
+        ('E_DEF_RATING', 'Rating Defensivo', 1.2),
+        ('STL', 'Robos', 0.8),
+        ('BLK', 'Tapones', 0.7),
+        ('BLKA', 'Tapones recibidos', 0.6),
+        ('PF', 'Faltas cometidas', 0.6)
+    ],
+    "Rebotes y Posesiones": [
+        ('REB', 'Rebotes totales', 0.9),
+        ('OREB', 'Rebotes ofensivos', 0.8),
+        ('DREB', 'Rebotes defensivos', 0.7),
+        ('E_OREB_PCT', 'Porcentaje rebotes ofensivos', 0.7),
+        ('E_DREB_PCT', 'Porcentaje rebotes defensivos', 0.7),
+        ('TOV', 'Pérdidas', 0.8),
+        ('E_TM_TOV_PCT', 'Porcentaje pérdidas', 0.7),
+        ('E_PACE', 'Ritmo de juego', 0.5)
+    ],
+    "Factores de victoria": [
+        ('W_PCT', 'Porcentaje victorias', 1.5),
+        ('E_NET_RATING', 'Rating Neto', 1.3),
+        ('PLUS_MINUS', 'Diferencial puntos', 1.0)
+    ]
+}
+
+# Ajustes contextuales (puntos porcentuales)
+MOMENTUM_FACTOR = 5          # Equipo con un porcentaje de victorias un 20% mejor
+PACE_FACTOR = 3              # Ritmo de juego un 10% distinto
+SHOOTING_FACTOR = 4          # FG% y 3P% un 10% mejores
+HOME_COURT_ADVANTAGE = 6.0   # team1 (local) siempre juega en casa
+NEUTRALIZING_FACTOR = 2.0    # Visitante con un porcentaje de victorias un 30% mejor
+
+DEFAULT_FACTORS = {
+    'momentum': MOMENTUM_FACTOR,
+    'pace': PACE_FACTOR,
+    'shooting': SHOOTING_FACTOR,
+    'home_court': HOME_COURT_ADVANTAGE,
+    'neutralizing': NEUTRALIZING_FACTOR,
+}
+
+# Configuración de pesos ajustados (ver calibrate_weights.py)
+DEFAULT_WEIGHTS_PATH = os.environ.get('MATCHUP_WEIGHTS', os.path.join('config', 'matchup_weights.json'))
+
+# Estadísticas clave que se muestran en la tarjeta de cada partido
+KEY_STATS_FOR_DISPLAY = ['PTS', 'AST', 'REB', 'E_OFF_RATING', 'E_DEF_RATING']
+STAT_DISPLAY_NAMES = ['Puntos', 'Asistencias', 'Rebotes', 'Rating Of.', 'Rating Def.']
+
+# Factores contextuales, en el orden en que se aplican
+FACTOR_NAMES = ['momentum', 'pace', 'shooting', 'home_court', 'neutralizing']
+
+
+def _signs(home, away):
+    # +1 si el factor favorece al local, -1 si favorece al visitante, 0 si no aplica
+    return np.where(home, 1, np.where(away, -1, 0)).astype(np.int8)
+
+
+class MatchupMatrix:
+    """
+    Resultados de todos los enfrentamientos posibles entre los equipos de un
+    registro. Los índices [i, j] son (local, visitante) en el orden de
+    registry.names.
+
+    Attributes:
+        home_prob, away_prob: Probabilidades de victoria (0-100, sin redondear)
+        confidence: Diferencia absoluta entre ambas probabilidades
+        advantage: Matriz booleana (estadística, local, visitante); True si
+            la estadística favorece al local
+        category_contributions: Puntos porcentuales de la probabilidad base
+            del local que aporta cada categoría
+        factor_signs: Para cada factor contextual, +1 si favorece al local,
+            -1 si favorece al visitante y 0 si no se aplica (no depende de
+            los pesos)
+        factor_contributions: Ajuste aplicado por cada factor contextual a la
+            probabilidad del local (antes de recortar y normalizar)
+
+    Args:
+        registry: TeamRegistry
+        stat_categories: Categorías con los pesos de cada estadística
+        factors: Tamaño de cada ajuste contextual (por defecto DEFAULT_FACTORS)
+        table: Matrices ya calculadas con los mismos pesos (ver to_table);
+            si no tiene la forma esperada, se calculan de nuevo
+    """
+
+    # Matrices booleanas de los factores que se muestran en el análisis
+    FLAG_NAMES = ['momentum_home', 'momentum_away', 'pace_display_home', 'pace_display_away',
+                  'shooting_home', 'shooting_away']
+
+    def __init__(self, registry, stat_categories=STAT_CATEGORIES, factors=None, table=None):
+        self.registry = registry
+        self.stat_categories = stat_categories
+        self.factors = dict(DEFAULT_FACTORS if factors is None else factors)
+
+        # Sólo se usan las estadísticas presentes en los datos
+        self.stats = [(category, key, name, weight)
+                      for category, stats in stat_categories.items()
+                      for key, name, weight in stats
+                      if key in registry.column_index]
+        self.stat_keys = [key for _, key, _, _ in self.stats]
+        self._stat_position = {key: s for s, key in enumerate(self.stat_keys)}
+
+        total_weight = 0
+        for _, _, _, weight in self.stats:
+            total_weight += weight
+        self.total_weight = total_weight
+
+        if table is not None and table.shape == self._table_shape():
+            self._load_table(table)
+        else:
+            self._compute()
+
+    def _column(self, key):
+        values = self.registry.column(key)
+        # home[i, j] = valor del local i; away[i, j] = valor del visitante j
+        return values[:, None], values[None, :]
+
+    def _compute(self):
+        n = len(self.registry)
+        points1 = np.zeros((n, n))
+        points2 = np.zeros((n, n))
+        self.advantage = np.zeros((len(self.stats), n, n), dtype=bool)
+        self.category_contributions = {category: np.zeros((n, n)) for category in self.stat_categories}
+
+        # Puntos ponderados: se acumulan en el mismo orden que el cálculo escalar
+        for s, (category, key, _, weight) in enumerate(self.stats):
+            home, away = self._column(key)
+            if is_lower_better(key):
+                wins = np.broadcast_to(home < away, (n, n))
+            else:
+                wins = np.broadcast_to(home > away, (n, n))
+            self.advantage[s] = wins
+            points1 = points1 + np.where(wins, weight, 0.0)
+            points2 = points2 + np.where(wins, 0.0, weight)
+            self.category_contributions[category] += np.where(wins, weight, 0.0)
+
+        for category in self.category_contributions:
+            self.category_contributions[category] = self.category_contributions[category] / self.total_weight * 100
+
+        p1 = (points1 / self.total_weight) * 100
+        p2 = (points2 / self.total_weight) * 100
+
+        w1, w2 = self._column('W_PCT')
+        pace1, pace2 = self._column('E_PACE')
+        off1, off2 = self._column('E_OFF_RATING')
+        def1, def2 = self._column('E_DEF_RATING')
+        fg1, fg2 = self._column('FG_PCT')
+        fg3_1, fg3_2 = self._column('FG3_PCT')
+
+        # 1. Momentum
+        self.momentum_home = np.broadcast_to(w1 > w2 * 1.2, (n, n))
+        self.momentum_away = ~self.momentum_home & (w2 > w1 * 1.2)
+        momentum = _signs(self.momentum_home, self.momentum_away)
+
+        # 2. Estilo de juego (cadena de elif del cálculo escalar)
+        high1 = np.broadcast_to(pace1 > pace2 * 1.1, (n, n))
+        high2 = ~high1 & (pace2 > pace1 * 1.1)
+        case1 = high1 & (off1 > off2)
+        case2 = ~case1 & high2 & (off2 > off1)
+        case3 = ~case1 & ~case2 & high2 & (def1 < def2)
+        case4 = ~case1 & ~case2 & ~case3 & high1 & (def2 < def1)
+        pace = _signs(case1 | case3, case2 | case4)
+
+        # El panel de factores evalúa el ritmo con una condición ligeramente
+        # distinta (sin la cadena de elif); se conserva tal cual para mostrar
+        # lo mismo que antes
+        self.pace_display_home = (high1 & (off1 > off2)) | (high2 & (def1 < def2))
+        self.pace_display_away = ~self.pace_display_home & ((high2 & (off2 > off1)) | (high1 & (def2 < def1)))
+
+        # 3. Eficiencia de tiro
+        self.shooting_home = np.broadcast_to((fg1 > fg2 * 1.1) & (fg3_1 > fg3_2 * 1.1), (n, n))
+        self.shooting_away = ~self.shooting_home & (fg2 > fg1 * 1.1) & (fg3_2 > fg3_1 * 1.1)
+        shooting = _signs(self.shooting_home, self.shooting_away)
+
+        # 4. Localía, reducida si el visitante es claramente mejor
+        neutralizing = _signs(np.zeros((n, n), dtype=bool), np.broadcast_to(w2 > w1 * 1.3, (n, n)))
+
+        self.factor_signs = {
+            'momentum': momentum,
+            'pace': pace,
+            'shooting': shooting,
+            'home_court': np.ones((n, n), dtype=np.int8),
+            'neutralizing': neutralizing,
+        }
+        self.factor_contributions = {name: self.factor_signs[name] * self.factors[name] for name in FACTOR_NAMES}
+        for name in FACTOR_NAMES:
+            adjustment = self.factor_contributions[name]
+            p1 = p1 + adjustment
+            p2 = p2 - adjustment
+
+        p1 = np.clip(p1, 0, 100)
+        p2 = np.clip(p2, 0, 100)
+        total = p1 + p2
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.home_prob = np.where(total > 0, p1 / total * 100, 50.0)
+            self.away_prob = np.where(total > 0, p2 / total * 100, 50.0)
+        self.confidence = np.abs(self.home_prob - self.away_prob)
+
+    # ------------------------------------------------------------------
+    # Tabla compartida
+
+    def _table_shape(self):
+        n = len(self.registry)
+        layers = 3 + len(self.stat_categories) + len(FACTOR_NAMES) + len(self.FLAG_NAMES) + len(self.stats)
+        return (layers, n, n)
+
+    def to_table(self):
+        """
+        Todas las matrices apiladas en un único array float64 (capa x local x
+        visitante) para guardarlo como tabla compartida.
+        """
+        n = len(self.registry)
+        layers = [self.home_prob, self.away_prob, self.confidence]
+        layers += [self.category_contributions[category] for category in self.stat_categories]
+        layers += [self.factor_signs[name] for name in FACTOR_NAMES]
+        layers += [getattr(self, name) for name in self.FLAG_NAMES]
+        layers += list(self.advantage)
+        return np.stack([np.broadcast_to(layer, (n, n)) for layer in layers]).astype(np.float64)
+
+    def _load_table(self, table):
+        # Las probabilidades y contribuciones son vistas de la tabla (mapeada
+        # en memoria); signos y banderas recuperan su tipo
+        self.home_prob, self.away_prob, self.confidence = table[0], table[1], table[2]
+        layer = 3
+        self.category_contributions = {}
+        for category in self.stat_categories:
+            self.category_contributions[category] = table[layer]
+            layer += 1
+        self.factor_signs = {}
+        for name in FACTOR_NAMES:
+            self.factor_signs[name] = table[layer].astype(np.int8)
+            layer += 1
+        for name in self.FLAG_NAMES:
+            setattr(self, name, table[layer] != 0)
+            layer += 1
+        self.advantage = table[layer:] != 0
+        self.factor_contributions = {name: self.factor_signs[name] * self.factors[name] for name in FACTOR_NAMES}
+
+    # ------------------------------------------------------------------
+    # Consultas
+
+    def win_probability(self, home, away):
+        """Probabilidad de victoria del local (0-100) por nombre, abreviatura o TEAM_ID."""
+        return float(self.home_prob[self.registry.index[home], self.registry.index[away]])
+
+    def contributions(self, i, j):
+        """
+        Contribución de cada categoría y factor a la probabilidad del local
+        (antes de recortar y normalizar).
+        """
+        result = {category: float(values[i, j]) for category, values in self.category_contributions.items()}
+        result.update({name: float(values[i, j]) for name, values in self.factor_contributions.items()})
+        return result
+
+    def analysis(self, i, j):
+        """
+        Análisis completo del enfrentamiento (local i, visitante j) con el mismo
+        formato que devuelve analyze_matchup.
+        """
+        registry = self.registry
+        matrix = registry.matrix
+
+        comparison = {}
+        for s, (category, key, name, weight) in enumerate(self.stats):
+            column = registry.column_index[key]
+            comparison[key] = {
+                "name": name,
+                "category": category,
+                "team1_value": matrix[i, column],
+                "team2_value": matrix[j, column],
+                "advantage": "team1" if self.advantage[s, i, j] else "team2",
+                "weight": weight
+            }
+
+        def side(home_flag, away_flag, factor):
+            if home_flag[i, j]:
+                return factor, "team1"
+            if away_flag[i, j]:
+                return -factor, "team2"
+            return 0, "neutral"
+
+        factors = self.factors
+        momentum_impact, momentum_beneficiary = side(self.momentum_home, self.momentum_away, factors['momentum'])
+        pace_impact, pace_beneficiary = side(self.pace_display_home, self.pace_display_away, factors['pace'])
+        shooting_impact, shooting_beneficiary = side(self.shooting_home, self.shooting_away, factors['shooting'])
+
+        additional_factors = {
+            "Factores Adicionales": [
+                {
+                    "key": "home_court",
+                    "name": "Factor Localía",
+                    "description": f"Ventaja del equipo local: +{factors['home_court']}%",
+                    "impact": factors['home_court'],
+                    "beneficiary": "team1"
+                },
+                {
+                    "key": "momentum",
+                    "name": "Momentum",
+                    "description": "Ventaja por mejor racha reciente",
+                    "impact": momentum_impact,
+                    "beneficiary": momentum_beneficiary
+                },
+                {
+                    "key": "pace",
+                    "name": "Estilo de Juego",
+                    "description": "Ventaja por ritmo de juego",
+                    "impact": pace_impact,
+                    "beneficiary": pace_beneficiary
+                },
+                {
+                    "key": "shooting",
+                    "name": "Eficiencia de Tiro",
+                    "description": "Ventaja por mejor eficiencia en tiros",
+                    "impact": shooting_impact,
+                    "beneficiary": shooting_beneficiary
+                }
+            ]
+        }
+
+        team1_win_prob = float(self.home_prob[i, j])
+        team2_win_prob = float(self.away_prob[i, j])
+        return {
+            "comparison": comparison,
+            "win_probability": {
+                "team1": round(team1_win_prob, 1),
+                "team2": round(team2_win_prob, 1)
+            },
+            "prediction": registry.names[i] if team1_win_prob > team2_win_prob else registry.names[j],
+            "confidence": float(self.confidence[i, j]),
+            "key_stats_for_display": list(KEY_STATS_FOR_DISPLAY),
+            "stat_display_names": list(STAT_DISPLAY_NAMES),
+            "stat_categories": self.stat_categories,
+            "additional_factors": additional_factors
+        }
+
+
+def apply_stat_weights(stat_weights, stat_categories=STAT_CATEGORIES):
+    """Copia de las categorías con los pesos sustituidos ({columna: peso})."""
+    return {
+        category: [(key, name, stat_weights.get(key, weight)) for key, name, weight in stats]
+        for category, stats in stat_categories.items()
+    }
+
+
+# Configuración de pesos leída, por ruta: (mtime_ns, categorías, factores)
+_weights_cache = {}
+_weights_lock = threading.Lock()
+
+
+def load_weights(path=None):
+    """
+    Pesos activos del modelo.
+
+    Args:
+        path: Archivo de configuración (por defecto DEFAULT_WEIGHTS_PATH)
+
+    Returns:
+        Tupla (stat_categories, factors, clave). La clave identifica la
+        configuración leída (None si se usan los valores por defecto).
+    """
+    path = path or DEFAULT_WEIGHTS_PATH
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return STAT_CATEGORIES, DEFAULT_FACTORS, None
+
+    with _weights_lock:
+        cached = _weights_cache.get(path)
+        if cached is None or cached[0] != mtime_ns:
+            try:
+                with open(path, 'r') as f:
+                    config = json.load(f)
+                stat_categories = apply_stat_weights(config.get('stat_weights', {}))
+                factors = dict(DEFAULT_FACTORS, **config.get('factors', {}))
+            except (OSError, ValueError) as e:
+                print(f"Configuración de pesos ilegible {path}: {e}. Se usan los pesos por defecto.")
+                return STAT_CATEGORIES, DEFAULT_FACTORS, None
+            cached = (mtime_ns, stat_categories, factors)
+            _weights_cache[path] = cached
+        return cached[1], cached[2], (path, cached[0])
+
+
+# Matrices calculadas, una por registro vivo (es decir, por versión de los
+# datos), junto con la clave de la configuración de pesos usada
+_matrices = weakref.WeakKeyDictionary()
+_matrices_lock = threading.Lock()
+
+
+def get_matchup_matrix(registry):
+    """
+    Devuelve la matriz de enfrentamientos del registro con los pesos activos,
+    calculándola la primera vez (o cuando cambia la configuración de pesos).
+    """
+    stat_categories, factors, weights_key = load_weights()
+    with _matrices_lock:
+        entry = _matrices.get(registry)
+        if entry is None or entry[0] != weights_key:
+            table = shared_table(registry, 'matchup', str(weights_key))
+            entry = (weights_key, MatchupMatrix(registry, stat_categories, factors, table))
+            _matrices[registry] = entry
+        return entry[1]
+
+
+def _weights_table_key():
+    return str(load_weights()[2])
+
+
+def _matchup_table(registry):
+    stat_categories, factors, _ = load_weights()
+    return MatchupMatrix(registry, stat_categories, factors).to_table()
+
+
+register_table('matchup', _matchup_table, key=_weights_table_key)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Cliente para los endpoints de stats.nba.com.
+
+Envuelve las clases de endpoint de nba_api con:
+- una caché de respuestas en disco (clave: endpoint + parámetros) con TTL
+- un limitador de peticiones tipo token bucket
+- reintentos con backoff exponencial y jitter
+- una sesión HTTP con pool de conexiones reutilizable
+
+Implementa la misma interfaz send(endpoint, parameters, timeout) que los
+transportes de ingest.py, así que se puede usar directamente como transporte.
+Las descargas masivas (backfills) que se interrumpen retoman desde la caché
+en lugar de empezar de cero.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from nba_api.stats.library.http import NBAStatsHTTP, NBAStatsResponse
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CACHE_DIR = os.path.join('cache', 'nba_api')
+DEFAULT_CACHE_TTL = 6 * 3600  # 6 horas
+
+# Códigos de estado que merecen un reintento (límite de peticiones y errores del servidor)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Limitador de peticiones: permite ráfagas de hasta `capacity` peticiones y
+    un ritmo sostenido de `rate` peticiones por segundo.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible y lo consume."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ResponseCache:
+    """Caché de respuestas en disco, un archivo JSON por (endpoint, parámetros)."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_CACHE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, endpoint, parameters):
+        key = json.dumps(sorted((k, '' if v is None else str(v)) for k, v in parameters.items()))
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, endpoint.lower(), f"{digest}.json")
+
+    def get(self, endpoint, parameters):
+        """Devuelve el texto de la respuesta guardada, o None si no existe o caducó."""
+        path = self._path(endpoint, parameters)
+        if not os.path.exists(path):
+            return None
+        if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)['response']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def set(self, endpoint, parameters, text):
+        path = self._path(endpoint, parameters)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'endpoint': endpoint, 'parameters': parameters, 'response': text}, f)
+        os.replace(tmp_path, path)
+
+
+class NBAStatsClient:
+    """
+    Cliente con caché, límite de peticiones y reintentos para stats.nba.com.
+
+    Args:
+        cache_dir: Directorio de la caché de respuestas (None para desactivarla)
+        cache_ttl: Segundos de validez de cada respuesta (None = no caduca)
+        rate: Peticiones por segundo sostenidas
+        burst: Tamaño máximo de ráfaga
+        max_retries: Reintentos por petición
+        backoff_base: Espera base (segundos) del backoff exponencial
+        backoff_max: Espera máxima entre reintentos
+        pool_size: Conexiones simultáneas del pool HTTP
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, cache_ttl=DEFAULT_CACHE_TTL, rate=1.0, burst=3,
+                 max_retries=5, backoff_base=1.0, backoff_max=60.0, pool_size=4,
+                 base_url=NBAStatsHTTP.base_url, headers=None):
+        self.cache = ResponseCache(cache_dir, cache_ttl) if cache_dir else None
+        self.limiter = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.base_url = base_url
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(headers if headers is not None else NBAStatsHTTP.headers)
+
+    def _backoff(self, attempt, retry_after=None):
+        # Backoff exponencial con "full jitter"; se respeta Retry-After si llega
+        if retry_after:
+            try:
+                return min(self.backoff_max, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def send(self, endpoint, parameters, timeout=30):
+        """
+        Devuelve el texto JSON de un endpoint, desde la caché si es posible.
+
+        Raises:
+            requests.RequestException: si se agotan los reintentos
+        """
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, parameters)
+            if cached is not None:
+                return cached
+
+        url = self.base_url.format(endpoint=endpoint)
+        # nba_api ordena los parámetros; algunos endpoints dependen del orden
+        params = sorted(parameters.items(), key=lambda kv: kv[0])
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+                if response.status_code in RETRYABLE_STATUS:
+                    last_error = requests.HTTPError(f"HTTP {response.status_code} en {endpoint}", response=response)
+                    retry_after = response.headers.get('Retry-After')
+                else:
+                    response.raise_for_status()
+                    text = response.text
+                    json.loads(text)  # Verificar que la respuesta es JSON válido antes de cachearla
+                    if self.cache is not None:
+                        self.cache.set(endpoint, parameters, text)
+                    return text
+            except (requests.ConnectionError, requests.Timeout, ValueError) as e:
+                last_error = e
+                retry_after = None
+
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt, retry_after)
+                print(f"Error consultando {endpoint} ({last_error}); reintento {attempt + 1} en {delay:.1f}s")
+                time.sleep(delay)
+
+        raise last_error
+
+    def get(self, endpoint_cls, **kwargs):
+        """
+        Ejecuta una clase de endpoint de nba_api a través del cliente.
+
+        Returns:
+            Instancia del endpoint con la respuesta ya cargada
+        """
+        endpoint = endpoint_cls(get_request=False, **kwargs)
+        text = self.send(endpoint.endpoint, endpoint.parameters, endpoint.timeout)
+        endpoint.nba_response = NBAStatsResponse(response=text, status_code=200, url=None)
+        endpoint.load_response()
+        return endpoint
+
+
+# Cliente compartido del proceso (comparte pool de conexiones y limitador)
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """Devuelve el cliente compartido con la configuración por defecto."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = NBAStatsClient()
+        return _default_client
@@ -0,0 +1,414 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Registro de modelos de predicción de partidos.
+
+Todos los modelos implementan la misma interfaz (PredictionModel): una matriz
+equipos x equipos (local x visitante) con la probabilidad de victoria del
+local, calculada una vez por versión de los datos, y el análisis completo de
+un enfrentamiento con el formato de analyze_matchup. El modelo que usa el
+dashboard se elige por configuración, sin tocar el código de los callbacks.
+
+Modelos registrados:
+- heuristic: el modelo de pesos por estadística de matchup_engine.py
+- logistic: regresión logística sobre diferencias de estadísticas
+- elo: diferencia de ratings Elo (elo.py)
+- margin: diferencia esperada de puntos con distribución normal (margin_model.py)
+- blend: media ponderada de otros modelos
+
+Configuración (config/prediction_model.json, o la ruta de la variable
+PREDICTION_MODEL_CONFIG):
+
+    {"model": "blend", "options": {"components": {"heuristic": 0.7, "elo": 0.3}}}
+
+La variable PREDICTION_MODEL sustituye el nombre del modelo. Sin
+configuración se usa el modelo de pesos (heuristic). La mezcla con Elo se
+activa con {"model": "blend"} o PREDICTION_MODEL=blend; sin componentes
+usa heuristic + elo con peso ELO_BLEND_WEIGHT, y sólo aplica Elo cuando
+ambos equipos tienen suficientes partidos valorados.
+
+Para comparar modelos (latencia, memoria y acierto) ver benchmark_models.py.
+"""
+
+import copy
+import json
+import math
+import os
+import threading
+import weakref
+
+import numpy as np
+
+from elo import ELO_BLEND_WEIGHT, MIN_GAMES_FOR_BLEND, expected_score, get_elo_ratings
+from margin_model import get_margin_model
+from matchup_engine import get_matchup_matrix, load_weights
+
+DEFAULT_MODEL_CONFIG_PATH = os.environ.get('PREDICTION_MODEL_CONFIG',
+                                           os.path.join('config', 'prediction_model.json'))
+DEFAULT_MODEL_CONFIG = {'model': 'heuristic'}
+
+# Componentes de la mezcla cuando la configuración no los indica
+DEFAULT_BLEND_COMPONENTS = {'heuristic': 1 - ELO_BLEND_WEIGHT, 'elo': ELO_BLEND_WEIGHT}
+
+# Modelos disponibles: nombre -> función(**opciones) que devuelve el modelo
+_model_factories = {}
+
+
+def register_model(name, factory):
+    """
+    Registra un modelo de predicción.
+
+    Args:
+        name: Nombre del modelo en la configuración
+        factory: Función que recibe las opciones de la configuración y
+            devuelve un PredictionModel
+    """
+    _model_factories[name] = factory
+
+
+def available_models():
+    return list(_model_factories)
+
+
+def build_model(name, options=None):
+    """Crea un modelo registrado con sus opciones."""
+    if name not in _model_factories:
+        raise ValueError(f"Modelo de predicción desconocido: {name} (disponibles: {', '.join(_model_factories)})")
+    return _model_factories[name](**(options or {}))
+
+
+class PredictionModel:
+    """
+    Interfaz común de los modelos de predicción.
+
+    Las subclases implementan compute_matrix(registry), que devuelve la
+    matriz (local x visitante) de probabilidades de victoria del local
+    (0-100) en el orden de registry.names. NaN indica que el modelo no tiene
+    opinión sobre ese enfrentamiento (p. ej. Elo sin partidos suficientes).
+
+    La matriz se cachea por registro. Los modelos cuyo resultado cambia sin
+    que cambien los datos (ratings Elo, pesos recalibrados) sobrescriben
+    cache_key(registry): la matriz se recalcula cuando cambia la clave.
+    """
+
+    name = None
+
+    def __init__(self):
+        # registro -> (clave, matriz)
+        self._matrices = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def compute_matrix(self, registry):
+        raise NotImplementedError
+
+    def cache_key(self, registry):
+        """Versión de las entradas del modelo aparte del registro (None si sólo depende de él)."""
+        return None
+
+    def matrix(self, registry):
+        """Matriz de probabilidades del registro, calculada la primera vez."""
+        key = self.cache_key(registry)
+        with self._lock:
+            cached = self._matrices.get(registry)
+            if cached is None or cached[0] != key:
+                cached = (key, self.compute_matrix(registry))
+                self._matrices[registry] = cached
+            return cached[1]
+
+    def filled_matrix(self, registry):
+        """
+        Matriz del modelo con los enfrentamientos sin opinión (NaN) resueltos
+        por el modelo de pesos, como en analyze().
+        """
+        matrix = self.matrix(registry)
+        return np.where(np.isnan(matrix), get_matchup_matrix(registry).home_prob, matrix)
+
+    def probabilities(self, registry, home_rows, away_rows):
+        """Probabilidades del local (0-100) de un lote de partidos (filas del registro)."""
+        return self.matrix(registry)[np.asarray(home_rows, dtype=np.intp), np.asarray(away_rows, dtype=np.intp)]
+
+    def details(self, registry, home, away):
+        """Información adicional del modelo para el análisis de un enfrentamiento."""
+        return {}
+
+    def with_elo_ratings(self, ratings):
+        """
+        Modelo equivalente cuyos componentes Elo usan otros ratings (p. ej.
+        los anteriores a una fecha, ver backtest.py). Los modelos que no usan
+        Elo se devuelven tal cual.
+        """
+        return self
+
+    def analyze(self, registry, home, away):
+        """
+        Análisis del enfrentamiento (filas local y visitante) con el formato
+        de analyze_matchup. La comparación de estadísticas y los factores
+        salen siempre del modelo de pesos; la probabilidad, del modelo.
+        """
+        engine = get_matchup_matrix(registry)
+        analysis = engine.analysis(home, away)
+        probability = float(self.matrix(registry)[home, away])
+        if not math.isnan(probability) and probability != engine.home_prob[home, away]:
+            team1_win_prob = probability
+            team2_win_prob = 100 - team1_win_prob
+            analysis['win_probability'] = {
+                "team1": round(team1_win_prob, 1),
+                "team2": round(team2_win_prob, 1)
+            }
+            analysis['prediction'] = registry.names[home] if team1_win_prob > team2_win_prob else registry.names[away]
+            analysis['confidence'] = abs(team1_win_prob - team2_win_prob)
+        analysis.update(self.details(registry, home, away))
+        return analysis
+
+
+class HeuristicModel(PredictionModel):
+    """Modelo de pesos por estadística y ajustes contextuales (matchup_engine.py)."""
+
+    name = 'heuristic'
+
+    def cache_key(self, registry):
+        # La misma clave con la que get_matchup_matrix cachea sus matrices
+        return load_weights()[2]
+
+    def compute_matrix(self, registry):
+        return get_matchup_matrix(registry).home_prob
+
+
+class LogisticModel(PredictionModel):
+    """
+    Regresión logística sobre diferencias (local - visitante) de estadísticas:
+    P(local) = 1 / (1 + exp(-(intercept + sum(coef * diferencia)))).
+
+    Los coeficientes por defecto equivalen a ~1 punto de diferencia por punto
+    de net rating con una desviación de 12 puntos, más la ventaja de local.
+
+    Args:
+        intercept: Término independiente (ventaja de local en escala logit)
+        coefficients: {columna: coeficiente}
+    """
+
+    name = 'logistic'
+    DEFAULT_INTERCEPT = 0.28
+    DEFAULT_COEFFICIENTS = {'E_NET_RATING': 0.14}
+
+    def __init__(self, intercept=None, coefficients=None):
+        super().__init__()
+        self.intercept = self.DEFAULT_INTERCEPT if intercept is None else intercept
+        self.coefficients = dict(self.DEFAULT_COEFFICIENTS if coefficients is None else coefficients)
+
+    def compute_matrix(self, registry):
+        logit = np.full((len(registry), len(registry)), float(self.intercept))
+        for column, coefficient in self.coefficients.items():
+            values = registry.column(column)
+            logit += coefficient * (values[:, None] - values[None, :])
+        return 100 / (1 + np.exp(-logit))
+
+    @classmethod
+    def fit(cls, registry, home_rows, away_rows, outcomes, columns=None, iterations=25):
+        """
+        Ajusta los coeficientes con Newton-Raphson (IRLS) sobre partidos
+        terminados.
+
+        Args:
+            registry: TeamRegistry
+            home_rows, away_rows: Filas del registro de cada partido
+            outcomes: 1 si ganó el local, 0 si no
+            columns: Columnas a usar (por defecto las de DEFAULT_COEFFICIENTS)
+
+        Returns:
+            LogisticModel con los coeficientes ajustados
+        """
+        columns = list(columns or cls.DEFAULT_COEFFICIENTS)
+        values = registry.matrix[:, registry.column_indices(columns)]
+        features = np.hstack([np.ones((len(home_rows), 1)), values[home_rows] - values[away_rows]])
+        y = np.asarray(outcomes, dtype=np.float64)
+        beta = np.zeros(features.shape[1])
+        for _ in range(iterations):
+            p = 1 / (1 + np.exp(-features @ beta))
+            gradient = features.T @ (y - p)
+            # Pequeña regularización para que la matriz sea invertible
+            hessian = (features * (p * (1 - p))[:, None]).T @ features + 1e-6 * np.eye(len(beta))
+            step = np.linalg.solve(hessian, gradient)
+            beta += step
+            if np.max(np.abs(step)) < 1e-10:
+                break
+        return cls(float(beta[0]), {column: float(b) for column, b in zip(columns, beta[1:])})
+
+
+class EloModel(PredictionModel):
+    """
+    Probabilidad por diferencia de ratings Elo (elo.py). Sin opinión (NaN)
+    si alguno de los equipos tiene menos de min_games partidos valorados.
+    """
+
+    name = 'elo'
+
+    def __init__(self, min_games=MIN_GAMES_FOR_BLEND, ratings=None):
+        super().__init__()
+        self.min_games = min_games
+        self._ratings = ratings
+
+    @property
+    def ratings(self):
+        return self._ratings or get_elo_ratings()
+
+    def cache_key(self, registry):
+        # Los ratings cambian sin que cambien los datos
+        ratings = self.ratings
+        ratings.refresh()
+        return ratings.state_version
+
+    def compute_matrix(self, registry):
+        ratings = self.ratings
+        values = np.array([ratings.rating(name) for name in registry.names])
+        games = np.array([ratings.games_played.get(name, 0) for name in registry.names])
+        matrix = expected_score(values[:, None] + ratings.home_advantage - values[None, :]) * 100
+        return np.where(np.minimum(games[:, None], games[None, :]) >= self.min_games, matrix, np.nan)
+
+    def with_elo_ratings(self, ratings):
+        return EloModel(self.min_games, ratings)
+
+    def details(self, registry, home, away):
+        probability = self.matrix(registry)[home, away]
+        if math.isnan(probability):
+            return {}
+        ratings = self.ratings
+        return {
+            'elo': {
+                "team1_rating": round(ratings.rating(registry.names[home]), 1),
+                "team2_rating": round(ratings.rating(registry.names[away]), 1),
+                "team1_win_prob": round(float(probability), 1)
+            }
+        }
+
+
+class MarginModelPredictor(PredictionModel):
+    """Probabilidad de la diferencia esperada de puntos (margin_model.py)."""
+
+    name = 'margin'
+
+    def compute_matrix(self, registry):
+        return get_margin_model(registry).home_win_prob
+
+
+class BlendModel(PredictionModel):
+    """
+    Media ponderada de otros modelos. Los componentes sin opinión (NaN) en
+    un enfrentamiento no cuentan y el resto de pesos se renormaliza; si sólo
+    queda uno, se usa su probabilidad tal cual.
+
+    Args:
+        components: {nombre del modelo: peso}
+        component_options: {nombre del modelo: opciones}
+    """
+
+    name = 'blend'
+
+    def __init__(self, components=None, component_options=None):
+        super().__init__()
+        components = components or DEFAULT_BLEND_COMPONENTS
+        component_options = component_options or {}
+        self.weights = {name: float(weight) for name, weight in components.items() if weight > 0}
+        self.components = {name: build_model(name, component_options.get(name)) for name in self.weights}
+
+    def cache_key(self, registry):
+        # La mezcla cambia cuando cambia alguno de sus componentes (Elo)
+        return tuple(component.cache_key(registry) for component in self.components.values())
+
+    def compute_matrix(self, registry):
+        stack = np.stack([component.matrix(registry) for component in self.components.values()])
+        weights = np.array(list(self.weights.values()))[:, None, None]
+        valid = ~np.isnan(stack)
+        values = np.where(valid, stack, 0.0)
+        count = valid.sum(axis=0)
+        weight_sum = (weights * valid).sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            blended = (weights * values).sum(axis=0) / weight_sum
+        # Con un único componente válido se devuelve su valor exacto
+        return np.where(count == 1, values.sum(axis=0), np.where(count == 0, np.nan, blended))
+
+    def with_elo_ratings(self, ratings):
+        components = {name: component.with_elo_ratings(ratings) for name, component in self.components.items()}
+        if all(components[name] is component for name, component in self.components.items()):
+            return self
+        # Los componentes sin Elo se comparten, con sus matrices ya calculadas
+        clone = copy.copy(self)
+        PredictionModel.__init__(clone)
+        clone.components = components
+        return clone
+
+    def details(self, registry, home, away):
+        result = {}
+        components = {}
+        for name, component in self.components.items():
+            probability = float(component.matrix(registry)[home, away])
+            if not math.isnan(probability):
+                components[name] = round(probability, 1)
+            result.update(component.details(registry, home, away))
+        if len(components) > 1:
+            result['components'] = components
+        return result
+
+
+register_model('heuristic', HeuristicModel)
+register_model('logistic', LogisticModel)
+register_model('elo', EloModel)
+register_model('margin', MarginModelPredictor)
+register_model('blend', BlendModel)
+
+
+# Modelo activo, por ruta de configuración: (clave, modelo)
+_active_models = {}
+_active_lock = threading.Lock()
+
+
+def load_model_config(path=None):
+    """
+    Configuración del modelo activo.
+
+    Returns:
+        Tupla (configuración, clave). La clave cambia cuando cambia el
+        archivo (None si se usa la configuración por defecto).
+    """
+    path = path or DEFAULT_MODEL_CONFIG_PATH
+    config, key = DEFAULT_MODEL_CONFIG, None
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, 'r') as f:
+            config, key = json.load(f), (path, mtime_ns)
+    except OSError:
+        pass
+    except ValueError as e:
+        print(f"Configuración de modelo ilegible {path}: {e}. Se usa el modelo por defecto.")
+
+    name = os.environ.get('PREDICTION_MODEL')
+    if name and name != config.get('model'):
+        config = {'model': name, 'options': {}}
+        key = (key, name)
+    return config, key
+
+
+def resolve_model(name=None):
+    """
+    Modelo para las herramientas de línea de comandos (opción --model): el
+    registrado con ese nombre y sus opciones por defecto, o sin nombre el
+    configurado, el mismo que usa analyze_matchup en el dashboard.
+    """
+    return build_model(name) if name else get_prediction_model()
+
+
+def get_prediction_model(path=None):
+    """Devuelve el modelo de predicción configurado (compartido en el proceso)."""
+    config, key = load_model_config(path)
+    with _active_lock:
+        entry = _active_models.get(path)
+        if entry is None or entry[0] != key:
+            try:
+                model = build_model(config.get('model', DEFAULT_MODEL_CONFIG['model']), config.get('options'))
+            except (ValueError, TypeError) as e:
+                print(f"Error creando el modelo de predicción: {e}. Se usa el modelo por defecto.")
+                model = build_model(DEFAULT_MODEL_CONFIG['model'], DEFAULT_MODEL_CONFIG.get('options'))
+            entry = (key, model)
+            _active_models[path] = entry
+        return entry[1]
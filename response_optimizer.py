@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Optimización de las respuestas JSON de Dash.
+
+Las figuras de los callbacks viajaban con la precisión completa de float64 y
+sin comprimir. Este módulo se engancha al servidor Flask de Dash
+(after_request) y, para las respuestas de /_dash-update-component:
+
+- Redondea los números a DECIMALS decimales (con al menos
+  SIGNIFICANT_DIGITS cifras significativas para los valores pequeños)
+  mientras lee el JSON; el dashboard nunca muestra más de dos decimales.
+- Mueve a la plantilla de la figura (layout.template) las propiedades que se
+  repiten idénticas en todos los elementos de layout.images, annotations y
+  shapes, y los estilos (marker, line, textfont...) repetidos en todas las
+  trazas de un mismo tipo. Plotly aplica la plantilla a cada elemento, así
+  que el resultado es el mismo con una sola copia de cada estilo.
+- Escribe el JSON sin espacios.
+
+Las respuestas de /_dash-update-component, /_dash-layout y
+/_dash-dependencies se comprimen con brotli (si el paquete está instalado) o
+gzip, según Accept-Encoding. Como muchas respuestas se repiten (figuras
+cacheadas, pestañas ya construidas), el resultado se guarda por hash del
+contenido original.
+
+Cada respuesta lleva el tamaño original en la cabecera X-Uncompressed-Length,
+y /_dash-response-stats devuelve los tamaños acumulados (original,
+optimizado y enviado) por salida de callback en este proceso.
+"""
+
+import collections
+import gzip
+import hashlib
+import json
+import math
+import threading
+
+import flask
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él se usa gzip
+    brotli = None
+
+DECIMALS = 4
+SIGNIFICANT_DIGITS = 6
+SHORT_NUMBER_LENGTH = 8
+
+# Las respuestas más pequeñas no compensan la compresión
+MIN_COMPRESS_BYTES = 512
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Respuestas optimizadas que se conservan por hash del contenido original
+CACHE_SIZE = 128
+
+# Mínimo de elementos con propiedades comunes para moverlas a la plantilla
+MIN_REPEATS = 3
+
+UPDATE_PATH = '/_dash-update-component'
+COMPRESSED_PATHS = (UPDATE_PATH, '/_dash-layout', '/_dash-dependencies')
+STATS_PATH = '/_dash-response-stats'
+
+LAYOUT_ARRAY_DEFAULTS = {
+    'images': 'imagedefaults',
+    'annotations': 'annotationdefaults',
+    'shapes': 'shapedefaults',
+}
+TRACE_STYLE_KEYS = ('marker', 'line', 'textfont', 'textposition', 'mode', 'opacity',
+                    'hoverlabel', 'fill', 'fillcolor')
+# Propiedades que identifican a cada elemento y no se heredan de la plantilla
+ITEM_IDENTITY_KEYS = ('name', 'templateitemname')
+
+_MISSING = object()
+
+
+def round_number(value):
+    """Redondea un número a DECIMALS decimales (o SIGNIFICANT_DIGITS cifras)."""
+    if not isinstance(value, float) or value == 0 or not math.isfinite(value):
+        return value
+    decimals = max(DECIMALS, SIGNIFICANT_DIGITS - 1 - math.floor(math.log10(abs(value))))
+    return round(value, decimals)
+
+
+def _parse_float(text):
+    # Los números cortos ya no ganan nada al redondearlos
+    if len(text) <= SHORT_NUMBER_LENGTH:
+        return float(text)
+    return round_number(float(text))
+
+
+def load_rounded(body):
+    """Lee un JSON redondeando todos sus números decimales."""
+    return json.loads(body, parse_float=_parse_float)
+
+
+def _has_list(value):
+    if isinstance(value, list):
+        return True
+    if isinstance(value, dict):
+        return any(_has_list(item) for item in value.values())
+    return False
+
+
+def _common_properties(items, keys=None):
+    """Propiedades (sin arrays de datos) con el mismo valor en todos los elementos."""
+    if len(items) < MIN_REPEATS or not all(isinstance(item, dict) for item in items):
+        return {}
+    common = {}
+    for key, value in items[0].items():
+        if key in ITEM_IDENTITY_KEYS or (keys is not None and key not in keys) or _has_list(value):
+            continue
+        if all(item.get(key, _MISSING) == value for item in items[1:]):
+            common[key] = value
+    return common
+
+
+def _merge(base, override):
+    """Mezcla recursiva de dos diccionarios; override tiene prioridad."""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def deduplicate_styles(figure):
+    """
+    Mueve a layout.template las propiedades repetidas de los elementos de
+    layout y de las trazas de un mismo tipo (modifica la figura).
+    """
+    layout = figure.setdefault('layout', {})
+    template = layout.get('template')
+    template = dict(template) if isinstance(template, dict) else {}
+    template_layout = dict(template.get('layout') or {})
+    template_data = dict(template.get('data') or {})
+    changed = False
+
+    for array_key, defaults_key in LAYOUT_ARRAY_DEFAULTS.items():
+        items = layout.get(array_key)
+        if not isinstance(items, list):
+            continue
+        common = _common_properties(items)
+        if not common:
+            continue
+        template_layout[defaults_key] = _merge(template_layout.get(defaults_key) or {}, common)
+        layout[array_key] = [{key: value for key, value in item.items() if key not in common} for item in items]
+        changed = True
+
+    traces_by_type = collections.defaultdict(list)
+    for trace in figure.get('data') or []:
+        if isinstance(trace, dict):
+            traces_by_type[trace.get('type', 'scatter')].append(trace)
+    for trace_type, traces in traces_by_type.items():
+        # Con varias entradas la plantilla se aplica por turnos a las trazas
+        entries = template_data.get(trace_type) or [{}]
+        if len(entries) != 1:
+            continue
+        common = _common_properties(traces, TRACE_STYLE_KEYS)
+        if not common:
+            continue
+        template_data[trace_type] = [_merge(entries[0], common)]
+        for trace in traces:
+            for key in common:
+                del trace[key]
+        changed = True
+
+    if changed:
+        template['layout'] = template_layout
+        template['data'] = template_data
+        layout['template'] = template
+    return figure
+
+
+def _is_figure(value):
+    return isinstance(value, dict) and isinstance(value.get('data'), list) and isinstance(value.get('layout'), dict)
+
+
+def optimize_figures(value):
+    """
+    Mueve a la plantilla los estilos repetidos de cada figura que contenga
+    una estructura JSON (respuesta de un callback). Modifica la estructura.
+    """
+    pending = [value]
+    while pending:
+        node = pending.pop()
+        if _is_figure(node):
+            deduplicate_styles(node)
+            continue
+        children = node.values() if isinstance(node, dict) else node
+        pending.extend(child for child in children if isinstance(child, (dict, list)))
+    return value
+
+
+def choose_encoding(accept_encoding):
+    """Codificación a usar según la cabecera Accept-Encoding (None: sin comprimir)."""
+    accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+class ResponseOptimizer:
+    """
+    Optimiza y comprime las respuestas JSON de Dash de un servidor Flask y
+    lleva las métricas de tamaño.
+    """
+
+    def __init__(self):
+        self._cache = collections.OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def register(self, server):
+        """Engancha el optimizador al servidor Flask y añade la ruta de métricas."""
+        server.after_request(self.process)
+        server.add_url_rule(STATS_PATH, 'dash_response_stats', self.stats_view)
+
+    def _optimize(self, body, optimize, encoding):
+        key = (hashlib.sha1(body).digest(), optimize, encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        optimized = body
+        if optimize:
+            try:
+                optimized = json.dumps(optimize_figures(load_rounded(body)), ensure_ascii=False,
+                                       separators=(',', ':')).encode('utf-8')
+            except ValueError:
+                optimized = body
+        sent = compress(optimized, encoding) if len(optimized) >= MIN_COMPRESS_BYTES else optimized
+        result = (optimized, sent, encoding if sent is not optimized else None)
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def _record(self, name, original, optimized, sent):
+        with self._lock:
+            stats = self._stats.setdefault(name, {'responses': 0, 'original_bytes': 0,
+                                                  'optimized_bytes': 0, 'sent_bytes': 0})
+            stats['responses'] += 1
+            stats['original_bytes'] += original
+            stats['optimized_bytes'] += optimized
+            stats['sent_bytes'] += sent
+
+    def process(self, response):
+        """after_request: optimiza, comprime y mide las respuestas de Dash."""
+        path = flask.request.path
+        if (path not in COMPRESSED_PATHS or response.status_code != 200 or response.direct_passthrough
+                or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+            return response
+
+        body = response.get_data()
+        optimize = path == UPDATE_PATH
+        encoding = choose_encoding(flask.request.headers.get('Accept-Encoding'))
+        optimized, sent, used_encoding = self._optimize(body, optimize, encoding)
+
+        response.set_data(sent)
+        if used_encoding:
+            response.headers['Content-Encoding'] = used_encoding
+        response.vary.add('Accept-Encoding')
+        response.headers['X-Uncompressed-Length'] = str(len(body))
+
+        name = path
+        if optimize:
+            request_json = flask.request.get_json(silent=True) or {}
+            name = request_json.get('output', path)
+        self._record(name, len(body), len(optimized), len(sent))
+        return response
+
+    def stats(self):
+        """Tamaños acumulados por salida de callback (y totales)."""
+        with self._lock:
+            outputs = {name: dict(values) for name, values in self._stats.items()}
+        totals = {key: sum(values[key] for values in outputs.values())
+                  for key in ('responses', 'original_bytes', 'optimized_bytes', 'sent_bytes')}
+        return {'outputs': outputs, 'totals': totals}
+
+    def stats_view(self):
+        return flask.jsonify(self.stats())
+
+
+# Instancia compartida por el dashboard
+_response_optimizer = None
+_response_optimizer_lock = threading.Lock()
+
+
+def get_response_optimizer():
+    """Devuelve la instancia compartida de ResponseOptimizer, creándola la primera vez."""
+    global _response_optimizer
+    with _response_optimizer_lock:
+        if _response_optimizer is None:
+            _response_optimizer = ResponseOptimizer()
+        return _response_optimizer
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Utilidades para leer el calendario de partidos.
+
+El calendario (cache/nba_schedule.json, tal como lo guarda
+get_schedule_data, o cualquier archivo JSON / JSONL con los mismos campos) se
+recorre partido a partido sin cargarlo entero en memoria.
+
+Este módulo no depende de ningún otro módulo del proyecto, así que lo pueden
+importar tanto los modelos (elo.py) como los scripts que los usan
+(batch_predict.py, backtest.py, season_simulator.py) sin imports circulares.
+"""
+
+import json
+import os
+
+DEFAULT_SCHEDULE_PATH = os.path.join('cache', 'nba_schedule.json')
+READ_BLOCK_SIZE = 1 << 16
+
+
+def _iter_json_array(f):
+    """Recorre un array JSON elemento a elemento leyendo por bloques."""
+    decoder = json.JSONDecoder()
+    buffer = f.read(READ_BLOCK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("El calendario debe ser un array JSON o un archivo JSONL")
+    buffer = buffer[1:]
+    eof = False
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        if buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield item
+                buffer = buffer[end:]
+                continue
+        if eof:
+            raise ValueError("Array JSON sin cerrar en el calendario")
+        more = f.read(READ_BLOCK_SIZE)
+        eof = not more
+        buffer += more
+
+
+def iter_schedule(path):
+    """
+    Partidos de un archivo de calendario, uno a uno.
+
+    Acepta un array JSON (el formato de cache/nba_schedule.json) o JSONL (un
+    partido por línea).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+
+def game_key(game):
+    """Identificador único de un partido (game_id, o fecha y equipos si no lo tiene)."""
+    return str(game.get('game_id') or f"{game.get('gameDate', '')}_{game.get('homeTeam', '')}_{game.get('awayTeam', '')}")
+
+
+def is_final(game):
+    """True si el partido ya terminó (gameStatusText 'Final', 'Final/OT'...)."""
+    return str(game.get('status', '')).strip().lower().startswith('final')
+
+
+def is_regular_season(game):
+    """
+    True si el partido es de temporada regular. Los game_id oficiales empiezan
+    por 002 en temporada regular; los partidos de muestra usan gameLabel.
+    """
+    game_id = str(game.get('game_id', ''))
+    if game_id[:3].isdigit():
+        return game_id.startswith('002')
+    return game.get('gameLabel', 'Regular Season') in ('', 'Regular Season')
+
+
+def is_playoff(game):
+    """True si el partido es de playoffs (game_id oficial que empieza por 004)."""
+    return str(game.get('game_id', '')).startswith('004')
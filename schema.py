@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Esquema canónico del conjunto de datos de equipos.
+
+La unión de LeagueDashTeamStats y TeamEstimatedMetrics por TEAM_ID produce
+columnas duplicadas con sufijos (TEAM_NAME_x/TEAM_NAME_y, GP_x/GP_y, ...).
+canonicalize() las elimina, deja un único nombre por estadística y aplica
+tipos compactos:
+
+- int8 para las columnas *_RANK (valores de 1 a 30)
+- int16 para partidos, victorias y derrotas
+- float32 en lugar del entero si a la columna le falta algún valor (los
+  enteros de NumPy no admiten NaN)
+- float32 para promedios, porcentajes y ratings
+- category para los nombres de equipo
+
+Además declara la semántica de cada estadística (si un valor mayor es mejor).
+"""
+
+import pandas as pd
+
+# Columnas que ambos endpoints devuelven con los mismos valores: se conserva
+# la de las estadísticas básicas (_x) y se descarta la duplicada (_y)
+DUPLICATED_COLUMNS = ['TEAM_NAME', 'GP', 'W', 'L', 'W_PCT',
+                      'GP_RANK', 'W_RANK', 'L_RANK', 'W_PCT_RANK']
+
+# Columnas con el mismo nombre pero distinto significado en el endpoint
+# avanzado (MIN son minutos totales, no por partido): se renombran con el
+# prefijo E_ que usa TeamEstimatedMetrics
+ADVANCED_PREFIX = 'E_'
+
+# Estadísticas en las que un valor menor es mejor
+LOWER_IS_BETTER = {'L', 'TOV', 'BLKA', 'PF', 'E_DEF_RATING', 'E_TM_TOV_PCT'}
+
+# Estadísticas descriptivas, sin una dirección "mejor"
+NEUTRAL_STATS = {'TEAM_ID', 'TEAM_NAME', 'GP', 'MIN', 'E_MIN', 'E_PACE', 'FGA', 'FG3A', 'FTA'}
+
+# Tipos explícitos por columna (las *_RANK se resuelven por sufijo)
+COLUMN_DTYPES = {
+    'TEAM_ID': 'int32',
+    'TEAM_NAME': 'category',
+    'GP': 'int16',
+    'W': 'int16',
+    'L': 'int16',
+}
+
+
+def column_dtype(column):
+    """Tipo compacto de una columna canónica (None si no se conoce)."""
+    if column in COLUMN_DTYPES:
+        return COLUMN_DTYPES[column]
+    if column.endswith('_RANK'):
+        return 'int8'
+    return None
+
+
+def higher_is_better(column):
+    """
+    Indica si un valor mayor de la estadística es mejor.
+
+    Returns:
+        True o False, o None para columnas descriptivas. En los rankings
+        (*_RANK) el 1 es el mejor, así que siempre devuelve False.
+    """
+    if column.endswith('_RANK'):
+        return False
+    if column in NEUTRAL_STATS:
+        return None
+    return column not in LOWER_IS_BETTER
+
+
+def is_lower_better(column):
+    """Atajo para las comparaciones: True sólo si un valor menor es mejor."""
+    return higher_is_better(column) is False
+
+
+def canonical_name(column):
+    """Nombre canónico de una columna resultante de la unión (_x/_y)."""
+    if column.endswith('_x'):
+        return column[:-2]
+    if column.endswith('_y'):
+        base = column[:-2]
+        return None if base in DUPLICATED_COLUMNS else ADVANCED_PREFIX + base
+    return column
+
+
+def canonicalize(df):
+    """
+    Convierte un DataFrame combinado al esquema canónico.
+
+    Es idempotente: aplicado sobre un DataFrame ya canónico sólo verifica tipos.
+
+    Args:
+        df: DataFrame con las estadísticas combinadas
+
+    Returns:
+        Nuevo DataFrame sin columnas duplicadas y con tipos compactos (las
+        columnas enteras con valores ausentes quedan como float32)
+    """
+    renames = {}
+    keep = []
+    for column in df.columns:
+        name = canonical_name(column)
+        if name is None:
+            continue
+        keep.append(column)
+        if name != column:
+            renames[column] = name
+
+    result = df[keep].rename(columns=renames)
+
+    dtypes = {}
+    for column in result.columns:
+        dtype = column_dtype(column)
+        if dtype is None and pd.api.types.is_float_dtype(result[column].dtype):
+            dtype = 'float32'
+        elif dtype is not None and dtype.startswith('int') and result[column].isna().any():
+            print(f"Columna {column} con valores ausentes: se guarda como float32 en lugar de {dtype}")
+            dtype = 'float32'
+        if dtype is not None and result[column].dtype != dtype:
+            dtypes[column] = dtype
+    return result.astype(dtypes) if dtypes else result
@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Simulador Monte Carlo del resto de la temporada.
+
+Toma los partidos pendientes del calendario (get_schedule_data() o un archivo
+JSON con los mismos campos), las probabilidades de victoria del modelo de
+predicción configurado (prediction_models.py, el mismo que usa
+analyze_matchup; otro con --model) y el
+balance actual de cada equipo, y juega el resto de la temporada muchas veces.
+Para cada equipo informa de la probabilidad de acabar en cada puesto de su
+conferencia, de clasificarse directamente (1-6), de jugar el play-in (7-10)
+y de llegar a los playoffs (incluido el resultado del play-in).
+
+El balance de partida y los partidos pendientes tienen que ser coherentes:
+si el calendario trae resultados (partidos terminados), el balance se cuenta
+a partir de ellos; si no, se usa el W/L del CSV de estadísticas y sólo se
+simulan los partidos posteriores a la fecha de esos datos (estimada a partir
+del número de partidos jugados de cada equipo, o --from-date).
+
+Las simulaciones se hacen por bloques vectorizados con NumPy y los bloques se
+reparten entre un pool de procesos. Cada bloque usa su propia semilla derivada
+de una SeedSequence, así que con --seed el resultado es idéntico sea cual sea
+el número de procesos.
+
+Uso:
+    python season_simulator.py --sims 100000 --seed 42
+    python season_simulator.py --from-date 2025-02-01 --output playoff_odds.csv
+"""
+
+import argparse
+import datetime
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DEFAULT_CSV_PATH, get_team_stats
+from prediction_models import get_prediction_model, resolve_model
+from schedule_utils import is_final, is_regular_season
+from team_registry import get_registry
+
+DEFAULT_SIMULATIONS = 100_000
+DEFAULT_CHUNK_SIZE = 5_000
+
+# Conferencias por abreviatura oficial
+CONFERENCES = {
+    'East': ['ATL', 'BOS', 'BKN', 'CHA', 'CHI', 'CLE', 'DET', 'IND',
+             'MIA', 'MIL', 'NYK', 'ORL', 'PHI', 'TOR', 'WAS'],
+    'West': ['DAL', 'DEN', 'GSW', 'HOU', 'LAC', 'LAL', 'MEM', 'MIN',
+             'NOP', 'OKC', 'PHX', 'POR', 'SAC', 'SAS', 'UTA'],
+}
+
+# Puestos por conferencia: 1-6 directos a playoffs, 7-10 play-in
+DIRECT_PLAYOFF_SEEDS = 6
+PLAY_IN_SEEDS = (7, 8, 9, 10)
+
+
+# Partidos de temporada regular por equipo
+SEASON_GAMES = 82
+
+
+def _score(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def remaining_games(schedule, registry, from_date=None):
+    """
+    Partidos de temporada regular que faltan por jugar.
+
+    Args:
+        schedule: Iterable de partidos con gameDate, homeTeam, awayTeam y status
+        registry: TeamRegistry para traducir nombres a filas
+        from_date: Si se indica ('YYYY-MM-DD'), sólo cuentan los partidos de esa
+            fecha en adelante
+
+    Returns:
+        Tupla (filas_locales, filas_visitantes) como arrays de enteros
+    """
+    home_rows, away_rows = [], []
+    unknown = set()
+    for game in schedule:
+        if is_final(game) or not is_regular_season(game):
+            continue
+        if from_date and game.get('gameDate', '') < from_date:
+            continue
+        home = registry.row(game.get('homeTeam'))
+        away = registry.row(game.get('awayTeam'))
+        if home is None or away is None:
+            unknown.update(name for name, row in ((game.get('homeTeam'), home), (game.get('awayTeam'), away))
+                           if row is None)
+            continue
+        home_rows.append(home)
+        away_rows.append(away)
+    if unknown:
+        print(f"Equipos no reconocidos en el calendario (partidos omitidos): {', '.join(sorted(map(str, unknown)))}")
+    return np.array(home_rows, dtype=np.intp), np.array(away_rows, dtype=np.intp)
+
+
+def schedule_record(schedule, registry):
+    """
+    Balance de cada equipo según los partidos de temporada regular terminados
+    del calendario (los que tienen marcador).
+
+    Returns:
+        Tupla (victorias, derrotas) como arrays de enteros por fila del registro
+    """
+    wins = np.zeros(len(registry), dtype=np.int64)
+    losses = np.zeros(len(registry), dtype=np.int64)
+    for game in schedule:
+        if not is_final(game) or not is_regular_season(game):
+            continue
+        home = registry.row(game.get('homeTeam'))
+        away = registry.row(game.get('awayTeam'))
+        home_score, away_score = _score(game.get('homeScore')), _score(game.get('awayScore'))
+        if home is None or away is None or home_score is None or away_score is None or home_score == away_score:
+            continue
+        winner, loser = (home, away) if home_score > away_score else (away, home)
+        wins[winner] += 1
+        losses[loser] += 1
+    return wins, losses
+
+
+def stats_cutoff_date(schedule, registry, played):
+    """
+    Fecha estimada de los datos de estadísticas: la mediana, entre los
+    equipos, de la fecha de su partido número `played` en el calendario.
+
+    Args:
+        played: Partidos jugados por cada equipo según las estadísticas (W + L)
+
+    Returns:
+        Fecha 'YYYY-MM-DD', o None si no se puede estimar
+    """
+    dates = [[] for _ in range(len(registry))]
+    for game in schedule:
+        if not is_regular_season(game):
+            continue
+        for team in (game.get('homeTeam'), game.get('awayTeam')):
+            row = registry.row(team)
+            if row is not None:
+                dates[row].append(game.get('gameDate', ''))
+    cutoffs = []
+    for row, team_dates in enumerate(dates):
+        count = int(played[row])
+        if count > 0 and team_dates:
+            team_dates.sort()
+            cutoffs.append(team_dates[min(count, len(team_dates)) - 1])
+    if not cutoffs:
+        return None
+    cutoffs.sort()
+    return cutoffs[len(cutoffs) // 2]
+
+
+def season_baseline(schedule, registry, from_date=None):
+    """
+    Balance de partida y partidos pendientes, coherentes entre sí.
+
+    Si el calendario tiene partidos terminados, el balance sale de ellos y se
+    simulan los que no han terminado. Si no, el balance es el W/L de las
+    estadísticas y sólo se simulan los partidos posteriores a la fecha
+    estimada de esos datos (o desde from_date, si se indica). Se avisa de los
+    equipos cuyo balance más partidos pendientes supera SEASON_GAMES.
+
+    Returns:
+        Tupla (victorias, derrotas, filas_locales, filas_visitantes)
+    """
+    schedule = list(schedule)
+    wins, losses = schedule_record(schedule, registry)
+    if (wins + losses).any():
+        print(f"Balance calculado con los {int(wins.sum())} partidos terminados del calendario")
+    else:
+        wins = np.asarray(registry.column('W'), dtype=np.int64)
+        losses = np.asarray(registry.column('L'), dtype=np.int64)
+        if from_date is None:
+            cutoff = stats_cutoff_date(schedule, registry, wins + losses)
+            if cutoff:
+                from_date = (datetime.date.fromisoformat(cutoff) + datetime.timedelta(days=1)).isoformat()
+                print(f"Calendario sin resultados: balance de las estadísticas, partidos desde {from_date}")
+
+    home_rows, away_rows = remaining_games(schedule, registry, from_date)
+    remaining = np.bincount(home_rows, minlength=len(registry)) + np.bincount(away_rows, minlength=len(registry))
+    over = np.flatnonzero(wins + losses + remaining > SEASON_GAMES)
+    if len(over):
+        teams = ', '.join(f"{registry.names[row]} ({wins[row]}-{losses[row]} + {remaining[row]})" for row in over)
+        print(f"Aviso: balance más partidos pendientes supera {SEASON_GAMES} partidos: {teams}")
+    return wins, losses, home_rows, away_rows
+
+
+def conference_rows(registry):
+    """Filas del registro de cada conferencia: {'East': array, 'West': array}."""
+    rows = {}
+    for conference, abbreviations in CONFERENCES.items():
+        rows[conference] = np.array([registry.row(abbr) for abbr in abbreviations
+                                     if registry.row(abbr) is not None], dtype=np.intp)
+    return rows
+
+
+def _simulate_chunk(seed_sequence, runs, base_wins, home_rows, away_rows, home_prob, conferences):
+    """
+    Simula `runs` temporadas completas.
+
+    Returns:
+        Tupla (conteo_puestos (equipos x 15), conteo_playoffs, suma_victorias)
+    """
+    rng = np.random.default_rng(seed_sequence)
+    n_teams = len(base_wins)
+    n_games = len(home_rows)
+
+    # Resultado de todos los partidos pendientes: una fila por simulación
+    game_prob = home_prob[home_rows, away_rows] / 100
+    home_won = (rng.random((runs, n_games)) < game_prob).astype(np.float32)
+
+    # Matrices de incidencia partido -> equipo para sumar victorias con un producto
+    home_incidence = np.zeros((n_games, n_teams), dtype=np.float32)
+    away_incidence = np.zeros((n_games, n_teams), dtype=np.float32)
+    home_incidence[np.arange(n_games), home_rows] = 1
+    away_incidence[np.arange(n_games), away_rows] = 1
+    wins = base_wins + home_won @ home_incidence + (1 - home_won) @ away_incidence
+
+    max_seeds = max(len(rows) for rows in conferences.values())
+    seed_counts = np.zeros((n_teams, max_seeds), dtype=np.int64)
+    playoff_counts = np.zeros(n_teams, dtype=np.int64)
+
+    for rows in conferences.values():
+        # Desempate aleatorio: el ruido (< 0.5) nunca altera el orden entre
+        # equipos con distinto número de victorias
+        keys = wins[:, rows] + rng.random((runs, len(rows))) * 0.5
+        standings = rows[np.argsort(-keys, axis=1)]  # standings[r, k] = equipo en el puesto k+1
+
+        for k in range(len(rows)):
+            seed_counts[:, k] += np.bincount(standings[:, k], minlength=n_teams)
+        for k in range(DIRECT_PLAYOFF_SEEDS):
+            playoff_counts += np.bincount(standings[:, k], minlength=n_teams)
+
+        if len(rows) < max(PLAY_IN_SEEDS):
+            continue
+        seventh, eighth, ninth, tenth = (standings[:, seed - 1] for seed in PLAY_IN_SEEDS)
+        # 7 contra 8: el ganador es el séptimo; el perdedor juega contra el
+        # ganador del 9 contra 10 por el octavo puesto (el mejor clasificado en casa)
+        seventh_won = rng.random(runs) < home_prob[seventh, eighth] / 100
+        seed7 = np.where(seventh_won, seventh, eighth)
+        loser_7_8 = np.where(seventh_won, eighth, seventh)
+        winner_9_10 = np.where(rng.random(runs) < home_prob[ninth, tenth] / 100, ninth, tenth)
+        seed8 = np.where(rng.random(runs) < home_prob[loser_7_8, winner_9_10] / 100, loser_7_8, winner_9_10)
+        playoff_counts += np.bincount(seed7, minlength=n_teams)
+        playoff_counts += np.bincount(seed8, minlength=n_teams)
+
+    return seed_counts, playoff_counts, wins.sum(axis=0, dtype=np.float64)
+
+
+def simulate_season(registry, home_rows, away_rows, simulations=DEFAULT_SIMULATIONS, seed=None,
+                    workers=None, chunk_size=DEFAULT_CHUNK_SIZE, record=None, model=None):
+    """
+    Simula el resto de la temporada.
+
+    Args:
+        registry: TeamRegistry con las columnas W y L actuales
+        home_rows, away_rows: Partidos pendientes (ver remaining_games)
+        simulations: Número de temporadas simuladas
+        seed: Semilla para resultados reproducibles (None = aleatoria)
+        workers: Procesos del pool (None = uno por CPU, 1 = sin pool)
+        chunk_size: Simulaciones por bloque (no depende del número de procesos)
+        record: Balance de partida (victorias, derrotas) por fila; por defecto
+            las columnas W y L del registro (ver season_baseline)
+        model: PredictionModel (por defecto, el configurado para el dashboard)
+
+    Returns:
+        DataFrame con una fila por equipo: balance actual, victorias esperadas,
+        probabilidad (%) de cada puesto y de top 6, play-in y playoffs
+    """
+    model = model or get_prediction_model()
+    home_prob = np.asarray(model.filled_matrix(registry))
+    if record is None:
+        record = (registry.column('W'), registry.column('L'))
+    base_wins = np.asarray(record[0], dtype=np.float32)
+    conferences = conference_rows(registry)
+
+    chunks = [chunk_size] * (simulations // chunk_size)
+    if simulations % chunk_size:
+        chunks.append(simulations % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = [(seed_sequence, runs, base_wins, home_rows, away_rows, home_prob, conferences)
+             for seed_sequence, runs in zip(seeds, chunks)]
+
+    if workers == 1 or len(tasks) == 1:
+        results = [_simulate_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_simulate_chunk, *zip(*tasks)))
+
+    seed_counts = sum(result[0] for result in results)
+    playoff_counts = sum(result[1] for result in results)
+    wins_sum = sum(result[2] for result in results)
+
+    team_conference = {}
+    for conference, rows in conferences.items():
+        for row in rows:
+            team_conference[row] = conference
+
+    summary = pd.DataFrame({
+        'TEAM_NAME': registry.names,
+        'CONFERENCE': [team_conference.get(row, '') for row in range(len(registry))],
+        'W': np.asarray(record[0]).astype(int),
+        'L': np.asarray(record[1]).astype(int),
+        'REMAINING': np.bincount(home_rows, minlength=len(registry)) + np.bincount(away_rows, minlength=len(registry)),
+        'PROJ_W': wins_sum / simulations,
+    })
+    seed_pct = seed_counts / simulations * 100
+    for k in range(seed_pct.shape[1]):
+        summary[f'SEED_{k + 1}'] = seed_pct[:, k]
+    summary['TOP6_PCT'] = seed_pct[:, :DIRECT_PLAYOFF_SEEDS].sum(axis=1)
+    summary['PLAY_IN_PCT'] = seed_pct[:, min(PLAY_IN_SEEDS) - 1:max(PLAY_IN_SEEDS)].sum(axis=1)
+    summary['PLAYOFF_PCT'] = playoff_counts / simulations * 100
+    return summary.sort_values(['CONFERENCE', 'PLAYOFF_PCT', 'PROJ_W'], ascending=[True, False, False]).reset_index(drop=True)
+
+
+def load_schedule(path=None):
+    """Calendario desde un archivo JSON, o desde get_schedule_data() del dashboard."""
+    if path:
+        with open(path, 'r') as f:
+            return json.load(f)
+    from dashboard import get_schedule_data
+    return get_schedule_data()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación Monte Carlo del resto de la temporada NBA")
+    parser.add_argument('--sims', type=int, default=DEFAULT_SIMULATIONS, help="Temporadas simuladas")
+    parser.add_argument('--seed', type=int, default=None, help="Semilla para resultados reproducibles")
+    parser.add_argument('--workers', type=int, default=None, help="Procesos (por defecto, uno por CPU)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Simulaciones por bloque")
+    parser.add_argument('--from-date', default=None,
+                        help="Sólo simular partidos desde esta fecha (YYYY-MM-DD)")
+    parser.add_argument('--schedule', default=None,
+                        help="Archivo JSON de calendario (por defecto, el del dashboard)")
+    parser.add_argument('--stats', default=DEFAULT_CSV_PATH, help="CSV de estadísticas completas")
+    parser.add_argument('--model', default=None,
+                        help="Modelo de predicción (por defecto, el configurado para el dashboard)")
+    parser.add_argument('--output', default=None, help="Guardar los resultados en un CSV")
+    args = parser.parse_args()
+
+    df = get_team_stats(args.stats)
+    if df.empty:
+        return
+    registry = get_registry(df)
+    wins, losses, home_rows, away_rows = season_baseline(load_schedule(args.schedule), registry, args.from_date)
+    print(f"Partidos pendientes: {len(home_rows)}")
+
+    start = datetime.datetime.now()
+    summary = simulate_season(registry, home_rows, away_rows, args.sims, args.seed, args.workers, args.chunk_size,
+                              record=(wins, losses), model=resolve_model(args.model))
+    elapsed = (datetime.datetime.now() - start).total_seconds()
+    print(f"{args.sims} temporadas simuladas en {elapsed:.1f}s")
+
+    columns = ['TEAM_NAME', 'W', 'L', 'PROJ_W', 'SEED_1', 'TOP6_PCT', 'PLAY_IN_PCT', 'PLAYOFF_PCT']
+    for conference, group in summary.groupby('CONFERENCE'):
+        print(f"\nConferencia {conference}")
+        print(group[columns].to_string(index=False, float_format=lambda value: f"{value:.1f}"))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        summary.to_csv(args.output, index=False, float_format='%.4f')
+        print(f"\nResultados guardados en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
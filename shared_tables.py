@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tablas de sólo lectura compartidas entre los workers de gunicorn.
+
+Con 'gunicorn --workers=3' cada worker tenía su propia copia del DataFrame,
+de la matriz de equipos y de las tablas derivadas. Este módulo guarda la
+matriz del registro de equipos y las tablas derivadas registradas como
+archivos .npy en un directorio versionado junto al CSV:
+
+    <csv>.shared/<clave de versión>[-<hash de las tablas>]/
+        meta.json        (se escribe al final: marca el directorio como completo)
+        matrix.npy       (equipos x columnas numéricas, float64)
+        <tabla>.npy      (tablas derivadas registradas con register_table)
+
+Las tablas derivadas son las de matchup_engine.py (todas las matrices de
+enfrentamientos), league_norms.py y correlations.py: cada módulo la registra
+al importarse, y get_matchup_matrix, get_league_norms y
+get_correlation_service la leen de snapshot.tables (registry.tables) en
+lugar de recalcularla en cada worker.
+
+Todos los procesos abren los archivos con memory-map, así que el sistema
+operativo mantiene una única copia física en la caché de páginas. El master
+de gunicorn las construye al precargar la aplicación (preload_app, ver
+gunicorn.conf.py); tras una recarga del CSV, el primer worker que la detecta
+construye la versión nueva y el resto la mapean.
+
+Procesos con distintas tablas registradas (los workers web y una herramienta
+de línea de comandos, por ejemplo) usan directorios distintos: ninguno borra
+ni reescribe los archivos que otro tiene mapeados.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from team_registry import TeamRegistry
+
+SHARED_SUFFIX = '.shared'
+SHARED_FORMAT_VERSION = 2
+
+# Versiones antiguas que se conservan (un worker puede estar aún usándolas;
+# en POSIX borrar un archivo mapeado no invalida el mapeo)
+KEEP_VERSIONS = 3
+
+# Tablas derivadas: nombre -> (función(registry) que devuelve un np.ndarray,
+# función sin argumentos con la clave de sus entradas, o None)
+_table_builders = {}
+
+
+def register_table(name, builder, key=None):
+    """
+    Registra una tabla derivada que se construye junto con la matriz de equipos.
+
+    Args:
+        name: Nombre de la tabla (nombre del archivo .npy)
+        builder: Función que recibe un TeamRegistry y devuelve un np.ndarray
+        key: Función sin argumentos que identifica las entradas de la tabla
+            aparte de los datos (p. ej. la configuración de pesos). La clave
+            se guarda al construir la tabla y shared_table() sólo la devuelve
+            mientras coincida.
+    """
+    _table_builders[name] = (builder, key)
+
+
+def shared_table(registry, name, key=None):
+    """
+    Tabla derivada compartida de un registro.
+
+    Args:
+        registry: TeamRegistry (el de una DataSnapshot con tablas compartidas)
+        name: Nombre de la tabla
+        key: Clave actual de las entradas de la tabla (ver register_table)
+
+    Returns:
+        np.ndarray mapeado en memoria, o None si el registro no tiene tablas
+        compartidas, la tabla no se construyó o se construyó con otra clave
+    """
+    tables = getattr(registry, 'tables', None)
+    return tables.table(name, key) if tables is not None else None
+
+
+def shared_root(csv_path):
+    """Directorio raíz de las tablas compartidas de un CSV."""
+    base, _ = os.path.splitext(csv_path)
+    return base + SHARED_SUFFIX
+
+
+def shared_directory_name(key):
+    """
+    Nombre del directorio de una versión para las tablas registradas en este
+    proceso: la clave de versión más un hash de los nombres de las tablas.
+    """
+    if not _table_builders:
+        return key
+    digest = hashlib.sha1(','.join(sorted(_table_builders)).encode('utf-8')).hexdigest()[:8]
+    return f"{key}-{digest}"
+
+
+class SharedTables:
+    """
+    Tablas mapeadas en memoria de una versión concreta de los datos.
+
+    Attributes:
+        key: Clave de versión (DataSnapshot.cache_key)
+        registry: TeamRegistry sobre la matriz mapeada (registry.tables es
+            este objeto)
+    """
+
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.key = meta['key']
+        self.version = meta['version']
+        matrix = np.load(os.path.join(directory, 'matrix.npy'), mmap_mode='r', allow_pickle=False)
+        self.registry = TeamRegistry.from_arrays(meta['names'], meta['team_ids'], meta['columns'], matrix)
+        self.registry.tables = self
+        self._table_keys = meta['table_keys']
+        # Todas las tablas se mapean ya: un mapeo abierto sigue siendo válido
+        # aunque luego se borre el directorio (al podar versiones antiguas)
+        self._tables = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r', allow_pickle=False)
+                        for name in meta['tables']}
+
+    def table(self, name, key=None):
+        """Tabla derivada mapeada en memoria, o None si no se construyó con esa clave."""
+        if self._table_keys.get(name) != key:
+            return None
+        return self._tables.get(name)
+
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format') != SHARED_FORMAT_VERSION:
+        return None
+    return meta
+
+
+def build_shared_tables(directory, registry, key, version):
+    """
+    Escribe la matriz de equipos y las tablas registradas en `directory`.
+
+    Se escribe en un directorio temporal que se renombra al final; si otro
+    proceso terminó antes, se conserva el suyo.
+    """
+    root = os.path.dirname(directory)
+    os.makedirs(root, exist_ok=True)
+    tmp_dir = f"{directory}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    np.save(os.path.join(tmp_dir, 'matrix.npy'), np.ascontiguousarray(registry.matrix), allow_pickle=False)
+    tables = []
+    table_keys = {}
+    for name, (builder, table_key) in _table_builders.items():
+        try:
+            table_keys[name] = table_key() if table_key is not None else None
+            table = np.ascontiguousarray(builder(registry))
+        except Exception as e:
+            print(f"Error construyendo la tabla compartida {name}: {e}")
+            continue
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), table, allow_pickle=False)
+        tables.append(name)
+
+    meta = {
+        'format': SHARED_FORMAT_VERSION,
+        'key': key,
+        'version': version,
+        'names': registry.names,
+        'team_ids': registry.team_ids,
+        'columns': registry.columns,
+        'tables': tables,
+        'table_keys': {name: table_keys[name] for name in tables},
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    try:
+        os.rename(tmp_dir, directory)
+    except OSError:
+        # Otro worker publicó la misma versión mientras tanto
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _prune_versions(root, current):
+    try:
+        entries = [os.path.join(root, name) for name in os.listdir(root)]
+    except OSError:
+        return
+    versions = sorted((path for path in entries if os.path.isdir(path) and '.tmp' not in path),
+                      key=os.path.getmtime, reverse=True)
+    for path in versions[KEEP_VERSIONS:]:
+        if os.path.basename(path) != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def open_shared_tables(csv_path, df, key, version=0):
+    """
+    Abre las tablas compartidas de una versión de los datos, construyéndolas si
+    todavía no existen.
+
+    Args:
+        csv_path: CSV de origen (las tablas se guardan junto a él)
+        df: DataFrame canónico de esa versión
+        key: Clave de versión (DataSnapshot.cache_key)
+        version: data_version del manifiesto
+
+    Returns:
+        SharedTables, o None si no se pudieron escribir (p. ej. directorio de
+        sólo lectura); en ese caso se usa una copia privada del proceso
+    """
+    root = shared_root(csv_path)
+    name = shared_directory_name(key)
+    directory = os.path.join(root, name)
+    meta = _read_meta(directory)
+    if meta is None:
+        try:
+            build_shared_tables(directory, TeamRegistry(df), key, version)
+            _prune_versions(root, name)
+        except OSError as e:
+            print(f"No se pudieron escribir las tablas compartidas {directory}: {e}")
+            return None
+        meta = _read_meta(directory)
+        if meta is None:
+            return None
+    try:
+        return SharedTables(directory, meta)
+    except OSError as e:
+        # Directorio podado por otro proceso entre la lectura y el mapeo
+        print(f"No se pudieron abrir las tablas compartidas {directory}: {e}")
+        return None
@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Registro de equipos con una matriz NumPy de estadísticas.
+
+Las rutas calientes del dashboard (análisis de equipo, comparación y
+analyze_matchup) buscaban cada equipo con un filtro booleano sobre todo el
+DataFrame (df[df['TEAM_NAME'] == equipo].iloc[0]) y luego leían los valores
+uno a uno desde una Serie de pandas. El registro precalcula:
+
+- un índice nombre / abreviatura / TEAM_ID -> fila
+- una matriz contigua (equipos x columnas numéricas) en float64
+- un mapa nombre de columna -> índice de columna
+
+La matriz es float64 para que las comparaciones y productos den exactamente
+el mismo resultado que los escalares float32 de pandas (que NumPy promueve a
+float64 al operar con floats de Python).
+"""
+
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+from nba_api.stats.static import teams as static_teams
+
+# Abreviaturas oficiales por TEAM_ID (datos estáticos incluidos en nba_api)
+TEAM_ABBREVIATIONS = {team['id']: team['abbreviation'] for team in static_teams.get_teams()}
+
+
+class TeamRecord:
+    """
+    Vista de sólo lectura de la fila de un equipo.
+
+    Se indexa por nombre de columna igual que la Serie que devolvía
+    df.iloc[...], pero cada acceso es una lectura directa de la matriz.
+    """
+
+    __slots__ = ('_registry', 'row')
+
+    def __init__(self, registry, row):
+        self._registry = registry
+        self.row = row
+
+    @property
+    def name(self):
+        return self._registry.names[self.row]
+
+    def __contains__(self, column):
+        return column in self._registry.column_index or column in ('TEAM_NAME', 'TEAM_ABBREVIATION')
+
+    def __getitem__(self, column):
+        registry = self._registry
+        index = registry.column_index.get(column)
+        if index is not None:
+            return registry.matrix[self.row, index]
+        if column == 'TEAM_NAME':
+            return registry.names[self.row]
+        if column == 'TEAM_ABBREVIATION':
+            return registry.abbreviations[self.row]
+        raise KeyError(column)
+
+    def values(self, columns):
+        """Valores de varias columnas como un array (una sola lectura de la matriz)."""
+        return self._registry.matrix[self.row, self._registry.column_indices(columns)]
+
+
+class TeamRegistry:
+    """
+    Índice de equipos sobre una matriz contigua de estadísticas.
+
+    Args:
+        df: DataFrame canónico con una fila por equipo (TEAM_ID y TEAM_NAME)
+    """
+
+    def __init__(self, df):
+        columns = [column for column in df.columns
+                   if pd.api.types.is_numeric_dtype(df[column].dtype)]
+        matrix = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float64))
+        self._set_arrays(list(df['TEAM_NAME']), list(df['TEAM_ID']), columns, matrix)
+
+    @classmethod
+    def from_arrays(cls, names, team_ids, columns, matrix):
+        """
+        Construye un registro sobre una matriz ya calculada (por ejemplo, una
+        matriz mapeada en memoria compartida por varios procesos, ver
+        shared_tables.py). La matriz no se copia.
+        """
+        registry = cls.__new__(cls)
+        registry._set_arrays(names, team_ids, columns, matrix)
+        return registry
+
+    def _set_arrays(self, names, team_ids, columns, matrix):
+        self.names = [str(name) for name in names]
+        self.team_ids = [int(team_id) for team_id in team_ids]
+        self.abbreviations = [TEAM_ABBREVIATIONS.get(team_id, '') for team_id in self.team_ids]
+
+        self.columns = list(columns)
+        self.column_index = {column: j for j, column in enumerate(self.columns)}
+        self.matrix = matrix
+        # SharedTables de la matriz compartida (la asigna shared_tables.py)
+        self.tables = None
+        if self.matrix.flags.writeable:
+            self.matrix.flags.writeable = False
+
+        # Cualquier identificador de equipo -> fila de la matriz
+        self.index = {}
+        for row, (name, team_id, abbr) in enumerate(zip(self.names, self.team_ids, self.abbreviations)):
+            self.index[name] = row
+            self.index[team_id] = row
+            self.index[str(team_id)] = row
+            if abbr:
+                self.index[abbr] = row
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, team):
+        return team in self.index
+
+    def row(self, team):
+        """Fila de un equipo (por nombre, abreviatura o TEAM_ID), o None si no existe."""
+        return self.index.get(team)
+
+    def record(self, team):
+        """TeamRecord de un equipo, o None si no existe."""
+        row = self.index.get(team)
+        return None if row is None else TeamRecord(self, row)
+
+    def column_indices(self, columns):
+        return [self.column_index[column] for column in columns]
+
+    def column(self, column):
+        """Columna completa (un valor por equipo, en el orden de self.names)."""
+        return self.matrix[:, self.column_index[column]]
+
+    def value(self, team, column):
+        """Valor de una estadística de un equipo."""
+        return self.matrix[self.index[team], self.column_index[column]]
+
+    def values(self, team, columns):
+        """Valores de varias estadísticas de un equipo como un array."""
+        return self.matrix[self.index[team], self.column_indices(columns)]
+
+
+# Registros compartidos, uno por DataFrame vivo (indexados por id del objeto)
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(df, registry=None):
+    """
+    Devuelve el registro del DataFrame indicado, construyéndolo la primera vez.
+
+    El registro se descarta automáticamente cuando el DataFrame se libera, así
+    que los DataFrames no deben modificarse en sitio después de registrarse.
+
+    Args:
+        df: DataFrame canónico
+        registry: Registro ya construido para df (se asocia en lugar de crear uno)
+    """
+    key = id(df)
+    with _registries_lock:
+        entry = _registries.get(key)
+        if registry is None and entry is not None and entry[0]() is df:
+            return entry[1]
+        if registry is None:
+            registry = TeamRegistry(df)
+        ref = weakref.ref(df, lambda _, key=key: _registries.pop(key, None))
+        _registries[key] = (ref, registry)
+        return registry
@@ -4,14 +4,16 @@ import seaborn as sns
 import os
 import numpy as np  # Añadir numpy para operaciones de ángulos
 
-# Cargar los datos combinados
-combined_stats = pd.read_csv("nba_team_complete_stats_2024_25.csv")
+from data_loader import DEFAULT_SEASON, get_team_stats
+
+# Cargar los datos combinados (desde la instantánea si está disponible)
+combined_stats = get_team_stats()
 
 def mostrar_equipos():
     """Muestra la lista de equipos disponibles para consulta"""
     print("\nEquipos disponibles:")
     # Ordenar equipos alfabéticamente para mejor visualización
-    teams = sorted(combined_stats['TEAM_NAME_x'].tolist())
+    teams = sorted(combined_stats['TEAM_NAME'].tolist())
     # Mostrar en formato de columnas para mejor visualización
     for i in range(0, len(teams), 3):
         row = teams[i:i+3]
@@ -20,7 +22,7 @@ def mostrar_equipos():
 
 def buscar_equipo(nombre_parcial):
     """Busca equipos que coincidan parcialmente con el nombre proporcionado"""
-    matches = combined_stats[combined_stats['TEAM_NAME_x'].str.contains(nombre_parcial, case=False)]
+    matches = combined_stats[combined_stats['TEAM_NAME'].str.contains(nombre_parcial, case=False)]
     if len(matches) == 0:
         print(f"No se encontraron equipos con '{nombre_parcial}' en su nombre.")
         return None
@@ -30,7 +32,7 @@ def buscar_equipo(nombre_parcial):
     else:
         # Mostrar las opciones y pedir selección
         print(f"Se encontraron {len(matches)} equipos:")
-        for i, team in enumerate(matches['TEAM_NAME_x']):
+        for i, team in enumerate(matches['TEAM_NAME']):
             print(f"{i+1}. {team}")
         try:
             choice = int(input("Seleccione un número: ")) - 1
@@ -49,8 +51,8 @@ def mostrar_estadisticas(equipo):
         return
     
     # Estadísticas básicas
-    print(f"\n===== Estadísticas de {equipo['TEAM_NAME_x']} =====")
-    print(f"Record: {int(equipo['W_x'])}-{int(equipo['L_x'])} ({equipo['W_PCT_x']:.3f})")
+    print(f"\n===== Estadísticas de {equipo['TEAM_NAME']} =====")
+    print(f"Record: {int(equipo['W'])}-{int(equipo['L'])} ({equipo['W_PCT']:.3f})")
     print(f"Puntos por partido: {equipo['PTS']:.1f} (Ranking: {int(equipo['PTS_RANK'])})")
     
     # Estadísticas de tiro
@@ -127,12 +129,12 @@ def crear_grafica_radar(equipo):
     ax.set_ylim(0, 30)
     
     # Añadir título
-    plt.title(f"Perfil de {equipo['TEAM_NAME_x']} - Temporada 2024-25", size=16, y=1.05)
+    plt.title(f"Perfil de {equipo['TEAM_NAME']} - Temporada {DEFAULT_SEASON}", size=16, y=1.05)
     
     # Guardar la figura
     plt.tight_layout()
-    plt.savefig(f"visualizaciones/{equipo['TEAM_NAME_x'].replace(' ', '_')}_radar.png", dpi=300)
-    print(f"\nGráfica de radar creada en visualizaciones/{equipo['TEAM_NAME_x'].replace(' ', '_')}_radar.png")
+    plt.savefig(f"visualizaciones/{equipo['TEAM_NAME'].replace(' ', '_')}_radar.png", dpi=300)
+    print(f"\nGráfica de radar creada en visualizaciones/{equipo['TEAM_NAME'].replace(' ', '_')}_radar.png")
     plt.close()
 
 def comparar_equipos():
@@ -155,11 +157,11 @@ def comparar_equipos():
         return
     
     # Crear tabla comparativa
-    print(f"\n===== {equipo1['TEAM_NAME_x']} vs {equipo2['TEAM_NAME_x']} =====")
+    print(f"\n===== {equipo1['TEAM_NAME']} vs {equipo2['TEAM_NAME']} =====")
     
     metricas = [
-        ("Record", f"{int(equipo1['W_x'])}-{int(equipo1['L_x'])}", f"{int(equipo2['W_x'])}-{int(equipo2['L_x'])}"),
-        ("W%", f"{equipo1['W_PCT_x']:.3f}", f"{equipo2['W_PCT_x']:.3f}"),
+        ("Record", f"{int(equipo1['W'])}-{int(equipo1['L'])}", f"{int(equipo2['W'])}-{int(equipo2['L'])}"),
+        ("W%", f"{equipo1['W_PCT']:.3f}", f"{equipo2['W_PCT']:.3f}"),
         ("Puntos/Partido", f"{equipo1['PTS']:.1f}", f"{equipo2['PTS']:.1f}"),
         ("FG%", f"{equipo1['FG_PCT']:.3f}", f"{equipo2['FG_PCT']:.3f}"),
         ("3P%", f"{equipo1['FG3_PCT']:.3f}", f"{equipo2['FG3_PCT']:.3f}"),
@@ -173,7 +175,7 @@ def comparar_equipos():
         ("Ritmo (PACE)", f"{equipo1['E_PACE']:.1f}", f"{equipo2['E_PACE']:.1f}")
     ]
     
-    print(f"{'Métrica':<20} {equipo1['TEAM_NAME_x']:<15} {equipo2['TEAM_NAME_x']:<15}")
+    print(f"{'Métrica':<20} {equipo1['TEAM_NAME']:<15} {equipo2['TEAM_NAME']:<15}")
     print("="*60)
     for metrica, valor1, valor2 in metricas:
         print(f"{metrica:<20} {valor1:<15} {valor2:<15}")
@@ -204,12 +206,12 @@ def crear_grafica_comparativa(equipo1, equipo2):
     vals2 = [equipo2[m] if 'PCT' not in m else equipo2[m]*100 for m in metricas]
     
     # Dibujar barras
-    plt.bar([i - width/2 for i in x], vals1, width, label=equipo1['TEAM_NAME_x'], color='skyblue')
-    plt.bar([i + width/2 for i in x], vals2, width, label=equipo2['TEAM_NAME_x'], color='orange')
+    plt.bar([i - width/2 for i in x], vals1, width, label=equipo1['TEAM_NAME'], color='skyblue')
+    plt.bar([i + width/2 for i in x], vals2, width, label=equipo2['TEAM_NAME'], color='orange')
     
     # Etiquetas y título
     plt.xticks(x, nombres)
-    plt.title(f"Comparación: {equipo1['TEAM_NAME_x']} vs {equipo2['TEAM_NAME_x']}", fontsize=16)
+    plt.title(f"Comparación: {equipo1['TEAM_NAME']} vs {equipo2['TEAM_NAME']}", fontsize=16)
     plt.legend()
     
     # Añadir valores sobre las barras
@@ -222,8 +224,8 @@ def crear_grafica_comparativa(equipo1, equipo2):
         plt.text(i + width/2, v + 1, valor, ha='center')
     
     # Guardar gráfica
-    team1 = equipo1['TEAM_NAME_x'].replace(' ', '_')
-    team2 = equipo2['TEAM_NAME_x'].replace(' ', '_')
+    team1 = equipo1['TEAM_NAME'].replace(' ', '_')
+    team2 = equipo2['TEAM_NAME'].replace(' ', '_')
     plt.tight_layout()
     plt.savefig(f"visualizaciones/comparacion_{team1}_vs_{team2}.png", dpi=300)
     print(f"\nGráfica comparativa creada en visualizaciones/comparacion_{team1}_vs_{team2}.png")
@@ -232,7 +234,7 @@ def crear_grafica_comparativa(equipo1, equipo2):
 def menu_principal():
     """Muestra el menú principal y maneja la selección del usuario"""
     while True:
-        print("\n===== ANALIZADOR DE ESTADÍSTICAS NBA - TEMPORADA 2024-25 =====")
+        print(f"\n===== ANALIZADOR DE ESTADÍSTICAS NBA - TEMPORADA {DEFAULT_SEASON} =====")
         print("1. Ver lista de equipos")
         print("2. Buscar estadísticas de un equipo")
         print("3. Comparar dos equipos")
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""Fixtures compartidas de las pruebas (se ejecutan desde la raíz del repositorio)."""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from data_loader import DEFAULT_CSV_PATH, load_team_stats  # noqa: E402
+from team_registry import TeamRegistry  # noqa: E402
+
+STATS_CSV = os.path.join(ROOT, DEFAULT_CSV_PATH)
+
+
+@pytest.fixture
+def stats_csv(tmp_path):
+    """Copia del CSV de estadísticas en un directorio temporal (las instantáneas se escriben junto a él)."""
+    path = tmp_path / os.path.basename(STATS_CSV)
+    shutil.copy(STATS_CSV, path)
+    return str(path)
+
+
+@pytest.fixture(scope='session')
+def team_stats(tmp_path_factory):
+    """DataFrame canónico de la temporada incluida en el repositorio."""
+    path = tmp_path_factory.mktemp('stats') / os.path.basename(STATS_CSV)
+    shutil.copy(STATS_CSV, path)
+    return load_team_stats(str(path), use_snapshot=False)
+
+
+@pytest.fixture(scope='session')
+def registry(team_stats):
+    return TeamRegistry(team_stats)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""Métricas del backtest y cruce de predicciones con los resultados."""
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import backtest, backtest_predictions, completed_games, evaluate
+from elo import EloRatings
+from matchup_engine import get_matchup_matrix
+from prediction_models import build_model
+
+
+def game(game_id, date, home, away, status='Final', home_score=None, away_score=None):
+    return {'game_id': game_id, 'gameDate': date, 'homeTeam': home, 'awayTeam': away,
+            'status': status, 'homeScore': home_score, 'awayScore': away_score}
+
+
+@pytest.fixture
+def schedule(registry):
+    names = registry.names
+    return [
+        game('0022400001', '2024-11-01', names[0], names[1], 'Final', 110, 100),
+        game('0022400002', '2024-11-02', names[2], names[3], 'Final/OT', '99', '101'),
+        game('0022400003', '2024-11-03', names[4], names[5], '7:30 pm ET'),
+        game('0022400004', '2024-11-04', names[6], 'Seattle SuperSonics', 'Final', 100, 90),
+        game('0012400005', '2024-10-10', names[7], names[8], 'Final', 95, 90),  # Pretemporada
+        game('0022400006', '2024-11-06', names[9], names[10], 'Final', None, None),
+    ]
+
+
+def test_evaluate_metrics():
+    metrics = evaluate([0.9, 0.8, 0.3, 0.5], [1, 0, 0, 1], buckets=2)
+    assert metrics['games'] == 4
+    # Con 0.5 se predice al visitante, igual que analyze_matchup
+    assert metrics['accuracy'] == pytest.approx(0.5)
+    assert metrics['brier'] == pytest.approx((0.01 + 0.64 + 0.09 + 0.25) / 4)
+    expected_log_loss = -(math.log(0.9) + math.log(0.2) + math.log(0.7) + math.log(0.5)) / 4
+    assert metrics['log_loss'] == pytest.approx(expected_log_loss)
+    assert metrics['baseline_home_accuracy'] == pytest.approx(0.5)
+    assert metrics['baseline_brier'] == pytest.approx(0.25)
+    assert [row['games'] for row in metrics['calibration']] == [1, 3]
+    assert metrics['calibration'][1]['mean_predicted'] == pytest.approx(2.2 / 3)
+
+    assert evaluate([], []) == {'games': 0}
+
+
+def test_completed_games_keeps_only_scored_known_games(registry, schedule):
+    games = completed_games(schedule, registry)
+    assert games['game_dates'] == ['2024-11-01', '2024-11-02', '2024-10-10']
+    assert list(games['home_won']) == [1.0, 0.0, 1.0]
+    assert list(games['home_rows']) == [0, 2, 7]
+
+    regular = completed_games(schedule, registry, regular_season_only=True)
+    assert regular['game_dates'] == ['2024-11-01', '2024-11-02']
+
+
+def test_backtest_uses_the_matchup_matrix(registry, schedule):
+    metrics, detail = backtest(schedule, registry, regular_season_only=True, model=build_model('heuristic'))
+    home_prob = get_matchup_matrix(registry).home_prob
+    assert metrics['games'] == len(detail) == 2
+    assert detail['home_win_prob'].tolist() == pytest.approx([home_prob[0, 1] / 100, home_prob[2, 3] / 100])
+    assert detail['home_won'].tolist() == [1, 0]
+
+
+def test_backtest_rates_elo_only_with_earlier_games(tmp_path, registry):
+    boston, miami = 'Boston Celtics', 'Miami Heat'
+    season = [game(f'00224{index:05d}', f'2024-11-{index // 2 + 1:02d}', boston, miami, 'Final', 110, 100 + index)
+              for index in range(6)]
+
+    # Ratings guardados con la temporada completa: el backtest no los usa
+    stored = EloRatings(str(tmp_path / 'stored.json'), str(tmp_path / 'stored.jsonl'))
+    stored.update(season)
+    model = build_model('elo', {'min_games': 1, 'ratings': stored})
+    _, detail = backtest(season, registry, model=model)
+
+    # Primera jornada: sin partidos anteriores, el modelo de pesos
+    home_prob = get_matchup_matrix(registry).home_prob[registry.row(boston), registry.row(miami)] / 100
+    assert detail['home_win_prob'][:2].tolist() == pytest.approx([home_prob, home_prob])
+
+    # Después, los ratings con los partidos de los días anteriores
+    earlier = EloRatings(str(tmp_path / 'earlier.json'), str(tmp_path / 'earlier.jsonl'))
+    for day in (1, 2):
+        earlier.update(season[2 * (day - 1):2 * day])
+        expected = build_model('elo', {'min_games': 1, 'ratings': earlier}).matrix(registry)
+        assert detail['home_win_prob'][2 * day:2 * day + 2].tolist() == pytest.approx(
+            [expected[registry.row(boston), registry.row(miami)] / 100] * 2)
+    assert stored.games_played[boston] == 6
+
+
+def test_backtest_predictions_joins_by_game_key(tmp_path, registry, schedule):
+    names = registry.names
+    predictions = pd.DataFrame({
+        'game_key': ['0022400001', '0022400002', '0022400003'],
+        'game_date': ['2024-11-01', '2024-11-02', '2024-11-03'],
+        'home_team': [names[0], names[2], names[4]],
+        'away_team': [names[1], names[3], names[5]],
+        'home_win_prob': [70.0, 60.0, 55.0],
+    })
+    path = tmp_path / 'predictions.csv'
+    predictions.to_csv(path, index=False)
+
+    metrics, detail = backtest_predictions(str(path), schedule)
+    assert metrics['games'] == 2
+    assert detail['home_win_prob'].tolist() == pytest.approx([0.7, 0.6])
+    assert metrics['accuracy'] == pytest.approx(0.5)
+    assert np.isclose(metrics['brier'], (0.09 + 0.36) / 2)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""Predicciones por lotes y reanudación de una ejecución interrumpida."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from batch_predict import OUTPUT_COLUMNS, completed_keys, run_batch
+
+
+@pytest.fixture
+def schedule_path(tmp_path, registry):
+    names = registry.names
+    games = [{'game_id': f'00224{index:05d}', 'gameDate': f'2025-03-{index % 28 + 1:02d}',
+              'homeTeam': names[index % 30], 'awayTeam': names[(index * 7 + 1) % 30],
+              'status': '', 'homeScore': None, 'awayScore': None}
+             for index in range(60)]
+    games.append({'game_id': '0022499999', 'gameDate': '2025-03-01',
+                  'homeTeam': 'Seattle SuperSonics', 'awayTeam': names[0], 'status': ''})
+    path = tmp_path / 'schedule.json'
+    path.write_text(json.dumps(games))
+    return str(path)
+
+
+def read_output(path):
+    return pd.read_csv(path, dtype={'game_key': str, 'game_id': str})
+
+
+def test_batch_scores_every_known_game(tmp_path, schedule_path, stats_csv):
+    output = str(tmp_path / 'predictions.csv')
+    scored, skipped = run_batch(schedule_path, output, stats_csv, workers=1, batch_size=7,
+                                model_name='heuristic')
+    assert skipped == 1
+    result = read_output(output)
+    assert list(result.columns) == OUTPUT_COLUMNS
+    assert len(result) == scored
+    assert result['game_key'].is_unique
+    assert ((result['home_win_prob'] + result['away_win_prob']).round(1) == 100).all()
+
+    # Una segunda ejecución no vuelve a puntuar nada
+    assert run_batch(schedule_path, output, stats_csv, workers=1, model_name='heuristic') == (0, 1)
+    assert len(read_output(output)) == scored
+
+
+def test_interrupted_batch_resumes_without_duplicates(tmp_path, schedule_path, stats_csv):
+    complete = str(tmp_path / 'complete.csv')
+    total, _ = run_batch(schedule_path, complete, stats_csv, workers=1, batch_size=7,
+                         model_name='heuristic')
+
+    # Ejecución interrumpida: 20 partidos escritos y la última línea a medias
+    with open(complete, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    partial = str(tmp_path / 'partial.csv')
+    with open(partial, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:21])
+        f.write(lines[21][:15])
+    assert len(completed_keys(partial)) == 20
+
+    scored, _ = run_batch(schedule_path, partial, stats_csv, workers=1, batch_size=7,
+                          model_name='heuristic')
+    assert scored == total - 20
+    pd.testing.assert_frame_equal(read_output(partial), read_output(complete))
+
+
+def test_jsonl_output_resumes(tmp_path, schedule_path, stats_csv):
+    output = str(tmp_path / 'predictions.jsonl')
+    total, _ = run_batch(schedule_path, output, stats_csv, workers=1, batch_size=10,
+                         model_name='heuristic')
+    with open(output, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    with open(output, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:5])
+        f.write(lines[5][:20])
+
+    scored, _ = run_batch(schedule_path, output, stats_csv, workers=1, model_name='heuristic')
+    assert scored == total - 5
+    with open(output, 'r', encoding='utf-8') as f:
+        keys = [json.loads(line)['game_key'] for line in f]
+    assert len(keys) == len(set(keys)) == total
+
+
+def test_parallel_batch_matches_single_process(tmp_path, schedule_path, stats_csv):
+    single = str(tmp_path / 'single.csv')
+    parallel = str(tmp_path / 'parallel.csv')
+    run_batch(schedule_path, single, stats_csv, workers=1, batch_size=5, model_name='heuristic')
+    run_batch(schedule_path, parallel, stats_csv, workers=2, batch_size=5, model_name='heuristic')
+    pd.testing.assert_frame_equal(read_output(parallel), read_output(single))
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""Ajuste de pesos: matrices de diseño, búsqueda reproducible y configuración."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import matchup_engine
+from calibrate_weights import (build_design, objective_values, predict_batch, save_config, search,
+                               split_by_date)
+from matchup_engine import DEFAULT_FACTORS, FACTOR_NAMES, MatchupMatrix, get_matchup_matrix, load_weights
+
+
+@pytest.fixture(scope='module')
+def all_pairs(registry):
+    n = len(registry)
+    home, away = np.nonzero(~np.eye(n, dtype=bool))
+    return {'home_rows': home, 'away_rows': away}
+
+
+def default_vectors(engine):
+    weights = np.array([weight for _, _, _, weight in engine.stats], dtype=np.float64)
+    factors = np.array([DEFAULT_FACTORS[name] for name in FACTOR_NAMES], dtype=np.float64)
+    return weights, factors
+
+
+def test_design_reproduces_the_engine(registry, all_pairs):
+    engine = MatchupMatrix(registry)
+    stat_keys, advantages, signs = build_design(registry, all_pairs)
+    assert stat_keys == engine.stat_keys
+    assert advantages.shape == (870, len(stat_keys))
+    assert signs.shape == (870, len(FACTOR_NAMES))
+
+    weights, factors = default_vectors(engine)
+    probabilities = predict_batch(advantages, signs, weights[None, :], factors[None, :])[:, 0]
+    expected = engine.home_prob[all_pairs['home_rows'], all_pairs['away_rows']] / 100
+    np.testing.assert_allclose(probabilities, expected, atol=1e-9)
+
+
+def test_objective_values_per_candidate():
+    probabilities = np.array([[0.8, 0.5], [0.4, 0.5]])
+    outcomes = np.array([1.0, 0.0])
+    np.testing.assert_allclose(objective_values(probabilities, outcomes, 'brier'), [0.1, 0.25])
+    log_loss = objective_values(probabilities, outcomes)
+    assert log_loss[0] == pytest.approx(-(np.log(0.8) + np.log(0.6)) / 2)
+    assert log_loss[1] == pytest.approx(np.log(2))
+
+
+def test_seeded_search_is_identical_for_any_worker_count(registry, all_pairs):
+    engine = MatchupMatrix(registry)
+    _, advantages, signs = build_design(registry, all_pairs)
+    # Resultados sintéticos: gana el local si su tasa de victorias es mayor
+    w_pct = registry.column('W_PCT')
+    outcomes = (w_pct[all_pairs['home_rows']] > w_pct[all_pairs['away_rows']]).astype(np.float64)
+    weights, factors = default_vectors(engine)
+
+    results = [search(advantages, signs, outcomes, weights, factors, candidates=600, rounds=2,
+                      seed=3, workers=workers, chunk_size=100)
+               for workers in (1, 2)]
+    assert results[0][0] == results[1][0]
+    np.testing.assert_array_equal(results[0][1], results[1][1])
+    np.testing.assert_array_equal(results[0][2], results[1][2])
+
+    initial = objective_values(predict_batch(advantages, signs, weights[None, :], factors[None, :]), outcomes)[0]
+    assert results[0][0] <= initial
+    assert (results[0][2] >= 0).all()
+
+
+def test_split_by_date_holds_out_the_latest_games():
+    games = {'game_dates': ['2024-12-01', '2024-11-01', '2025-01-01', '2024-10-01', '2024-11-15']}
+    train, validation = split_by_date(games, 0.4)
+    assert sorted(validation) == [0, 2]
+    assert sorted(train) == [1, 3, 4]
+    train, validation = split_by_date(games, 0)
+    assert len(train) == 5 and len(validation) == 0
+
+
+def test_saved_config_is_versioned_and_reloaded(tmp_path, monkeypatch, registry):
+    path = str(tmp_path / 'matchup_weights.json')
+    monkeypatch.setattr(matchup_engine, 'DEFAULT_WEIGHTS_PATH', path)
+    default_matrix = get_matchup_matrix(registry)
+    assert load_weights()[2] is None
+
+    assert save_config(path, {'PTS': 5.0}, {'home_court': 0.0}, {'method': 'random'}) == 1
+    assert save_config(path, {'PTS': 6.0}, {'home_court': 0.0}, {'method': 'grid'}) == 2
+    assert sorted(os.listdir(tmp_path / 'matchup_weights_history')) == ['v1.json', 'v2.json']
+    with open(path) as f:
+        assert json.load(f)['method'] == 'grid'
+
+    stat_categories, factors, key = load_weights()
+    assert key is not None
+    assert factors['home_court'] == 0.0 and factors['momentum'] == DEFAULT_FACTORS['momentum']
+    assert {key: weight for stats in stat_categories.values() for key, _, weight in stats}['PTS'] == 6.0
+
+    # La matriz se recalcula con la nueva configuración
+    fitted_matrix = get_matchup_matrix(registry)
+    assert fitted_matrix is not default_matrix
+    assert fitted_matrix.factors['home_court'] == 0.0
+    assert get_matchup_matrix(registry) is fitted_matrix
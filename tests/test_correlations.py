@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""Correlaciones precalculadas frente a DataFrame.corr."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from correlations import correlation_frame, correlation_matrix, get_correlation_service
+
+
+def test_matches_pandas_without_missing_values(team_stats):
+    columns = ['PTS', 'AST', 'REB', 'E_NET_RATING', 'W_PCT']
+    expected = team_stats[columns].astype(np.float64).corr()
+    pd.testing.assert_frame_equal(correlation_frame(team_stats, columns), expected, atol=1e-12, rtol=0)
+
+
+def test_matches_pandas_with_missing_values():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame(rng.normal(size=(200, 6)), columns=list('abcdef'))
+    df['b'] += df['a']
+    df = df.mask(rng.random(df.shape) < 0.2)
+    df.loc[:5, 'f'] = np.nan
+    pd.testing.assert_frame_equal(correlation_frame(df), df.corr(), atol=1e-12, rtol=0)
+
+
+def test_degenerate_columns_are_nan():
+    values = np.array([[1.0, 5.0, np.nan], [2.0, 5.0, 1.0], [3.0, 5.0, np.nan]])
+    corr = correlation_matrix(values)
+    assert corr[0, 0] == pytest.approx(1.0)
+    assert np.isnan(corr[0, 1])   # Columna constante
+    assert np.isnan(corr[0, 2])   # Un único par completo
+
+
+def test_service_indexes_the_full_matrix(registry, team_stats):
+    service = get_correlation_service(registry)
+    assert get_correlation_service(registry) is service
+    assert service.matrix.shape == (len(registry.columns), len(registry.columns))
+
+    columns = ['W', 'PTS', 'E_DEF_RATING']
+    frame = service.frame(columns)
+    assert list(frame.index) == columns
+    np.testing.assert_allclose(frame.to_numpy(), team_stats[columns].astype(np.float64).corr().to_numpy(),
+                               atol=1e-12)
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+
+"""Callbacks del dashboard a través del endpoint de Dash, como los llama el navegador."""
+
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import plotly.io as pio
+import pytest
+
+import dashboard
+from logo_assets import LOGO_ROUTE, LogoAssets, get_logo_assets
+
+
+@pytest.fixture(scope='module')
+def client(team_stats):
+    return dashboard.create_dashboard(team_stats).server.test_client()
+
+
+def update_component(client, outputs, inputs, changed=(), state=None):
+    """
+    POST a /_dash-update-component, como lo hace el navegador.
+
+    Args:
+        outputs: 'id.propiedad' o lista de ellas (callbacks con varias salidas)
+        inputs, state: {'id.propiedad': valor}
+    """
+    def prop(key, value=None):
+        component_id, name = key.split('.')
+        return {'id': component_id, 'property': name, 'value': value}
+
+    def props(values):
+        return [prop(key, value) for key, value in (values or {}).items()]
+
+    multi = isinstance(outputs, list)
+    output_specs = [prop(key) for key in outputs] if multi else prop(outputs)
+    for spec in (output_specs if multi else [output_specs]):
+        del spec['value']
+    return client.post('/_dash-update-component', json={
+        'output': '..' + '...'.join(outputs) + '..' if multi else outputs,
+        'outputs': output_specs,
+        'inputs': props(inputs),
+        'state': props(state),
+        'changedPropIds': list(changed),
+    })
+
+
+def output_value(response, output):
+    component_id, prop = output.split('.')
+    return response.get_json()['response'][component_id][prop]
+
+
+SCATTER_OUTPUTS = ['scatter-plot.figure', 'scatter-data.data']
+
+
+def logo_positions(figure):
+    return [value for image in figure['layout']['images'] for value in (image['x'], image['y'])]
+
+
+def scatter(client, x_axis, y_axis, request=None):
+    response = update_component(client, SCATTER_OUTPUTS, {'scatter-request.data': request},
+                                state={'x-axis.value': x_axis, 'y-axis.value': y_axis})
+    return output_value(response, 'scatter-plot.figure'), output_value(response, 'scatter-data.data')
+
+
+def remap_axes(figure, data, x_axis, y_axis):
+    """Lo mismo que SCATTER_AXES_CLIENTSIDE hace en el navegador."""
+    def fill(template):
+        return template.replace('{x_axis}', x_axis).replace('{y_axis}', y_axis)
+
+    x, y = data['columns'][x_axis], data['columns'][y_axis]
+    figure['data'][0].update(x=x, y=y, hovertemplate=fill(data['hovertemplate']))
+    figure['layout']['title']['text'] = fill(data['title'])
+    figure['layout']['xaxis']['title']['text'] = x_axis
+    figure['layout']['yaxis']['title']['text'] = y_axis
+    for image, row in zip(figure['layout']['images'], data['image_rows']):
+        image.update(x=x[row], y=y[row])
+    return figure
+
+
+def test_scatter_is_a_single_trace_with_logo_urls(client, team_stats):
+    figure, data = scatter(client, 'PTS', 'AST')
+    assert len(figure['data']) == 1
+    trace = figure['data'][0]
+    assert trace['customdata'] == team_stats['TEAM_NAME'].tolist()
+    assert trace['x'] == pytest.approx(team_stats['PTS'].tolist())
+    assert len(figure['layout']['images']) == 30
+    # URLs con el hash del contenido, no el SVG incrustado
+    assert figure['layout']['images'][0]['source'] == get_logo_assets().url('ATL')
+    assert all(image['source'].startswith(LOGO_ROUTE + '/') for image in figure['layout']['images'])
+
+    assert set(data['columns']) == {option['value'] for option in dashboard.SCATTER_AXIS_OPTIONS}
+    assert data['image_rows'] == list(range(30))
+
+
+def test_browser_remap_matches_a_full_build(client):
+    figure, data = scatter(client, 'PTS', 'AST')
+    remapped = remap_axes(figure, data, 'W', 'E_NET_RATING')
+    full, _ = scatter(client, 'PTS', 'AST', request={'x_axis': 'W', 'y_axis': 'E_NET_RATING'})
+
+    assert remapped['data'][0]['x'] == pytest.approx(full['data'][0]['x'])
+    assert remapped['data'][0]['y'] == pytest.approx(full['data'][0]['y'])
+    assert remapped['data'][0]['hovertemplate'] == full['data'][0]['hovertemplate']
+    assert remapped['layout']['title']['text'] == full['layout']['title']['text'] == "Relación entre W y E_NET_RATING"
+    assert remapped['layout']['xaxis']['title']['text'] == full['layout']['xaxis']['title']['text']
+    assert logo_positions(remapped) == pytest.approx(logo_positions(full))
+
+
+def test_axis_changes_do_not_reach_the_server(team_stats):
+    app = dashboard.create_dashboard(team_stats)
+    for entry in app.callback_map.values():
+        inputs = {(item['id'], item['property']) for item in entry['inputs']}
+        if ('x-axis', 'value') in inputs:
+            assert 'callback' not in entry
+
+
+def correlation_chart(client, columns):
+    response = update_component(client, 'correlation-chart.figure', {'correlation-columns.value': columns})
+    return output_value(response, 'correlation-chart.figure')
+
+
+def test_correlation_selection_matches_a_full_build(client, team_stats):
+    columns = ['W', 'PTS', 'E_DEF_RATING', 'AST']
+    figure = correlation_chart(client, columns)
+    full = json.loads(pio.to_json(dashboard.build_correlation_chart(team_stats, columns)))
+
+    heatmap, expected = figure['data'][0], full['data'][0]
+    assert heatmap['x'] == expected['x'] == columns
+    # Las respuestas se redondean a 6 cifras significativas (response_optimizer)
+    np.testing.assert_allclose(heatmap['z'], expected['z'], rtol=1e-5)
+    assert heatmap['texttemplate'] == expected['texttemplate'] == '%{z:.2f}'
+    # Los valores van en la capa de texto del mapa de calor, sin anotaciones
+    assert not figure['layout'].get('annotations')
+
+    default = correlation_chart(client, dashboard.CORRELATION_COLUMNS)
+    assert default['data'][0]['x'] == dashboard.CORRELATION_COLUMNS
+    assert correlation_chart(client, [])['data'] == []
+
+
+def components(tree):
+    """Componentes (dicts con type y props) de la respuesta JSON de un layout."""
+    if isinstance(tree, list):
+        for child in tree:
+            yield from components(child)
+    elif isinstance(tree, dict) and 'props' in tree:
+        yield tree
+        yield from components(tree['props'].get('children'))
+
+
+def render_tab(client, tab):
+    return update_component(client, 'tab-content.children', {'tabs.value': tab})
+
+
+def test_only_the_active_tab_is_rendered(client):
+    response = render_tab(client, 'tab-general')
+    content = output_value(response, 'tab-content.children')
+    graphs = {component['props'].get('id'): component['props'] for component in components(content)
+              if component['type'] == 'Graph'}
+    # Los gráficos que sólo dependen de los datos llegan ya construidos
+    assert {'scatter-plot', 'correlation-chart'} <= set(graphs)
+    embedded = [graph_id for graph_id, props in graphs.items() if props.get('figure')]
+    assert len(embedded) == 4
+
+    analysis = output_value(render_tab(client, 'tab-team-analysis'), 'tab-content.children')
+    ids = {component['props'].get('id') for component in components(analysis)}
+    assert 'scatter-plot' not in ids and 'team-selector' in ids
+
+    # El contenido construido se reutiliza
+    assert output_value(render_tab(client, 'tab-general'), 'tab-content.children') == content
+
+
+def test_tab_clicks_only_trigger_render_tab(team_stats):
+    app = dashboard.create_dashboard(team_stats)
+    listeners = [output for output, entry in app.callback_map.items()
+                 if any(item['id'] == 'tabs' for item in entry['inputs'])]
+    assert listeners == ['tab-content.children']
+
+
+def test_callback_responses_are_compressed(client):
+    plain = render_tab(client, 'tab-general')
+    compressed = client.post('/_dash-update-component', headers={'Accept-Encoding': 'gzip'}, json={
+        'output': 'tab-content.children',
+        'outputs': {'id': 'tab-content', 'property': 'children'},
+        'inputs': [{'id': 'tabs', 'property': 'value', 'value': 'tab-general'}],
+        'state': [],
+        'changedPropIds': [],
+    })
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(compressed.get_data())) == plain.get_json()
+
+
+def test_schedule_uses_the_current_snapshot(tmp_path, monkeypatch, team_stats):
+    import requests
+
+    def offline(*args, **kwargs):
+        raise requests.ConnectionError("sin red")
+
+    # Tras una recarga en caliente, un equipo ha cambiado de nombre
+    renamed = team_stats.assign(TEAM_NAME=team_stats['TEAM_NAME'].astype(str))
+    renamed.loc[0, 'TEAM_NAME'] = 'Seattle SuperSonics'
+    current = SimpleNamespace(snapshot=lambda: SimpleNamespace(df=renamed))
+    monkeypatch.setattr(dashboard, 'get_data_manager', lambda: current)
+    monkeypatch.setattr(requests, 'get', offline)
+    monkeypatch.chdir(tmp_path)
+
+    schedule = dashboard.get_schedule_data()
+    teams = {game['homeTeam'] for game in schedule} | {game['awayTeam'] for game in schedule}
+    assert teams <= set(renamed['TEAM_NAME'])
+    assert 'Seattle SuperSonics' in teams
+    assert team_stats.loc[0, 'TEAM_NAME'] not in teams
+
+
+def test_download_team_logo_replaces_the_file_only_on_success(tmp_path, monkeypatch):
+    (tmp_path / 'BOS.svg').write_bytes(b'<svg>old</svg>')
+    monkeypatch.setattr(dashboard, 'get_logo_assets', lambda: LogoAssets(str(tmp_path)))
+
+    def offline(*args, **kwargs):
+        raise OSError("sin red")
+
+    monkeypatch.setattr(dashboard, 'urlopen', offline)
+    assert not dashboard.download_team_logo('BOS')
+    assert (tmp_path / 'BOS.svg').read_bytes() == b'<svg>old</svg>'
+
+    monkeypatch.setattr(dashboard, 'urlopen', lambda *args, **kwargs: io.BytesIO(b'<svg>new</svg>'))
+    assert dashboard.download_team_logo('BOS')
+    assert (tmp_path / 'BOS.svg').read_bytes() == b'<svg>new</svg>'
+    assert os.listdir(tmp_path) == ['BOS.svg']
+
+
+def test_clear_logo_cache_keeps_the_logos(client, monkeypatch, capsys):
+    monkeypatch.setattr(dashboard, 'download_team_logo', lambda abbr: abbr != 'BOS')
+    threads = []
+    refresh = dashboard.refresh_team_logos
+
+    def tracked_refresh(*args, **kwargs):
+        threads.append(refresh(*args, **kwargs))
+        return threads[-1]
+
+    monkeypatch.setattr(dashboard, 'refresh_team_logos', tracked_refresh)
+    before = sorted(os.listdir('logos'))
+    response = update_component(client, 'clear-cache-output.children', {'clear-cache-button.n_clicks': 1})
+    message = output_value(response, 'clear-cache-output.children')
+    assert 'segundo plano' in message['props']['children']
+
+    threads[0].join(10)
+    assert 'no se pudieron descargar: BOS' in capsys.readouterr().out
+    assert sorted(os.listdir('logos')) == before
+    assert client.get(get_logo_assets().url('BOS')).status_code == 200
+
+
+def test_logo_refresh_returns_at_once_and_has_a_deadline(monkeypatch):
+    release = threading.Event()
+
+    def download(abbr):
+        if abbr == 'BOS':
+            release.wait(5)
+        return abbr != 'MIA'
+
+    monkeypatch.setattr(dashboard, 'download_team_logo', download)
+    results = []
+    start = time.monotonic()
+    thread = dashboard.refresh_team_logos(['ATL', 'BOS', 'MIA'], results.append, workers=2, deadline=0.3)
+    assert time.monotonic() - start < 0.2
+    # Una sola actualización a la vez
+    assert dashboard.refresh_team_logos(['ATL'], results.append) is None
+
+    thread.join(3)
+    assert time.monotonic() - start < 3
+    assert results == [['BOS', 'MIA']]
+    release.set()
+
+
+def test_logo_route_serves_svg(client):
+    response = client.get(get_logo_assets().url('BOS'))
+    assert response.status_code == 200
+    assert response.mimetype == 'image/svg+xml'
+    assert response.cache_control.immutable
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""Carga del CSV de estadísticas a través de la instantánea binaria."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+from data_loader import (get_team_stats, load_team_stats, read_snapshot, read_snapshot_meta,
+                         snapshot_path, write_snapshot)
+
+
+def test_snapshot_round_trip(tmp_path):
+    df = pd.DataFrame({
+        'TEAM_ID': np.array([1, 2, 3], dtype=np.int64),
+        'TEAM_NAME': ['A', None, 'C'],
+        'PTS': [110.5, np.nan, 108.25],
+        'PLAYOFFS': [True, False, True],
+    })
+    snapshot_dir = str(tmp_path / 'stats.snapshot')
+    write_snapshot(df, snapshot_dir)
+
+    assert read_snapshot_meta(snapshot_dir)['rows'] == 3
+    pd.testing.assert_frame_equal(read_snapshot(snapshot_dir), df)
+
+
+def test_missing_snapshot_has_no_meta(tmp_path):
+    assert read_snapshot_meta(str(tmp_path / 'missing.snapshot')) is None
+
+
+def test_load_writes_then_reads_the_snapshot(stats_csv, monkeypatch):
+    first = load_team_stats(stats_csv)
+    assert len(first) == 30
+    assert read_snapshot_meta(snapshot_path(stats_csv)) is not None
+
+    # La segunda carga no vuelve a parsear el CSV
+    def fail(*args, **kwargs):
+        raise AssertionError("se parseó el CSV con la instantánea al día")
+    monkeypatch.setattr(data_loader.pd, 'read_csv', fail)
+    second = load_team_stats(stats_csv)
+    pd.testing.assert_frame_equal(second, first)
+
+
+def test_snapshot_is_rebuilt_when_the_csv_changes(stats_csv):
+    load_team_stats(stats_csv)
+    raw = pd.read_csv(stats_csv)
+    raw.loc[0, 'PTS'] = 150.0
+    raw.to_csv(stats_csv, index=False)
+    os.utime(stats_csv, ns=(0, os.stat(stats_csv).st_mtime_ns + 1))
+
+    assert load_team_stats(stats_csv)['PTS'].iloc[0] == 150.0
+    assert read_snapshot(snapshot_path(stats_csv))['PTS'].iloc[0] == 150.0
+
+
+def test_missing_csv_gives_an_empty_frame(tmp_path):
+    assert load_team_stats(str(tmp_path / 'missing.csv')).empty
+
+
+def test_get_team_stats_shares_one_frame(stats_csv):
+    assert get_team_stats(stats_csv) is get_team_stats(stats_csv)
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""Recarga en caliente del CSV de estadísticas."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from data_manager import DataManager
+
+
+def rewrite_csv(path, change):
+    """Modifica el CSV y adelanta su mtime (algunos sistemas de archivos tienen poca resolución)."""
+    raw = pd.read_csv(path)
+    change(raw)
+    mtime_ns = os.stat(path).st_mtime_ns
+    raw.to_csv(path, index=False)
+    os.utime(path, ns=(mtime_ns, mtime_ns + 1_000_000_000))
+
+
+def test_initial_snapshot(stats_csv):
+    manager = DataManager(stats_csv, poll_interval=None)
+    snapshot = manager.snapshot()
+    assert len(snapshot.df) == 30
+    assert snapshot.registry.row('BOS') is not None
+    assert snapshot.version == 0
+    with pytest.raises(AttributeError):
+        snapshot.df = None
+
+
+def test_refresh_swaps_in_a_new_snapshot(stats_csv):
+    manager = DataManager(stats_csv, poll_interval=None)
+    old = manager.snapshot()
+    events = []
+    manager.add_listener(lambda previous, current: events.append((previous, current)))
+
+    assert not manager.refresh()
+    rewrite_csv(stats_csv, lambda raw: raw.__setitem__('PTS', raw['PTS'] + 1))
+    assert manager.refresh()
+
+    new = manager.snapshot()
+    assert new is not old
+    assert new.cache_key != old.cache_key
+    assert new.registry.value('BOS', 'PTS') == pytest.approx(old.registry.value('BOS', 'PTS') + 1)
+    # Las peticiones que guardaron la instantánea anterior siguen viendo sus datos
+    assert old.df['PTS'].iloc[0] == new.df['PTS'].iloc[0] - 1
+    assert events == [(old, new)]
+
+
+def test_snapshot_reloads_when_polling(stats_csv):
+    manager = DataManager(stats_csv, poll_interval=0)
+    old = manager.snapshot()
+    rewrite_csv(stats_csv, lambda raw: raw.__setitem__('AST', raw['AST'] * 2))
+    assert manager.snapshot() is not old
+
+
+def test_empty_or_broken_csv_keeps_the_previous_data(stats_csv):
+    manager = DataManager(stats_csv, poll_interval=None)
+    old = manager.snapshot()
+
+    rewrite_csv(stats_csv, lambda raw: raw.drop(raw.index, inplace=True))
+    assert not manager.refresh()
+    assert manager.snapshot() is old
+
+    with open(stats_csv, 'w') as f:
+        f.write('not,a\n"broken')
+    os.utime(stats_csv, ns=(0, os.stat(stats_csv).st_mtime_ns + 2_000_000_000))
+    assert not manager.refresh()
+    assert manager.snapshot() is old
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""Manifiestos de versiones y detección de equipos cambiados."""
+
+import os
+
+import pandas as pd
+
+from data_versions import (data_version, manifest_path, plan_refresh, read_manifest,
+                           teams_changed_since, write_manifest)
+
+
+def frame():
+    return pd.DataFrame({
+        'TEAM_ID': [1, 2, 3],
+        'TEAM_NAME': ['A', 'B', 'C'],
+        'PTS': [110.5, 112.0, 108.25],
+    })
+
+
+def save(df, csv_path, manifest):
+    df.to_csv(csv_path, index=False)
+    write_manifest(csv_path, manifest)
+
+
+def test_first_refresh_marks_every_team(tmp_path):
+    csv_path = str(tmp_path / 'stats.csv')
+    changed, manifest = plan_refresh(frame(), csv_path)
+    assert changed == ['1', '2', '3']
+    assert manifest['data_version'] == 1
+    assert manifest['team_versions'] == {'1': 1, '2': 1, '3': 1}
+
+
+def test_manifest_round_trip(tmp_path):
+    csv_path = str(tmp_path / 'stats.csv')
+    _, manifest = plan_refresh(frame(), csv_path)
+    save(frame(), csv_path, manifest)
+
+    assert os.path.exists(manifest_path(csv_path))
+    assert read_manifest(csv_path) == manifest
+    assert data_version(csv_path) == 1
+
+
+def test_unchanged_data_keeps_the_version(tmp_path):
+    csv_path = str(tmp_path / 'stats.csv')
+    _, manifest = plan_refresh(frame(), csv_path)
+    save(frame(), csv_path, manifest)
+
+    changed, again = plan_refresh(frame(), csv_path)
+    assert changed == []
+    assert again == manifest
+
+
+def test_changed_team_bumps_only_that_team(tmp_path):
+    csv_path = str(tmp_path / 'stats.csv')
+    _, manifest = plan_refresh(frame(), csv_path)
+    save(frame(), csv_path, manifest)
+
+    updated = frame()
+    updated.loc[1, 'PTS'] = 113.0
+    changed, manifest = plan_refresh(updated, csv_path)
+    assert changed == ['2']
+    assert manifest['data_version'] == 2
+    assert manifest['team_versions'] == {'1': 1, '2': 2, '3': 1}
+
+    save(updated, csv_path, manifest)
+    assert teams_changed_since(csv_path, 1) == [2]
+    assert teams_changed_since(csv_path, 2) == []
+
+
+def test_forced_refresh_bumps_the_version(tmp_path):
+    csv_path = str(tmp_path / 'stats.csv')
+    _, manifest = plan_refresh(frame(), csv_path)
+    save(frame(), csv_path, manifest)
+
+    changed, forced = plan_refresh(frame(), csv_path, force=True)
+    assert changed == []
+    assert forced['data_version'] == 2
+    assert forced['team_versions'] == manifest['team_versions']
+
+
+def test_missing_manifest_is_rebuilt_from_the_csv(tmp_path):
+    csv_path = str(tmp_path / 'stats.csv')
+    frame().to_csv(csv_path, index=False)
+
+    manifest = read_manifest(csv_path)
+    assert manifest['data_version'] == 0
+    assert manifest['team_versions'] == {'1': 0, '2': 0, '3': 0}
+    assert plan_refresh(frame(), csv_path)[0] == []
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+"""Actualización incremental y persistencia de los ratings Elo."""
+
+import json
+import os
+
+import pytest
+
+from elo import HOME_ADVANTAGE, INITIAL_RATING, K_FACTOR, EloRatings, expected_score, margin_multiplier
+
+BOSTON, MIAMI, UTAH = 'Boston Celtics', 'Miami Heat', 'Utah Jazz'
+
+
+def game(game_id, date, home, away, home_score=None, away_score=None, status='Final'):
+    return {'game_id': game_id, 'gameDate': date, 'homeTeam': home, 'awayTeam': away,
+            'status': status, 'homeScore': home_score, 'awayScore': away_score}
+
+
+SCHEDULE = [
+    game('0022400002', '2024-11-03', MIAMI, BOSTON, 120, 118),
+    game('0022400001', '2024-11-01', BOSTON, MIAMI, 110, 100),
+    game('0022400003', '2024-11-05', UTAH, BOSTON, '99', '101'),
+    game('0022400004', '2024-11-07', UTAH, MIAMI, status='7:30 pm ET'),
+]
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / 'elo_ratings.json'), str(tmp_path / 'elo_history.jsonl')
+
+
+def test_expected_score_and_margin():
+    assert expected_score(0) == 0.5
+    assert expected_score(400) == pytest.approx(10 / 11)
+    assert expected_score(-100) == pytest.approx(1 - expected_score(100))
+    # Ganar por mucho cuenta más, pero menos si el ganador ya era favorito
+    assert margin_multiplier(20, 0) > margin_multiplier(5, 0)
+    assert margin_multiplier(20, 200) < margin_multiplier(20, 0)
+
+
+def test_first_game_update(paths):
+    ratings = EloRatings(*paths)
+    records = ratings.update(SCHEDULE[1:2])
+    expected = expected_score(HOME_ADVANTAGE)
+    change = K_FACTOR * margin_multiplier(10, HOME_ADVANTAGE) * (1 - expected)
+    assert ratings.rating(BOSTON) == pytest.approx(INITIAL_RATING + change)
+    assert ratings.rating(MIAMI) == pytest.approx(INITIAL_RATING - change)
+    assert records[0]['home_win_prob'] == round(expected * 100, 2)
+
+
+def test_update_is_incremental_and_persistent(paths):
+    ratings = EloRatings(*paths)
+    records = ratings.update(SCHEDULE)
+    # En orden cronológico y sin el partido pendiente
+    assert [record['game_date'] for record in records] == ['2024-11-01', '2024-11-03', '2024-11-05']
+    assert ratings.games_played == {BOSTON: 3, MIAMI: 2, UTAH: 1}
+    assert sum(ratings.ratings.values()) == pytest.approx(3 * INITIAL_RATING)
+
+    # Los partidos ya procesados no se repiten
+    assert ratings.update(SCHEDULE) == []
+    assert len(ratings.history()) == 3
+    assert [record['game_date'] for record in ratings.history(UTAH)] == ['2024-11-05']
+
+    # Otra instancia (otro worker) lee el mismo estado
+    other = EloRatings(*paths)
+    assert other.ratings == pytest.approx(ratings.ratings)
+    finished = dict(SCHEDULE[3], status='Final', homeScore=105, awayScore=95)
+    other.update([finished])
+    ratings.refresh()
+    assert ratings.games_played[UTAH] == 2
+    with open(paths[0]) as f:
+        assert len(json.load(f)['processed']) == 4
+
+
+def test_rebuild_matches_incremental_updates(paths, tmp_path):
+    incremental = EloRatings(*paths)
+    for entry in sorted(SCHEDULE, key=lambda g: g['gameDate']):
+        incremental.update([entry])
+
+    rebuilt = EloRatings(str(tmp_path / 'other.json'), str(tmp_path / 'other.jsonl'))
+    rebuilt.update(SCHEDULE[:1])
+    records = rebuilt.rebuild(SCHEDULE + SCHEDULE[:1])  # Partido repetido en el calendario
+    assert len(records) == 3
+    assert rebuilt.ratings == pytest.approx(incremental.ratings)
+    assert len(rebuilt.history()) == 3
+
+
+
+def test_state_version_changes_with_each_update(paths):
+    ratings = EloRatings(*paths)
+    assert ratings.state_version is None
+    ratings.update(SCHEDULE[:1])
+    assert ratings.state_version == os.stat(paths[0]).st_mtime_ns
+
+
+def test_only_regular_season_games_between_known_teams_count(paths):
+    schedule = [
+        game('0012400001', '2024-10-10', BOSTON, MIAMI, 120, 90),             # Pretemporada
+        game('0032400001', '2025-02-16', 'Team Shaq', 'Team Chuck', 150, 140),  # All-Star
+        game('', '2024-10-12', BOSTON, 'Real Madrid', 110, 95),
+        game('0022400001', '2024-11-01', BOSTON, MIAMI, 110, 100),
+        game('0042400101', '2025-04-20', BOSTON, MIAMI, 105, 99),             # Playoffs
+    ]
+    ratings = EloRatings(*paths)
+    records = ratings.update(schedule, teams=[BOSTON, MIAMI, UTAH])
+    assert [record['game_key'] for record in records] == ['0022400001']
+    assert ratings.games_played == {BOSTON: 1, MIAMI: 1}
+
+    with_playoffs = EloRatings(paths[0] + '.playoffs', paths[1] + '.playoffs', include_playoffs=True)
+    records = with_playoffs.rebuild(schedule, teams=[BOSTON, MIAMI, UTAH])
+    assert [record['game_key'] for record in records] == ['0022400001', '0042400101']
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""Caché de figuras por versión de los datos, en memoria y en disco."""
+
+import os
+from types import SimpleNamespace
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from figure_cache import MEMORY_VERSIONS, FigureCache, figures_root
+
+
+class CountingBuilder:
+    """Gráfico de barras que cuenta cuántas veces se construye."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, df):
+        self.calls += 1
+        return go.Figure(go.Bar(x=df['TEAM_NAME'], y=df['PTS']))
+
+
+def snapshot(key, points=(110.5, 120.25)):
+    return SimpleNamespace(cache_key=key, df=pd.DataFrame({'TEAM_NAME': ['A', 'B'], 'PTS': list(points)}))
+
+
+def test_figures_root():
+    assert figures_root(os.path.join('data', 'nba_team_stats.csv')) == os.path.join('data', 'nba_team_stats.figures')
+
+
+def test_figure_is_built_once_per_version(tmp_path):
+    builder = CountingBuilder()
+    cache = FigureCache(str(tmp_path))
+    cache.register('points', builder.__call__)
+
+    figure = cache.get('points', snapshot('v1'))
+    assert figure['data'][0]['y'] == [110.5, 120.25]
+    assert cache.get('points', snapshot('v1')) is figure
+    assert builder.calls == 1
+    assert len(os.listdir(tmp_path / 'v1')) == 1
+
+    cache.get('points', snapshot('v2', (90.0, 95.0)))
+    assert builder.calls == 2
+
+
+def test_other_processes_load_the_figure_from_disk(tmp_path):
+    first = CountingBuilder()
+    cache = FigureCache(str(tmp_path))
+    cache.register('points', first.__call__)
+    figure = cache.get('points', snapshot('v1'))
+
+    # Otro worker con el mismo código del gráfico no lo reconstruye
+    second = CountingBuilder()
+    other = FigureCache(str(tmp_path))
+    other.register('points', second.__call__)
+    assert other.get('points', snapshot('v1')) == figure
+    assert second.calls == 0
+
+
+def test_changed_chart_code_is_not_served_from_disk(tmp_path):
+    cache = FigureCache(str(tmp_path))
+    cache.register('points', lambda df: go.Figure(go.Bar(y=df['PTS'])))
+    cache.get('points', snapshot('v1'))
+
+    other = FigureCache(str(tmp_path))
+    other.register('points', lambda df: go.Figure(go.Scatter(y=df['PTS'])))
+    assert other.get('points', snapshot('v1'))['data'][0]['type'] == 'scatter'
+    assert len(os.listdir(tmp_path / 'v1')) == 2
+
+
+def test_memory_keeps_only_recent_versions():
+    builder = CountingBuilder()
+    cache = FigureCache()
+    cache.register('points', builder.__call__)
+    for version in range(MEMORY_VERSIONS + 1):
+        cache.get('points', snapshot(f'v{version}'))
+    cache.get('points', snapshot(f'v{MEMORY_VERSIONS}'))
+    assert builder.calls == MEMORY_VERSIONS + 1
+    cache.get('points', snapshot('v0'))
+    assert builder.calls == MEMORY_VERSIONS + 2
+
+
+def test_chart_decorator_ignores_callback_arguments(tmp_path):
+    current = snapshot('v1')
+    cache = FigureCache(str(tmp_path))
+    builder = CountingBuilder()
+
+    @cache.chart('points', lambda: current)
+    def points_chart(df):
+        return builder(df)
+
+    assert points_chart.__name__ == 'points_chart'
+    assert points_chart('tab-general') == points_chart('tab-equipos')
+    assert builder.calls == 1
+
+    cache.warm(snapshot('v2'))
+    assert builder.calls == 2
+
+
+def test_dependencies_are_part_of_the_fingerprint(tmp_path):
+    def logo_v1(team):
+        return f'/assets/logos/{team}.png'
+
+    def logo_v2(team):
+        return f'/assets/logos/{team}.svg'
+
+    def chart(df):
+        return go.Figure(go.Bar(y=df['PTS']))
+
+    first = FigureCache(str(tmp_path), dependencies=[logo_v1])
+    first.register('points', chart)
+    first.get('points', snapshot('v1'))
+
+    second = FigureCache(str(tmp_path), dependencies=[logo_v2])
+    second.register('points', chart)
+    second.get('points', snapshot('v1'))
+    assert len(os.listdir(tmp_path / 'v1')) == 2
+
+
+def test_invalidate_rebuilds_the_figures(tmp_path):
+    builder = CountingBuilder()
+    cache = FigureCache(str(tmp_path))
+    cache.register('points', builder.__call__)
+    current = snapshot('v1')
+    cache.get('points', current)
+
+    cache.invalidate(current)
+    assert os.listdir(tmp_path / 'v1') == []
+    cache.get('points', current)
+    assert builder.calls == 2
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""Ingesta contra un servidor HTTP local que sirve respuestas grabadas."""
+
+import functools
+import http.server
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from data_versions import data_version
+from ingest import HTTPTransport, RecordingTransport, run_ingestion, write_csvs_atomically
+from schema import canonicalize
+from warehouse import StatsWarehouse
+
+BASIC_CSV = 'nba_team_stats_2024_25.csv'
+ADVANCED_CSV = 'nba_team_advanced_metrics_2024_25.csv'
+COMPLETE_CSV = 'nba_team_complete_stats_2024_25.csv'
+
+
+def recorded_response(df, name):
+    """Respuesta de stats.nba.com (formato resultSets) con las filas de un DataFrame."""
+    rows = df.astype(object).where(df.notna(), None).values.tolist()
+    return json.dumps({'resource': name.lower(), 'parameters': {},
+                       'resultSets': [{'name': name, 'headers': list(df.columns), 'rowSet': rows}]})
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    """Directorio con las respuestas grabadas de los dos endpoints (un equipo sin métricas)."""
+    basic = pd.read_csv(os.path.join(ROOT, BASIC_CSV))
+    advanced = pd.read_csv(os.path.join(ROOT, ADVANCED_CSV)).iloc[1:]
+    directory = tmp_path / 'recorded'
+    directory.mkdir()
+    (directory / 'leaguedashteamstats').write_text(recorded_response(basic, 'LeagueDashTeamStats'))
+    (directory / 'teamestimatedmetrics').write_text(recorded_response(advanced, 'TeamEstimatedMetrics'))
+    return directory, basic, advanced
+
+
+@pytest.fixture
+def server(recordings):
+    directory = recordings[0]
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(directory))
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    httpd.RequestHandlerClass.log_message = lambda *args: None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_ingestion_from_local_server(tmp_path, recordings, server):
+    _, basic, advanced = recordings
+    output_dir = tmp_path / 'out'
+    record_dir = tmp_path / 'rerecorded'
+
+    transport = RecordingTransport(HTTPTransport(server), str(record_dir))
+    frames = run_ingestion(transport, season='2024-25', output_dir=str(output_dir))
+
+    written = sorted(os.listdir(output_dir))
+    for name in (BASIC_CSV, ADVANCED_CSV, COMPLETE_CSV):
+        assert name in written
+    assert not any('.tmp' in name for name in written)
+
+    assert len(pd.read_csv(output_dir / BASIC_CSV)) == 30
+    assert len(pd.read_csv(output_dir / ADVANCED_CSV)) == 29
+
+    # Unión por TEAM_ID (sólo los equipos con ambos conjuntos de datos), en
+    # el esquema canónico
+    complete = pd.read_csv(output_dir / COMPLETE_CSV)
+    assert len(complete) == 29
+    assert set(complete['TEAM_ID']) == set(advanced['TEAM_ID'])
+    expected = canonicalize(pd.merge(basic, advanced, on='TEAM_ID', how='inner'))
+    assert list(complete.columns) == list(expected.columns)
+    assert 'TEAM_NAME' in complete.columns and 'E_MIN' in complete.columns
+    np.testing.assert_allclose(complete['E_NET_RATING'], expected['E_NET_RATING'])
+    assert frames['complete'].shape == complete.shape
+
+    # El transporte de grabación guarda las mismas respuestas que sirvió el servidor
+    for endpoint in ('leaguedashteamstats', 'teamestimatedmetrics'):
+        assert (record_dir / endpoint).read_text() == (recordings[0] / endpoint).read_text()
+
+
+def test_failed_write_keeps_previous_files(tmp_path):
+    path = tmp_path / 'stats.csv'
+    path.write_text('TEAM_ID\n1\n')
+    frames = {
+        str(path): pd.DataFrame({'TEAM_ID': [2]}),
+        str(tmp_path / 'missing' / 'other.csv'): pd.DataFrame({'TEAM_ID': [3]}),
+    }
+    with pytest.raises(OSError):
+        write_csvs_atomically(frames)
+
+    assert path.read_text() == 'TEAM_ID\n1\n'
+    assert sorted(os.listdir(tmp_path)) == ['stats.csv']
+
+
+def test_incremental_refresh_only_rewrites_changed_files(tmp_path, server):
+    output_dir = tmp_path / 'out'
+    paths = [str(output_dir / name) for name in (BASIC_CSV, ADVANCED_CSV, COMPLETE_CSV)]
+
+    frames = run_ingestion(HTTPTransport(server), season='2024-25', output_dir=str(output_dir), incremental=True)
+    assert [len(frames['changed'][path]) for path in paths] == [30, 29, 29]
+    assert [data_version(path) for path in paths] == [1, 1, 1]
+    mtimes = [os.stat(path).st_mtime_ns for path in paths]
+
+    frames = run_ingestion(HTTPTransport(server), season='2024-25', output_dir=str(output_dir), incremental=True)
+    assert [frames['changed'][path] for path in paths] == [[], [], []]
+    assert [data_version(path) for path in paths] == [1, 1, 1]
+    assert [os.stat(path).st_mtime_ns for path in paths] == mtimes
+
+
+def test_full_refresh_keeps_manifests_in_step(tmp_path, server):
+    output_dir = tmp_path / 'out'
+    paths = [str(output_dir / name) for name in (BASIC_CSV, ADVANCED_CSV, COMPLETE_CSV)]
+    warehouse = StatsWarehouse(str(tmp_path / 'warehouse'))
+
+    # Un refresco completo reescribe todo y sube siempre la versión
+    run_ingestion(HTTPTransport(server), season='2024-25', output_dir=str(output_dir), warehouse=warehouse)
+    assert [data_version(path) for path in paths] == [1, 1, 1]
+    run_ingestion(HTTPTransport(server), season='2024-25', output_dir=str(output_dir), warehouse=warehouse)
+    assert [data_version(path) for path in paths] == [2, 2, 2]
+    assert warehouse.has_season('2024-25')
+
+    # Después, un refresco incremental sin cambios no toca ni los CSV ni el almacén
+    catalog = os.path.join(warehouse.root, 'catalog.json')
+    mtime = os.stat(catalog).st_mtime_ns
+    frames = run_ingestion(HTTPTransport(server), season='2024-25', output_dir=str(output_dir),
+                           warehouse=warehouse, incremental=True)
+    assert [frames['changed'][path] for path in paths] == [[], [], []]
+    assert [data_version(path) for path in paths] == [2, 2, 2]
+    assert os.stat(catalog).st_mtime_ns == mtime
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+"""Referencias de la liga frente a los cálculos directos con pandas."""
+
+import numpy as np
+import pytest
+
+from league_norms import PERCENTILES, get_league_norms
+
+
+def test_statistics_match_pandas(registry, team_stats):
+    norms = get_league_norms(registry)
+    for column in ['PTS', 'E_DEF_RATING', 'W_PCT']:
+        values = team_stats[column].astype(np.float64)
+        assert norms.min(column) == pytest.approx(values.min())
+        assert norms.max(column) == pytest.approx(values.max())
+        assert norms.average(column) == pytest.approx(values.mean())
+        for q in PERCENTILES:
+            assert norms.percentile(column, q) == pytest.approx(np.percentile(values, q))
+        assert norms.percentile_rank(column, values.median()) == pytest.approx((values <= values.median()).mean() * 100)
+    assert get_league_norms(registry) is norms
+
+
+def test_scaling(registry, team_stats):
+    norms = get_league_norms(registry)
+    columns = ['PTS', 'E_DEF_RATING']
+    row = team_stats.iloc[0]
+    values = [row['PTS'], row['E_DEF_RATING']]
+
+    np.testing.assert_allclose(norms.scale_to_max(columns, values),
+                               [row['PTS'] / team_stats['PTS'].max() * 100,
+                                row['E_DEF_RATING'] / team_stats['E_DEF_RATING'].max() * 100])
+
+    scaled = norms.min_max(columns, values)
+    points = (row['PTS'] - team_stats['PTS'].min()) / (team_stats['PTS'].max() - team_stats['PTS'].min()) * 100
+    # En el rating defensivo, menos es mejor: la escala se invierte
+    defense = ((team_stats['E_DEF_RATING'].max() - row['E_DEF_RATING'])
+               / (team_stats['E_DEF_RATING'].max() - team_stats['E_DEF_RATING'].min()) * 100)
+    np.testing.assert_allclose(scaled, [points, defense])
+    assert norms.min_max(columns, values, invert_lower_better=False)[1] == pytest.approx(100 - defense)
+
+    # Matriz de filas x columnas: mismo resultado fila a fila
+    matrix = team_stats[columns].to_numpy(dtype=np.float64)
+    np.testing.assert_allclose(norms.min_max(columns, matrix)[0], scaled)
+    assert norms.min_max(columns, matrix).min() >= 0 and norms.min_max(columns, matrix).max() <= 100
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""URLs por contenido de los logos y cabeceras de caché de la ruta."""
+
+import os
+
+import flask
+import pytest
+
+from logo_assets import IMMUTABLE_MAX_AGE, LOGO_ROUTE, LogoAssets
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg"><circle r="1"/></svg>'
+
+
+@pytest.fixture
+def assets(tmp_path):
+    (tmp_path / 'BOS.svg').write_bytes(SVG)
+    (tmp_path / 'EMP.svg').write_bytes(b'')
+    return LogoAssets(str(tmp_path))
+
+
+@pytest.fixture
+def client(assets):
+    app = flask.Flask(__name__)
+    assets.register(app)
+    return app.test_client()
+
+
+def test_url_follows_the_content(assets, tmp_path):
+    url = assets.url('BOS')
+    assert url.startswith(f"{LOGO_ROUTE}/BOS.") and url.endswith('.svg')
+    assert assets.url('BOS') == url
+    assert assets.url('EMP') is None
+    assert assets.url('SEA') is None
+
+    (tmp_path / 'BOS.svg').write_bytes(SVG.replace(b'r="1"', b'r="2"'))
+    os.utime(tmp_path / 'BOS.svg', ns=(1, 1))
+    assert assets.url('BOS') != url
+
+
+def test_current_hash_is_immutable(assets, client):
+    response = client.get(assets.url('BOS'))
+    assert response.status_code == 200
+    assert response.mimetype == 'image/svg+xml'
+    assert response.data == SVG
+    assert response.cache_control.max_age == IMMUTABLE_MAX_AGE
+    assert response.cache_control.immutable
+    assert response.headers['ETag'] == f'"{assets.digest("BOS")}"'
+
+    revalidated = client.get(assets.url('BOS'), headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+
+def test_stale_and_plain_urls_are_revalidated(assets, client):
+    for url in (f"{LOGO_ROUTE}/BOS.0123456789ab.svg", f"{LOGO_ROUTE}/BOS.svg"):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.data == SVG
+        assert response.cache_control.no_cache
+        assert not response.cache_control.immutable
+
+
+def test_missing_logos_are_not_found(client):
+    assert client.get(f"{LOGO_ROUTE}/SEA.svg").status_code == 404
+    assert client.get(f"{LOGO_ROUTE}/EMP.svg").status_code == 404
+    assert client.get(f"{LOGO_ROUTE}/bos.svg").status_code == 404
+
+
+def test_missing_logo_is_fetched_again(assets, tmp_path):
+    fetched = []
+
+    def fetch(abbr):
+        fetched.append(abbr)
+        if abbr != 'NYK':
+            return False
+        (tmp_path / 'NYK.svg').write_bytes(SVG)
+        return True
+
+    app = flask.Flask(__name__)
+    assets.register(app, fetch=fetch)
+    client = app.test_client()
+
+    assert client.get(f"{LOGO_ROUTE}/NYK.svg").data == SVG
+    assert client.get(f"{LOGO_ROUTE}/SEA.svg").status_code == 404
+    assert client.get(f"{LOGO_ROUTE}/../x.svg").status_code == 404
+    assert fetched == ['NYK', 'SEA']
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""Marcador esperado y distribución de la diferencia de puntos."""
+
+import math
+
+import numpy as np
+import pytest
+
+import margin_model
+from margin_model import HOME_COURT_POINTS, MARGIN_BUCKETS, MARGIN_STD, MarginModel, get_margin_model, normal_cdf
+
+
+def scalar_prediction(registry, home, away):
+    """Cálculo escalar de un partido con las fórmulas del modelo."""
+    pace = registry.column('E_PACE')
+    offense = registry.column('E_OFF_RATING')
+    defense = registry.column('E_DEF_RATING')
+    league_rating = (offense.mean() + defense.mean()) / 2
+    possessions = pace[home] * pace[away] / pace.mean()
+    home_points = possessions * offense[home] * defense[away] / league_rating / 100 + HOME_COURT_POINTS / 2
+    away_points = possessions * offense[away] * defense[home] / league_rating / 100 - HOME_COURT_POINTS / 2
+    return home_points, away_points
+
+
+def test_normal_cdf_matches_math_erf():
+    values = np.array([-3.0, -1.0, -0.25, 0.0, 0.5, 2.0, 4.0])
+    expected = [0.5 * (1 + math.erf(value / math.sqrt(2))) for value in values]
+    np.testing.assert_allclose(normal_cdf(values), expected, atol=1e-7)
+    assert normal_cdf(0.0) == pytest.approx(0.5)
+
+
+def test_numpy_normal_cdf_without_scipy(monkeypatch):
+    monkeypatch.setattr(margin_model, 'ndtr', None)
+    values = np.linspace(-12, 12, 4801)
+    expected = [0.5 * (1 + math.erf(value / math.sqrt(2))) for value in values]
+    np.testing.assert_allclose(normal_cdf(values), expected, rtol=0, atol=1e-15)
+    # Las colas conservan la precisión relativa
+    assert normal_cdf(-8.0) == pytest.approx(0.5 * math.erfc(8 / math.sqrt(2)), rel=1e-12)
+    assert normal_cdf(np.zeros((2, 3))).shape == (2, 3)
+
+
+def test_matrices_match_the_scalar_formulas(registry):
+    model = MarginModel(registry)
+    for home, away in [(0, 1), (5, 17), (29, 3)]:
+        home_points, away_points = scalar_prediction(registry, home, away)
+        assert model.home_points[home, away] == pytest.approx(home_points)
+        assert model.away_points[home, away] == pytest.approx(away_points)
+        assert model.margin[home, away] == pytest.approx(home_points - away_points)
+        assert model.total[home, away] == pytest.approx(home_points + away_points)
+        expected_prob = 50 * (1 + math.erf((home_points - away_points) / MARGIN_STD / math.sqrt(2)))
+        assert model.home_win_prob[home, away] == pytest.approx(expected_prob, abs=1e-5)
+
+
+def test_distribution_and_cover_probability(registry):
+    model = MarginModel(registry)
+    distribution = model.distribution([0, 5], [1, 17])
+    assert distribution.shape == (2, len(MARGIN_BUCKETS))
+    np.testing.assert_allclose(distribution.sum(axis=1), 1.0)
+    # P(diferencia > 0) es la probabilidad de victoria del local
+    positive = distribution[0, MARGIN_BUCKETS.index('0..5'):].sum() * 100
+    assert positive == pytest.approx(model.home_win_prob[0, 1], abs=1e-5)
+
+    home, away = registry.names[0], registry.names[1]
+    assert model.cover_probability(home, away, 0) == pytest.approx(model.home_win_prob[0, 1], abs=1e-5)
+    assert model.cover_probability(home, away, -5.5) < model.cover_probability(home, away, 5.5)
+
+
+def test_games_skips_unknown_teams(registry):
+    names = registry.names
+    schedule = [
+        {'game_id': '1', 'gameDate': '2025-01-15', 'homeTeam': names[0], 'awayTeam': names[1]},
+        {'game_id': '2', 'gameDate': '2025-01-15', 'homeTeam': 'Seattle SuperSonics', 'awayTeam': names[1]},
+        {'game_id': '3', 'gameDate': '2025-01-16', 'homeTeam': registry.abbreviations[2], 'awayTeam': names[3]},
+    ]
+    result = get_margin_model(registry).games(schedule)
+    assert result['game_id'].tolist() == ['1', '3']
+    assert result['home_team'].tolist() == [names[0], names[2]]
+    assert result.filter(like='margin_').shape[1] == len(MARGIN_BUCKETS)
+    assert get_margin_model(registry) is get_margin_model(registry)
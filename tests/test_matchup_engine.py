@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+"""MatchupMatrix frente al cálculo escalar original de analyze_matchup."""
+
+import pytest
+
+from matchup_engine import DEFAULT_FACTORS, MatchupMatrix
+from schema import is_lower_better
+
+
+def scalar_win_probability(team1_data, team2_data, stat_categories):
+    """
+    Cálculo escalar de analyze_matchup antes de vectorizarlo (con los nombres
+    de columna canónicos). Devuelve (prob_local, prob_visitante, ventajas).
+    """
+    advantages = {}
+    advantage_points = {"team1": 0, "team2": 0}
+    total_weight = 0
+    for category, stats in stat_categories.items():
+        for key, name, weight in stats:
+            if key in team1_data and key in team2_data:
+                total_weight += weight
+                if key in ['E_DEF_RATING', 'TOV', 'E_TM_TOV_PCT', 'BLKA', 'PF']:
+                    team1_better = team1_data[key] < team2_data[key]
+                else:
+                    team1_better = team1_data[key] > team2_data[key]
+                if team1_better:
+                    advantage_points["team1"] += weight
+                    advantages[key] = "team1"
+                else:
+                    advantage_points["team2"] += weight
+                    advantages[key] = "team2"
+
+    team1_win_prob = (advantage_points["team1"] / total_weight) * 100
+    team2_win_prob = (advantage_points["team2"] / total_weight) * 100
+
+    momentum_factor = 5
+    if team1_data['W_PCT'] > team2_data['W_PCT'] * 1.2:
+        team1_win_prob += momentum_factor
+        team2_win_prob -= momentum_factor
+    elif team2_data['W_PCT'] > team1_data['W_PCT'] * 1.2:
+        team1_win_prob -= momentum_factor
+        team2_win_prob += momentum_factor
+
+    pace_factor = 3
+    if team1_data['E_PACE'] > team2_data['E_PACE'] * 1.1:
+        high_pace_team, low_pace_team = "team1", "team2"
+    elif team2_data['E_PACE'] > team1_data['E_PACE'] * 1.1:
+        high_pace_team, low_pace_team = "team2", "team1"
+    else:
+        high_pace_team = low_pace_team = None
+    if high_pace_team and low_pace_team:
+        if high_pace_team == "team1" and team1_data['E_OFF_RATING'] > team2_data['E_OFF_RATING']:
+            team1_win_prob += pace_factor
+            team2_win_prob -= pace_factor
+        elif high_pace_team == "team2" and team2_data['E_OFF_RATING'] > team1_data['E_OFF_RATING']:
+            team1_win_prob -= pace_factor
+            team2_win_prob += pace_factor
+        elif low_pace_team == "team1" and team1_data['E_DEF_RATING'] < team2_data['E_DEF_RATING']:
+            team1_win_prob += pace_factor
+            team2_win_prob -= pace_factor
+        elif low_pace_team == "team2" and team2_data['E_DEF_RATING'] < team1_data['E_DEF_RATING']:
+            team1_win_prob -= pace_factor
+            team2_win_prob += pace_factor
+
+    shooting_factor = 4
+    if team1_data['FG_PCT'] > team2_data['FG_PCT'] * 1.1 and team1_data['FG3_PCT'] > team2_data['FG3_PCT'] * 1.1:
+        team1_win_prob += shooting_factor
+        team2_win_prob -= shooting_factor
+    elif team2_data['FG_PCT'] > team1_data['FG_PCT'] * 1.1 and team2_data['FG3_PCT'] > team1_data['FG3_PCT'] * 1.1:
+        team1_win_prob -= shooting_factor
+        team2_win_prob += shooting_factor
+
+    home_court_advantage = 6.0
+    team1_win_prob += home_court_advantage
+    team2_win_prob -= home_court_advantage
+    if team2_data['W_PCT'] > team1_data['W_PCT'] * 1.3:
+        neutralizing_factor = 2.0
+        team1_win_prob -= neutralizing_factor
+        team2_win_prob += neutralizing_factor
+
+    team1_win_prob = max(0, min(100, team1_win_prob))
+    team2_win_prob = max(0, min(100, team2_win_prob))
+    total_prob = team1_win_prob + team2_win_prob
+    if total_prob > 0:
+        team1_win_prob = (team1_win_prob / total_prob) * 100
+        team2_win_prob = (team2_win_prob / total_prob) * 100
+    else:
+        team1_win_prob = team2_win_prob = 50
+    return team1_win_prob, team2_win_prob, advantages
+
+
+@pytest.fixture(scope='module')
+def matchups(registry):
+    return MatchupMatrix(registry)
+
+
+def team_data(registry, row):
+    return dict(zip(registry.columns, registry.matrix[row]))
+
+
+def test_registry_has_all_teams(registry):
+    assert len(registry) == 30
+
+
+def test_matrix_matches_scalar_path_for_every_pair(registry, matchups):
+    pairs = 0
+    for i in range(len(registry)):
+        for j in range(len(registry)):
+            if i == j:
+                continue
+            home_prob, away_prob, advantages = scalar_win_probability(
+                team_data(registry, i), team_data(registry, j), matchups.stat_categories)
+
+            assert matchups.home_prob[i, j] == home_prob, (registry.names[i], registry.names[j])
+            assert matchups.away_prob[i, j] == away_prob, (registry.names[i], registry.names[j])
+
+            analysis = matchups.analysis(i, j)
+            assert analysis['win_probability'] == {'team1': round(home_prob, 1), 'team2': round(away_prob, 1)}
+            assert analysis['confidence'] == abs(home_prob - away_prob)
+            assert {key: entry['advantage'] for key, entry in analysis['comparison'].items()} == advantages
+            assert analysis['prediction'] == (registry.names[i] if home_prob > away_prob else registry.names[j])
+            pairs += 1
+    assert pairs == 870
+
+
+def test_lower_is_better_stats_match_the_scalar_list():
+    for key in ['E_DEF_RATING', 'TOV', 'E_TM_TOV_PCT', 'BLKA', 'PF']:
+        assert is_lower_better(key)
+    for key in ['PTS', 'W_PCT', 'E_NET_RATING', 'E_PACE']:
+        assert not is_lower_better(key)
+
+
+def test_contributions_add_up_to_unclipped_probability(registry, matchups):
+    n_factors = len(DEFAULT_FACTORS)
+    for i, j in [(0, 1), (5, 17), (29, 3)]:
+        contributions = matchups.contributions(i, j)
+        assert len(contributions) == len(matchups.stat_categories) + n_factors
+        base = sum(contributions[category] for category in matchups.stat_categories)
+        adjustments = sum(contributions[name] for name in DEFAULT_FACTORS)
+        home_prob, _, _ = scalar_win_probability(team_data(registry, i), team_data(registry, j),
+                                                 matchups.stat_categories)
+        if 0 < base + adjustments < 100:
+            assert base + adjustments == pytest.approx(home_prob)
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+"""Limitador, caché de respuestas y reintentos del cliente de stats.nba.com."""
+
+import json
+import os
+import time
+
+import pytest
+import requests
+
+import nba_client
+from nba_client import NBAStatsClient, ResponseCache, TokenBucket
+
+
+class FakeClock:
+    """Sustituye a time.monotonic y time.sleep: dormir avanza el reloj."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(nba_client.time, 'monotonic', fake.monotonic)
+    monkeypatch.setattr(nba_client.time, 'sleep', fake.sleep)
+    return fake
+
+
+class FakeResponse:
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}", response=self)
+
+
+class FakeSession:
+    """Devuelve las respuestas indicadas, en orden, y cuenta las peticiones."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params))
+        return self.responses.pop(0)
+
+
+PAYLOAD = json.dumps({'resultSets': []})
+PARAMETERS = {'Season': '2024-25', 'LeagueID': '00'}
+
+
+def test_token_bucket_allows_a_burst_then_waits(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+    bucket.acquire()
+    assert sum(clock.sleeps) == pytest.approx(0.5)
+
+    clock.now += 10
+    for _ in range(3):
+        bucket.acquire()
+    assert sum(clock.sleeps) == pytest.approx(0.5)
+
+
+def test_response_cache_round_trip(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    assert cache.get('leaguedashteamstats', PARAMETERS) is None
+    cache.set('leaguedashteamstats', PARAMETERS, PAYLOAD)
+    assert cache.get('leaguedashteamstats', PARAMETERS) == PAYLOAD
+    assert cache.get('leaguedashteamstats', dict(PARAMETERS, Season='2023-24')) is None
+
+
+def test_response_cache_expires_after_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    cache.set('leaguedashteamstats', PARAMETERS, PAYLOAD)
+    path = cache._path('leaguedashteamstats', PARAMETERS)
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert cache.get('leaguedashteamstats', PARAMETERS) is None
+
+    assert ResponseCache(str(tmp_path), ttl=None).get('leaguedashteamstats', PARAMETERS) == PAYLOAD
+
+
+def test_send_retries_with_backoff_then_caches(tmp_path, clock):
+    client = NBAStatsClient(cache_dir=str(tmp_path), rate=1000, burst=1000, max_retries=3,
+                            backoff_base=1.0, backoff_max=8.0)
+    client.session = FakeSession([
+        FakeResponse(503),
+        FakeResponse(429, headers={'Retry-After': '7'}),
+        FakeResponse(200, PAYLOAD),
+    ])
+
+    assert client.send('leaguedashteamstats', PARAMETERS) == PAYLOAD
+    assert len(client.session.calls) == 3
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 1.0   # Backoff exponencial con jitter del primer intento
+    assert clock.sleeps[1] == 7.0        # Retry-After
+
+    # La segunda petición sale de la caché
+    assert client.send('leaguedashteamstats', PARAMETERS) == PAYLOAD
+    assert len(client.session.calls) == 3
+
+
+def test_send_raises_when_retries_are_exhausted(clock):
+    client = NBAStatsClient(cache_dir=None, rate=1000, burst=1000, max_retries=2, backoff_max=4.0)
+    client.session = FakeSession([FakeResponse(502)] * 3)
+
+    with pytest.raises(requests.HTTPError):
+        client.send('leaguedashteamstats', PARAMETERS)
+    assert len(client.session.calls) == 3
+    assert len(clock.sleeps) == 2
+    assert all(0 <= delay <= 4.0 for delay in clock.sleeps)
+
+
+def test_send_does_not_retry_client_errors(clock):
+    client = NBAStatsClient(cache_dir=None, rate=1000, burst=1000, max_retries=3)
+    client.session = FakeSession([FakeResponse(404)])
+
+    with pytest.raises(requests.HTTPError):
+        client.send('leaguedashteamstats', PARAMETERS)
+    assert len(client.session.calls) == 1
+    assert clock.sleeps == []
+
+
+def test_backoff_is_capped():
+    client = NBAStatsClient(cache_dir=None, backoff_base=1.0, backoff_max=5.0)
+    for attempt in range(10):
+        assert 0 <= client._backoff(attempt) <= 5.0
+    assert client._backoff(0, retry_after='120') == 5.0
+    assert 0 <= client._backoff(0, retry_after='soon') <= 1.0
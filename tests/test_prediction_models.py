@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+"""Registro de modelos de predicción, mezcla y configuración del modelo activo."""
+
+import json
+import math
+import os
+
+import numpy as np
+import pytest
+
+import matchup_engine
+import prediction_models
+from elo import MIN_GAMES_FOR_BLEND, EloRatings
+from matchup_engine import get_matchup_matrix
+from prediction_models import (DEFAULT_BLEND_COMPONENTS, DEFAULT_MODEL_CONFIG, LogisticModel, PredictionModel, available_models,
+                               build_model, get_prediction_model, load_model_config, register_model,
+                               resolve_model)
+
+BOSTON, MIAMI = 'Boston Celtics', 'Miami Heat'
+
+
+@pytest.fixture
+def ratings(tmp_path):
+    """Ratings Elo en los que sólo Boston y Miami tienen partidos suficientes."""
+    ratings = EloRatings(str(tmp_path / 'elo_ratings.json'), str(tmp_path / 'elo_history.jsonl'))
+    ratings.update([{'game_id': f'00224{index:05d}', 'gameDate': f'2024-11-{index + 1:02d}',
+                     'homeTeam': BOSTON, 'awayTeam': MIAMI, 'status': 'Final',
+                     'homeScore': 110, 'awayScore': 100}
+                    for index in range(MIN_GAMES_FOR_BLEND)])
+    return ratings
+
+
+def test_registered_models():
+    assert {'heuristic', 'logistic', 'elo', 'margin', 'blend'} <= set(available_models())
+    with pytest.raises(ValueError):
+        build_model('coin_flip')
+
+
+def test_heuristic_model_is_the_matchup_engine(registry):
+    model = build_model('heuristic')
+    engine = get_matchup_matrix(registry)
+    np.testing.assert_array_equal(model.matrix(registry), engine.home_prob)
+    assert model.analyze(registry, 0, 1) == engine.analysis(0, 1)
+    np.testing.assert_array_equal(model.probabilities(registry, [0, 5], [1, 17]),
+                                  engine.home_prob[[0, 5], [1, 17]])
+
+
+def test_logistic_model(registry):
+    model = LogisticModel(intercept=0.2, coefficients={'E_NET_RATING': 0.1})
+    net = registry.column('E_NET_RATING')
+    expected = 100 / (1 + math.exp(-(0.2 + 0.1 * (net[3] - net[7]))))
+    assert model.matrix(registry)[3, 7] == pytest.approx(expected)
+    assert model.matrix(registry) is model.matrix(registry)
+
+
+def test_logistic_fit_recovers_the_coefficients(registry):
+    rng = np.random.default_rng(0)
+    home_rows = rng.integers(0, 30, 20000)
+    away_rows = (home_rows + rng.integers(1, 30, 20000)) % 30
+    truth = LogisticModel(intercept=0.3, coefficients={'E_NET_RATING': 0.15})
+    outcomes = rng.random(20000) < truth.matrix(registry)[home_rows, away_rows] / 100
+
+    fitted = LogisticModel.fit(registry, home_rows, away_rows, outcomes)
+    assert fitted.intercept == pytest.approx(0.3, abs=0.05)
+    assert fitted.coefficients['E_NET_RATING'] == pytest.approx(0.15, abs=0.02)
+
+
+def test_elo_model_has_no_opinion_without_games(registry, ratings):
+    model = build_model('elo', {'ratings': ratings})
+    matrix = model.matrix(registry)
+    boston, miami = registry.row(BOSTON), registry.row(MIAMI)
+    assert matrix[boston, miami] == pytest.approx(ratings.home_win_probability(BOSTON, MIAMI))
+    assert np.isnan(matrix[boston, registry.row('Utah Jazz')])
+    assert model.analyze(registry, boston, miami)['elo']['team1_rating'] == round(ratings.rating(BOSTON), 1)
+
+
+def test_blend_renormalizes_without_elo(registry, ratings):
+    blend = build_model('blend', {'components': {'heuristic': 0.7, 'elo': 0.3},
+                                  'component_options': {'elo': {'ratings': ratings}}})
+    heuristic = get_matchup_matrix(registry).home_prob
+    elo = build_model('elo', {'ratings': ratings}).matrix(registry)
+    matrix = blend.matrix(registry)
+
+    boston, miami = registry.row(BOSTON), registry.row(MIAMI)
+    assert matrix[boston, miami] == pytest.approx(0.7 * heuristic[boston, miami] + 0.3 * elo[boston, miami])
+    # Sin Elo, la probabilidad del modelo de pesos tal cual
+    assert matrix[2, 3] == heuristic[2, 3]
+
+    analysis = blend.analyze(registry, boston, miami)
+    assert analysis['win_probability']['team1'] == round(matrix[boston, miami], 1)
+    assert set(analysis['components']) == {'heuristic', 'elo'}
+    assert blend.analyze(registry, 2, 3) == get_matchup_matrix(registry).analysis(2, 3)
+
+
+def test_with_elo_ratings_replaces_only_the_elo_components(registry, ratings, tmp_path):
+    heuristic = build_model('heuristic')
+    assert heuristic.with_elo_ratings(ratings) is heuristic
+
+    empty = EloRatings(str(tmp_path / 'empty.json'), str(tmp_path / 'empty.jsonl'))
+    blend = build_model('blend', {'component_options': {'elo': {'ratings': ratings}}})
+    dated = blend.with_elo_ratings(empty)
+    assert dated is not blend and dated.weights == blend.weights
+    assert dated.components['heuristic'] is blend.components['heuristic']
+    assert dated.components['elo'].ratings is empty
+    assert blend.components['elo'].ratings is ratings
+
+    boston, miami = registry.row(BOSTON), registry.row(MIAMI)
+    heuristic_prob = get_matchup_matrix(registry).home_prob[boston, miami]
+    assert blend.matrix(registry)[boston, miami] != heuristic_prob
+    assert dated.matrix(registry)[boston, miami] == heuristic_prob
+
+
+def test_models_share_one_matrix_cache(registry):
+    for name in available_models():
+        model = build_model(name)
+        # Un único punto de extensión: ningún modelo sustituye matrix()
+        assert type(model).matrix is PredictionModel.matrix
+        matrix = model.matrix(registry)
+        assert model.matrix(registry) is matrix
+        key, cached = model._matrices[registry]
+        assert cached is matrix and key == model.cache_key(registry)
+
+
+def test_matrices_follow_ratings_and_weights(tmp_path, monkeypatch, registry, ratings):
+    blend = build_model('blend', {'components': {'heuristic': 0.7, 'elo': 0.3},
+                                  'component_options': {'elo': {'ratings': ratings}}})
+    before = blend.matrix(registry)
+    boston, miami = registry.row(BOSTON), registry.row(MIAMI)
+
+    # Un resultado nuevo cambia los ratings y, con ellos, la mezcla
+    ratings.update([{'game_id': '0022499999', 'gameDate': '2024-12-01', 'homeTeam': MIAMI,
+                     'awayTeam': BOSTON, 'status': 'Final', 'homeScore': 130, 'awayScore': 90}])
+    after = blend.matrix(registry)
+    assert after[boston, miami] < before[boston, miami]
+
+    # Una configuración de pesos nueva cambia el modelo de pesos
+    heuristic = build_model('heuristic')
+    default = heuristic.matrix(registry)
+    path = str(tmp_path / 'matchup_weights.json')
+    monkeypatch.setattr(matchup_engine, 'DEFAULT_WEIGHTS_PATH', path)
+    with open(path, 'w') as f:
+        json.dump({'factors': {'home_court': 0.0}}, f)
+    assert heuristic.matrix(registry) is get_matchup_matrix(registry).home_prob
+    assert not np.array_equal(heuristic.matrix(registry), default)
+
+
+def test_model_config_file_and_environment(tmp_path, monkeypatch):
+    monkeypatch.delenv('PREDICTION_MODEL', raising=False)
+    path = str(tmp_path / 'prediction_model.json')
+    assert load_model_config(path) == (DEFAULT_MODEL_CONFIG, None)
+
+    with open(path, 'w') as f:
+        json.dump({'model': 'logistic', 'options': {'intercept': 0.1}}, f)
+    model = get_prediction_model(path)
+    assert model.name == 'logistic' and model.intercept == 0.1
+    assert get_prediction_model(path) is model
+
+    # El modelo se vuelve a crear cuando cambia el archivo
+    with open(path, 'w') as f:
+        json.dump({'model': 'margin'}, f)
+    os.utime(path, ns=(1, 1))
+    assert get_prediction_model(path).name == 'margin'
+
+    monkeypatch.setenv('PREDICTION_MODEL', 'heuristic')
+    assert get_prediction_model(path).name == 'heuristic'
+
+
+def test_default_model_is_heuristic_and_blend_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv('PREDICTION_MODEL', raising=False)
+    path = str(tmp_path / 'prediction_model.json')
+    assert get_prediction_model(path).name == 'heuristic'
+
+    monkeypatch.setenv('PREDICTION_MODEL', 'blend')
+    blend = get_prediction_model(path)
+    assert blend.name == 'blend'
+    assert blend.weights == {name: weight for name, weight in DEFAULT_BLEND_COMPONENTS.items() if weight > 0}
+
+
+def test_invalid_config_falls_back_to_the_default(tmp_path, monkeypatch):
+    monkeypatch.delenv('PREDICTION_MODEL', raising=False)
+    path = str(tmp_path / 'prediction_model.json')
+    with open(path, 'w') as f:
+        json.dump({'model': 'coin_flip'}, f)
+    assert get_prediction_model(path).name == DEFAULT_MODEL_CONFIG['model']
+
+
+def test_custom_models_can_be_registered(registry, monkeypatch):
+    monkeypatch.setattr(prediction_models, '_model_factories', dict(prediction_models._model_factories))
+
+    class HomeAlways(PredictionModel):
+        name = 'home_always'
+
+        def compute_matrix(self, registry):
+            return np.full((len(registry), len(registry)), 100.0)
+
+    register_model('home_always', HomeAlways)
+    model = build_model('home_always')
+    assert model.analyze(registry, 0, 1)['prediction'] == registry.names[0]
+
+
+def test_filled_matrix_uses_the_heuristic_without_opinion(registry, ratings):
+    model = build_model('elo', {'ratings': ratings})
+    filled = model.filled_matrix(registry)
+    heuristic = get_matchup_matrix(registry).home_prob
+    boston, miami = registry.row(BOSTON), registry.row(MIAMI)
+    assert not np.isnan(filled).any()
+    assert filled[boston, miami] == model.matrix(registry)[boston, miami]
+    assert filled[2, 3] == heuristic[2, 3]
+
+
+def test_resolve_model(monkeypatch):
+    monkeypatch.delenv('PREDICTION_MODEL', raising=False)
+    assert resolve_model('logistic').name == 'logistic'
+    assert resolve_model() is get_prediction_model()
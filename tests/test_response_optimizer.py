@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""Redondeo de números y plantillas de estilos de las respuestas de Dash."""
+
+import copy
+import gzip
+import json
+import math
+
+import flask
+import plotly.graph_objects as go
+import pytest
+
+from response_optimizer import (MIN_REPEATS, UPDATE_PATH, ResponseOptimizer, deduplicate_styles,
+                                load_rounded, optimize_figures, round_number)
+
+
+@pytest.mark.parametrize('value, expected', [
+    (0.123456789, 0.123457),
+    (123.456789, 123.4568),
+    (0.000123456789, 0.000123457),
+    (98765.4321, 98765.4321),
+    (-3.14159265, -3.14159),
+    (0.0, 0.0),
+])
+def test_round_number(value, expected):
+    assert round_number(value) == expected
+
+
+def test_round_number_leaves_other_values_alone():
+    assert round_number(7) == 7
+    assert round_number(True) is True
+    assert round_number('0.123456789') == '0.123456789'
+    assert math.isnan(round_number(float('nan')))
+    assert round_number(float('inf')) == float('inf')
+
+
+def test_load_rounded_only_touches_long_floats():
+    data = load_rounded('{"a": 0.1234567891, "b": 0.5, "c": 12, "d": [1.23456789012, "x"]}')
+    assert data == {'a': 0.123457, 'b': 0.5, 'c': 12, 'd': [1.23457, 'x']}
+    assert isinstance(data['c'], int)
+
+
+def logo_figure(count):
+    return {
+        'data': [
+            {'type': 'bar', 'name': f'Equipo {k}', 'x': [k], 'y': [k * 2],
+             'marker': {'color': '#1f77b4', 'line': {'width': 1}}, 'opacity': 0.8}
+            for k in range(count)
+        ],
+        'layout': {
+            'images': [
+                {'source': f'/assets/logos/{k}.png', 'x': k, 'y': 0, 'xref': 'x', 'yref': 'paper',
+                 'sizex': 0.8, 'sizey': 0.1, 'xanchor': 'center', 'layer': 'above'}
+                for k in range(count)
+            ],
+        },
+    }
+
+
+def test_deduplicate_styles_moves_repeated_properties_to_the_template():
+    figure = deduplicate_styles(logo_figure(5))
+    template = figure['layout']['template']
+
+    assert template['layout']['imagedefaults'] == {'y': 0, 'xref': 'x', 'yref': 'paper', 'sizex': 0.8,
+                                                   'sizey': 0.1, 'xanchor': 'center', 'layer': 'above'}
+    assert figure['layout']['images'][3] == {'source': '/assets/logos/3.png', 'x': 3}
+
+    assert template['data']['bar'] == [{'marker': {'color': '#1f77b4', 'line': {'width': 1}}, 'opacity': 0.8}]
+    assert figure['data'][2] == {'type': 'bar', 'name': 'Equipo 2', 'x': [2], 'y': [4]}
+
+    # El resultado sigue siendo una figura válida de Plotly
+    go.Figure(figure)
+
+
+def test_deduplicate_styles_merges_with_an_existing_template():
+    figure = logo_figure(4)
+    figure['layout']['template'] = {'layout': {'imagedefaults': {'opacity': 0.5}},
+                                    'data': {'bar': [{'marker': {'pattern': {'shape': '/'}}}]}}
+    deduplicate_styles(figure)
+    template = figure['layout']['template']
+    assert template['layout']['imagedefaults']['opacity'] == 0.5
+    assert template['layout']['imagedefaults']['yref'] == 'paper'
+    assert template['data']['bar'][0]['marker'] == {'pattern': {'shape': '/'}, 'color': '#1f77b4',
+                                                    'line': {'width': 1}}
+
+
+def test_deduplicate_styles_keeps_small_or_cycling_figures():
+    few = logo_figure(MIN_REPEATS - 1)
+    assert deduplicate_styles(copy.deepcopy(few)) == few
+
+    cycling = logo_figure(5)
+    cycling['layout']['template'] = {'data': {'bar': [{'opacity': 0.5}, {'opacity': 0.9}]}}
+    deduplicate_styles(cycling)
+    # Varias entradas por tipo se aplican por turnos: las trazas no se tocan
+    assert all('marker' in trace for trace in cycling['data'])
+
+
+def test_deduplicate_styles_skips_data_arrays_and_identity_keys():
+    figure = logo_figure(4)
+    for trace in figure['data']:
+        trace['marker'] = {'color': ['red', 'blue']}
+        trace['name'] = 'Mismo nombre'
+    deduplicate_styles(figure)
+    assert 'marker' not in figure['layout']['template']['data']['bar'][0]
+    assert all(trace['name'] == 'Mismo nombre' for trace in figure['data'])
+
+
+def test_optimize_figures_finds_nested_figures():
+    response = {'response': {'grafico': {'figure': logo_figure(4)}, 'texto': {'children': 'hola'}}}
+    optimize_figures(response)
+    assert 'template' in response['response']['grafico']['figure']['layout']
+    assert response['response']['texto'] == {'children': 'hola'}
+
+
+def test_update_responses_are_optimized_and_compressed():
+    app = flask.Flask(__name__)
+    optimizer = ResponseOptimizer()
+    optimizer.register(app)
+    payload = {'multi': True, 'response': {'grafico': {'figure': logo_figure(30)}}}
+    payload['response']['grafico']['figure']['data'][0]['y'] = [0.1234567891]
+
+    @app.route(UPDATE_PATH, methods=['POST'])
+    def update():
+        return flask.jsonify(payload)
+
+    client = app.test_client()
+    response = client.post(UPDATE_PATH, json={'output': 'grafico.figure'},
+                           headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    body = json.loads(gzip.decompress(response.get_data()))
+    figure = body['response']['grafico']['figure']
+    assert figure['data'][0]['y'] == [0.123457]
+    assert 'imagedefaults' in figure['layout']['template']['layout']
+
+    stats = optimizer.stats()['outputs']['grafico.figure']
+    assert stats['responses'] == 1
+    assert stats['sent_bytes'] < stats['optimized_bytes'] < stats['original_bytes']
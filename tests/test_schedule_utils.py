@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""Lectura del calendario y clasificación de los partidos."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+import schedule_utils
+from schedule_utils import game_key, is_final, is_regular_season, iter_schedule
+
+from conftest import ROOT
+
+GAMES = [{'game_id': f'00224{index:05d}', 'gameDate': '2025-03-01', 'homeTeam': 'Boston Celtics',
+          'awayTeam': 'Miami Heat', 'status': 'Final', 'note': 'x' * 50}
+         for index in range(20)]
+
+
+def test_iter_schedule_reads_json_arrays_in_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(schedule_utils, 'READ_BLOCK_SIZE', 64)
+    path = tmp_path / 'schedule.json'
+    path.write_text(json.dumps(GAMES, indent=1))
+    assert list(iter_schedule(str(path))) == GAMES
+
+    path.write_text(json.dumps(GAMES)[:-1])
+    with pytest.raises(ValueError):
+        list(iter_schedule(str(path)))
+
+
+def test_iter_schedule_reads_jsonl(tmp_path):
+    path = tmp_path / 'schedule.jsonl'
+    path.write_text('\n'.join(json.dumps(game) for game in GAMES) + '\n\n')
+    assert list(iter_schedule(str(path))) == GAMES
+
+
+def test_game_classification():
+    assert game_key({'game_id': '0022400001'}) == '0022400001'
+    assert game_key({'gameDate': '2025-03-01', 'homeTeam': 'A', 'awayTeam': 'B'}) == '2025-03-01_A_B'
+
+    assert is_final({'status': 'Final/OT'}) and is_final({'status': ' final '})
+    assert not is_final({'status': '7:30 pm ET'}) and not is_final({})
+
+    assert is_regular_season({'game_id': '0022400001'})
+    assert not is_regular_season({'game_id': '0042400101'})
+    assert is_regular_season({'gameLabel': ''})
+    assert not is_regular_season({'gameLabel': 'Preseason'})
+
+
+@pytest.mark.parametrize('module', ['elo', 'batch_predict', 'season_simulator', 'backtest'])
+def test_modules_import_without_cycles(module):
+    # Cada módulo se importa primero en un intérprete limpio
+    subprocess.run([sys.executable, '-c', f'import {module}'], cwd=ROOT, check=True)
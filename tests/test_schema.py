@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""Nombres y tipos del esquema canónico."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from schema import DUPLICATED_COLUMNS, canonical_name, canonicalize, column_dtype
+
+
+def merged_frame():
+    return pd.DataFrame({
+        'TEAM_ID': [1610612737, 1610612738],
+        'TEAM_NAME_x': ['Atlanta Hawks', 'Boston Celtics'],
+        'GP_x': [82, 82],
+        'W_x': [40, 61],
+        'L_x': [42, 21],
+        'W_PCT_x': [0.488, 0.744],
+        'MIN_x': [48.2, 48.1],
+        'PTS': [118.2, 116.3],
+        'PTS_RANK': [5, 9],
+        'W_RANK_x': [18, 2],
+        'TEAM_NAME_y': ['Atlanta Hawks', 'Boston Celtics'],
+        'GP_y': [82, 82],
+        'W_RANK_y': [18, 2],
+        'MIN_y': [3961.0, 3951.0],
+        'E_PACE': [101.9, 97.2],
+    })
+
+
+def test_canonical_names():
+    assert canonical_name('W_PCT_x') == 'W_PCT'
+    assert canonical_name('MIN_y') == 'E_MIN'
+    assert canonical_name('MIN_RANK_y') == 'E_MIN_RANK'
+    assert canonical_name('PTS') == 'PTS'
+    for column in DUPLICATED_COLUMNS:
+        assert canonical_name(column + '_y') is None
+
+
+def test_canonicalize_renames_and_drops_duplicates():
+    result = canonicalize(merged_frame())
+    assert list(result.columns) == ['TEAM_ID', 'TEAM_NAME', 'GP', 'W', 'L', 'W_PCT', 'MIN', 'PTS',
+                                    'PTS_RANK', 'W_RANK', 'E_MIN', 'E_PACE']
+
+
+def test_canonicalize_dtypes():
+    result = canonicalize(merged_frame())
+    assert result['TEAM_ID'].dtype == np.int32
+    assert result['TEAM_NAME'].dtype == 'category'
+    for column in ['GP', 'W', 'L']:
+        assert result[column].dtype == np.int16
+    for column in ['PTS_RANK', 'W_RANK']:
+        assert result[column].dtype == np.int8
+    for column in ['W_PCT', 'MIN', 'PTS', 'E_MIN', 'E_PACE']:
+        assert result[column].dtype == np.float32
+    assert result['W_PCT'].tolist() == pytest.approx([0.488, 0.744])
+
+
+def test_canonicalize_is_idempotent():
+    once = canonicalize(merged_frame())
+    twice = canonicalize(once)
+    pd.testing.assert_frame_equal(once, twice)
+
+
+def test_canonicalize_keeps_missing_values_in_integer_columns(capsys):
+    df = merged_frame()
+    df['PTS_RANK'] = [5, np.nan]
+    df['W_x'] = [40, np.nan]
+    result = canonicalize(df)
+
+    assert result['PTS_RANK'].dtype == np.float32
+    assert result['W'].dtype == np.float32
+    assert result['PTS_RANK'].iloc[0] == 5
+    assert np.isnan(result['PTS_RANK'].iloc[1])
+    assert np.isnan(result['W'].iloc[1])
+    # Las columnas sin valores ausentes conservan su tipo compacto
+    assert result['W_RANK'].dtype == np.int8
+    assert 'PTS_RANK' in capsys.readouterr().out
+
+
+def test_canonicalize_stats_csv(stats_csv):
+    result = canonicalize(pd.read_csv(stats_csv))
+    assert len(result) == 30
+    assert not any(column.endswith(('_x', '_y')) for column in result.columns)
+    assert result.columns.is_unique
+    for column in result.columns:
+        expected = column_dtype(column)
+        if expected is not None:
+            assert result[column].dtype == expected, column
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+"""Balance de partida y simulación Monte Carlo de la temporada."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from prediction_models import build_model
+from season_simulator import (SEASON_GAMES, remaining_games, schedule_record, season_baseline,
+                              simulate_season)
+
+
+def game(date, home, away, status='', home_score=None, away_score=None, game_id=''):
+    return {'game_id': game_id, 'gameDate': date, 'homeTeam': home, 'awayTeam': away,
+            'status': status, 'homeScore': home_score, 'awayScore': away_score}
+
+
+@pytest.fixture(scope='module')
+def heuristic():
+    return build_model('heuristic')
+
+
+@pytest.fixture(scope='module')
+def round_robin(registry):
+    # Cada equipo recibe una vez a cada rival: 870 partidos pendientes
+    return [game('2025-03-01', home, away) for home in registry.names for away in registry.names if home != away]
+
+
+def test_schedule_record_counts_final_regular_season_games(registry):
+    boston, miami, utah = 'Boston Celtics', 'Miami Heat', 'Utah Jazz'
+    schedule = [
+        game('2024-11-01', boston, miami, 'Final', 110, 100),
+        game('2024-11-03', miami, boston, 'Final/OT', 120, 118),
+        game('2024-11-05', utah, boston, 'Final', '99', '101'),
+        game('2024-11-07', utah, miami, '7:30 pm ET'),
+        game('2024-10-10', boston, utah, 'Final', 90, 80, game_id='0012400001'),  # Pretemporada
+    ]
+    wins, losses = schedule_record(schedule, registry)
+    assert wins[registry.row(boston)] == 2 and losses[registry.row(boston)] == 1
+    assert wins[registry.row(miami)] == 1 and losses[registry.row(miami)] == 1
+    assert wins[registry.row(utah)] == 0 and losses[registry.row(utah)] == 1
+    assert wins.sum() == losses.sum() == 3
+
+    home_rows, away_rows = remaining_games(schedule, registry)
+    assert list(home_rows) == [registry.row(utah)]
+    assert list(away_rows) == [registry.row(miami)]
+
+
+def test_baseline_uses_finished_games_when_available(registry):
+    schedule = [
+        game('2024-11-01', 'Boston Celtics', 'Miami Heat', 'Final', 110, 100),
+        game('2025-03-01', 'Miami Heat', 'Boston Celtics'),
+    ]
+    wins, losses, home_rows, away_rows = season_baseline(schedule, registry)
+    assert wins.sum() == losses.sum() == 1
+    assert len(home_rows) == len(away_rows) == 1
+
+
+def test_baseline_without_results_uses_stats_record(registry, capsys):
+    team = registry.names[0]
+    opponent = registry.names[1]
+    schedule = [game(f'2025-03-{day:02d}', team, opponent) for day in range(1, 31)]
+    schedule.append(game('2025-01-01', team, opponent))
+
+    wins, losses, home_rows, away_rows = season_baseline(schedule, registry, from_date='2025-03-01')
+    assert np.array_equal(wins, registry.column('W'))
+    assert np.array_equal(losses, registry.column('L'))
+    assert len(home_rows) == 30   # El partido anterior a from_date ya está en el W/L
+
+    # El W/L de las estadísticas más 30 partidos pendientes pasa de 82
+    assert wins[0] + losses[0] + 30 > SEASON_GAMES
+    assert f'supera {SEASON_GAMES} partidos: {team}' in capsys.readouterr().out
+
+
+def test_seeded_simulation_is_identical_for_any_worker_count(registry, round_robin, heuristic):
+    home_rows, away_rows = remaining_games(round_robin, registry)
+    summaries = [simulate_season(registry, home_rows, away_rows, simulations=300, seed=7,
+                                 workers=workers, chunk_size=50, model=heuristic)
+                 for workers in (1, 2, 3)]
+    for summary in summaries[1:]:
+        pd.testing.assert_frame_equal(summaries[0], summary)
+
+    other_seed = simulate_season(registry, home_rows, away_rows, simulations=300, seed=8,
+                                 workers=1, chunk_size=50, model=heuristic)
+    assert not other_seed.equals(summaries[0])
+
+
+def test_simulation_summary_is_consistent(registry, round_robin, heuristic):
+    home_rows, away_rows = remaining_games(round_robin, registry)
+    record = (np.zeros(len(registry)), np.zeros(len(registry)))
+    summary = simulate_season(registry, home_rows, away_rows, simulations=200, seed=1,
+                              workers=1, chunk_size=100, record=record, model=heuristic)
+
+    assert len(summary) == 30
+    assert (summary['REMAINING'] == 58).all()
+    # Cada simulación reparte todas las victorias pendientes
+    assert summary['PROJ_W'].sum() == pytest.approx(len(home_rows))
+    seed_columns = [column for column in summary.columns if column.startswith('SEED_')]
+    for conference, group in summary.groupby('CONFERENCE'):
+        assert group[seed_columns].sum().to_numpy() == pytest.approx(100.0)
+        # Seis puestos directos y dos del play-in por conferencia
+        assert group['PLAYOFF_PCT'].sum() == pytest.approx(800.0)
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+"""Matriz de equipos y tablas derivadas compartidas entre procesos."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import matchup_engine
+import shared_tables
+from correlations import CorrelationService, get_correlation_service
+from data_manager import DataManager
+from league_norms import LeagueNorms, get_league_norms
+from shared_tables import (KEEP_VERSIONS, open_shared_tables, register_table, shared_directory_name,
+                           shared_root, shared_table)
+from team_registry import TeamRegistry
+
+# Tablas que registran matchup_engine, league_norms y correlations al importarse
+REGISTERED_TABLES = dict(shared_tables._table_builders)
+
+
+@pytest.fixture(autouse=True)
+def no_registered_tables(monkeypatch):
+    # Cada prueba registra sus propias tablas
+    monkeypatch.setattr(shared_tables, '_table_builders', {})
+
+
+def test_matrix_is_mapped_from_disk(stats_csv, team_stats):
+    tables = open_shared_tables(stats_csv, team_stats, 'v1-test', version=1)
+    assert tables is not None
+    assert tables.version == 1
+    assert isinstance(tables.registry.matrix, np.memmap)
+
+    private = TeamRegistry(team_stats)
+    np.testing.assert_array_equal(tables.registry.matrix, private.matrix)
+    assert tables.registry.names == private.names
+    assert tables.registry.columns == private.columns
+    assert tables.registry.row('BOS') == private.row('BOS')
+
+
+def test_existing_version_is_reused(stats_csv, team_stats):
+    first = open_shared_tables(stats_csv, team_stats, 'v1-test')
+    meta = os.path.join(first.directory, 'meta.json')
+    mtime = os.stat(meta).st_mtime_ns
+
+    second = open_shared_tables(stats_csv, team_stats, 'v1-test')
+    assert second.directory == first.directory
+    assert os.stat(meta).st_mtime_ns == mtime
+
+
+def test_registered_tables_are_built_and_mapped(stats_csv, team_stats):
+    register_table('pts_order', lambda registry: np.argsort(registry.column('PTS')))
+    tables = open_shared_tables(stats_csv, team_stats, 'v1-test')
+
+    expected = np.argsort(TeamRegistry(team_stats).column('PTS'))
+    np.testing.assert_array_equal(tables.table('pts_order'), expected)
+    assert isinstance(tables.table('pts_order'), np.memmap)
+    assert tables.table('missing') is None
+
+
+def test_tables_are_only_used_with_the_key_they_were_built_with(stats_csv, team_stats):
+    register_table('pts_order', lambda registry: np.argsort(registry.column('PTS')), key=lambda: 'pesos-1')
+    tables = open_shared_tables(stats_csv, team_stats, 'v1-test')
+    assert tables.table('pts_order', 'pesos-1') is not None
+    assert tables.table('pts_order', 'pesos-2') is None
+    assert shared_table(tables.registry, 'pts_order', 'pesos-1') is tables.table('pts_order', 'pesos-1')
+    assert shared_table(TeamRegistry(team_stats), 'pts_order', 'pesos-1') is None
+
+
+def test_derived_tables_are_read_from_the_snapshot(stats_csv, tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_tables, '_table_builders', dict(REGISTERED_TABLES))
+    assert {'matchup', 'league_norms', 'correlations'} <= set(REGISTERED_TABLES)
+    snapshot = DataManager(stats_csv, poll_interval=None).snapshot()
+    registry = snapshot.registry
+    private = TeamRegistry(snapshot.df)
+    assert registry.tables is snapshot.tables
+
+    matchups = matchup_engine.get_matchup_matrix(registry)
+    expected = matchup_engine.MatchupMatrix(private)
+    assert isinstance(matchups.home_prob, np.memmap)
+    np.testing.assert_array_equal(matchups.home_prob, expected.home_prob)
+    np.testing.assert_array_equal(matchups.advantage, expected.advantage)
+    for i, j in [(0, 1), (5, 3), (29, 17)]:
+        assert matchups.analysis(i, j) == expected.analysis(i, j)
+        assert matchups.contributions(i, j) == expected.contributions(i, j)
+
+    norms = get_league_norms(registry)
+    assert isinstance(norms.sorted_values, np.memmap)
+    np.testing.assert_array_equal(norms.percentiles, LeagueNorms(private).percentiles)
+    assert norms.percentile_rank('PTS', 115) == LeagueNorms(private).percentile_rank('PTS', 115)
+
+    correlations = get_correlation_service(registry)
+    assert isinstance(correlations.matrix, np.memmap)
+    np.testing.assert_array_equal(correlations.matrix, CorrelationService(private).matrix)
+
+    # Con otra configuración de pesos la tabla compartida ya no sirve
+    path = str(tmp_path / 'matchup_weights.json')
+    monkeypatch.setattr(matchup_engine, 'DEFAULT_WEIGHTS_PATH', path)
+    with open(path, 'w') as f:
+        json.dump({'factors': {'home_court': 0.0}}, f)
+    reweighted = matchup_engine.get_matchup_matrix(registry)
+    assert not isinstance(reweighted.home_prob, np.memmap)
+    np.testing.assert_array_equal(reweighted.home_prob,
+                                  matchup_engine.MatchupMatrix(private, factors=dict(
+                                      matchup_engine.DEFAULT_FACTORS, home_court=0.0)).home_prob)
+
+
+def test_processes_with_other_tables_use_their_own_directory(stats_csv, team_stats):
+    assert shared_directory_name('v1-test') == 'v1-test'
+    plain = open_shared_tables(stats_csv, team_stats, 'v1-test')
+
+    register_table('pts_order', lambda registry: np.argsort(registry.column('PTS')))
+    assert shared_directory_name('v1-test') != 'v1-test'
+    with_tables = open_shared_tables(stats_csv, team_stats, 'v1-test')
+    assert with_tables.directory != plain.directory
+
+    # El directorio del otro proceso sigue vivo y sus mapeos son válidos
+    assert os.path.isdir(plain.directory)
+    assert plain.table('pts_order') is None
+    np.testing.assert_array_equal(plain.registry.matrix, with_tables.registry.matrix)
+
+
+def test_mappings_survive_pruning(stats_csv, team_stats):
+    register_table('pts_order', lambda registry: np.argsort(registry.column('PTS')))
+    first = open_shared_tables(stats_csv, team_stats, 'v0-test', 0)
+    expected = np.array(first.table('pts_order'))
+    for version in range(1, KEEP_VERSIONS + 2):
+        open_shared_tables(stats_csv, team_stats, f'v{version}-test', version)
+    np.testing.assert_array_equal(first.table('pts_order'), expected)
+
+
+def test_old_versions_are_pruned(stats_csv, team_stats):
+    for version in range(KEEP_VERSIONS + 2):
+        tables = open_shared_tables(stats_csv, team_stats, f'v{version}-test', version)
+        os.utime(os.path.join(shared_root(stats_csv), os.path.basename(tables.directory)),
+                 ns=(version * 10**9, version * 10**9))
+    remaining = [name for name in os.listdir(shared_root(stats_csv)) if '.tmp' not in name]
+    assert len(remaining) <= KEEP_VERSIONS + 1
+    assert os.path.basename(tables.directory) in remaining
+
+
+def test_data_manager_uses_the_shared_registry(stats_csv):
+    snapshot = DataManager(stats_csv, poll_interval=None).snapshot()
+    assert snapshot.tables is not None
+    assert snapshot.registry is snapshot.tables.registry
+    assert isinstance(snapshot.registry.matrix, np.memmap)
+
+    private = DataManager(stats_csv, poll_interval=None, share_tables=False).snapshot()
+    assert private.tables is None
+    np.testing.assert_array_equal(private.registry.matrix, snapshot.registry.matrix)
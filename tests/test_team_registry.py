@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""Índice de equipos y matriz de estadísticas."""
+
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import team_registry
+from team_registry import TeamRegistry, get_registry
+
+
+def test_every_identifier_finds_the_same_row(team_stats, registry):
+    row = registry.row('Boston Celtics')
+    assert row is not None
+    assert registry.row('BOS') == row
+    assert registry.row(1610612738) == row
+    assert registry.row('1610612738') == row
+    assert registry.names[row] == 'Boston Celtics'
+    assert registry.abbreviations[row] == 'BOS'
+    assert 'BOS' in registry and 'Seattle SuperSonics' not in registry
+    assert registry.row('Seattle SuperSonics') is None
+    assert len(registry) == len(team_stats) == 30
+
+
+def test_matrix_matches_the_dataframe(team_stats, registry):
+    numeric = [column for column in team_stats.columns if pd.api.types.is_numeric_dtype(team_stats[column])]
+    assert registry.columns == numeric
+    assert registry.matrix.dtype == np.float64
+    assert registry.matrix.flags.c_contiguous
+    np.testing.assert_array_equal(registry.matrix, team_stats[numeric].to_numpy(dtype=np.float64))
+    np.testing.assert_array_equal(registry.column('PTS'), team_stats['PTS'].to_numpy(dtype=np.float64))
+
+    row = registry.row('DEN')
+    expected = team_stats[team_stats['TEAM_NAME'] == 'Denver Nuggets'].iloc[0]
+    assert registry.value('DEN', 'E_NET_RATING') == np.float64(expected['E_NET_RATING'])
+    np.testing.assert_array_equal(registry.values('DEN', ['PTS', 'AST']),
+                                  [np.float64(expected['PTS']), np.float64(expected['AST'])])
+    assert registry.names[row] == expected['TEAM_NAME']
+
+
+def test_matrix_is_read_only(registry):
+    with pytest.raises(ValueError):
+        registry.matrix[0, 0] = 1.0
+
+
+def test_team_record(registry):
+    record = registry.record('LAL')
+    assert record.name == 'Los Angeles Lakers'
+    assert record['TEAM_NAME'] == 'Los Angeles Lakers'
+    assert record['TEAM_ABBREVIATION'] == 'LAL'
+    assert record['PTS'] == registry.value('LAL', 'PTS')
+    assert 'PTS' in record and 'NOT_A_STAT' not in record
+    with pytest.raises(KeyError):
+        record['NOT_A_STAT']
+    assert registry.record('Seattle SuperSonics') is None
+
+
+def test_get_registry_is_shared_per_dataframe(team_stats):
+    df = team_stats.copy()
+    registry = get_registry(df)
+    assert get_registry(df) is registry
+    assert get_registry(team_stats.copy()) is not registry
+    assert isinstance(registry, TeamRegistry)
+
+    # El registro se descarta junto con el DataFrame
+    key = id(df)
+    del df
+    gc.collect()
+    assert key not in team_registry._registries
+
+
+def test_registry_over_an_existing_matrix(registry):
+    matrix = np.array(registry.matrix)
+    shared = TeamRegistry.from_arrays(registry.names, registry.team_ids, registry.columns, matrix)
+    assert shared.matrix is matrix
+    assert shared.row('BOS') == registry.row('BOS')
+    assert shared.value('BOS', 'PTS') == registry.value('BOS', 'PTS')
+    assert not matrix.flags.writeable
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""Escritura y consulta del almacén histórico por temporadas."""
+
+import pandas as pd
+import pytest
+
+from warehouse import StatsWarehouse
+
+
+def season_frame(points):
+    return pd.DataFrame({
+        'TEAM_ID': [1610612737, 1610612738, 1610612739],
+        'TEAM_NAME': ['Atlanta Hawks', 'Boston Celtics', 'Cleveland Cavaliers'],
+        'W': [40, 61, 64],
+        'PTS': points,
+    })
+
+
+def test_append_and_lookup(tmp_path):
+    warehouse = StatsWarehouse(str(tmp_path))
+    assert warehouse.append(season_frame([118.2, 116.3, 121.9]), '2024-25')
+    assert warehouse.has_season('2024-25')
+    assert not warehouse.has_season('2024-25', 'Playoffs')
+
+    row = warehouse.lookup('2024-25', 1610612738)
+    assert row['TEAM_NAME'] == 'Boston Celtics'
+    assert row['W'] == 61
+    assert row['PTS'] == pytest.approx(116.3)
+    assert warehouse.lookup('2024-25', 1) is None
+    assert warehouse.lookup('2023-24', 1610612738) is None
+    assert list(warehouse.load('2024-25').columns) == ['TEAM_ID', 'TEAM_NAME', 'W', 'PTS']
+
+
+def test_append_does_not_replace_by_default(tmp_path):
+    warehouse = StatsWarehouse(str(tmp_path))
+    warehouse.append(season_frame([118.2, 116.3, 121.9]), '2024-25')
+    assert not warehouse.append(season_frame([100.0, 100.0, 100.0]), '2024-25')
+    assert warehouse.lookup('2024-25', 1610612737)['PTS'] == pytest.approx(118.2)
+
+    assert warehouse.append(season_frame([100.0, 101.0, 102.0]), '2024-25', replace=True)
+    assert warehouse.lookup('2024-25', 1610612737)['PTS'] == pytest.approx(100.0)
+
+
+def test_catalog_survives_reopening(tmp_path):
+    warehouse = StatsWarehouse(str(tmp_path))
+    warehouse.append(season_frame([110.0, 111.0, 112.0]), '2023-24')
+    warehouse.append(season_frame([118.2, 116.3, 121.9]), '2024-25')
+
+    reopened = StatsWarehouse(str(tmp_path))
+    assert reopened.seasons() == ['2023-24', '2024-25']
+    assert reopened.lookup('2023-24', 1610612739)['PTS'] == pytest.approx(112.0)
+
+    history = reopened.team_history(1610612739)
+    assert history['SEASON'].tolist() == ['2023-24', '2024-25']
+    assert history['PTS'].tolist() == pytest.approx([112.0, 121.9])
+
+
+def test_append_stores_the_canonical_schema(tmp_path):
+    merged = season_frame([118.2, 116.3, 121.9]).rename(columns={'TEAM_NAME': 'TEAM_NAME_x', 'W': 'W_x'})
+    merged['TEAM_NAME_y'] = merged['TEAM_NAME_x']
+    merged['MIN_y'] = [3961.0, 3951.0, 3966.0]
+
+    warehouse = StatsWarehouse(str(tmp_path))
+    warehouse.append(merged, '2024-25')
+    season = warehouse.load('2024-25')
+    assert list(season.columns) == ['TEAM_ID', 'TEAM_NAME', 'W', 'PTS', 'E_MIN']
+    assert season['W'].dtype == 'int16'
+    assert season['PTS'].dtype == 'float32'
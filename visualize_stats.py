@@ -4,12 +4,14 @@ import seaborn as sns
 import os
 import numpy as np
 
+from data_loader import get_team_stats
+
 # Configuración de estilo para las visualizaciones
 plt.style.use('fivethirtyeight')
 sns.set(font_scale=1.2)
 
 # Cargar los datos de estadísticas combinadas
-combined_stats = pd.read_csv("nba_team_complete_stats_2024_25.csv")
+combined_stats = get_team_stats()
 
 # Crear carpeta para guardar las visualizaciones
 if not os.path.exists("visualizaciones"):
@@ -20,10 +22,10 @@ print(f"Se han cargado datos de {len(combined_stats)} equipos de la NBA")
 # 1. Visualización de la correlación entre Ofensiva y Defensiva
 plt.figure(figsize=(12, 10))
 plt.scatter(combined_stats['E_OFF_RATING'], combined_stats['E_DEF_RATING'], 
-           s=100, alpha=0.7, c=combined_stats['W_PCT_x'], cmap='viridis')
+           s=100, alpha=0.7, c=combined_stats['W_PCT'], cmap='viridis')
 
 # Añadir nombres de los equipos como etiquetas
-for i, txt in enumerate(combined_stats['TEAM_NAME_x']):
+for i, txt in enumerate(combined_stats['TEAM_NAME']):
     plt.annotate(txt, (combined_stats['E_OFF_RATING'].iloc[i], combined_stats['E_DEF_RATING'].iloc[i]),
                 fontsize=9)
 
@@ -40,7 +42,8 @@ plt.close()
 # 2. Top 10 equipos por puntos por partido
 top_pts = combined_stats.sort_values('PTS', ascending=False).head(10)
 plt.figure(figsize=(14, 8))
-sns.barplot(x='TEAM_NAME_x', y='PTS', data=top_pts, palette='viridis')
+# order: TEAM_NAME es categórica, sólo se muestran los 10 equipos seleccionados
+sns.barplot(x='TEAM_NAME', y='PTS', data=top_pts, order=top_pts['TEAM_NAME'], palette='viridis')
 plt.title('Top 10 Equipos por Puntos por Partido', fontsize=16)
 plt.xticks(rotation=45, ha='right')
 plt.ylabel('Puntos por partido')
@@ -50,11 +53,11 @@ plt.close()
 
 # 3. Relación entre asistencias y victorias
 plt.figure(figsize=(12, 8))
-sns.regplot(x='AST', y='W_PCT_x', data=combined_stats, scatter_kws={'s':100, 'alpha':0.7})
+sns.regplot(x='AST', y='W_PCT', data=combined_stats, scatter_kws={'s':100, 'alpha':0.7})
 
 # Añadir nombres de los equipos
-for i, txt in enumerate(combined_stats['TEAM_NAME_x']):
-    plt.annotate(txt, (combined_stats['AST'].iloc[i], combined_stats['W_PCT_x'].iloc[i]),
+for i, txt in enumerate(combined_stats['TEAM_NAME']):
+    plt.annotate(txt, (combined_stats['AST'].iloc[i], combined_stats['W_PCT'].iloc[i]),
                 fontsize=9)
 
 plt.title('Relación entre Asistencias y Porcentaje de Victorias', fontsize=16)
@@ -68,7 +71,7 @@ plt.close()
 plt.figure(figsize=(18, 16))
 stats_corr = combined_stats[['PTS', 'FG_PCT', 'FG3_PCT', 'FT_PCT', 'AST', 'REB',
                            'STL', 'BLK', 'TOV', 'E_OFF_RATING', 'E_DEF_RATING',
-                           'E_PACE', 'E_AST_RATIO', 'W_PCT_x']].corr()
+                           'E_PACE', 'E_AST_RATIO', 'W_PCT']].corr()
 mask = np.triu(np.ones_like(stats_corr, dtype=bool))
 heatmap = sns.heatmap(stats_corr, mask=mask, annot=True, fmt='.2f', cmap='viridis',
                      vmin=-1, vmax=1, square=True, linewidths=.5)
@@ -80,10 +83,10 @@ plt.close()
 # 5. Comparar ritmo de juego (PACE) y efectividad ofensiva
 plt.figure(figsize=(12, 8))
 sns.scatterplot(x='E_PACE', y='E_OFF_RATING', size='PTS', sizes=(50, 400),
-               hue='W_PCT_x', palette='viridis', data=combined_stats)
+               hue='W_PCT', palette='viridis', data=combined_stats)
 
 # Añadir nombres de los equipos
-for i, txt in enumerate(combined_stats['TEAM_NAME_x']):
+for i, txt in enumerate(combined_stats['TEAM_NAME']):
     plt.annotate(txt, (combined_stats['E_PACE'].iloc[i], combined_stats['E_OFF_RATING'].iloc[i]),
                 fontsize=9)
 
@@ -101,12 +104,12 @@ leaders = pd.DataFrame({
     'Categoría': ['Puntos por partido', 'Eficiencia Ofensiva', 'Eficiencia Defensiva', 
                  'Rebotes por partido', 'Asistencias por partido', 'Robos por partido'],
     'Equipo Líder': [
-        combined_stats.loc[combined_stats['PTS'].idxmax(), 'TEAM_NAME_x'],
-        combined_stats.loc[combined_stats['E_OFF_RATING'].idxmax(), 'TEAM_NAME_x'],
-        combined_stats.loc[combined_stats['E_DEF_RATING'].idxmin(), 'TEAM_NAME_x'],
-        combined_stats.loc[combined_stats['REB'].idxmax(), 'TEAM_NAME_x'],
-        combined_stats.loc[combined_stats['AST'].idxmax(), 'TEAM_NAME_x'],
-        combined_stats.loc[combined_stats['STL'].idxmax(), 'TEAM_NAME_x']
+        combined_stats.loc[combined_stats['PTS'].idxmax(), 'TEAM_NAME'],
+        combined_stats.loc[combined_stats['E_OFF_RATING'].idxmax(), 'TEAM_NAME'],
+        combined_stats.loc[combined_stats['E_DEF_RATING'].idxmin(), 'TEAM_NAME'],
+        combined_stats.loc[combined_stats['REB'].idxmax(), 'TEAM_NAME'],
+        combined_stats.loc[combined_stats['AST'].idxmax(), 'TEAM_NAME'],
+        combined_stats.loc[combined_stats['STL'].idxmax(), 'TEAM_NAME']
     ],
     'Valor': [
         combined_stats['PTS'].max(),
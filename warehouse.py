@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Almacén multi-temporada de estadísticas de equipos.
+
+Cada temporada y tipo de temporada se guarda como una partición independiente
+(una instantánea columnar de data_loader) dentro de:
+
+    <raíz>/season=2024-25/season_type=Regular_Season/
+
+Un catálogo (catalog.json) lista las particiones y los TEAM_ID de cada una,
+de modo que el índice (temporada, TEAM_ID) se construye sin abrir ninguna
+partición. Las particiones se cargan bajo demanda y se conservan en memoria.
+
+Uso:
+    python warehouse.py list
+    python warehouse.py import-csv nba_team_complete_stats_2024_25.csv --season 2024-25
+    python warehouse.py ingest 2022-23 2023-24
+    python warehouse.py lookup 2024-25 1610612738
+"""
+
+import argparse
+import json
+import os
+import threading
+
+import pandas as pd
+
+from data_loader import DEFAULT_SEASON, read_snapshot, write_snapshot
+from schema import canonicalize
+
+DEFAULT_WAREHOUSE_DIR = 'warehouse'
+DEFAULT_SEASON_TYPE = 'Regular Season'
+CATALOG_FILE = 'catalog.json'
+
+
+def partition_name(season, season_type=DEFAULT_SEASON_TYPE):
+    """Ruta relativa de la partición de una temporada."""
+    return os.path.join(f"season={season}", f"season_type={season_type.replace(' ', '_')}")
+
+
+class StatsWarehouse:
+    """
+    Almacén particionado por (temporada, tipo de temporada) e indexado por
+    (temporada, TEAM_ID).
+    """
+
+    def __init__(self, root=DEFAULT_WAREHOUSE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._catalog = self._read_catalog()
+        self._build_index()
+
+    # ------------------------------------------------------------------
+    # Catálogo e índice
+
+    def _catalog_path(self):
+        return os.path.join(self.root, CATALOG_FILE)
+
+    def _read_catalog(self):
+        if not os.path.exists(self._catalog_path()):
+            return {'partitions': {}}
+        with open(self._catalog_path(), 'r') as f:
+            return json.load(f)
+
+    def _write_catalog(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self._catalog_path()}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._catalog, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._catalog_path())
+
+    def _build_index(self):
+        # (temporada, tipo, TEAM_ID) -> (partición, fila)
+        self._index = {}
+        for name, entry in self._catalog['partitions'].items():
+            for row, team_id in enumerate(entry['team_ids']):
+                self._index[(entry['season'], entry['season_type'], team_id)] = (name, row)
+
+    # ------------------------------------------------------------------
+    # Escritura
+
+    def append(self, df, season, season_type=DEFAULT_SEASON_TYPE, replace=False):
+        """
+        Añade una temporada al almacén.
+
+        Args:
+            df: DataFrame con una fila por equipo (debe incluir TEAM_ID); se
+                convierte al esquema canónico antes de guardarse
+            season: Temporada en formato "2024-25"
+            season_type: Tipo de temporada ("Regular Season", "Playoffs"...)
+            replace: Si es False y la partición ya existe, no se modifica
+
+        Returns:
+            True si se escribió la partición
+        """
+        name = partition_name(season, season_type)
+        with self._lock:
+            if name in self._catalog['partitions'] and not replace:
+                return False
+
+            df = canonicalize(df).reset_index(drop=True)
+            write_snapshot(df, os.path.join(self.root, name))
+            self._catalog['partitions'][name] = {
+                'season': season,
+                'season_type': season_type,
+                'rows': len(df),
+                'team_ids': [int(team_id) for team_id in df['TEAM_ID']],
+            }
+            self._write_catalog()
+            self._frames.pop(name, None)
+            self._build_index()
+        return True
+
+    # ------------------------------------------------------------------
+    # Lectura
+
+    def seasons(self, season_type=DEFAULT_SEASON_TYPE):
+        """Temporadas disponibles, ordenadas cronológicamente."""
+        return sorted(entry['season'] for entry in self._catalog['partitions'].values()
+                      if entry['season_type'] == season_type)
+
+    def has_season(self, season, season_type=DEFAULT_SEASON_TYPE):
+        return partition_name(season, season_type) in self._catalog['partitions']
+
+    def _partition_frame(self, name):
+        frame = self._frames.get(name)
+        if frame is None:
+            with self._lock:
+                frame = self._frames.get(name)
+                if frame is None:
+                    frame = read_snapshot(os.path.join(self.root, name))
+                    self._frames[name] = frame
+        return frame
+
+    def load(self, season, season_type=DEFAULT_SEASON_TYPE):
+        """DataFrame completo de una temporada (cargado una sola vez)."""
+        name = partition_name(season, season_type)
+        if name not in self._catalog['partitions']:
+            raise KeyError(f"Temporada no disponible en el almacén: {season} ({season_type})")
+        return self._partition_frame(name)
+
+    def lookup(self, season, team_id, season_type=DEFAULT_SEASON_TYPE):
+        """
+        Estadísticas de un equipo en una temporada.
+
+        Returns:
+            Serie con la fila del equipo o None si no existe
+        """
+        location = self._index.get((season, season_type, int(team_id)))
+        if location is None:
+            return None
+        name, row = location
+        return self._partition_frame(name).iloc[row]
+
+    def team_history(self, team_id, season_type=DEFAULT_SEASON_TYPE):
+        """Todas las temporadas disponibles de un equipo, con una columna SEASON."""
+        rows = []
+        for season in self.seasons(season_type):
+            row = self.lookup(season, team_id, season_type)
+            if row is not None:
+                rows.append(row.to_dict() | {'SEASON': season})
+        return pd.DataFrame(rows)
+
+
+# Instancias compartidas dentro del proceso, indexadas por directorio
+_shared_warehouses = {}
+_shared_lock = threading.Lock()
+
+
+def get_warehouse(root=DEFAULT_WAREHOUSE_DIR):
+    """Devuelve el almacén compartido del proceso para el directorio indicado."""
+    key = os.path.abspath(root)
+    with _shared_lock:
+        if key not in _shared_warehouses:
+            _shared_warehouses[key] = StatsWarehouse(root)
+        return _shared_warehouses[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Almacén multi-temporada de estadísticas NBA")
+    parser.add_argument('--root', default=DEFAULT_WAREHOUSE_DIR, help="Directorio del almacén")
+    parser.add_argument('--season-type', default=DEFAULT_SEASON_TYPE, help="Tipo de temporada")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help="Listar las temporadas disponibles")
+
+    import_parser = subparsers.add_parser('import-csv', help="Importar un CSV de estadísticas completas")
+    import_parser.add_argument('csv_path')
+    import_parser.add_argument('--season', default=DEFAULT_SEASON)
+    import_parser.add_argument('--replace', action='store_true', help="Sobrescribir la temporada si ya existe")
+
+    ingest_parser = subparsers.add_parser('ingest', help="Descargar temporadas desde la API de la NBA")
+    ingest_parser.add_argument('seasons', nargs='+')
+    ingest_parser.add_argument('--replace', action='store_true', help="Volver a descargar temporadas existentes")
+
+    lookup_parser = subparsers.add_parser('lookup', help="Consultar un equipo en una temporada")
+    lookup_parser.add_argument('season')
+    lookup_parser.add_argument('team_id', type=int)
+
+    args = parser.parse_args()
+    warehouse = StatsWarehouse(args.root)
+
+    if args.command == 'list':
+        for season in warehouse.seasons(args.season_type):
+            print(season)
+    elif args.command == 'import-csv':
+        written = warehouse.append(pd.read_csv(args.csv_path), args.season, args.season_type, replace=args.replace)
+        print(f"Temporada {args.season} {'importada' if written else 'ya existente (usa --replace)'}")
+    elif args.command == 'ingest':
+        from ingest import fetch_season
+        from nba_client import NBAStatsClient
+        # Las temporadas pasadas no cambian: sus respuestas cacheadas no caducan,
+        # así que un backfill interrumpido se retoma sin repetir peticiones
+        transport = NBAStatsClient(cache_ttl=None)
+        # Sólo se descargan las temporadas que faltan (salvo --replace)
+        for season in args.seasons:
+            if warehouse.has_season(season, args.season_type) and not args.replace:
+                print(f"Temporada {season} ya disponible, se omite")
+                continue
+            frames = fetch_season(transport, season, args.season_type)
+            warehouse.append(frames['complete'], season, args.season_type, replace=True)
+            print(f"Temporada {season} añadida ({len(frames['complete'])} equipos)")
+    elif args.command == 'lookup':
+        row = warehouse.lookup(args.season, args.team_id, args.season_type)
+        if row is None:
+            print(f"No hay datos para el equipo {args.team_id} en {args.season}")
+        else:
+            pd.set_option('display.max_rows', None)
+            print(row)
+
+
+if __name__ == '__main__':
+    main()